@@ -9,16 +9,27 @@ Install: Copy to .claude/hooks/ and configure in hooks.json
 import json
 import os
 import sys
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, Dict, Any
-import hashlib
+from typing import Optional, Dict, Any, List, Sequence, Tuple
+
+# Shared swarm primitives live with the skill scripts. They are imported
+# where used, so a hook that is forwarded to the daemon never loads them.
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "skills" / "swarm-coordinator" / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import perf_trace
 
 # Configuration
 SWARM_DIR = Path(".claude/swarm")
 LOCK_TIMEOUT_MINUTES = 5
 AGENT_NAME_ENV = "CLAUDE_AGENT_NAME"
 
+# Optional coordinator daemon (hooks/coordinator_daemon.py)
+DAEMON_SOCKET = "coordinator.sock"
+DAEMON_TIMEOUT_SECONDS = 5
+
 EVENT_ALIASES = {
     "sessionstart": "session-start",
     "sessionend": "session-end",
@@ -30,10 +41,26 @@ EVENT_ALIASES = {
 class SwarmCoordinator:
     """Manages multi-agent coordination"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        agent_id: Optional[str] = None,
+        pid: Optional[int] = None,
+        lock_index=None,
+        session_pid: Optional[int] = None,
+        heartbeat_writer: bool = False,
+        lock_wait_seconds: Optional[float] = None,
+    ):
         self.swarm_dir = SWARM_DIR
         self.swarm_dir.mkdir(parents=True, exist_ok=True)
-        self.agent_id = self._get_agent_id()
+        self.agent_id = agent_id or self._get_agent_id()
+        self.pid = pid or os.getpid()
+        self._locks = lock_index
+        # The long-lived process the agent's lock leases follow (liveness.py)
+        self.session_pid = session_pid
+        self.heartbeat_writer = heartbeat_writer
+        # How long PreToolUse queues for a locked file (wait_queue.py); None
+        # means SWARM_LOCK_WAIT_SECONDS
+        self._lock_wait_seconds = lock_wait_seconds
 
     def _get_agent_id(self) -> str:
         """Get or generate agent ID"""
@@ -47,26 +74,43 @@ class SwarmCoordinator:
             return session_file.read_text().strip()
 
         # Generate new ID
+        import hashlib
+
         agent_id = f"agent-{hashlib.sha256(os.urandom(16)).hexdigest()[:8]}"
         session_file.write_text(agent_id)
         return agent_id
 
     def handle_session_start(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Handle session start event"""
+        import liveness
+        import snapshot
+
         session_id = context.get("session_id", "unknown")
+        session_pid = self.session_pid or liveness.session_pid()
 
         # Register agent
         agent_record = {
             "id": self.agent_id,
             "session_id": session_id,
             "started_at": datetime.utcnow().isoformat(),
-            "pid": os.getpid(),
+            "pid": self.pid,
+            "session_pid": session_pid,
         }
 
-        self._append_jsonl("agents.jsonl", agent_record)
+        trace = perf_trace.current()
+        with trace.phase("register"):
+            self._append_jsonl("agents.jsonl", agent_record)
 
-        # Get available tasks
-        tasks = self._get_available_tasks()
+            # Leases follow the session process, renewed by a background writer
+            if self.heartbeat_writer:
+                liveness.spawn_writer(self.swarm_dir, self.agent_id, session_pid)
+            else:
+                liveness.start_session(self.swarm_dir, self.agent_id, session_pid)
+
+        # Get available tasks from the snapshot (topped up if tasks changed)
+        with trace.phase("tasks"):
+            swarm = snapshot.load(self.swarm_dir, sections=("ready",))
+        tasks = swarm["ready"]
 
         # Build context message
         if tasks:
@@ -78,7 +122,7 @@ class SwarmCoordinator:
 
 You are agent **{self.agent_id}** in a multi-agent swarm.
 
-**Available tasks** ({len(tasks)} total):
+**Available tasks** ({swarm['ready_total']} total):
 {task_list}
 
 **Tools available**:
@@ -108,19 +152,36 @@ Use `swarm_get_state` to check swarm status.
         if tool_name not in ["Edit", "Write", "MultiEdit"]:
             return {"block": False}
 
-        file_path = self._extract_file_path(tool_input)
-        if not file_path:
+        file_paths = self._extract_file_paths(tool_input)
+        if not file_paths:
             return {"block": False}
 
-        # Check if file is locked
-        lock_info = self._check_lock(file_path)
-
-        if lock_info and lock_info["holder"] != self.agent_id:
-            # File is locked by another agent
-            time_remaining = (
-                datetime.fromisoformat(lock_info["expires_at"]) - datetime.utcnow()
-            )
-            minutes = max(1, time_remaining.seconds // 60)
+        self._renew_lease()
+
+        # All paths or none: nothing is locked if any path is held by another agent
+        reason = f"editing via {tool_name}"
+        conflicts = self._acquire_locks(file_paths, reason)
+        if conflicts and self.lock_wait_seconds() > 0:
+            with perf_trace.current().phase("wait"):
+                conflicts = self._wait_for_locks(file_paths, reason, conflicts)
+        perf_trace.current().tag(
+            lock="blocked" if conflicts else "acquired",
+            paths=len(file_paths),
+            conflicts=len(conflicts),
+        )
+
+        if conflicts:
+            file_path, lock_info = conflicts[0]
+            if lock_info.get("queued"):
+                held_for = "**Queued**: other agents are waiting for this file first"
+            elif lock_info.get("lease"):
+                held_for = f"**Held**: while {lock_info['holder']} is active (heartbeat lease)"
+            else:
+                time_remaining = (
+                    datetime.fromisoformat(lock_info["expires_at"]) - datetime.utcnow()
+                )
+                minutes = max(1, time_remaining.seconds // 60)
+                held_for = f"**Time remaining**: ~{minutes} minutes"
 
             return {
                 "block": True,
@@ -128,23 +189,20 @@ Use `swarm_get_state` to check swarm status.
 ⚠️  File **{file_path}** is locked by agent **{lock_info['holder']}**
 
 **Reason**: {lock_info.get('reason', 'editing')}
-**Time remaining**: ~{minutes} minutes
-
+{held_for}
+{self._other_conflicts(conflicts[1:])}
 **Suggestions**:
 1. Work on a different file
 2. Message {lock_info['holder']} to coordinate: `swarm_send_message`
-3. Wait for lock to expire
+3. Wait for the lock to be released or expire
 
 **Current swarm state**: Use `swarm_get_state` to see all locks
 """,
             }
 
-        # Acquire lock
-        self._acquire_lock(file_path, f"editing via {tool_name}")
-
         return {
             "block": False,
-            "message": f"✓ Acquired lock on {file_path}",
+            "message": f"✓ Acquired lock on {', '.join(file_paths)}",
         }
 
     def handle_post_tool_use(
@@ -155,16 +213,22 @@ Use `swarm_get_state` to check swarm status.
     ) -> Dict[str, Any]:
         """Handle post-tool-use event (lock release)"""
         if tool_name in ["Edit", "Write", "MultiEdit"]:
-            file_path = self._extract_file_path(tool_input)
-            if file_path and self._response_succeeded(tool_response):
-                self._release_lock(file_path)
+            self._renew_lease()
+            file_paths = self._extract_file_paths(tool_input)
+            if file_paths and self._response_succeeded(tool_response):
+                with perf_trace.current().phase("release"):
+                    self._release_locks(file_paths)
 
         return {"success": True}
 
     def handle_session_end(self, hook_context: Dict[str, Any]) -> Dict[str, Any]:
         """Handle session end event"""
-        # Release all locks held by this agent
-        self._release_all_locks()
+        import liveness
+
+        # Release all locks held by this agent, and stop its heartbeat
+        with perf_trace.current().phase("release"):
+            self._release_all_locks()
+        liveness.end_session(self.swarm_dir, self.agent_id)
 
         # Mark agent as terminated
         termination_record = {
@@ -178,25 +242,31 @@ Use `swarm_get_state` to check swarm status.
 
     # Helper methods
 
-    def _extract_file_path(self, tool_input: Any) -> Optional[str]:
-        """Extract a single file path from tool input payloads."""
+    def _extract_file_paths(self, tool_input: Any) -> List[str]:
+        """
+        Every file path a tool input targets, sorted and without duplicates.
+
+        Acquiring in sorted order keeps lock records and conflict reports
+        deterministic whatever order the tool listed its paths in.
+        """
         if isinstance(tool_input, str):
-            return tool_input
+            return [tool_input] if tool_input else []
 
         if not isinstance(tool_input, dict):
-            return None
-
-        if tool_input.get("file_path"):
-            return tool_input["file_path"]
+            return []
 
-        if tool_input.get("path"):
-            return tool_input["path"]
+        paths = [tool_input.get("file_path"), tool_input.get("path")]
+        if isinstance(tool_input.get("paths"), list):
+            paths.extend(tool_input["paths"])
 
-        paths = tool_input.get("paths")
-        if isinstance(paths, list) and paths:
-            return paths[0]
+        return sorted({p for p in paths if isinstance(p, str) and p})
 
-        return None
+    def _other_conflicts(self, conflicts: List[Tuple[str, Dict[str, Any]]]) -> str:
+        """Extra lines for the block message when several paths are locked."""
+        if not conflicts:
+            return ""
+        lines = "\n".join(f"- {path} (agent {info['holder']})" for path, info in conflicts)
+        return f"**Also locked**:\n{lines}\n"
 
     def _response_succeeded(self, tool_response: Any) -> bool:
         """Normalize success detection from Claude tool responses."""
@@ -212,58 +282,193 @@ Use `swarm_get_state` to check swarm status.
 
         return str(status).lower() in {"ok", "success", "done"}
 
-    def _check_lock(self, file_path: str) -> Optional[Dict[str, Any]]:
-        """Check if file is currently locked"""
-        locks_file = self.swarm_dir / "locks.jsonl"
-        if not locks_file.exists():
-            return None
+    def _lock_index(self):
+        """Indexed view of locks.jsonl (opened lazily, once per coordinator)"""
+        if self._locks is None:
+            from lock_index import LockIndex
 
-        # Scan backwards for most recent lock record
-        lines = locks_file.read_text().strip().split("\n")
-        for line in reversed(lines):
-            if not line:
-                continue
+            self._locks = LockIndex(self.swarm_dir)
+        return self._locks
 
-            record = json.loads(line)
-            if record["file_path"] != file_path:
-                continue
+    def _renew_lease(self):
+        """Mark this agent alive (a utime on its heartbeat file)"""
+        import liveness
 
-            # Check if lock is released
-            if record.get("status") == "released":
-                return None
+        with perf_trace.current().phase("lease"):
+            liveness.touch(self.swarm_dir, self.agent_id)
 
-            # Check if lock is expired
-            expires_at = datetime.fromisoformat(record["expires_at"])
-            if expires_at > datetime.utcnow():
-                return record
-            else:
-                # Expired
-                return None
+    def _check_locks(self, file_paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Active locks on any of file_paths, keyed by path.
 
-        return None
+        A path covered by another agent's reservation (a task's `files`
+        pattern, see lock_index.py) reports that reservation unless another
+        agent already holds the path itself.
+        """
+        locks = self._lock_index()
+        held = locks.get_many(file_paths)
 
-    def _acquire_lock(self, file_path: str, reason: str):
-        """Acquire lock on file"""
-        lock_record = {
-            "file_path": file_path,
-            "holder": self.agent_id,
-            "reason": reason,
-            "acquired_at": datetime.utcnow().isoformat(),
-            "expires_at": (
-                datetime.utcnow() + timedelta(minutes=LOCK_TIMEOUT_MINUTES)
-            ).isoformat(),
-        }
-        self._append_jsonl("locks.jsonl", lock_record)
-
-    def _release_lock(self, file_path: str):
-        """Release lock on file"""
-        release_record = {
-            "file_path": file_path,
-            "holder": self.agent_id,
-            "released_at": datetime.utcnow().isoformat(),
-            "status": "released",
-        }
-        self._append_jsonl("locks.jsonl", release_record)
+        relative = {path: self._project_path(path) for path in file_paths}
+        covered = locks.covering_many(sorted(set(relative.values())))
+        for path in file_paths:
+            if path in held and held[path]["holder"] != self.agent_id:
+                continue
+            others = [r for r in covered.get(relative[path], []) if r["holder"] != self.agent_id]
+            if others:
+                held[path] = others[0]
+        return held
+
+    def _project_path(self, file_path: str) -> str:
+        """file_path relative to the project root, as task `files` patterns are written"""
+        root = self.swarm_dir.resolve().parent.parent
+        path = os.path.normpath(os.path.join(root, file_path))
+        relative = os.path.relpath(path, root)
+        if relative == ".." or relative.startswith(".." + os.sep):
+            return file_path
+        return relative.replace(os.sep, "/")
+
+    def _acquire_locks(
+        self, file_paths: List[str], reason: str, ticket_id: Optional[str] = None
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Lock every path in one append, or none of them.
+
+        The check and the append happen under the locks.jsonl append lock,
+        so no other agent can take one of the paths in between. Returns the
+        (path, lock) pairs held by other agents; the batch is only written
+        when that list is empty. A free path still conflicts while another
+        agent waits for it ahead of ticket_id (any waiter, without a ticket).
+        """
+        import wait_queue
+        from swarm_log import locked_append
+
+        trace = perf_trace.current()
+        with locked_append(self.swarm_dir / "locks.jsonl") as f:
+            with trace.phase("check_locks"):
+                held = self._check_locks(file_paths)
+            conflicts = [
+                (path, held[path])
+                for path in file_paths
+                if path in held and held[path]["holder"] != self.agent_id
+            ]
+            if not conflicts and wait_queue.has_waiters(self.swarm_dir):
+                for path in file_paths:
+                    entry = wait_queue.queued_ahead(
+                        self.swarm_dir, path, self.agent_id, ticket_id
+                    )
+                    if entry is not None:
+                        conflicts.append(
+                            (
+                                path,
+                                {
+                                    "holder": entry["agent_id"],
+                                    "reason": "queued for this file",
+                                    "queued": True,
+                                },
+                            )
+                        )
+            if conflicts:
+                return conflicts
+
+            now = datetime.utcnow()
+            expires_at = (now + timedelta(minutes=LOCK_TIMEOUT_MINUTES)).isoformat()
+            with trace.phase("append"):
+                f.write(
+                    "".join(
+                        json.dumps(
+                            {
+                                "file_path": file_path,
+                                "holder": self.agent_id,
+                                "reason": reason,
+                                "lease": True,
+                                "acquired_at": now.isoformat(),
+                                "expires_at": expires_at,
+                            }
+                        )
+                        + "\n"
+                        for file_path in file_paths
+                    )
+                )
+
+        with trace.phase("append"):
+            self._after_append("locks.jsonl")
+        with trace.phase("index_refresh"):
+            self._lock_index().refresh()
+        return []
+
+    def lock_wait_seconds(self) -> float:
+        """How long PreToolUse waits for locked files (0: block at once)"""
+        if self._lock_wait_seconds is None:
+            import wait_queue
+
+            self._lock_wait_seconds = wait_queue.WAIT_SECONDS
+        return self._lock_wait_seconds
+
+    def _wait_for_locks(
+        self,
+        file_paths: List[str],
+        reason: str,
+        conflicts: List[Tuple[str, Dict[str, Any]]],
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Queue for file_paths and take them when this agent's turn comes.
+
+        Sleeps until a release wakes the ticket (or RECHECK_SECONDS pass)
+        and retries; only the oldest waiter on every path may lock. Returns
+        [] once locked, or the remaining conflicts when the wait times out
+        or a queue is full.
+        """
+        import wait_queue
+
+        started = time.monotonic()
+        deadline = time.time() + self.lock_wait_seconds()
+        ticket = wait_queue.Ticket(self.swarm_dir, self.agent_id, file_paths, deadline)
+        if not ticket.enqueue():
+            wait_queue.record_wait(self.swarm_dir, self.agent_id, file_paths, 0, "full")
+            return conflicts
+
+        try:
+            while True:
+                # Also covers a release between the first attempt and enqueue
+                conflicts = self._acquire_locks(file_paths, reason, ticket.id)
+                if not conflicts:
+                    outcome = "acquired"
+                    break
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    outcome = "timeout"
+                    break
+                ticket.wait(min(remaining, wait_queue.RECHECK_SECONDS))
+                self._renew_lease()
+        finally:
+            ticket.leave()
+
+        if outcome == "timeout":
+            # Pass the turn on if this agent was first in line
+            wait_queue.notify(self.swarm_dir, file_paths)
+        wait_queue.record_wait(
+            self.swarm_dir, self.agent_id, file_paths, time.monotonic() - started, outcome
+        )
+        perf_trace.current().tag(wait=outcome)
+        return conflicts
+
+    def _release_locks(self, file_paths: List[str], patterns: Sequence[str] = ()):
+        """Release locks on all file_paths, and reservations on patterns, in one append"""
+        if not file_paths and not patterns:
+            return
+        released_at = datetime.utcnow().isoformat()
+        release = {"holder": self.agent_id, "released_at": released_at, "status": "released"}
+        self._append_jsonl(
+            "locks.jsonl",
+            *({"file_path": file_path, **release} for file_path in file_paths),
+            *({"file_path": pattern, "reservation": True, **release} for pattern in patterns),
+        )
+        self._lock_index().refresh()
+
+        import wait_queue
+
+        if wait_queue.has_waiters(self.swarm_dir):
+            wait_queue.notify(self.swarm_dir, file_paths)
 
     def _release_all_locks(self):
         """Release all locks held by this agent"""
@@ -271,47 +476,24 @@ Use `swarm_get_state` to check swarm status.
         if not locks_file.exists():
             return
 
-        # Find all active locks for this agent
-        active_locks = set()
-        lines = locks_file.read_text().strip().split("\n")
+        # Release every lock whose latest record is ours, and our reservations
+        index = self._lock_index()
+        self._release_locks(
+            sorted(index.held_by(self.agent_id)), list(index.reservations(self.agent_id))
+        )
 
-        for line in lines:
-            if not line:
-                continue
-            record = json.loads(line)
-
-            if record.get("holder") == self.agent_id:
-                if record.get("status") == "released":
-                    active_locks.discard(record["file_path"])
-                else:
-                    active_locks.add(record["file_path"])
-
-        # Release each active lock
-        for file_path in active_locks:
-            self._release_lock(file_path)
-
-    def _get_available_tasks(self) -> list:
-        """Get list of available tasks"""
-        tasks_file = self.swarm_dir / "tasks.jsonl"
-        if not tasks_file.exists():
-            return []
+    def _append_jsonl(self, filename: str, *records: Dict[str, Any]):
+        """Append records to JSONL file in one write (under its lock, so compaction is safe)"""
+        from swarm_log import append_records
 
-        # Parse tasks (simplified - should use proper task tracking)
-        tasks = []
-        for line in tasks_file.read_text().strip().split("\n"):
-            if not line:
-                continue
-            task = json.loads(line)
-            if task.get("status") == "pending" and not task.get("assigned_to"):
-                tasks.append(task)
+        append_records(self.swarm_dir / filename, records)
+        self._after_append(filename)
 
-        return sorted(tasks, key=lambda t: t.get("priority", 0), reverse=True)
+    def _after_append(self, filename: str):
+        """Start a background compaction if the log has grown large"""
+        from compact import maybe_trigger_compaction
 
-    def _append_jsonl(self, filename: str, record: Dict[str, Any]):
-        """Append record to JSONL file"""
-        filepath = self.swarm_dir / filename
-        with open(filepath, "a") as f:
-            f.write(json.dumps(record) + "\n")
+        maybe_trigger_compaction(self.swarm_dir, self.swarm_dir / filename)
 
 def _normalize_event_name(event_name: Optional[str]) -> str:
     """Normalize hook event names to kebab-case for routing."""
@@ -329,12 +511,28 @@ def _normalize_event_name(event_name: Optional[str]) -> str:
     return ""
 
 
-def process_hook_event(event_data: Dict[str, Any]) -> Dict[str, Any]:
+def process_hook_event(
+    event_data: Dict[str, Any], coordinator: Optional[SwarmCoordinator] = None
+) -> Dict[str, Any]:
     """Process a Claude Code hook payload and return the hook response."""
-    coordinator = SwarmCoordinator()
     event_type = _normalize_event_name(
         event_data.get("hook_event_name") or event_data.get("event")
     )
+    # Traced here unless the caller (main, the daemon) already traces the call
+    trace = perf_trace.start(event_type)
+    perf_trace.current().set_event(event_type)
+    try:
+        with perf_trace.current().phase("session"):
+            coordinator = coordinator or SwarmCoordinator()
+        return _dispatch_hook_event(event_type, event_data, coordinator)
+    finally:
+        perf_trace.finish(trace, SWARM_DIR)
+
+
+def _dispatch_hook_event(
+    event_type: str, event_data: Dict[str, Any], coordinator: SwarmCoordinator
+) -> Dict[str, Any]:
+    """Route a normalized hook event to the coordinator's handler."""
     hook_context = event_data.get("hook_context") or event_data.get("context") or {}
 
     try:
@@ -364,17 +562,77 @@ def process_hook_event(event_data: Dict[str, Any]) -> Dict[str, Any]:
         return {"error": str(exc)}
 
 
-def main():
-    """Main entry point for hook execution"""
-    raw_input = sys.stdin.read().strip() or "{}"
+def forward_to_daemon(
+    event_data: Dict[str, Any],
+    agent_id: str,
+    pid: Optional[int] = None,
+    session_pid: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Hand a hook payload to the coordinator daemon, if one is listening.
+
+    Returns the daemon's hook response, or None when no daemon answered and
+    the event should be handled in-process.
+    """
+    socket_path = SWARM_DIR / DAEMON_SOCKET
+    if not socket_path.exists():
+        return None
+
+    import socket
+
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+
+    request = {
+        "agent_id": agent_id,
+        "pid": pid or os.getpid(),
+        "session_pid": session_pid,
+        "event": event_data,
+    }
     try:
-        event_data = json.loads(raw_input)
-    except json.JSONDecodeError:
-        print(json.dumps({"error": "Invalid JSON input"}))
-        sys.exit(1)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(DAEMON_TIMEOUT_SECONDS)
+            sock.connect(str(socket_path))
+            sock.sendall((json.dumps(request) + "\n").encode())
+            with sock.makefile("rb") as reader:
+                response = reader.readline()
+        return json.loads(response)
+    except (OSError, ValueError):
+        # Stale socket, daemon shutting down or timed out
+        return None
 
-    result = process_hook_event(event_data)
-    print(json.dumps(result))
+
+def main(raw_input: Optional[str] = None):
+    """Main entry point for hook execution (payload from stdin unless given)"""
+    if raw_input is None:
+        raw_input = sys.stdin.read()
+    trace = perf_trace.start("unknown")
+    with perf_trace.current().phase("parse"):
+        raw_input = raw_input.strip() or "{}"
+        try:
+            event_data = json.loads(raw_input)
+        except json.JSONDecodeError:
+            print(json.dumps({"error": "Invalid JSON input"}))
+            sys.exit(1)
+    event_type = _normalize_event_name(event_data.get("hook_event_name") or event_data.get("event"))
+    perf_trace.current().set_event(event_type)
+
+    with perf_trace.current().phase("session"):
+        coordinator = SwarmCoordinator(heartbeat_writer=True)
+        session_pid = None
+        if event_type == "session-start":
+            from liveness import session_pid as current_session_pid
+
+            # The daemon is not a child of the agent, so tell it which process is
+            session_pid = current_session_pid()
+    with perf_trace.current().phase("daemon"):
+        result = forward_to_daemon(event_data, coordinator.agent_id, session_pid=session_pid)
+    if result is None or (result.get("block") and coordinator.lock_wait_seconds() > 0):
+        # The daemon never sleeps on a lock, so a queued wait happens here
+        result = process_hook_event(event_data, coordinator)
+    with perf_trace.current().phase("serialize"):
+        print(json.dumps(result))
+    perf_trace.finish(trace, coordinator.swarm_dir)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Optional long-lived coordinator for the swarm hooks.
+
+Every hook invocation normally starts a Python process that opens the lock
+index, catches up with the log tail and exits. When this daemon is running,
+coordination.py forwards the hook payload over a Unix domain socket
+(.claude/swarm/coordinator.sock) instead, and the daemon answers it with a
+coordinator that stays warm between calls. If the daemon is not running the
+hook simply handles the event itself, so starting it is purely an
+optimization.
+
+Requests are served one at a time, which also serializes lock decisions
+between agents that go through the daemon. The logs remain the source of
+truth: agents that do not use the daemon keep appending to them directly.
+
+Usage:
+    python3 hooks/coordinator_daemon.py start    # detach into the background
+    python3 hooks/coordinator_daemon.py run      # stay in the foreground
+    python3 hooks/coordinator_daemon.py status
+    python3 hooks/coordinator_daemon.py stop
+
+Run it from the project root, like the hooks themselves.
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLUGIN_ROOT))
+sys.path.insert(0, str(PLUGIN_ROOT / "skills" / "swarm-coordinator" / "scripts"))
+
+import perf_trace
+import swarm_log
+from hooks import coordination
+from lock_index import LockIndex
+
+PID_FILE = "coordinator.pid"
+
+# Exit after this long without a request
+IDLE_TIMEOUT_SECONDS = int(os.environ.get("SWARM_DAEMON_IDLE_SECONDS", 1800))
+
+# A client that stops sending mid-request must not stall everyone else
+REQUEST_TIMEOUT_SECONDS = 5
+
+
+class HookRequestHandler(socketserver.StreamRequestHandler):
+    """One JSON request line in, one JSON hook response line out."""
+
+    timeout = REQUEST_TIMEOUT_SECONDS
+
+    def handle(self):
+        self.server.last_request = time.monotonic()
+        trace = perf_trace.start("unknown")
+        perf_trace.current().tag(daemon=True)
+        try:
+            with perf_trace.current().phase("parse"):
+                request = json.loads(self.rfile.readline())
+            with perf_trace.current().phase("session"):
+                coordinator = self.server.coordinator_for(
+                    request["agent_id"], request.get("pid"), request.get("session_pid")
+                )
+            event_data = request.get("event") or {}
+            result = coordination.process_hook_event(event_data, coordinator)
+        except (ValueError, KeyError, TypeError) as exc:
+            result = {"error": f"Invalid daemon request: {exc}"}
+        except OSError:
+            perf_trace.finish(trace, coordination.SWARM_DIR)
+            return
+
+        # A finished session has no more events to serve
+        if result.get("success") and _is_session_end(event_data):
+            self.server.coordinators.pop(request["agent_id"], None)
+
+        with perf_trace.current().phase("serialize"):
+            self.wfile.write((json.dumps(result) + "\n").encode())
+        perf_trace.finish(trace, coordination.SWARM_DIR)
+
+
+class CoordinatorDaemon(socketserver.UnixStreamServer):
+    """Serves hook events for every agent from one process."""
+
+    def __init__(self, socket_path: Path):
+        self.socket_path = Path(socket_path)
+        self.coordinators: Dict[str, coordination.SwarmCoordinator] = {}
+        self.last_request = time.monotonic()
+        self._locks = None
+        super().__init__(str(self.socket_path), HookRequestHandler)
+
+    def coordinator_for(
+        self, agent_id: str, pid: Optional[int], session_pid: Optional[int] = None
+    ) -> coordination.SwarmCoordinator:
+        """The warm coordinator for agent_id, created on first use."""
+        if not agent_id:
+            raise ValueError("agent_id is required")
+
+        coordinator = self.coordinators.get(agent_id)
+        if coordinator is None:
+            if self._locks is None:
+                self._locks = LockIndex(coordination.SWARM_DIR)
+            # All agents share one lock index connection
+            coordinator = coordination.SwarmCoordinator(
+                agent_id=agent_id,
+                pid=pid,
+                lock_index=self._locks,
+                session_pid=session_pid,
+                heartbeat_writer=True,
+                # Waiting would stall every other agent's events
+                lock_wait_seconds=0,
+            )
+            self.coordinators[agent_id] = coordinator
+        else:
+            if pid:
+                coordinator.pid = pid
+            if session_pid:
+                coordinator.session_pid = session_pid
+        return coordinator
+
+    def serve_until_idle(self, idle_timeout: float = IDLE_TIMEOUT_SECONDS):
+        """Handle requests until none has arrived for idle_timeout seconds."""
+        while time.monotonic() - self.last_request < idle_timeout:
+            # Group-committed appends must not wait for the next request
+            if swarm_log.has_pending_sync():
+                self.timeout = swarm_log.FSYNC_GROUP_SECONDS
+            else:
+                self.timeout = min(60, idle_timeout)
+            self.handle_request()
+            swarm_log.sync_pending(swarm_log.FSYNC_GROUP_SECONDS)
+
+    def server_close(self):
+        super().server_close()
+        if self._locks is not None:
+            self._locks.close()
+            self._locks = None
+        try:
+            self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _is_session_end(event_data: Dict) -> bool:
+    name = event_data.get("hook_event_name") or event_data.get("event")
+    return coordination._normalize_event_name(name) == "session-end"
+
+
+def socket_path(swarm_dir: Path = None) -> Path:
+    return (swarm_dir or coordination.SWARM_DIR) / coordination.DAEMON_SOCKET
+
+
+def daemon_running(path: Path) -> bool:
+    """True if something accepts connections on the daemon socket."""
+    if not path.exists():
+        return False
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(1)
+            sock.connect(str(path))
+        return True
+    except OSError:
+        return False
+
+
+def run(idle_timeout: float = IDLE_TIMEOUT_SECONDS) -> int:
+    """Serve in the foreground until idle, SIGTERM or SIGINT."""
+    swarm_dir = coordination.SWARM_DIR
+    swarm_dir.mkdir(parents=True, exist_ok=True)
+    path = socket_path(swarm_dir)
+
+    if daemon_running(path):
+        print(f"❌ Coordinator daemon already running on {path}")
+        return 1
+    if path.exists():
+        # Left behind by a daemon that was killed
+        path.unlink()
+
+    def _terminate(signum, frame):
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, _terminate)
+
+    pid_file = swarm_dir / PID_FILE
+    server = CoordinatorDaemon(path)
+    pid_file.write_text(str(os.getpid()))
+    try:
+        server.serve_until_idle(idle_timeout)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            pid_file.unlink()
+        except FileNotFoundError:
+            pass
+    return 0
+
+
+def start(idle_timeout: float = IDLE_TIMEOUT_SECONDS) -> int:
+    """Launch the daemon in its own session and wait until it listens."""
+    swarm_dir = coordination.SWARM_DIR
+    path = socket_path(swarm_dir)
+    if daemon_running(path):
+        print(f"✓ Coordinator daemon already running on {path}")
+        return 0
+
+    log_file = swarm_dir / ".cache" / "coordinator.log"
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_file, "a") as log:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "run", "--idle-timeout", str(idle_timeout)],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+        )
+
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        if daemon_running(path):
+            print(f"✓ Coordinator daemon listening on {path}")
+            return 0
+        time.sleep(0.05)
+
+    print(f"❌ Coordinator daemon did not start (see {log_file})")
+    return 1
+
+
+def stop() -> int:
+    """Ask a running daemon to exit."""
+    swarm_dir = coordination.SWARM_DIR
+    path = socket_path(swarm_dir)
+    try:
+        pid = int((swarm_dir / PID_FILE).read_text().strip())
+        os.kill(pid, signal.SIGTERM)
+    except (FileNotFoundError, ValueError, ProcessLookupError):
+        print("Coordinator daemon is not running")
+        return 0
+
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and path.exists():
+        time.sleep(0.05)
+    print("✓ Coordinator daemon stopped")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Swarm coordinator daemon")
+    parser.add_argument("command", choices=["start", "run", "stop", "status"])
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=IDLE_TIMEOUT_SECONDS,
+        help="Exit after this many seconds without a request",
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        sys.exit(run(args.idle_timeout))
+    if args.command == "start":
+        sys.exit(start(args.idle_timeout))
+    if args.command == "stop":
+        sys.exit(stop())
+
+    path = socket_path()
+    if daemon_running(path):
+        print(f"✓ Coordinator daemon listening on {path}")
+    else:
+        print("Coordinator daemon is not running")
+
+
+if __name__ == "__main__":
+    main()
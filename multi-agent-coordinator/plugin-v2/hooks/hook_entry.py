@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Startup-optimised entry point for the swarm coordination hook.
+
+Claude Code starts a fresh interpreter for every hook event, and with a
+broad matcher most of those events are for tools coordination ignores.
+This script imports nothing but sys and os until it knows the event
+matters: a PreToolUse/PostToolUse payload that mentions neither Edit nor
+Write (so the tool cannot be Edit, Write or MultiEdit) is answered straight
+from the raw text, before json is imported or the filesystem is touched.
+
+Everything else is handed to coordination.py. Imported rather than run as
+the main script, it loads from cached bytecode instead of being compiled on
+every event; session start precompiles it and the skill scripts, so the
+cache is there even when PYTHONDONTWRITEBYTECODE is set.
+"""
+
+import os
+import sys
+
+# Substrings of every coordinated tool name (MultiEdit contains Edit)
+EDIT_TOOLS = ("Edit", "Write")
+
+# What coordination.py answers for an event about any other tool
+IGNORED_RESPONSES = {
+    "pretooluse": '{"block": false}',
+    "posttooluse": '{"success": true}',
+}
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(os.path.dirname(HOOKS_DIR), "skills", "swarm-coordinator", "scripts")
+
+
+def _event_name(raw: str):
+    """
+    hook_event_name of a raw payload, read without a JSON parser.
+
+    Returns None whenever the text is not unambiguous: the key appears more
+    or less than once, the legacy "event" key is present, or the value is
+    not a plain string.
+    """
+    key = '"hook_event_name"'
+    if raw.count(key) != 1 or '"event"' in raw:
+        return None
+
+    rest = raw[raw.index(key) + len(key) :].lstrip()
+    if not rest.startswith(":"):
+        return None
+    rest = rest[1:].lstrip()
+    end = rest.find('"', 1)
+    if not rest.startswith('"') or end < 0:
+        return None
+
+    value = rest[1:end]
+    return None if "\\" in value else value
+
+
+def _event_token(raw: str) -> str:
+    """Event name folded like coordination.py does ("PreToolUse" -> "pretooluse")."""
+    return (_event_name(raw) or "").replace("-", "").replace("_", "").lower()
+
+
+def fast_response(raw: str):
+    """The hook response for an event coordination ignores, or None to process it."""
+    if any(name in raw for name in EDIT_TOOLS):
+        return None
+    return IGNORED_RESPONSES.get(_event_token(raw))
+
+
+def precompile():
+    """Refresh the bytecode of the hook and skill scripts (best effort)."""
+    import compileall
+
+    for directory in (HOOKS_DIR, SCRIPTS_DIR):
+        # A read-only plugin directory just keeps compiling in memory
+        compileall.compile_dir(directory, maxlevels=0, quiet=2)
+
+
+def main():
+    raw_input = sys.stdin.read()
+    response = fast_response(raw_input)
+    if response is not None:
+        print(response)
+        return
+
+    import coordination
+
+    coordination.main(raw_input)
+
+    if _event_token(raw_input) == "sessionstart":
+        precompile()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Compact binary record format for swarm logs (optional).
+
+The live logs stay JSONL: every reader and writer in the plugin, and git
+diffs, depend on it. This format is for copies of them (archives, exports,
+large histories) that are scanned far more often than read in full. A
+.swlog file starts with MAGIC and holds one record per entry:
+
+    length   u32   body size in bytes
+    kind     u8    record type (KINDS)
+    encoding u8    body encoding (ENCODING_MSGPACK or ENCODING_JSON)
+    time     f64   record timestamp, seconds since the epoch (0 if none)
+    key      u64   key_hash() of the record's key (KEY_FIELDS)
+    crc      u32   CRC-32 of the body
+    body           the JSON record, as msgpack if installed, else compact JSON
+
+A reader looking for one key (a file path, a recipient, a task) compares the
+fixed-size headers and skips every other body without decoding it.
+JSONL converts to this format and back without loss: export_jsonl() of an
+imported log reproduces each json.dumps() line.
+
+Usage:
+    python3 binlog.py import .claude/swarm/locks.jsonl locks.swlog
+    python3 binlog.py export locks.swlog locks.jsonl
+    python3 binlog.py scan locks.swlog --key src/app.py
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:  # optional: bodies fall back to JSON
+    msgpack = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no advisory locks
+    fcntl = None
+
+MAGIC = b"SWLOG1\n\0"
+HEADER = struct.Struct("<IBBdQI")
+
+ENCODING_JSON = 0
+ENCODING_MSGPACK = 1
+
+# Record types
+KINDS = {
+    "task": 1,
+    "task_update": 2,
+    "message": 3,
+    "lock": 4,
+    "lock_release": 5,
+    "agent": 6,
+    "agent_end": 7,
+    "other": 0,
+}
+KIND_NAMES = {code: name for name, code in KINDS.items()}
+
+# The field a record is looked up by, per record type
+KEY_FIELDS = {
+    "task": "id",
+    "task_update": "task_id",
+    "message": "to",
+    "lock": "file_path",
+    "lock_release": "file_path",
+    "agent": "id",
+    "agent_end": "id",
+}
+
+TIME_FIELDS = (
+    "timestamp",
+    "acquired_at",
+    "released_at",
+    "claimed_at",
+    "completed_at",
+    "created_at",
+    "started_at",
+    "terminated_at",
+)
+
+
+class CorruptRecord(ValueError):
+    """A record whose body does not match its CRC."""
+
+
+class Header(NamedTuple):
+    offset: int
+    length: int
+    kind: str
+    encoding: int
+    time: float
+    key_hash: int
+    crc: int
+
+
+def key_hash(key: str) -> int:
+    """Stable 64-bit hash of a record key."""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+
+
+def classify(record: Dict[str, Any]) -> str:
+    """Record type of a swarm log record."""
+    if "file_path" in record:
+        return "lock_release" if record.get("status") == "released" else "lock"
+    if "task_id" in record:
+        return "task_update"
+    if "to" in record and "from" in record:
+        return "message"
+    if "terminated_at" in record:
+        return "agent_end"
+    if "started_at" in record and "id" in record:
+        return "agent"
+    if "id" in record and "description" in record:
+        return "task"
+    return "other"
+
+
+def record_time(record: Dict[str, Any]) -> float:
+    for field in TIME_FIELDS:
+        value = record.get(field)
+        if isinstance(value, str):
+            try:
+                stamp = datetime.fromisoformat(value)
+            except ValueError:
+                continue
+            if stamp.tzinfo is None:
+                stamp = stamp.replace(tzinfo=timezone.utc)
+            return stamp.timestamp()
+    return 0.0
+
+
+def _encode_body(record: Dict[str, Any]) -> Tuple[int, bytes]:
+    if msgpack is not None:
+        try:
+            return ENCODING_MSGPACK, msgpack.packb(record, use_bin_type=True)
+        except (OverflowError, TypeError, ValueError):
+            # Integers wider than 64 bits and the like: JSON keeps them
+            pass
+    return ENCODING_JSON, json.dumps(record, separators=(",", ":")).encode()
+
+
+def _decode_body(encoding: int, body: bytes) -> Dict[str, Any]:
+    if encoding == ENCODING_JSON:
+        return json.loads(body)
+    if msgpack is None:
+        raise RuntimeError("this log holds msgpack records; install msgpack to read it")
+    return msgpack.unpackb(body, raw=False, strict_map_key=False)
+
+
+def encode(record: Dict[str, Any]) -> bytes:
+    """One record, header and body."""
+    kind = classify(record)
+    key = record.get(KEY_FIELDS.get(kind, ""), "")
+    encoding, body = _encode_body(record)
+    header = HEADER.pack(
+        len(body),
+        KINDS[kind],
+        encoding,
+        record_time(record),
+        key_hash(str(key)) if key else 0,
+        zlib.crc32(body),
+    )
+    return header + body
+
+
+def append_records(path: Path, records: Iterable[Dict[str, Any]]):
+    """Append records to a .swlog file in one locked write."""
+    data = b"".join(encode(record) for record in records)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        if os.fstat(fd).st_size == 0:
+            data = MAGIC + data
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+def _scan(path: Path) -> Iterator[Tuple[Header, Any]]:
+    """
+    (header, buffer) for each complete record of a .swlog file.
+
+    A record cut short by a writer that is still appending (or crashed) ends
+    the scan.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < len(MAGIC) or f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a swarm binary log")
+        if size == len(MAGIC):
+            return
+        with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as buf:
+            offset = len(MAGIC)
+            unpack = HEADER.unpack_from
+            while offset + HEADER.size <= size:
+                length, kind, encoding, stamp, hashed, crc = unpack(buf, offset)
+                if offset + HEADER.size + length > size:
+                    return
+                yield Header(
+                    offset, length, KIND_NAMES.get(kind, "other"), encoding, stamp, hashed, crc
+                ), buf
+                offset += HEADER.size + length
+
+
+def iter_headers(path: Path) -> Iterator[Header]:
+    """Headers of the complete records of a .swlog file, none decoded."""
+    for header, _ in _scan(path):
+        yield header
+
+
+def read_records(
+    path: Path, key: Optional[str] = None, kinds: Optional[Iterable[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Records of a .swlog file, in order.
+
+    With key (or kinds), only records with that key (or of those types) are
+    decoded; the bodies of all others are skipped unread.
+    """
+    wanted_hash = key_hash(key) if key is not None else None
+    kinds = set(kinds) if kinds is not None else None
+    for header, buf in _scan(path):
+        if wanted_hash is not None and header.key_hash != wanted_hash:
+            continue
+        if kinds is not None and header.kind not in kinds:
+            continue
+        start = header.offset + HEADER.size
+        body = buf[start : start + header.length]
+        if zlib.crc32(body) != header.crc:
+            raise CorruptRecord(f"{path}: record at byte {header.offset} fails its CRC")
+        record = _decode_body(header.encoding, body)
+        # Hash collisions are possible, if unlikely
+        if key is not None and str(record.get(KEY_FIELDS.get(header.kind, ""), "")) != key:
+            continue
+        yield record
+
+
+def import_jsonl(jsonl_path: Path, swlog_path: Path, batch: int = 10000) -> int:
+    """Convert a JSONL log to a new .swlog file; returns the record count."""
+    swlog_path = Path(swlog_path)
+    if swlog_path.exists():
+        swlog_path.unlink()
+    count = 0
+    pending = []
+    with open(jsonl_path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            pending.append(json.loads(line))
+            if len(pending) >= batch:
+                append_records(swlog_path, pending)
+                count += len(pending)
+                pending = []
+    if pending or not count:
+        append_records(swlog_path, pending)
+        count += len(pending)
+    return count
+
+
+def export_jsonl(swlog_path: Path, jsonl_path: Path) -> int:
+    """Write a .swlog file back out as JSONL; returns the record count."""
+    count = 0
+    tmp_path = Path(jsonl_path).with_name(f".{Path(jsonl_path).name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        for record in read_records(swlog_path):
+            f.write(json.dumps(record) + "\n")
+            count += 1
+    os.replace(tmp_path, jsonl_path)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Binary swarm log conversion and scans")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    convert = sub.add_parser("import", help="JSONL log to .swlog")
+    convert.add_argument("source")
+    convert.add_argument("target")
+
+    export = sub.add_parser("export", help=".swlog to JSONL log")
+    export.add_argument("source")
+    export.add_argument("target")
+
+    scan = sub.add_parser("scan", help="Print records of a .swlog as JSONL")
+    scan.add_argument("source")
+    scan.add_argument("--key", help="Only records with this key (file path, recipient, task, agent)")
+    scan.add_argument("--kind", action="append", choices=sorted(KINDS), help="Only these types")
+
+    args = parser.parse_args()
+
+    if args.command == "import":
+        count = import_jsonl(Path(args.source), Path(args.target))
+        print(f"✓ Imported {count} records into {args.target}", file=sys.stderr)
+    elif args.command == "export":
+        count = export_jsonl(Path(args.source), Path(args.target))
+        print(f"✓ Exported {count} records to {args.target}", file=sys.stderr)
+    else:
+        for record in read_records(Path(args.source), args.key, args.kind):
+            print(json.dumps(record))
+
+
+if __name__ == "__main__":
+    main()
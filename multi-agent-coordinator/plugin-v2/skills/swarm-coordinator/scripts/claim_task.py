@@ -1,15 +1,31 @@
 #!/usr/bin/env python3
-"""Claim a task from the task queue."""
+"""
+Claim a task from the task queue.
+
+Claiming a task with `files` patterns also reserves them in locks.jsonl
+(see lock_index.py), so other agents' edits under those paths are blocked
+until the task is completed. A task whose patterns overlap another agent's
+reservation cannot be claimed until that reservation is released.
+"""
 
 import argparse
 import json
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Any, Dict, List
 from id_generator import generate_agent_id
+from lock_index import LockIndex, patterns_overlap
+from state_engine import is_claimable
+from swarm_cache import SwarmCache
+from swarm_log import append_records, locked_append
 
 SWARM_DIR = Path(".claude/swarm")
 
+# Reservations are leases (liveness.py): they end when their holder's
+# heartbeat stops, and outlive a forgotten task by at most this long
+RESERVATION_HOURS = float(os.environ.get("SWARM_RESERVATION_HOURS", 24))
+
 
 def get_agent_id() -> str:
     """Get current agent ID."""
@@ -28,100 +44,151 @@ def get_agent_id() -> str:
 
 def load_task_state():
     """Load current task state."""
-    tasks_file = SWARM_DIR / "tasks.jsonl"
-    if not tasks_file.exists():
+    if not SWARM_DIR.exists():
         return {}
-
-    task_state = {}
-    with open(tasks_file, "r") as f:
-        for line in f:
-            if not line.strip():
-                continue
-
-            record = json.loads(line)
-
-            # Task definition
-            if "id" in record and "task_id" not in record:
-                task_state[record["id"]] = {**record, "status": "pending"}
-            # Task state update
-            elif "task_id" in record:
-                task_id = record["task_id"]
-                if task_id in task_state:
-                    task_state[task_id].update(record)
-
-    return task_state
+    with SwarmCache(SWARM_DIR) as cache:
+        return cache.tasks()
 
 
 def get_available_tasks(task_state):
-    """Get list of available tasks."""
-    available = []
-
-    for task_id, task in task_state.items():
-        # Must be pending and not assigned
-        if task.get("status") != "pending" or task.get("assigned_to"):
-            continue
-
-        # Check dependencies
-        deps = task.get("dependencies", [])
-        all_deps_completed = all(
-            task_state.get(dep_id, {}).get("status") == "completed" for dep_id in deps
-        )
-
-        if all_deps_completed:
-            available.append(task)
+    """Claimable tasks of task_state, in the ready queue's claim order."""
+    available = [task for task in task_state.values() if is_claimable(task_state, task)]
+    available.sort(key=lambda t: (-(t.get("priority") or 0), t.get("created_at") or ""))
+    return available
 
-    # Sort by priority (descending)
-    available.sort(key=lambda t: t.get("priority", 0), reverse=True)
 
-    return available
+def _patterns(task: Dict[str, Any]) -> List[str]:
+    return sorted({p for p in task.get("files") or [] if isinstance(p, str) and p})
+
+
+def reservation_conflicts(
+    reservations: Dict[str, Dict[str, Any]], task: Dict[str, Any], agent_id: str
+) -> List[Dict[str, Any]]:
+    """Reservations of other agents that overlap a `files` pattern of task."""
+    return [
+        record
+        for held, record in reservations.items()
+        if record["holder"] != agent_id
+        and any(patterns_overlap(held, pattern) for pattern in _patterns(task))
+    ]
+
+
+def reserve_files(task: Dict[str, Any], agent_id: str, locks_log=None) -> List[str]:
+    """
+    Append one reservation per `files` pattern of task, in one write.
+
+    locks_log is an open locked_append() of locks.jsonl to write to, when
+    the caller already holds that lock.
+    """
+    patterns = _patterns(task)
+    if not patterns:
+        return []
+
+    now = datetime.utcnow()
+    expires_at = (now + timedelta(hours=RESERVATION_HOURS)).isoformat()
+    records = [
+        {
+            "file_path": pattern,
+            "holder": agent_id,
+            "reason": f"reserved for task {task['id']}",
+            "reservation": True,
+            "lease": True,
+            "task_id": task["id"],
+            "acquired_at": now.isoformat(),
+            "expires_at": expires_at,
+        }
+        for pattern in patterns
+    ]
+    if locks_log is None:
+        append_records(SWARM_DIR / "locks.jsonl", records)
+    else:
+        locks_log.write("".join(json.dumps(record) + "\n" for record in records))
+    return patterns
 
 
 def claim_task(task_id: str = None):
-    """Claim a task."""
+    """
+    Claim a task.
+
+    The state read, the availability check and the claim append all happen
+    while holding the tasks.jsonl lock, so two agents can never claim the
+    same task. The reservation check and the reservations are written under
+    the locks.jsonl lock as well, so two agents can never reserve
+    overlapping patterns. Returns the claimed task ID, or None if nothing
+    was claimed.
+    """
     SWARM_DIR.mkdir(parents=True, exist_ok=True)
     agent_id = get_agent_id()
-    task_state = load_task_state()
-
-    # Find task to claim
-    if task_id:
-        task = task_state.get(task_id)
-        if not task:
-            print(f"❌ Task {task_id} not found")
-            return
-        if task.get("status") != "pending":
-            print(f"❌ Task {task_id} is not available (status: {task.get('status')})")
-            return
-    else:
-        # Auto-assign highest priority task
-        available = get_available_tasks(task_state)
-        if not available:
-            print("No available tasks to claim")
-            return
-        task = available[0]
-        task_id = task["id"]
-
-    # Claim the task
-    claim = {
-        "task_id": task_id,
-        "agent_id": agent_id,
-        "claimed_at": datetime.utcnow().isoformat(),
-        "status": "in_progress",
-    }
 
     tasks_file = SWARM_DIR / "tasks.jsonl"
-    with open(tasks_file, "a") as f:
-        f.write(json.dumps(claim) + "\n")
+    locks_file = SWARM_DIR / "locks.jsonl"
+    with locked_append(tasks_file) as f, SwarmCache(SWARM_DIR) as cache:
+        with locked_append(locks_file) as locks_log:
+            index = LockIndex(SWARM_DIR)
+            try:
+                reservations = index.reservations()
+            finally:
+                index.close()
+
+            # Find task to claim
+            if task_id:
+                task = cache.task(task_id)
+                if not task:
+                    print(f"❌ Task {task_id} not found")
+                    return None
+                if task.get("status") != "pending":
+                    holder = task.get("agent_id")
+                    if task.get("status") == "in_progress" and holder:
+                        print(f"❌ Task {task_id} was already claimed by {holder}")
+                    else:
+                        print(f"❌ Task {task_id} is not available (status: {task.get('status')})")
+                    return None
+                conflicts = reservation_conflicts(reservations, task, agent_id)
+                if conflicts:
+                    held = ", ".join(f"{r['file_path']} ({r['holder']})" for r in conflicts)
+                    print(f"❌ Task {task_id} needs files reserved by other agents: {held}")
+                    return None
+            else:
+                # Auto-assign the highest priority claimable task whose files are free
+                task = cache.next_available_task()
+                if task and reservation_conflicts(reservations, task, agent_id):
+                    task = next(
+                        (
+                            t
+                            for t in cache.available_tasks()
+                            if not reservation_conflicts(reservations, t, agent_id)
+                        ),
+                        None,
+                    )
+                if not task:
+                    print("No available tasks to claim")
+                    return None
+                task_id = task["id"]
+
+            # Claim the task
+            claim = {
+                "task_id": task_id,
+                "agent_id": agent_id,
+                "claimed_at": datetime.utcnow().isoformat(),
+                "status": "in_progress",
+            }
+            f.write(json.dumps(claim) + "\n")
+            reserved = reserve_files(task, agent_id, locks_log)
 
     print(f"✓ Claimed task **{task_id}**: {task.get('description', '')}")
     print()
     print(f"**Priority**: {task.get('priority', 0)}")
     if task.get("files"):
         print(f"**Files**: {', '.join(task['files'])}")
+    if reserved:
+        print(f"**Reserved**: {', '.join(reserved)} (released on completion)")
     if task.get("dependencies"):
         print(f"**Dependencies**: {', '.join(task['dependencies'])}")
     print()
     print("You can now work on this task. When complete, use complete_task.py")
 
+    return task_id
+
 
 def main():
     parser = argparse.ArgumentParser(description="Claim a task from the queue")
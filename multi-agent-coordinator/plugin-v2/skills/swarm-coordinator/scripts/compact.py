@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Compact the append-only swarm logs.
+
+- locks.jsonl:  only the currently active, unexpired locks are kept
+- tasks.jsonl:  all updates are folded into one record per task
+- agents.jsonl: terminated agents are dropped
+
+Each rewrite holds the log's append lock, writes a temp file and renames it
+over the log, so readers never see a half-written file and writers blocked
+on the lock re-open the new file instead of appending to the old one.
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from liveness import Liveness
+from lock_index import lock_is_active
+from state_engine import apply_task_record
+from swarm_log import locked_append, read_appended
+
+SWARM_DIR = Path(".claude/swarm")
+
+# Logs larger than this are compacted by --auto (and the hook trigger)
+AUTO_COMPACT_BYTES = int(os.environ.get("SWARM_COMPACT_BYTES", 1024 * 1024))
+
+# A trigger marker older than this belongs to a compactor that died
+TRIGGER_STALE_SECONDS = 600
+
+
+def fold_locks(records: List[Dict[str, Any]], swarm_dir: Path = None) -> List[Dict[str, Any]]:
+    """Keep the latest record per path if it is active (reservations apart from locks)."""
+    latest = {}
+    for record in records:
+        if record.get("file_path"):
+            latest[(bool(record.get("reservation")), record["file_path"])] = record
+
+    now = datetime.utcnow()
+    liveness = Liveness(swarm_dir, now) if swarm_dir is not None else None
+    return [record for record in latest.values() if lock_is_active(record, now, liveness)]
+
+
+def fold_tasks(records: List[Dict[str, Any]], swarm_dir: Path = None) -> List[Dict[str, Any]]:
+    """Fold every task into a single record carrying its full state."""
+    task_state = {}
+    for record in records:
+        apply_task_record(task_state, record)
+
+    return [{**task, "compacted": True} for task in task_state.values()]
+
+
+def fold_agents(records: List[Dict[str, Any]], swarm_dir: Path = None) -> List[Dict[str, Any]]:
+    """Keep the latest registration of every agent still running."""
+    active = {}
+    for record in records:
+        agent_id = record.get("id")
+        if not agent_id:
+            continue
+        if record.get("terminated_at"):
+            active.pop(agent_id, None)
+        else:
+            active.pop(agent_id, None)
+            active[agent_id] = record
+
+    return list(active.values())
+
+
+# Each fold gets a log's records and the swarm directory holding the log
+FOLDERS: Dict[str, Callable[[List[Dict[str, Any]], Path], List[Dict[str, Any]]]] = {
+    "locks": fold_locks,
+    "tasks": fold_tasks,
+    "agents": fold_agents,
+}
+
+
+def compact_log(path: Path, fold: Callable) -> Dict[str, int]:
+    """
+    Rewrite a JSONL log as fold(records, swarm_dir), atomically.
+
+    Returns the record counts before and after compaction.
+    """
+    path = Path(path)
+    if not path.exists():
+        return {"before": 0, "after": 0}
+
+    with locked_append(path):
+        records = read_appended(path).records
+        kept = fold(records, path.parent)
+
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.compact")
+        with open(tmp_path, "w") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in kept))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    return {"before": len(records), "after": len(kept)}
+
+
+def compact(
+    logs: List[str] = None, min_bytes: int = 0, swarm_dir: Path = None
+) -> Dict[str, Dict[str, int]]:
+    """Compact the named logs (all by default) that are at least min_bytes."""
+    swarm_dir = swarm_dir or SWARM_DIR
+    results = {}
+    for name in logs or list(FOLDERS):
+        path = swarm_dir / f"{name}.jsonl"
+        if not path.exists() or path.stat().st_size < min_bytes:
+            continue
+        results[name] = compact_log(path, FOLDERS[name])
+    return results
+
+
+def _trigger_marker(swarm_dir: Path) -> Path:
+    return swarm_dir / ".cache" / "compact.pending"
+
+
+def maybe_trigger_compaction(swarm_dir: Path, log_path: Path):
+    """Start a background compaction if log_path has outgrown AUTO_COMPACT_BYTES."""
+    try:
+        if log_path.stat().st_size < AUTO_COMPACT_BYTES:
+            return
+    except OSError:
+        return
+    _start_background(swarm_dir)
+
+
+def maybe_trigger_retention(swarm_dir: Path, log_path: Path):
+    """Start a background compaction if the message log log_path is due for retention."""
+    import message_archive
+
+    if message_archive.retention_due(log_path):
+        _start_background(swarm_dir)
+
+
+def _start_background(swarm_dir: Path):
+    """
+    Start compact.py --auto (compaction of large logs, then message retention).
+
+    At most one background compactor runs at a time; a marker file in the
+    cache directory records that one was started.
+    """
+    try:
+        marker = _trigger_marker(swarm_dir)
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            if time.time() - marker.stat().st_mtime > TRIGGER_STALE_SECONDS:
+                marker.unlink()
+        except FileNotFoundError:
+            pass
+
+        fd = os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        os.close(fd)
+    except OSError:
+        # Already running, or the swarm directory is not writable
+        return
+
+    import subprocess
+
+    subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), "--auto", "--swarm-dir", str(swarm_dir)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compact swarm JSONL logs")
+    parser.add_argument(
+        "--logs",
+        nargs="+",
+        choices=list(FOLDERS),
+        help="Logs to compact (default: all)",
+    )
+    parser.add_argument(
+        "--auto",
+        action="store_true",
+        help=f"Only compact logs larger than {AUTO_COMPACT_BYTES} bytes",
+    )
+    parser.add_argument("--swarm-dir", help="Swarm directory (default: .claude/swarm)")
+
+    args = parser.parse_args()
+
+    swarm_dir = Path(args.swarm_dir) if args.swarm_dir else SWARM_DIR
+
+    archived = {}
+    try:
+        results = compact(args.logs, AUTO_COMPACT_BYTES if args.auto else 0, swarm_dir)
+        if args.auto:
+            import message_archive
+
+            archived = message_archive.apply_retention(swarm_dir)
+    finally:
+        if args.auto:
+            try:
+                _trigger_marker(swarm_dir).unlink()
+            except FileNotFoundError:
+                pass
+
+    if not results and not archived:
+        print("Nothing to compact")
+    for name, counts in results.items():
+        print(f"✓ Compacted {name}.jsonl: {counts['before']} → {counts['after']} records")
+    for key, count in archived.items():
+        print(f"✓ Archived {count} old message(s) from {key}")
+
+
+if __name__ == "__main__":
+    main()
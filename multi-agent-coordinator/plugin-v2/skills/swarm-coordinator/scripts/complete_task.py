@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
-"""Mark a task as completed."""
+"""Mark a task as completed, releasing its file reservations."""
 
 import argparse
-import json
 import os
 from datetime import datetime
 from pathlib import Path
-from id_generator import generate_agent_id, generate_message_id
+from swarm_log import append_records
+from id_generator import generate_agent_id
+from lock_index import LockIndex
+from message_store import append_message, new_message_id
 
 SWARM_DIR = Path(".claude/swarm")
 
@@ -26,6 +28,40 @@ def get_agent_id() -> str:
     return agent_id
 
 
+def release_reservations(task_id: str, agent_id: str):
+    """Release the agent's reservations for task_id in one append."""
+    if not (SWARM_DIR / "locks.jsonl").exists():
+        return []
+
+    index = LockIndex(SWARM_DIR)
+    try:
+        patterns = [
+            pattern
+            for pattern, record in index.reservations(agent_id).items()
+            if record.get("task_id") == task_id
+        ]
+    finally:
+        index.close()
+    if not patterns:
+        return []
+
+    released_at = datetime.utcnow().isoformat()
+    append_records(
+        SWARM_DIR / "locks.jsonl",
+        [
+            {
+                "file_path": pattern,
+                "holder": agent_id,
+                "reservation": True,
+                "released_at": released_at,
+                "status": "released",
+            }
+            for pattern in patterns
+        ],
+    )
+    return patterns
+
+
 def complete_task(task_id: str, summary: str = ""):
     """Mark task as completed."""
     SWARM_DIR.mkdir(parents=True, exist_ok=True)
@@ -40,13 +76,12 @@ def complete_task(task_id: str, summary: str = ""):
         "summary": summary,
     }
 
-    tasks_file = SWARM_DIR / "tasks.jsonl"
-    with open(tasks_file, "a") as f:
-        f.write(json.dumps(completion) + "\n")
+    append_records(SWARM_DIR / "tasks.jsonl", [completion])
+    released = release_reservations(task_id, agent_id)
 
     # Broadcast completion message
     message = {
-        "id": generate_message_id(SWARM_DIR),
+        "id": new_message_id(SWARM_DIR),
         "from": agent_id,
         "to": "all",
         "subject": f"Task {task_id} completed",
@@ -57,11 +92,11 @@ def complete_task(task_id: str, summary: str = ""):
         "read": False,
     }
 
-    messages_file = SWARM_DIR / "messages.jsonl"
-    with open(messages_file, "a") as f:
-        f.write(json.dumps(message) + "\n")
+    append_message(SWARM_DIR, message)
 
     print(f"✓ Task {task_id} marked as completed")
+    if released:
+        print(f"  Released reservations: {', '.join(released)}")
     print("  Broadcast notification sent to all agents")
 
 
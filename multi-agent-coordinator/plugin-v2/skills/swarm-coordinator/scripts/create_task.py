@@ -3,26 +3,27 @@
 
 import argparse
 import json
+import os
+import sqlite3
+import sys
 from datetime import datetime
 from pathlib import Path
-from id_generator import generate_task_id
+from swarm_log import append_records, locked_append
+from swarm_cache import SwarmCache
+from id_generator import RecordIndex, count_records_in_file, generate_ids, generate_task_id
 
 SWARM_DIR = Path(".claude/swarm")
 
 
-def create_task(
+def _new_task(
+    task_id: str,
     description: str,
     files: list = None,
     dependencies: list = None,
     priority: int = 5,
-):
-    """Create a new task with hash-based ID."""
-    SWARM_DIR.mkdir(parents=True, exist_ok=True)
-
-    # Generate collision-resistant ID
-    task_id = generate_task_id(SWARM_DIR)
-
-    task = {
+) -> dict:
+    """Build a task definition record."""
+    return {
         "id": task_id,
         "description": description,
         "status": "pending",
@@ -32,9 +33,38 @@ def create_task(
         "created_at": datetime.utcnow().isoformat(),
     }
 
-    tasks_file = SWARM_DIR / "tasks.jsonl"
-    with open(tasks_file, "a") as f:
-        f.write(json.dumps(task) + "\n")
+
+def _check_spec(spec, where: str):
+    """Raise ValueError naming where (e.g. "line 3") if spec is not a valid task spec."""
+    if not isinstance(spec, dict):
+        raise ValueError(f"{where}: task spec must be a JSON object, got {spec!r}")
+    if not spec.get("description") or not isinstance(spec["description"], str):
+        raise ValueError(f"{where}: task spec is missing a description: {spec}")
+    priority = spec.get("priority", 5)
+    if not isinstance(priority, int) or isinstance(priority, bool):
+        raise ValueError(f"{where}: priority must be an integer, got {priority!r}")
+    for key in ("dependencies", "files"):
+        value = spec.get(key)
+        if value is not None and (
+            not isinstance(value, list) or not all(isinstance(v, str) for v in value)
+        ):
+            raise ValueError(f"{where}: {key} must be a list of strings, got {value!r}")
+
+
+def create_task(
+    description: str,
+    files: list = None,
+    dependencies: list = None,
+    priority: int = 5,
+):
+    """Create a new task with hash-based ID."""
+    SWARM_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Generate collision-resistant ID
+    task_id = generate_task_id(SWARM_DIR)
+
+    task = _new_task(task_id, description, files, dependencies, priority)
+    append_records(SWARM_DIR / "tasks.jsonl", [task])
 
     print(f"✓ Created task **{task_id}**")
     print(f"  Description: {description}")
@@ -47,9 +77,92 @@ def create_task(
     return task_id
 
 
+def create_tasks(batch: list) -> list:
+    """
+    Create many tasks at once.
+
+    All IDs are generated against one record count and reserved in the ID
+    index (see id_generator.RecordIndex) while the tasks log is locked, so
+    they collide neither with each other nor with IDs handed out
+    elsewhere. The whole batch is then written in a single buffered append
+    followed by one fsync.
+
+    Args:
+        batch: Task specs with "description" and optional "files",
+            "dependencies" and "priority" keys
+
+    Returns:
+        The new task IDs, in batch order
+
+    Raises:
+        ValueError: if any spec is invalid; nothing is written then
+    """
+    for number, spec in enumerate(batch, 1):
+        _check_spec(spec, f"entry {number}")
+
+    SWARM_DIR.mkdir(parents=True, exist_ok=True)
+    tasks_file = SWARM_DIR / "tasks.jsonl"
+
+    with locked_append(tasks_file) as f:
+        try:
+            task_ids = RecordIndex(tasks_file).new_ids("task", len(batch))
+        except (OSError, sqlite3.Error):
+            # Unwritable cache directory: check against the log itself
+            with SwarmCache(SWARM_DIR) as cache:
+                existing = cache.tasks()
+            record_count = count_records_in_file(tasks_file) + len(batch)
+            task_ids = generate_ids("task", len(batch), record_count, set(existing))
+
+        tasks = [
+            _new_task(
+                task_id,
+                spec["description"],
+                spec.get("files"),
+                spec.get("dependencies"),
+                spec.get("priority", 5),
+            )
+            for task_id, spec in zip(task_ids, batch)
+        ]
+
+        f.write("".join(json.dumps(task) + "\n" for task in tasks))
+        f.flush()
+        os.fsync(f.fileno())
+
+    return task_ids
+
+
+def read_batch(source: str) -> list:
+    """Read task specs from a JSONL file, or stdin when source is '-'.
+
+    Raises ValueError naming the line of the first invalid spec.
+    """
+    stream = sys.stdin if source == "-" else open(source, "r")
+    try:
+        batch = []
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                spec = json.loads(line)
+            except ValueError as exc:
+                raise ValueError(f"line {number}: invalid JSON: {exc}") from None
+            _check_spec(spec, f"line {number}")
+            batch.append(spec)
+        return batch
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Create a new task")
-    parser.add_argument("--description", required=True, help="Task description")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--description", help="Task description")
+    source.add_argument(
+        "--from-jsonl",
+        metavar="PATH",
+        help="Create one task per JSONL line ('-' reads stdin)",
+    )
     parser.add_argument(
         "--files",
         nargs="+",
@@ -69,6 +182,19 @@ def main():
 
     args = parser.parse_args()
 
+    if args.from_jsonl:
+        try:
+            batch = read_batch(args.from_jsonl)
+            task_ids = create_tasks(batch)
+        except (OSError, ValueError) as exc:
+            print(f"❌ {exc}")
+            sys.exit(1)
+
+        print(f"✓ Created {len(task_ids)} task(s)")
+        for task_id, spec in zip(task_ids, batch):
+            print(f"  - **{task_id}**: {spec['description']}")
+        return
+
     create_task(
         description=args.description,
         files=args.files,
@@ -1,12 +1,24 @@
 #!/usr/bin/env python3
-"""Get messages sent to this agent."""
+"""
+Get messages sent to this agent.
+
+Each agent has a read cursor (.cache/cursors/<agent>.json) holding the
+position, in every message log it reads (see message_store.py), up to which
+it has read its mail. Unread messages are the ones past the cursor, read
+from the agent's own logs only (SwarmCache.inbox()), and marking them read
+moves the cursor instead of rewriting the log.
+"""
 
 import argparse
 import json
 import os
-import hashlib
 from datetime import datetime
 from pathlib import Path
+from typing import Any, Dict
+
+import message_store
+from swarm_cache import SwarmCache
+from swarm_log import watermark_at, write_json_atomic
 
 SWARM_DIR = Path(".claude/swarm")
 
@@ -20,46 +32,131 @@ def get_agent_id() -> str:
     if session_file.exists():
         return session_file.read_text().strip()
 
+    import hashlib
+
     agent_id = f"agent-{hashlib.sha256(os.urandom(16)).hexdigest()[:8]}"
     SWARM_DIR.mkdir(parents=True, exist_ok=True)
     session_file.write_text(agent_id)
     return agent_id
 
 
-def get_messages(unread_only: bool = True, limit: int = 20):
-    """Get messages for this agent."""
+def cursor_file(agent_id: str) -> Path:
+    """Path of the agent's read cursor."""
+    return SWARM_DIR / message_store.CURSOR_DIR / f"{message_store.safe_name(agent_id)}.json"
+
+
+def load_cursor(agent_id: str) -> Dict[str, Any]:
+    """Read positions of the agent, keyed by log file name."""
+    try:
+        return json.loads(cursor_file(agent_id).read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_cursor(agent_id: str, cursor: Dict[str, Any]):
+    """Persist read positions durably."""
+    write_json_atomic(cursor_file(agent_id), cursor, durable=True)
+
+
+def fetch_unread(agent_id: str, limit: int = 20, peek: bool = False) -> Dict[str, Any]:
+    """
+    Oldest unread messages for agent_id, at most limit of them.
+
+    Unless peek is set, the cursor of every inbox log is moved past the
+    messages returned from it (and past anything in between that was not
+    addressed to the agent). Returns the messages and how many unread
+    messages remain after them.
+    """
+    cursor = load_cursor(agent_id)
+    with SwarmCache(SWARM_DIR) as cache:
+        tails = cache.inbox(agent_id, cursor)
+    streams = [
+        [
+            {"timestamp": msg.get("timestamp", ""), "msg": msg, "log": key, "end": end}
+            for msg, end in zip(tail.records, tail.ends)
+            if not msg.get("read", False)
+        ]
+        for key, tail in tails.items()
+    ]
+
+    unread = message_store.merge_by_time(streams)
+    shown = unread[:limit]
+
+    if not peek:
+        # A log with unread messages left over stops after its last shown one
+        leftover = {entry["log"] for entry in unread[limit:]}
+        last_shown = {entry["log"]: entry["end"] for entry in shown}
+
+        changed = False
+        for key, tail in tails.items():
+            if key not in leftover:
+                position = tail.watermark
+            elif key in last_shown:
+                position = watermark_at(SWARM_DIR / key, tail.watermark["inode"], last_shown[key])
+            else:
+                position = None
+            if position is not None and position != cursor.get(key):
+                cursor[key] = position
+                changed = True
+        if changed:
+            save_cursor(agent_id, cursor)
+
+    return {
+        "messages": [entry["msg"] for entry in shown],
+        "remaining": len(unread) - len(shown),
+    }
+
+
+def wait_for_unread(agent_id: str, timeout: float) -> bool:
+    """Long-poll until agent_id has unread mail (see watch.py); False on timeout."""
+    import watch
+
+    # The agent's logs in either layout, in case the swarm is partitioned meanwhile
+    logs = [
+        message_store.MESSAGES_LOG,
+        message_store.log_key(SWARM_DIR, message_store.partition_log(SWARM_DIR, agent_id)),
+        message_store.log_key(
+            SWARM_DIR, message_store.partition_log(SWARM_DIR, message_store.BROADCAST)
+        ),
+    ]
+    return bool(
+        watch.wait_until(
+            lambda: fetch_unread(agent_id, 1, peek=True)["messages"], SWARM_DIR, logs, timeout
+        )
+    )
+
+
+def get_messages(
+    unread_only: bool = True, limit: int = 20, peek: bool = False, wait: float = 0
+):
+    """
+    Print messages for this agent, newest first, and return them.
+
+    With wait (unread only), blocks up to that many seconds for new mail
+    instead of returning empty-handed.
+    """
     agent_id = get_agent_id()
-    messages_file = SWARM_DIR / "messages.jsonl"
 
-    if not messages_file.exists():
+    if unread_only and wait > 0:
+        wait_for_unread(agent_id, wait)
+
+    if not any(log.exists() for log in message_store.inbox_logs(SWARM_DIR, agent_id)):
         print("No messages.")
-        return
-
-    # Read all messages
-    all_messages = []
-    with open(messages_file, "r") as f:
-        for line in f:
-            if line.strip():
-                all_messages.append(json.loads(line))
-
-    # Filter messages for this agent
-    messages = [
-        msg
-        for msg in all_messages
-        if msg.get("to") == agent_id or msg.get("to") == "all"
-    ]
+        return []
 
-    # Filter unread if requested
+    remaining = 0
     if unread_only:
-        messages = [msg for msg in messages if not msg.get("read", False)]
-
-    # Limit results
-    messages = messages[-limit:]
+        unread = fetch_unread(agent_id, limit, peek)
+        messages, remaining = unread["messages"], unread["remaining"]
+    else:
+        with SwarmCache(SWARM_DIR) as cache:
+            inbox = cache.inbox(agent_id)
+        messages = message_store.merge_by_time(tail.records for tail in inbox.values())[-limit:]
     messages.reverse()
 
     if not messages:
         print("No messages.")
-        return
+        return []
 
     print(f"📬 {len(messages)} message(s):\n")
 
@@ -75,6 +172,11 @@ def get_messages(unread_only: bool = True, limit: int = 20):
         print("---")
         print()
 
+    if remaining:
+        print(f"({remaining} more unread message(s); run again to read them)")
+
+    return messages
+
 
 def main():
     parser = argparse.ArgumentParser(description="Get messages sent to this agent")
@@ -89,10 +191,22 @@ def main():
         default=20,
         help="Maximum number of messages to show",
     )
+    parser.add_argument(
+        "--peek",
+        action="store_true",
+        help="Show unread messages without marking them read",
+    )
+
+    parser.add_argument(
+        "--wait",
+        type=float,
+        default=0,
+        help="With --unread-only, wait up to this many seconds for new messages",
+    )
 
     args = parser.parse_args()
 
-    get_messages(args.unread_only, args.limit)
+    get_messages(args.unread_only, args.limit, args.peek, args.wait)
 
 
 if __name__ == "__main__":
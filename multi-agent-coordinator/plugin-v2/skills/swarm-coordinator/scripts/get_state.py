@@ -2,98 +2,43 @@
 """Query current swarm state."""
 
 import argparse
-import json
 from datetime import datetime
 from pathlib import Path
+from swarm_cache import SwarmCache
 
 SWARM_DIR = Path(".claude/swarm")
 
 
 def get_agents():
     """Get active agents."""
-    agents_file = SWARM_DIR / "agents.jsonl"
-    if not agents_file.exists():
+    if not SWARM_DIR.exists():
         return {}
-
-    active_agents = {}
-    with open(agents_file, "r") as f:
-        for line in f:
-            if not line.strip():
-                continue
-
-            record = json.loads(line)
-            agent_id = record.get("id")
-
-            if not agent_id:
-                continue
-
-            if record.get("terminated_at"):
-                # Agent terminated
-                active_agents.pop(agent_id, None)
-            else:
-                # Agent started
-                active_agents[agent_id] = record
-
-    return active_agents
+    with SwarmCache(SWARM_DIR) as cache:
+        return cache.agents()
 
 
 def get_tasks():
     """Get task state."""
-    tasks_file = SWARM_DIR / "tasks.jsonl"
-    if not tasks_file.exists():
+    if not SWARM_DIR.exists():
         return {}
-
-    task_state = {}
-    with open(tasks_file, "r") as f:
-        for line in f:
-            if not line.strip():
-                continue
-
-            record = json.loads(line)
-
-            # Task definition
-            if "id" in record and "task_id" not in record:
-                task_state[record["id"]] = {**record, "status": "pending"}
-            # Task state update
-            elif "task_id" in record:
-                task_id = record["task_id"]
-                if task_id in task_state:
-                    task_state[task_id].update(record)
-
-    return task_state
+    with SwarmCache(SWARM_DIR) as cache:
+        return cache.tasks()
 
 
 def get_locks():
     """Get active file locks."""
-    locks_file = SWARM_DIR / "locks.jsonl"
-    if not locks_file.exists():
+    if not SWARM_DIR.exists():
         return {}
+    with SwarmCache(SWARM_DIR) as cache:
+        return cache.locks()
 
-    active_locks = {}
-    with open(locks_file, "r") as f:
-        for line in f:
-            if not line.strip():
-                continue
-
-            record = json.loads(line)
-            file_path = record.get("file_path")
 
-            if not file_path:
-                continue
-
-            if record.get("status") == "released":
-                # Lock released
-                active_locks.pop(file_path, None)
-            elif record.get("holder"):
-                # Check if expired
-                expires_at = datetime.fromisoformat(record["expires_at"])
-                if expires_at > datetime.utcnow():
-                    active_locks[file_path] = record
-                else:
-                    # Expired
-                    active_locks.pop(file_path, None)
-
-    return active_locks
+def get_reservations():
+    """Get active file reservations of claimed tasks."""
+    if not SWARM_DIR.exists():
+        return {}
+    with SwarmCache(SWARM_DIR) as cache:
+        return cache.reservations()
 
 
 def print_agents(agents):
@@ -138,17 +83,61 @@ def print_locks(locks):
     print(f"## 🔒 Active File Locks ({len(locks)})\n")
     if locks:
         for file_path, lock in locks.items():
-            expires_at = datetime.fromisoformat(lock["expires_at"])
-            remaining = int((expires_at - datetime.utcnow()).total_seconds() / 60)
             print(f"- **{file_path}**")
             print(f"  - Holder: {lock['holder']}")
             print(f"  - Reason: {lock.get('reason', 'unknown')}")
-            print(f"  - Expires in: {max(0, remaining)} min")
+            if lock.get("lease"):
+                print("  - Held while the holder's heartbeat is fresh")
+            else:
+                expires_at = datetime.fromisoformat(lock["expires_at"])
+                remaining = int((expires_at - datetime.utcnow()).total_seconds() / 60)
+                print(f"  - Expires in: {max(0, remaining)} min")
     else:
         print("No active locks.")
     print()
 
 
+def print_reservations(reservations):
+    """Print the file patterns reserved by claimed tasks."""
+    print(f"## 📌 Reserved Files ({len(reservations)})\n")
+    if reservations:
+        for pattern, reservation in reservations.items():
+            print(f"- **{pattern}**")
+            print(f"  - Holder: {reservation['holder']}")
+            print(f"  - Task: {reservation.get('task_id', 'unknown')}")
+    else:
+        print("No reserved files.")
+    print()
+
+
+def print_perf(summary):
+    """Print hook latency percentiles from the trace ring (perf_trace.py)."""
+    print("## ⏱️ Hook Performance\n")
+    if not summary:
+        print("No traces. Set SWARM_TRACE=1 for the hooks to record them.")
+        print()
+        return
+
+    for event, stats in summary.items():
+        total = stats["total"]
+        print(
+            f"### {event} ({total['count']} calls): "
+            f"p50 {total['p50']:.2f}ms, p95 {total['p95']:.2f}ms, p99 {total['p99']:.2f}ms"
+        )
+        for phase, latency in stats["phases"].items():
+            print(
+                f"- {phase}: p50 {latency['p50']:.2f}ms, p95 {latency['p95']:.2f}ms, "
+                f"p99 {latency['p99']:.2f}ms ({latency['count']} calls)"
+            )
+        if stats["mean_counters"]:
+            counters = ", ".join(f"{c} {v}" for c, v in stats["mean_counters"].items())
+            print(f"- Mean per call: {counters}")
+        if stats["locks"]:
+            locks = ", ".join(f"{outcome} {n}" for outcome, n in sorted(stats["locks"].items()))
+            print(f"- Locks: {locks}")
+        print()
+
+
 def get_state(query_type: str = "all"):
     """Get and print swarm state."""
     if query_type in ["agents", "all"]:
@@ -162,13 +151,20 @@ def get_state(query_type: str = "all"):
     if query_type in ["locks", "all"]:
         locks = get_locks()
         print_locks(locks)
+        print_reservations(get_reservations())
+
+    # Traces are opt-in, so only shown on request
+    if query_type == "perf":
+        import perf_trace
+
+        print_perf(perf_trace.summarize(perf_trace.read(SWARM_DIR)))
 
 
 def main():
     parser = argparse.ArgumentParser(description="Query swarm state")
     parser.add_argument(
         "--query-type",
-        choices=["all", "agents", "tasks", "locks"],
+        choices=["all", "agents", "tasks", "locks", "perf"],
         default="all",
         help="Type of state to query",
     )
@@ -8,12 +8,21 @@ Inspired by beads' progressive hash length scaling:
 - Large projects (1,500-10,000): 6-char hash
 
 This ensures minimal collision probability while keeping IDs readable.
+
+Record counts and the set of IDs already in a log are kept in a small
+SQLite index (.cache/ids.db) that only reads the lines appended since its
+last refresh, so neither the hash length decision nor the collision check
+re-reads the whole file.
 """
 
 import hashlib
+import sqlite3
 import time
 import os
 from pathlib import Path
+from typing import Iterable, List, Set
+
+from swarm_log import read_appended
 
 # Count threshold for hash length scaling
 HASH_LENGTH_THRESHOLDS = [
@@ -23,13 +32,185 @@ HASH_LENGTH_THRESHOLDS = [
 ]
 
 
+class RecordIndex:
+    """Record count and ID set of one JSONL log, refreshed from its tail."""
+
+    def __init__(self, log_file: Path):
+        self.log_file = Path(log_file)
+        self.db_path = self.log_file.parent / ".cache" / "ids.db"
+        self.log_name = self.log_file.name
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the index database, creating the schema if needed."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS log_watermarks (
+                log TEXT PRIMARY KEY,
+                inode INTEGER,
+                offset INTEGER,
+                fingerprint TEXT,
+                record_count INTEGER
+            )
+        """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS log_ids (
+                log TEXT,
+                id TEXT,
+                PRIMARY KEY (log, id)
+            ) WITHOUT ROWID
+        """
+        )
+        return conn
+
+    def _refresh(self, conn: sqlite3.Connection) -> int:
+        """Fold newly appended lines into the index; returns the record count."""
+        row = conn.execute(
+            "SELECT inode, offset, fingerprint, record_count FROM log_watermarks WHERE log = ?",
+            (self.log_name,),
+        ).fetchone()
+        watermark = None
+        record_count = 0
+        if row:
+            watermark = {"inode": row[0], "offset": row[1], "fingerprint": row[2]}
+            record_count = row[3]
+
+        tail = read_appended(self.log_file, watermark)
+        if tail.reset:
+            conn.execute("DELETE FROM log_ids WHERE log = ?", (self.log_name,))
+            record_count = 0
+
+        if tail.records or tail.reset or not row:
+            record_count += len(tail.records)
+            conn.executemany(
+                "INSERT OR IGNORE INTO log_ids (log, id) VALUES (?, ?)",
+                [
+                    (self.log_name, record["id"])
+                    for record in tail.records
+                    if isinstance(record.get("id"), str)
+                ],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO log_watermarks VALUES (?, ?, ?, ?, ?)",
+                (
+                    self.log_name,
+                    tail.watermark["inode"],
+                    tail.watermark["offset"],
+                    tail.watermark["fingerprint"],
+                    record_count,
+                ),
+            )
+
+        return record_count
+
+    def count(self) -> int:
+        """Number of non-empty records in the log."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            record_count = self._refresh(conn)
+            conn.execute("COMMIT")
+            return record_count
+        finally:
+            conn.close()
+
+    def new_id(self, prefix: str) -> str:
+        """
+        Generate an ID that is not yet used in the log.
+
+        The ID is reserved in the index before returning, so concurrent
+        callers can never be handed the same ID.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            hash_length = get_hash_length(self._refresh(conn))
+            while True:
+                data = f"{time.time()}-{os.urandom(16).hex()}"
+                new_id = f"{prefix}-{hashlib.sha256(data.encode()).hexdigest()[:hash_length]}"
+                inserted = conn.execute(
+                    "INSERT OR IGNORE INTO log_ids (log, id) VALUES (?, ?)",
+                    (self.log_name, new_id),
+                ).rowcount
+                if inserted:
+                    conn.execute("COMMIT")
+                    return new_id
+        finally:
+            conn.close()
+
+    def new_ids(self, prefix: str, count: int) -> List[str]:
+        """
+        Generate count distinct unused IDs, sized for the log after they are added.
+
+        Like new_id(), every ID is reserved in the same transaction that
+        checked it.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            hash_length = get_hash_length(self._refresh(conn) + count)
+            ids = []
+            while len(ids) < count:
+                data = f"{time.time()}-{os.urandom(16).hex()}"
+                new_id = f"{prefix}-{hashlib.sha256(data.encode()).hexdigest()[:hash_length]}"
+                inserted = conn.execute(
+                    "INSERT OR IGNORE INTO log_ids (log, id) VALUES (?, ?)",
+                    (self.log_name, new_id),
+                ).rowcount
+                if inserted:
+                    ids.append(new_id)
+            conn.execute("COMMIT")
+            return ids
+        finally:
+            conn.close()
+
+    def ids(self) -> Set[str]:
+        """IDs in use: those in the log plus the reserved ones."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._refresh(conn)
+            rows = conn.execute("SELECT id FROM log_ids WHERE log = ?", (self.log_name,)).fetchall()
+            conn.execute("COMMIT")
+            return {row[0] for row in rows}
+        finally:
+            conn.close()
+
+    def reserve(self, ids: Iterable[str]):
+        """Mark IDs as used even though they are not (or no longer) in the log."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._refresh(conn)
+            conn.executemany(
+                "INSERT OR IGNORE INTO log_ids (log, id) VALUES (?, ?)",
+                [(self.log_name, record_id) for record_id in ids],
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+
+def _scan_records(filepath: Path) -> int:
+    """Count non-empty lines by reading the whole file."""
+    with open(filepath, 'r') as f:
+        return sum(1 for line in f if line.strip())
+
+
 def count_records_in_file(filepath: Path) -> int:
     """Count number of non-empty lines in a JSONL file."""
     if not filepath.exists():
         return 0
 
-    with open(filepath, 'r') as f:
-        return sum(1 for line in f if line.strip())
+    try:
+        return RecordIndex(filepath).count()
+    except (OSError, sqlite3.Error):
+        # Unwritable cache directory: fall back to a full scan
+        return _scan_records(filepath)
 
 
 def get_hash_length(record_count: int) -> int:
@@ -57,10 +238,13 @@ def generate_id(prefix: str, context_file: Path = None) -> str:
         >>> generate_id("msg", Path(".claude/swarm/messages.jsonl"))
         'msg-f4e5d6'
     """
-    # Determine hash length
-    if context_file and context_file.exists():
-        record_count = count_records_in_file(context_file)
-        hash_length = get_hash_length(record_count)
+    if context_file:
+        try:
+            return RecordIndex(context_file).new_id(prefix)
+        except (OSError, sqlite3.Error):
+            hash_length = get_hash_length(
+                _scan_records(context_file) if context_file.exists() else 0
+            )
     else:
         hash_length = 4  # Start with 4 chars for new files
 
@@ -71,6 +255,35 @@ def generate_id(prefix: str, context_file: Path = None) -> str:
     return f"{prefix}-{hash_val}"
 
 
+def generate_ids(
+    prefix: str, count: int, record_count: int = 0, existing: Set[str] = None
+) -> List[str]:
+    """
+    Generate a batch of distinct IDs sized for a single record count.
+
+    Every ID is checked against the batch and against existing, so the
+    result is collision-free rather than merely unlikely to collide.
+
+    Args:
+        prefix: ID prefix (e.g., "task")
+        count: Number of IDs to generate
+        record_count: Record count used for the hash length decision
+        existing: IDs already in use
+    """
+    hash_length = get_hash_length(record_count)
+    taken = set(existing or ())
+    ids = []
+
+    while len(ids) < count:
+        data = f"{time.time()}-{os.urandom(16).hex()}"
+        new_id = f"{prefix}-{hashlib.sha256(data.encode()).hexdigest()[:hash_length]}"
+        if new_id not in taken:
+            taken.add(new_id)
+            ids.append(new_id)
+
+    return ids
+
+
 def generate_task_id(swarm_dir: Path = Path(".claude/swarm")) -> str:
     """Generate task ID with progressive hash length."""
     tasks_file = swarm_dir / "tasks.jsonl"
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Agent liveness from heartbeats, for lease-based file locks.
+
+Each agent has a heartbeat file (.cache/heartbeats/<agent>.json). Its
+content, written once per session, is the session's pid as recorded in
+agents.jsonl. Its mtime is the agent's last_seen. Renewing the lease is a
+utime() on that file, so heartbeats every few seconds never grow a log.
+
+Locks taken by the hook are leases ("lease": true): they stay held while
+their holder is alive, for up to SWARM_LEASE_MAX_HOLD_SECONDS after they
+were acquired, and end as soon as it is not. An agent is alive while its
+heartbeat is younger than SWARM_LEASE_SECONDS and its session process
+still exists. An agent without a heartbeat file has no verdict, and its
+locks fall back to their fixed expires_at.
+
+Usage:
+    python3 liveness.py status
+    python3 liveness.py run --agent agent-1 --pid 4242   # heartbeat writer
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import message_store
+from swarm_log import write_json_atomic
+
+SWARM_DIR = Path(".claude/swarm")
+
+HEARTBEAT_DIR = Path(".cache") / "heartbeats"
+
+# Heartbeats older than this mean the agent is gone
+LEASE_SECONDS = float(os.environ.get("SWARM_LEASE_SECONDS", 30))
+
+# Longest a live holder keeps a lease, counted from acquired_at
+LEASE_MAX_HOLD_SECONDS = float(os.environ.get("SWARM_LEASE_MAX_HOLD_SECONDS", 3600))
+
+# How often the background writer renews the lease
+HEARTBEAT_SECONDS = float(os.environ.get("SWARM_HEARTBEAT_SECONDS", 5))
+
+# A hook run through one of these has the agent one process further up
+SHELLS = {"sh", "bash", "dash", "zsh"}
+
+
+def heartbeat_file(swarm_dir: Path, agent_id: str) -> Path:
+    """Path of the agent's heartbeat file."""
+    return Path(swarm_dir) / HEARTBEAT_DIR / f"{message_store.safe_name(agent_id)}.json"
+
+
+def pid_alive(pid: int) -> bool:
+    """True if a process with this pid exists (on this host)."""
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def session_pid() -> int:
+    """The process a hook runs under: its parent, skipping a wrapping shell."""
+    pid = os.getppid()
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+        comm = stat[stat.index("(") + 1 : stat.rindex(")")]
+        if comm in SHELLS:
+            pid = int(stat[stat.rindex(")") + 2 :].split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return pid
+
+
+def start_session(swarm_dir: Path, agent_id: str, pid: int, writer: Optional[int] = None):
+    """Record the session pid (and heartbeat writer) and renew the lease."""
+    path = heartbeat_file(swarm_dir, agent_id)
+    write_json_atomic(path, {"agent_id": agent_id, "pid": pid, "writer": writer})
+
+
+def touch(swarm_dir: Path, agent_id: str):
+    """Renew the agent's lease; creates a pid-less heartbeat if there is none."""
+    path = heartbeat_file(swarm_dir, agent_id)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        write_json_atomic(path, {"agent_id": agent_id, "pid": None, "writer": None})
+
+
+def expire(swarm_dir: Path, agent_id: str):
+    """Mark the agent gone at once (its locks are free immediately)."""
+    try:
+        os.utime(heartbeat_file(swarm_dir, agent_id), (0, 0))
+    except FileNotFoundError:
+        pass
+
+
+def end_session(swarm_dir: Path, agent_id: str):
+    """Remove the heartbeat, which also stops its writer."""
+    try:
+        heartbeat_file(swarm_dir, agent_id).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def read_heartbeat(path: Path) -> Optional[Tuple[float, Dict]]:
+    """(last_seen, content) of a heartbeat file, or None if it is missing."""
+    try:
+        with open(path) as f:
+            last_seen = os.fstat(f.fileno()).st_mtime
+            try:
+                content = json.load(f)
+            except ValueError:
+                content = {}
+    except FileNotFoundError:
+        return None
+    return last_seen, content
+
+
+class Liveness:
+    """
+    Liveness verdicts for one query, memoised per agent.
+
+    Called with an agent ID, returns True (alive), False (gone) or None
+    (no heartbeat: the caller falls back to fixed expiry).
+    """
+
+    def __init__(self, swarm_dir: Path, now: Optional[datetime] = None):
+        self.swarm_dir = Path(swarm_dir)
+        self.now = (
+            now.replace(tzinfo=timezone.utc).timestamp() if now is not None else time.time()
+        )
+        self._verdicts: Dict[str, Optional[bool]] = {}
+
+    def __call__(self, agent_id: str) -> Optional[bool]:
+        if agent_id not in self._verdicts:
+            self._verdicts[agent_id] = self._verdict(agent_id)
+        return self._verdicts[agent_id]
+
+    def _verdict(self, agent_id: str) -> Optional[bool]:
+        heartbeat = read_heartbeat(heartbeat_file(self.swarm_dir, agent_id))
+        if heartbeat is None:
+            return None
+        last_seen, content = heartbeat
+        if self.now - last_seen > LEASE_SECONDS:
+            return False
+        pid = content.get("pid")
+        return not isinstance(pid, int) or pid_alive(pid)
+
+
+def run_writer(swarm_dir: Path, agent_id: str, pid: int, interval: float = HEARTBEAT_SECONDS):
+    """
+    Renew the agent's lease every interval seconds while pid is alive.
+
+    Stops when the session ends (its heartbeat file is removed) and expires
+    the lease at once when the session process dies.
+    """
+    path = heartbeat_file(swarm_dir, agent_id)
+    start_session(swarm_dir, agent_id, pid, writer=os.getpid())
+    while pid_alive(pid):
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return
+        time.sleep(interval)
+    expire(swarm_dir, agent_id)
+
+
+def spawn_writer(swarm_dir: Path, agent_id: str, pid: int):
+    """Start a detached heartbeat writer unless one already runs for this session."""
+    heartbeat = read_heartbeat(heartbeat_file(swarm_dir, agent_id))
+    if heartbeat:
+        content = heartbeat[1]
+        writer = content.get("writer")
+        if content.get("pid") == pid and isinstance(writer, int) and pid_alive(writer):
+            return
+
+    start_session(swarm_dir, agent_id, pid)
+
+    import subprocess
+
+    subprocess.Popen(
+        [
+            sys.executable,
+            str(Path(__file__).resolve()),
+            "run",
+            "--agent",
+            agent_id,
+            "--pid",
+            str(pid),
+            "--swarm-dir",
+            str(swarm_dir),
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def status(swarm_dir: Path) -> Dict[str, Dict]:
+    """last_seen, pid and verdict of every agent with a heartbeat."""
+    liveness = Liveness(swarm_dir)
+    agents = {}
+    for path in sorted((Path(swarm_dir) / HEARTBEAT_DIR).glob("*.json")):
+        heartbeat = read_heartbeat(path)
+        if heartbeat is None:
+            continue
+        last_seen, content = heartbeat
+        agent_id = content.get("agent_id") or path.stem
+        agents[agent_id] = {
+            "last_seen": datetime.utcfromtimestamp(last_seen).isoformat(),
+            "pid": content.get("pid"),
+            "alive": liveness(agent_id),
+        }
+    return agents
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent heartbeats and lock leases")
+    parser.add_argument("command", choices=["status", "run"])
+    parser.add_argument("--agent", help="Agent ID (run)")
+    parser.add_argument("--pid", type=int, help="Session process to watch (run)")
+    parser.add_argument(
+        "--interval", type=float, default=HEARTBEAT_SECONDS, help="Seconds between heartbeats"
+    )
+    parser.add_argument("--swarm-dir", help="Swarm directory (default: .claude/swarm)")
+
+    args = parser.parse_args()
+    swarm_dir = Path(args.swarm_dir) if args.swarm_dir else SWARM_DIR
+
+    if args.command == "run":
+        if not args.agent or not args.pid:
+            parser.error("run needs --agent and --pid")
+        run_writer(swarm_dir, args.agent, args.pid, args.interval)
+        return
+
+    for agent_id, info in status(swarm_dir).items():
+        state = {True: "alive", False: "gone", None: "unknown"}[info["alive"]]
+        print(f"{agent_id}: {state} (last seen {info['last_seen']}, pid {info['pid']})")
+
+
+if __name__ == "__main__":
+    main()
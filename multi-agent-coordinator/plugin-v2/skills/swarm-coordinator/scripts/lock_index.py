@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Indexed lock table for locks.jsonl.
+
+locks.jsonl stays the source of truth. The latest lock record per file path
+is kept in a SQLite table (.cache/locks.db) that is brought up to date from
+the log tail, so checking a path is a point query instead of a full-file
+scan, whatever the size of the lock history.
+
+Reservations are lock records whose file_path is a pattern ("reservation":
+true), written when a task with `files` is claimed and released by records
+carrying the same flag. They are kept apart from locks, so a lock or release
+on the same path never touches a reservation. A pattern is a glob
+("src/auth/**", "src/*.py") or a plain path, which covers itself and
+everything below it ("docs"). They are also indexed by their literal
+directory prefix ("src/auth/"), so finding the reservations covering a path
+only looks at the few prefixes that are ancestors of that path.
+"""
+
+import json
+import re
+import sqlite3
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from liveness import LEASE_MAX_HOLD_SECONDS, Liveness
+from swarm_log import read_appended
+
+
+def lock_is_active(
+    record: Dict[str, Any], now: datetime = None, liveness: Optional[Liveness] = None
+) -> bool:
+    """
+    An acquire record is active until its expiry.
+
+    A lease ("lease": true) ends as soon as liveness (see liveness.py) finds
+    its holder dead. While the holder is alive, a lock lease is active for
+    no longer than SWARM_LEASE_MAX_HOLD_SECONDS after it was acquired, and a
+    reservation lease (released when its task completes) until its
+    expires_at. When liveness does not know the holder, a lease expires like
+    any other lock.
+    """
+    if record.get("status") == "released" or not record.get("holder"):
+        return False
+    now = now or datetime.utcnow()
+    expires_at = datetime.fromisoformat(record["expires_at"])
+    if record.get("lease") and liveness is not None:
+        alive = liveness(record["holder"])
+        if alive is not None:
+            if not alive or record.get("reservation"):
+                return alive and expires_at > now
+            # A lock left behind by a failed edit is never released by
+            # PostToolUse, so a live holder must not pin it for the whole session
+            acquired_at = record.get("acquired_at")
+            if not acquired_at:
+                return True
+            held_until = datetime.fromisoformat(acquired_at) + timedelta(
+                seconds=LEASE_MAX_HOLD_SECONDS
+            )
+            return held_until > now
+    return expires_at > now
+
+
+GLOB_CHARS = "*?["
+
+# Bump when what the tables hold changes; older indexes are re-read from the log
+INDEX_VERSION = 1
+
+
+def _normalize_pattern(pattern: str) -> str:
+    """Strip "./" and a trailing "/" (a directory is its own plain pattern)."""
+    while pattern.startswith("./"):
+        pattern = pattern[2:]
+    return pattern.rstrip("/") or pattern
+
+
+def pattern_prefix(pattern: str) -> str:
+    """The directory part of a pattern before its first glob character."""
+    pattern = _normalize_pattern(pattern)
+    literal = re.split(r"[*?\[]", pattern, maxsplit=1)[0]
+    return literal[: literal.rfind("/") + 1]
+
+
+@lru_cache(maxsize=65536)
+def _pattern_regex(pattern: str):
+    """Compile a glob: ** spans directories, * and ? stay within one."""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            parts.append("(.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 2 :]:
+            end = pattern.index("]", i + 2)
+            body = pattern[i + 1 : end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append(f"[{body}]")
+            i = end + 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(parts))
+
+
+def pattern_matches(pattern: str, file_path: str) -> bool:
+    """True if the reservation pattern covers file_path."""
+    pattern = _normalize_pattern(pattern)
+    if not any(ch in pattern for ch in GLOB_CHARS):
+        return file_path == pattern or file_path.startswith(pattern + "/")
+    return _pattern_regex(pattern).fullmatch(file_path) is not None
+
+
+def patterns_overlap(a: str, b: str) -> bool:
+    """
+    True if two reservation patterns may cover a common path.
+
+    One pattern covering the other (read as a path) overlaps; so do two
+    patterns with nested literal prefixes when either spans directories
+    ("**"), which errs on the side of overlap.
+    """
+    a, b = _normalize_pattern(a), _normalize_pattern(b)
+    if a == b or pattern_matches(a, b) or pattern_matches(b, a):
+        return True
+    if "**" not in a and "**" not in b:
+        return False
+    prefix_a, prefix_b = pattern_prefix(a), pattern_prefix(b)
+    return prefix_a.startswith(prefix_b) or prefix_b.startswith(prefix_a)
+
+
+def _ancestor_prefixes(file_path: str) -> List[str]:
+    """Every directory prefix a covering pattern can have ("", "src/", ...)."""
+    prefixes = [""]
+    index = file_path.find("/")
+    while index >= 0:
+        prefixes.append(file_path[: index + 1])
+        index = file_path.find("/", index + 1)
+    return prefixes
+
+
+class LockIndex:
+    """Latest lock record per file path, refreshed from the locks.jsonl tail."""
+
+    def __init__(self, swarm_dir: Path = Path(".claude/swarm")):
+        self.swarm_dir = Path(swarm_dir)
+        self.locks_file = self.swarm_dir / "locks.jsonl"
+        self.db_path = self.swarm_dir / ".cache" / "locks.db"
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open (once) the index database, creating the schema if needed."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS lock_watermark (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    inode INTEGER,
+                    offset INTEGER,
+                    fingerprint TEXT
+                )
+            """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS locks (
+                    file_path TEXT PRIMARY KEY,
+                    holder TEXT,
+                    record TEXT
+                ) WITHOUT ROWID
+            """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_locks_holder ON locks(holder)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS reservations (
+                    pattern TEXT PRIMARY KEY,
+                    prefix TEXT,
+                    holder TEXT,
+                    record TEXT
+                ) WITHOUT ROWID
+            """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_reservations_prefix ON reservations(prefix)"
+            )
+            if conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+                self._reset(conn)
+            self._conn = conn
+        return self._conn
+
+    def _reset(self, conn: sqlite3.Connection):
+        """Empty an index written by an older version, so it is re-read from the log."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have reset it meanwhile
+            if conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+                for table in ("lock_watermark", "locks", "reservations"):
+                    conn.execute(f"DELETE FROM {table}")
+                conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def close(self):
+        """Close the database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def refresh(self):
+        """Fold lock records appended since the last refresh into the table."""
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT inode, offset, fingerprint FROM lock_watermark WHERE id = 0"
+        ).fetchone()
+        watermark = {"inode": row[0], "offset": row[1], "fingerprint": row[2]} if row else None
+
+        # Cheap pre-check outside the write transaction
+        tail = read_appended(self.locks_file, watermark)
+        if not tail.records and not tail.reset and row and tail.watermark == watermark:
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have advanced the watermark meanwhile
+            row = conn.execute(
+                "SELECT inode, offset, fingerprint FROM lock_watermark WHERE id = 0"
+            ).fetchone()
+            current = {"inode": row[0], "offset": row[1], "fingerprint": row[2]} if row else None
+            if current != watermark:
+                tail = read_appended(self.locks_file, current)
+
+            if tail.reset:
+                conn.execute("DELETE FROM locks")
+                conn.execute("DELETE FROM reservations")
+
+            # Only the last record per key matters. Reservations are keyed
+            # apart from locks: only a record flagged "reservation" replaces or
+            # ends one, so the holder's own lock on a reserved path keeps it
+            latest: Dict[str, Dict[str, Any]] = {}
+            latest_reservations: Dict[str, Dict[str, Any]] = {}
+            for record in tail.records:
+                file_path = record.get("file_path")
+                if file_path:
+                    keyed = latest_reservations if record.get("reservation") else latest
+                    keyed[file_path] = record
+
+            conn.executemany(
+                "DELETE FROM locks WHERE file_path = ?",
+                [(p,) for p, r in latest.items() if r.get("status") == "released"],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO locks (file_path, holder, record) VALUES (?, ?, ?)",
+                [
+                    (p, r["holder"], json.dumps(r))
+                    for p, r in latest.items()
+                    if r.get("status") != "released" and r.get("holder")
+                ],
+            )
+
+            conn.executemany(
+                "DELETE FROM reservations WHERE pattern = ?", [(p,) for p in latest_reservations]
+            )
+            conn.executemany(
+                "INSERT INTO reservations (pattern, prefix, holder, record) VALUES (?, ?, ?, ?)",
+                [
+                    (p, pattern_prefix(p), r["holder"], json.dumps(r))
+                    for p, r in latest_reservations.items()
+                    if r.get("status") != "released" and r.get("holder")
+                ],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO lock_watermark VALUES (0, ?, ?, ?)",
+                (
+                    tail.watermark["inode"],
+                    tail.watermark["offset"],
+                    tail.watermark["fingerprint"],
+                ),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Return the active lock on file_path, if any."""
+        self.refresh()
+        row = self._connect().execute(
+            "SELECT record FROM locks WHERE file_path = ?", (file_path,)
+        ).fetchone()
+        if not row:
+            return None
+
+        record = json.loads(row[0])
+        return record if lock_is_active(record, liveness=Liveness(self.swarm_dir)) else None
+
+    def get_many(self, file_paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Active locks on any of file_paths, keyed by path (one refresh and query)."""
+        self.refresh()
+        if not file_paths:
+            return {}
+        now = datetime.utcnow()
+        liveness = Liveness(self.swarm_dir, now)
+        placeholders = ",".join("?" * len(file_paths))
+        active = {}
+        for file_path, record in self._connect().execute(
+            f"SELECT file_path, record FROM locks WHERE file_path IN ({placeholders})",
+            list(file_paths),
+        ):
+            record = json.loads(record)
+            if lock_is_active(record, now, liveness):
+                active[file_path] = record
+        return active
+
+    def covering(self, file_path: str) -> List[Dict[str, Any]]:
+        """Active reservations whose pattern covers file_path."""
+        self.refresh()
+        now = datetime.utcnow()
+        return self._covering(file_path, now, Liveness(self.swarm_dir, now))
+
+    def covering_many(self, file_paths: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """covering() for several paths after one refresh, omitting uncovered paths."""
+        self.refresh()
+        now = datetime.utcnow()
+        liveness = Liveness(self.swarm_dir, now)
+        covered = {}
+        for file_path in file_paths:
+            reservations = self._covering(file_path, now, liveness)
+            if reservations:
+                covered[file_path] = reservations
+        return covered
+
+    def _covering(
+        self, file_path: str, now: datetime, liveness: Liveness
+    ) -> List[Dict[str, Any]]:
+        prefixes = _ancestor_prefixes(file_path)
+        placeholders = ",".join("?" * len(prefixes))
+        reservations = []
+        for pattern, record in self._connect().execute(
+            f"SELECT pattern, record FROM reservations WHERE prefix IN ({placeholders})",
+            prefixes,
+        ):
+            if pattern_matches(pattern, file_path):
+                record = json.loads(record)
+                if lock_is_active(record, now, liveness):
+                    reservations.append(record)
+        return reservations
+
+    def reservations(self, holder: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Active reservations keyed by pattern, optionally only holder's."""
+        self.refresh()
+        now = datetime.utcnow()
+        liveness = Liveness(self.swarm_dir, now)
+        query = "SELECT pattern, record FROM reservations"
+        params = ()
+        if holder is not None:
+            query += " WHERE holder = ?"
+            params = (holder,)
+        active = {}
+        for pattern, record in self._connect().execute(query + " ORDER BY pattern", params):
+            record = json.loads(record)
+            if lock_is_active(record, now, liveness):
+                active[pattern] = record
+        return active
+
+    def held_by(self, holder: str) -> List[str]:
+        """File paths whose latest lock record belongs to holder."""
+        self.refresh()
+        rows = self._connect().execute(
+            "SELECT file_path FROM locks WHERE holder = ?", (holder,)
+        )
+        return [row[0] for row in rows]
+
+    def active_locks(self) -> Dict[str, Dict[str, Any]]:
+        """All active locks keyed by file path."""
+        self.refresh()
+        now = datetime.utcnow()
+        liveness = Liveness(self.swarm_dir, now)
+        active = {}
+        for file_path, record in self._connect().execute(
+            "SELECT file_path, record FROM locks"
+        ):
+            record = json.loads(record)
+            if lock_is_active(record, now, liveness):
+                active[file_path] = record
+        return active
+
+
+if __name__ == "__main__":
+    # Demo
+    index = LockIndex()
+    locks = index.active_locks()
+    print(f"Active locks: {len(locks)}")
+    for file_path, lock in locks.items():
+        print(f"  {file_path} -> {lock['holder']}")
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Message retention: move old messages out of the logs into archive segments.
+
+Without retention the message logs (and the cache built from them) grow
+forever. apply_retention() cuts the oldest messages off each message log,
+those older than max_age_days and those beyond the newest max_count. They
+go into a gzip-compressed segment under .claude/swarm/archive/messages/,
+and the log is rewritten without them.
+
+- Only a leading run of a log is cut, so the rest keeps its order and the
+  agents' read cursors can simply be shifted (message_store.py)
+- The segment and its manifest entry (segments.jsonl: log, time range,
+  recipients) are written before the log is replaced, so a crash can
+  duplicate messages into the archive but never lose them
+- The log's append lock is held throughout, as during compaction
+
+query() reads the archive back on demand, opening only the segments whose
+time range and recipients match.
+
+Retention is off unless SWARM_MESSAGE_RETENTION_DAYS or
+SWARM_MESSAGE_RETENTION_COUNT (messages kept per log) is set. It then runs
+in the background compactor (compact.py --auto), which send_message.py starts
+as soon as retention_due() finds the oldest message of a log past the age
+limit or the log over the count limit, whatever the size of the log.
+
+Usage:
+    python3 message_archive.py prune --max-age-days 7 --max-count 10000
+    python3 message_archive.py query --agent agent-1 --since 2025-01-01T00:00:00
+    python3 message_archive.py list
+"""
+
+import argparse
+import gzip
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import message_store
+from id_generator import RecordIndex, count_records_in_file
+from swarm_log import append_records, locked_append, read_appended, watermark_at, write_json_atomic
+
+SWARM_DIR = Path(".claude/swarm")
+
+ARCHIVE_DIR = Path("archive") / "messages"
+MANIFEST = "segments.jsonl"
+
+RETENTION_DAYS = float(os.environ.get("SWARM_MESSAGE_RETENTION_DAYS", 0))
+RETENTION_COUNT = int(os.environ.get("SWARM_MESSAGE_RETENTION_COUNT", 0))
+
+
+def retention_enabled() -> bool:
+    return RETENTION_DAYS > 0 or RETENTION_COUNT > 0
+
+
+def retention_due(log: Path, now: float = None) -> bool:
+    """True if retention would archive messages from log (reads one line at most)."""
+    if RETENTION_COUNT and count_records_in_file(log) > RETENTION_COUNT:
+        return True
+    if not RETENTION_DAYS:
+        return False
+    try:
+        with open(log, "rb") as f:
+            oldest = json.loads(f.readline())
+    except (OSError, ValueError):
+        return False
+    if not isinstance(oldest, dict):
+        return False
+    cutoff = (time.time() if now is None else now) - RETENTION_DAYS * 86400
+    return message_store.timestamp_seconds(oldest.get("timestamp")) < cutoff
+
+
+def archive_dir(swarm_dir: Path) -> Path:
+    return Path(swarm_dir) / ARCHIVE_DIR
+
+
+def segments(swarm_dir: Path) -> List[Dict[str, Any]]:
+    """Manifest entries of the archive, oldest segment first."""
+    return read_appended(archive_dir(swarm_dir) / MANIFEST).records
+
+
+def _cut(
+    records: List[Dict[str, Any]], max_age_days: float, max_count: int, now: float
+) -> int:
+    """How many leading records retention removes."""
+    cut = max(0, len(records) - max_count) if max_count else 0
+    if max_age_days:
+        cutoff = now - max_age_days * 86400
+        aged = 0
+        for record in records:
+            if message_store.timestamp_seconds(record.get("timestamp")) >= cutoff:
+                break
+            aged += 1
+        cut = max(cut, aged)
+    return cut
+
+
+def _fsync_dir(path: Path):
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def _write_segment(swarm_dir: Path, key: str, data: bytes, archived: List[Dict]) -> Dict:
+    """Store data (whole log lines) as a segment and add it to the manifest."""
+    target_dir = archive_dir(swarm_dir)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    name = f"{message_store.safe_name(key.replace('/', '_'))}-{time.time_ns()}.jsonl.gz"
+    tmp_path = target_dir / f".{name}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(gzip.compress(data))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, target_dir / name)
+    _fsync_dir(target_dir)
+
+    times = [message_store.timestamp_seconds(msg.get("timestamp")) for msg in archived]
+    entry = {
+        "segment": name,
+        "log": key,
+        "messages": len(archived),
+        "bytes": len(data),
+        "first_ts": min(times),
+        "last_ts": max(times),
+        "recipients": sorted({msg.get("to") or message_store.BROADCAST for msg in archived}),
+        "archived_at": datetime.utcnow().isoformat(),
+    }
+    append_records(target_dir / MANIFEST, [entry])
+    return entry
+
+
+def _shift_cursors(swarm_dir: Path, key: str, log: Path, inode: int, removed: int):
+    """Move read positions in key back by the bytes removed from its front."""
+    cursor_dir = swarm_dir / message_store.CURSOR_DIR
+    if not cursor_dir.is_dir():
+        return
+
+    new_inode = os.stat(log).st_ino
+    for cursor_file in cursor_dir.glob("*.json"):
+        try:
+            cursor = json.loads(cursor_file.read_text())
+        except ValueError:
+            continue
+        position = cursor.get(key)
+        if not position or position.get("inode") != inode:
+            continue
+        offset = position.get("offset", 0) - removed
+        # A reader still inside the archived part has nothing left to skip
+        shifted = watermark_at(log, new_inode, offset) if offset > 0 else None
+        if shifted:
+            cursor[key] = shifted
+        else:
+            cursor.pop(key)
+        write_json_atomic(cursor_file, cursor, durable=True)
+
+
+def prune_log(
+    swarm_dir: Path, log: Path, max_age_days: float, max_count: int, now: float
+) -> Optional[Dict[str, Any]]:
+    """Archive the messages of one log that retention removes; None if none are."""
+    key = message_store.log_key(swarm_dir, log)
+    if not log.exists():
+        return None
+
+    with locked_append(log):
+        tail = read_appended(log, with_ends=True)
+        cut = _cut(tail.records, max_age_days, max_count, now)
+        if not cut:
+            return None
+        removed = tail.ends[cut - 1]
+
+        with open(log, "rb") as f:
+            inode = os.fstat(f.fileno()).st_ino
+            head = f.read(removed)
+            rest = f.read()
+        entry = _write_segment(swarm_dir, key, head, tail.records[:cut])
+
+        # Rewriting the log drops its IDs from the index; archived IDs stay taken
+        id_log = message_store.id_log(swarm_dir)
+        reserved = [msg.get("id") for msg in tail.records[:cut]]
+        if log == id_log:
+            # Its index also holds the IDs reserved for other logs
+            reserved.extend(RecordIndex(id_log).ids())
+
+        tmp_path = log.with_name(f".{log.name}.{os.getpid()}.retention")
+        with open(tmp_path, "wb") as f:
+            f.write(rest)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, log)
+        _fsync_dir(log.parent)
+
+        _shift_cursors(swarm_dir, key, log, inode, removed)
+        RecordIndex(id_log).reserve(i for i in reserved if isinstance(i, str))
+
+    return entry
+
+
+def apply_retention(
+    swarm_dir: Path = None,
+    max_age_days: float = None,
+    max_count: int = None,
+    now: float = None,
+) -> Dict[str, int]:
+    """
+    Archive old messages from every message log.
+
+    max_age_days and max_count default to the environment settings (0: no
+    limit). Returns the number of messages archived per log key.
+    """
+    swarm_dir = Path(swarm_dir or SWARM_DIR)
+    max_age_days = RETENTION_DAYS if max_age_days is None else max_age_days
+    max_count = RETENTION_COUNT if max_count is None else max_count
+    now = time.time() if now is None else now
+    if not max_age_days and not max_count:
+        return {}
+
+    archived = {}
+    for log in message_store.all_logs(swarm_dir):
+        entry = prune_log(swarm_dir, log, max_age_days, max_count, now)
+        if entry:
+            archived[entry["log"]] = entry["messages"]
+    return archived
+
+
+def _read_segment(path: Path) -> Iterable[Dict[str, Any]]:
+    with gzip.open(path, "rb") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line the live log had quarantined
+                continue
+            if isinstance(record, dict):
+                yield record
+
+
+def query(
+    swarm_dir: Path = None,
+    agent_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Archived messages, oldest first.
+
+    With agent_id, only messages addressed to it (or broadcast); since and
+    until bound the timestamp (inclusive).
+    """
+    swarm_dir = Path(swarm_dir or SWARM_DIR)
+    low = message_store.timestamp_seconds(since.isoformat()) if since else float("-inf")
+    high = message_store.timestamp_seconds(until.isoformat()) if until else float("inf")
+    wanted = {agent_id, message_store.BROADCAST} if agent_id else None
+
+    streams = []
+    for entry in segments(swarm_dir):
+        if entry["last_ts"] < low or entry["first_ts"] > high:
+            continue
+        if wanted and not wanted.intersection(entry["recipients"]):
+            continue
+        streams.append(
+            [
+                msg
+                for msg in _read_segment(archive_dir(swarm_dir) / entry["segment"])
+                if (not wanted or (msg.get("to") or message_store.BROADCAST) in wanted)
+                and low <= message_store.timestamp_seconds(msg.get("timestamp")) <= high
+            ]
+        )
+    return message_store.merge_by_time(streams)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive and query old swarm messages")
+    parser.add_argument("--swarm-dir", help="Swarm directory (default: .claude/swarm)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    prune = sub.add_parser("prune", help="Archive messages past the retention limits")
+    prune.add_argument("--max-age-days", type=float, help="Archive messages older than this")
+    prune.add_argument("--max-count", type=int, help="Messages to keep per log")
+
+    search = sub.add_parser("query", help="Print archived messages as JSONL")
+    search.add_argument("--agent", help="Only messages to this agent (and broadcasts)")
+    search.add_argument("--since", type=datetime.fromisoformat, help="ISO timestamp (UTC)")
+    search.add_argument("--until", type=datetime.fromisoformat, help="ISO timestamp (UTC)")
+
+    sub.add_parser("list", help="List archive segments")
+
+    args = parser.parse_args()
+    swarm_dir = Path(args.swarm_dir) if args.swarm_dir else SWARM_DIR
+
+    if args.command == "prune":
+        archived = apply_retention(swarm_dir, args.max_age_days, args.max_count)
+        if not archived:
+            print("Nothing to archive")
+        for key, count in archived.items():
+            print(f"✓ Archived {count} message(s) from {key}")
+    elif args.command == "query":
+        for msg in query(swarm_dir, args.agent, args.since, args.until):
+            print(json.dumps(msg))
+    else:
+        for entry in segments(swarm_dir):
+            first = datetime.utcfromtimestamp(entry["first_ts"]).isoformat()
+            last = datetime.utcfromtimestamp(entry["last_ts"]).isoformat()
+            print(f"{entry['segment']}: {entry['messages']} message(s) from {entry['log']}, {first} – {last}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Where swarm messages are stored.
+
+Two layouts are supported:
+
+- single file (default): every message is appended to messages.jsonl
+- partitioned: direct messages go to inbox/<recipient>.jsonl and broadcasts
+  to inbox/all.jsonl, so reading one agent's mail never touches the
+  traffic between other agents
+
+The partitioned layout is in use as soon as the inbox/ directory exists.
+`message_store.py migrate` switches an existing swarm over by moving
+messages.jsonl into the partitions (the old file is kept as
+messages.jsonl.migrated).
+"""
+
+import bisect
+import heapq
+import json
+import os
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from id_generator import RecordIndex, generate_id
+from swarm_log import (
+    append_records,
+    locked_append,
+    read_appended,
+    watermark_at,
+    write_json_atomic,
+)
+
+SWARM_DIR = Path(".claude/swarm")
+
+MESSAGES_LOG = "messages.jsonl"
+INBOX_DIR = "inbox"
+BROADCAST = "all"
+
+# Per-agent read cursors of get_messages.py, named after safe_name(agent)
+CURSOR_DIR = Path(".cache") / "cursors"
+
+
+def safe_name(name: str) -> str:
+    """File name for an agent ID (agent IDs are not trusted as file names)."""
+    safe = re.sub(r"[^A-Za-z0-9._-]", "_", name)
+    if safe != name or safe.startswith("."):
+        import hashlib
+
+        safe = f"{safe}-{hashlib.sha256(name.encode()).hexdigest()[:8]}"
+    return safe
+
+
+def is_partitioned(swarm_dir: Path) -> bool:
+    """True once the swarm uses per-recipient inbox logs."""
+    return (swarm_dir / INBOX_DIR).is_dir()
+
+
+def partition_log(swarm_dir: Path, recipient: str) -> Path:
+    """Inbox log holding messages sent to recipient ("all" for broadcasts)."""
+    return swarm_dir / INBOX_DIR / f"{safe_name(recipient)}.jsonl"
+
+
+def inbox_logs(swarm_dir: Path, agent_id: str) -> List[Path]:
+    """Logs that can hold messages addressed to agent_id."""
+    if not is_partitioned(swarm_dir):
+        return [swarm_dir / MESSAGES_LOG]
+    if agent_id == BROADCAST:
+        return [partition_log(swarm_dir, BROADCAST)]
+    return [partition_log(swarm_dir, agent_id), partition_log(swarm_dir, BROADCAST)]
+
+
+def all_logs(swarm_dir: Path) -> List[Path]:
+    """Every log holding messages, in either layout."""
+    if not is_partitioned(swarm_dir):
+        return [swarm_dir / MESSAGES_LOG]
+    return sorted((swarm_dir / INBOX_DIR).glob("*.jsonl"))
+
+
+def log_key(swarm_dir: Path, log: Path) -> str:
+    """Stable name of a message log relative to the swarm directory."""
+    return log.relative_to(swarm_dir).as_posix()
+
+
+def id_log(swarm_dir: Path) -> Path:
+    """Log whose ID index holds the message IDs in use."""
+    if is_partitioned(swarm_dir):
+        # IDs of every partition are reserved in the broadcast log's index
+        return partition_log(swarm_dir, BROADCAST)
+    return swarm_dir / MESSAGES_LOG
+
+
+def new_message_id(swarm_dir: Path) -> str:
+    """Generate a message ID that no stored message uses."""
+    return generate_id("msg", id_log(swarm_dir))
+
+
+def _dumps(message: Dict[str, Any]) -> str:
+    return json.dumps(message) + "\n"
+
+
+def append_message(swarm_dir: Path, message: Dict[str, Any]) -> Path:
+    """Append a message to the log its recipient reads; returns that log."""
+    swarm_dir.mkdir(parents=True, exist_ok=True)
+    if not is_partitioned(swarm_dir):
+        with locked_append(swarm_dir / MESSAGES_LOG) as f:
+            # A migration may have finished while we waited for the lock
+            if not is_partitioned(swarm_dir):
+                f.write(_dumps(message))
+                return swarm_dir / MESSAGES_LOG
+
+    log = partition_log(swarm_dir, message.get("to") or BROADCAST)
+    append_records(log, [message])
+    return log
+
+
+def timestamp_seconds(timestamp: Any) -> float:
+    """A message timestamp (naive ISO 8601, UTC) in epoch seconds; 0 if unparsable."""
+    try:
+        stamp = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return 0.0
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=timezone.utc)
+    return stamp.timestamp()
+
+
+def merge_by_time(streams: Iterable[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Merge per-log message lists by timestamp, keeping each log's order."""
+    return list(heapq.merge(*streams, key=lambda msg: msg.get("timestamp", "")))
+
+
+def read_inbox(swarm_dir: Path, agent_id: str) -> List[Dict[str, Any]]:
+    """Every message addressed to agent_id, oldest first."""
+    return merge_by_time(
+        [
+            msg
+            for msg in read_appended(log).records
+            if msg.get("to") in (agent_id, BROADCAST)
+        ]
+        for log in inbox_logs(swarm_dir, agent_id)
+    )
+
+
+def read_all(swarm_dir: Path) -> List[Dict[str, Any]]:
+    """Every stored message, oldest first."""
+    return merge_by_time(read_appended(log).records for log in all_logs(swarm_dir))
+
+
+def migrate(swarm_dir: Path) -> Dict[str, int]:
+    """
+    Switch a swarm from messages.jsonl to per-recipient inbox logs.
+
+    Holds the messages.jsonl append lock throughout, so no message is
+    written to the old log after it has been copied. Read cursors are
+    carried over, so no agent sees its old mail as unread again.
+    """
+    messages_file = swarm_dir / MESSAGES_LOG
+    if is_partitioned(swarm_dir):
+        return {"messages": 0, "partitions": len(all_logs(swarm_dir))}
+
+    swarm_dir.mkdir(parents=True, exist_ok=True)
+    with locked_append(messages_file):
+        tail = read_appended(messages_file, with_ends=True)
+        messages = tail.records
+
+        partitions: Dict[str, List[tuple]] = {}
+        for msg, end in zip(messages, tail.ends):
+            partitions.setdefault(safe_name(msg.get("to") or BROADCAST), []).append((msg, end))
+
+        # Write the partitions next to the inbox, then publish them at once.
+        # For each partition remember (old end offset, new end offset) pairs.
+        offsets: Dict[str, List[tuple]] = {}
+        staging = swarm_dir / f".{INBOX_DIR}.{os.getpid()}.migrate"
+        staging.mkdir()
+        for name, records in partitions.items():
+            lines = [_dumps(msg) for msg, _ in records]
+            new_end = 0
+            offsets[name] = []
+            for (_, old_end), line in zip(records, lines):
+                new_end += len(line.encode())
+                offsets[name].append((old_end, new_end))
+            with open(staging / f"{name}.jsonl", "w") as f:
+                f.write("".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+
+        # Senders pick IDs from the broadcast log's index as soon as the inbox
+        # is visible, so it must already hold every ID the old index knows,
+        # including IDs reserved by senders that have not appended yet
+        RecordIndex(staging / f"{safe_name(BROADCAST)}.jsonl").reserve(
+            RecordIndex(messages_file).ids()
+        )
+        os.rename(staging, swarm_dir / INBOX_DIR)
+
+        _carry_over_cursors(swarm_dir, tail.watermark["inode"], offsets)
+        if messages:
+            os.replace(messages_file, swarm_dir / f"{MESSAGES_LOG}.migrated")
+        else:
+            messages_file.unlink()
+
+    return {"messages": len(messages), "partitions": len(partitions)}
+
+
+def _carry_over_cursors(swarm_dir: Path, inode: int, offsets: Dict[str, List[tuple]]):
+    """Translate messages.jsonl read positions into inbox log positions."""
+    cursor_dir = swarm_dir / CURSOR_DIR
+    if not cursor_dir.is_dir():
+        return
+
+    for cursor_file in cursor_dir.glob("*.json"):
+        try:
+            cursor = json.loads(cursor_file.read_text())
+        except ValueError:
+            continue
+        legacy = cursor.pop(MESSAGES_LOG, None)
+        if not legacy or legacy.get("inode") != inode:
+            continue
+
+        for name in (cursor_file.stem, BROADCAST):
+            pairs = offsets.get(name, [])
+            # Last message of the partition that the agent had read past
+            index = bisect.bisect_right([old for old, _ in pairs], legacy.get("offset", 0))
+            if index:
+                log = swarm_dir / INBOX_DIR / f"{name}.jsonl"
+                position = watermark_at(log, os.stat(log).st_ino, pairs[index - 1][1])
+                if position:
+                    cursor[log_key(swarm_dir, log)] = position
+        write_json_atomic(cursor_file, cursor, durable=True)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Swarm message storage layout")
+    parser.add_argument("command", choices=["status", "migrate"])
+    parser.add_argument("--swarm-dir", help="Swarm directory (default: .claude/swarm)")
+
+    args = parser.parse_args()
+    swarm_dir = Path(args.swarm_dir) if args.swarm_dir else SWARM_DIR
+
+    if args.command == "migrate":
+        result = migrate(swarm_dir)
+        print(
+            f"✓ Partitioned inbox: {result['messages']} message(s) moved into "
+            f"{result['partitions']} inbox log(s)"
+        )
+        return
+
+    layout = "partitioned (inbox/)" if is_partitioned(swarm_dir) else f"single file ({MESSAGES_LOG})"
+    print(f"Message layout: {layout}")
+    for log in all_logs(swarm_dir):
+        if log.exists():
+            print(f"  {log_key(swarm_dir, log)}: {log.stat().st_size} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Opt-in performance traces of hook invocations.
+
+With SWARM_TRACE=1, every hook event handled by coordination.py records one
+trace: its total time, the time spent in each phase (parsing the payload,
+setting up the session, checking locks, appending, serialising the
+response, ...), the bytes and records read from the logs, and how lock
+acquisition turned out. Code that is not being traced pays for one function
+call per phase.
+
+Traces go to a ring buffer, .claude/swarm/.cache/trace.ring: a small header
+holding the slot count and the next sequence number, then SLOTS fixed-size
+slots of one JSON record each. Writers overwrite the oldest slot, so the
+file never grows past SLOTS * SLOT_BYTES. `get_state.py --query-type perf`
+summarises it.
+"""
+
+import json
+import math
+import os
+import struct
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no advisory locks
+    fcntl = None
+
+TRACE_FILE = Path(".cache") / "trace.ring"
+
+ENABLED = os.environ.get("SWARM_TRACE", "") not in ("", "0")
+
+# Traces kept; fixed when the ring file is created
+SLOTS = int(os.environ.get("SWARM_TRACE_SLOTS", 4096))
+
+# Bytes per slot; a longer record is stored without its tags, or failing
+# that with only its event and total time ("truncated": true)
+SLOT_BYTES = 1024
+
+MAGIC = b"SWTRACE1"
+HEADER = struct.Struct("<8sQQ")  # magic, slots, next sequence number
+HEADER_BYTES = 64
+
+
+class Trace:
+    """Timings, counters and tags of one hook invocation."""
+
+    def __init__(self, event: str):
+        self.event = event
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.tags: Dict[str, Any] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block; repeated phases add up."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def set_event(self, event: str):
+        self.event = event
+
+    def count(self, **counters: int):
+        for name, value in counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def tag(self, **tags: Any):
+        self.tags.update(tags)
+
+    def record(self) -> Dict[str, Any]:
+        return {
+            "event": self.event,
+            "at": time.time(),
+            "pid": os.getpid(),
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "phases": {name: round(ms, 3) for name, ms in self.phases.items()},
+            "counters": self.counters,
+            "tags": self.tags,
+        }
+
+
+class _NullTrace:
+    """Stand-in while nothing is traced."""
+
+    def phase(self, name: str):
+        return nullcontext()
+
+    def set_event(self, event: str):
+        pass
+
+    def count(self, **counters: int):
+        pass
+
+    def tag(self, **tags: Any):
+        pass
+
+
+NULL = _NullTrace()
+_current = NULL
+
+
+def current():
+    """The trace of the running hook invocation (a no-op one when untraced)."""
+    return _current
+
+
+def start(event: str) -> Optional[Trace]:
+    """
+    Begin tracing an invocation, if tracing is on.
+
+    Returns None when tracing is off or a trace is already running (the
+    caller is nested inside a traced invocation and must not finish it).
+    """
+    global _current
+    if not ENABLED or _current is not NULL:
+        return None
+    _current = Trace(event)
+    return _current
+
+
+def finish(trace: Optional[Trace], swarm_dir: Path):
+    """Stop trace (if start() returned one) and store it in the ring."""
+    global _current
+    if trace is None:
+        return
+    _current = NULL
+    try:
+        write(swarm_dir, trace.record())
+    except OSError:
+        # Tracing must never fail a hook
+        pass
+
+
+def _encode(record: Dict[str, Any]) -> bytes:
+    """One slot holding record as a whole JSON line, trimmed until it fits."""
+    minimal = {
+        "event": str(record.get("event", ""))[:64],
+        "at": record.get("at"),
+        "total_ms": record.get("total_ms"),
+        "phases": {},
+        "counters": {},
+        "tags": {},
+        "seq": record.get("seq"),
+        "truncated": True,
+    }
+    for candidate in (record, dict(record, tags={}), minimal):
+        data = json.dumps(candidate, separators=(",", ":")).encode()
+        if len(data) < SLOT_BYTES:
+            break
+    return data.ljust(SLOT_BYTES - 1) + b"\n"
+
+
+def write(swarm_dir: Path, record: Dict[str, Any]):
+    """Store record in the oldest slot of the ring."""
+    path = Path(swarm_dir) / TRACE_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        header = os.pread(fd, HEADER.size, 0)
+        if len(header) == HEADER.size and header[:8] == MAGIC:
+            _, slots, seq = HEADER.unpack(header)
+        else:
+            slots, seq = SLOTS, 0
+        record = dict(record, seq=seq)
+        os.pwrite(fd, _encode(record), HEADER_BYTES + (seq % slots) * SLOT_BYTES)
+        os.pwrite(fd, HEADER.pack(MAGIC, slots, seq + 1).ljust(HEADER_BYTES, b"\0"), 0)
+    finally:
+        os.close(fd)
+
+
+def read(swarm_dir: Path) -> List[Dict[str, Any]]:
+    """Traces in the ring, oldest first."""
+    try:
+        with open(Path(swarm_dir) / TRACE_FILE, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return []
+    if len(data) < HEADER.size or data[:8] != MAGIC:
+        return []
+
+    _, slots, seq = HEADER.unpack_from(data)
+    records = []
+    for slot in range(min(slots, seq)):
+        offset = HEADER_BYTES + slot * SLOT_BYTES
+        raw = data[offset : offset + SLOT_BYTES].strip()
+        try:
+            records.append(json.loads(raw))
+        except ValueError:
+            # Torn or truncated slot
+            continue
+    return sorted(records, key=lambda r: r.get("seq", 0))
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of values."""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def _latency(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+    }
+
+
+def summarize(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Latency percentiles (ms) per event and per phase, with mean counters
+    and counts of each lock outcome. Events handled by the daemon are
+    listed apart from the hook processes that forwarded them.
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        name = record["event"] + (" (daemon)" if record["tags"].get("daemon") else "")
+        groups.setdefault(name, []).append(record)
+
+    summary = {}
+    for name, group in sorted(groups.items()):
+        phases: Dict[str, List[float]] = {}
+        counters: Dict[str, int] = {}
+        locks: Dict[str, int] = {}
+        for record in group:
+            for phase, ms in record["phases"].items():
+                phases.setdefault(phase, []).append(ms)
+            for counter, value in record["counters"].items():
+                counters[counter] = counters.get(counter, 0) + value
+            if "lock" in record["tags"]:
+                locks[record["tags"]["lock"]] = locks.get(record["tags"]["lock"], 0) + 1
+        summary[name] = {
+            "total": _latency([r["total_ms"] for r in group]),
+            "phases": {phase: _latency(values) for phase, values in sorted(phases.items())},
+            "mean_counters": {c: round(v / len(group), 1) for c, v in sorted(counters.items())},
+            "locks": locks,
+        }
+    return summary
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Reference replay of the swarm logs.
+
+Folds the JSONL logs from byte 0 on every call, with no cache or snapshot
+involved. This defines what the swarm state is; the scripts read it through
+SwarmCache (swarm_cache.py), which must return exactly what these functions
+return and is tested against them.
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import message_store
+from liveness import Liveness
+from lock_index import lock_is_active
+from state_engine import apply_task_record, is_claimable
+from swarm_log import TailRead, read_appended
+
+
+def replay_tasks(swarm_dir: Path) -> Dict[str, Dict]:
+    """Task state keyed by task ID, in definition order."""
+    task_state: Dict[str, Dict] = {}
+    for record in read_appended(swarm_dir / "tasks.jsonl").records:
+        apply_task_record(task_state, record)
+    return task_state
+
+
+def replay_available_tasks(swarm_dir: Path) -> List[Dict]:
+    """Claimable tasks by priority (descending), then created_at, then definition order."""
+    task_state = replay_tasks(swarm_dir)
+    available = [task for task in task_state.values() if is_claimable(task_state, task)]
+    available.sort(key=lambda t: (-(t.get("priority") or 0), t.get("created_at") or ""))
+    return available
+
+
+def replay_agents(swarm_dir: Path) -> Dict[str, Dict]:
+    """Latest registration of every agent that has not terminated."""
+    active_agents: Dict[str, Dict] = {}
+    for record in read_appended(swarm_dir / "agents.jsonl").records:
+        agent_id = record.get("id")
+        if not agent_id:
+            continue
+
+        if record.get("terminated_at"):
+            # Agent terminated
+            active_agents.pop(agent_id, None)
+        else:
+            # Agent started
+            active_agents[agent_id] = record
+
+    return active_agents
+
+
+def replay_locks(swarm_dir: Path, now: Optional[datetime] = None) -> Dict[str, Dict]:
+    """Unexpired, unreleased locks keyed by file path."""
+    return _replay_lock_records(swarm_dir, False, now)
+
+
+def replay_reservations(swarm_dir: Path, now: Optional[datetime] = None) -> Dict[str, Dict]:
+    """Unexpired, unreleased reservations keyed by pattern."""
+    return _replay_lock_records(swarm_dir, True, now)
+
+
+def _replay_lock_records(
+    swarm_dir: Path, reservation: bool, now: Optional[datetime]
+) -> Dict[str, Dict]:
+    """Fold the locks.jsonl records that are (or are not) reservations."""
+    now = now or datetime.utcnow()
+    liveness = Liveness(swarm_dir, now)
+    active_locks: Dict[str, Dict] = {}
+    for record in read_appended(swarm_dir / "locks.jsonl").records:
+        file_path = record.get("file_path")
+        # Reservations are keyed apart from locks on the same path
+        if not file_path or bool(record.get("reservation")) != reservation:
+            continue
+
+        if record.get("status") == "released":
+            # Lock released
+            active_locks.pop(file_path, None)
+        elif record.get("holder"):
+            if lock_is_active(record, now, liveness):
+                active_locks[file_path] = record
+            else:
+                # Expired
+                active_locks.pop(file_path, None)
+
+    return active_locks
+
+
+def replay_inbox(
+    swarm_dir: Path, agent_id: str, cursor: Optional[Dict[str, Any]] = None
+) -> Dict[str, TailRead]:
+    """
+    Messages addressed to agent_id after cursor, per inbox log.
+
+    Keyed by log key (see message_store.log_key); each TailRead carries the
+    addressed records, the offset just past each one and the log watermark.
+    """
+    cursor = cursor or {}
+    inbox = {}
+    for log in message_store.inbox_logs(swarm_dir, agent_id):
+        key = message_store.log_key(swarm_dir, log)
+        tail = read_appended(log, cursor.get(key), with_ends=True)
+        kept = [
+            (msg, end)
+            for msg, end in zip(tail.records, tail.ends)
+            if msg.get("to") in (agent_id, message_store.BROADCAST)
+        ]
+        inbox[key] = TailRead(
+            [msg for msg, _ in kept], tail.watermark, tail.reset, [end for _, end in kept]
+        )
+    return inbox
@@ -2,12 +2,13 @@
 """Send a message to another agent in the swarm."""
 
 import argparse
-import json
 import os
 import hashlib
 from datetime import datetime
 from pathlib import Path
-from id_generator import generate_message_id, generate_agent_id
+from id_generator import generate_agent_id
+from message_archive import retention_enabled
+from message_store import append_message, new_message_id
 
 SWARM_DIR = Path(".claude/swarm")
 
@@ -35,7 +36,7 @@ def send_message(recipient: str, subject: str, body: str, priority: str = "norma
     SWARM_DIR.mkdir(parents=True, exist_ok=True)
 
     message = {
-        "id": generate_message_id(SWARM_DIR),
+        "id": new_message_id(SWARM_DIR),
         "from": get_agent_id(),
         "to": recipient,
         "subject": subject,
@@ -45,9 +46,12 @@ def send_message(recipient: str, subject: str, body: str, priority: str = "norma
         "read": False,
     }
 
-    messages_file = SWARM_DIR / "messages.jsonl"
-    with open(messages_file, "a") as f:
-        f.write(json.dumps(message) + "\n")
+    log = append_message(SWARM_DIR, message)
+    if retention_enabled():
+        # Retention runs in the background compactor, started once the log is due
+        from compact import maybe_trigger_retention
+
+        maybe_trigger_retention(SWARM_DIR, log)
 
     print(f"✓ Message sent to {recipient}")
     if subject:
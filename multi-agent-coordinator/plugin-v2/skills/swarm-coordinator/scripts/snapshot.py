@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Materialised swarm summary for agent bootstrap.
+
+SessionStart only needs a summary of the swarm: the active agents, the top
+SWARM_SNAPSHOT_TOP_K (10) ready tasks and how many there are, the active
+locks and reservations and each agent's unread count. .cache/snapshot.json holds that summary
+together with the position (watermark, see swarm_log.py) of every log it was
+built from, so loading it is one small read plus a stat() per log.
+
+Each section is versioned by the logs it is built from:
+
+- agents: agents.jsonl
+- ready: tasks.jsonl
+- locks, reservations: locks.jsonl, and at most SWARM_SNAPSHOT_MAX_AGE_SECONDS
+  (30) old, since locks expire and leases lapse without a log changing
+- unread: the message logs, the agents' read cursors and the agent list
+
+load() tops up only the sections whose logs moved. It re-queries them from
+SwarmCache, which folds in just the lines appended since its last refresh.
+The snapshot is advisory: lock decisions still go through the lock index.
+
+Usage:
+    python3 snapshot.py show       # print the (topped-up) snapshot as JSON
+    python3 snapshot.py follow     # keep it fresh while the swarm changes
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+
+import message_store
+from swarm_log import log_moved, write_json_atomic
+
+SWARM_DIR = Path(".claude/swarm")
+
+SNAPSHOT_FILE = Path(".cache") / "snapshot.json"
+
+# Bump when the layout changes; older snapshots are rebuilt
+SNAPSHOT_VERSION = 2
+
+TOP_K = int(os.environ.get("SWARM_SNAPSHOT_TOP_K", 10))
+MAX_AGE_SECONDS = float(os.environ.get("SWARM_SNAPSHOT_MAX_AGE_SECONDS", 30))
+
+SECTIONS = ("agents", "ready", "locks", "reservations", "unread")
+
+# Logs owned by each fixed section; unread owns every message log
+SECTION_LOGS = {
+    "agents": "agents.jsonl",
+    "ready": "tasks.jsonl",
+    "locks": "locks.jsonl",
+    "reservations": "locks.jsonl",
+}
+
+# Cache groups each section is built from
+SECTION_GROUPS = {
+    "agents": "agents",
+    "ready": "tasks",
+    "locks": "locks",
+    "reservations": "locks",
+    "unread": "messages",
+}
+
+# Sections that go stale with time as well as with their log
+TIMED_SECTIONS = ("locks", "reservations")
+
+
+def snapshot_path(swarm_dir: Path) -> Path:
+    return Path(swarm_dir) / SNAPSHOT_FILE
+
+
+def _empty() -> Dict[str, Any]:
+    return {
+        "version": SNAPSHOT_VERSION,
+        "logs": {},
+        "cursors": {},
+        "refreshed_at": {},
+        "agents": {},
+        "ready": [],
+        "ready_total": 0,
+        "locks": {},
+        "reservations": {},
+        "unread": {},
+    }
+
+
+def read_snapshot(swarm_dir: Path) -> Dict[str, Any]:
+    """The snapshot as last written, or an empty one if unusable."""
+    try:
+        with open(snapshot_path(swarm_dir), "r") as f:
+            snapshot = json.load(f)
+        if snapshot.get("version") == SNAPSHOT_VERSION:
+            return snapshot
+    except (OSError, ValueError):
+        pass
+    return _empty()
+
+
+def _message_logs(swarm_dir: Path) -> Dict[str, Path]:
+    return {message_store.log_key(swarm_dir, log): log for log in message_store.all_logs(swarm_dir)}
+
+
+def _cursor_file(swarm_dir: Path, agent_id: str) -> Path:
+    return swarm_dir / message_store.CURSOR_DIR / f"{message_store.safe_name(agent_id)}.json"
+
+
+def _cursor_versions(swarm_dir: Path, agent_ids) -> Dict[str, int]:
+    """mtime of every agent's read cursor (0 if it has none)."""
+    versions = {}
+    for agent_id in agent_ids:
+        try:
+            versions[agent_id] = os.stat(_cursor_file(swarm_dir, agent_id)).st_mtime_ns
+        except FileNotFoundError:
+            versions[agent_id] = 0
+    return versions
+
+
+def stale_sections(
+    swarm_dir: Path, snapshot: Dict[str, Any], now: Optional[float] = None
+) -> Set[str]:
+    """Sections whose logs moved since the snapshot was built."""
+    swarm_dir = Path(swarm_dir)
+    now = time.time() if now is None else now
+    logs = snapshot["logs"]
+    refreshed_at = snapshot["refreshed_at"]
+
+    stale = {section for section in SECTIONS if section not in refreshed_at}
+    for section, name in SECTION_LOGS.items():
+        if log_moved(swarm_dir / name, logs.get(name)):
+            stale.add(section)
+    for section in TIMED_SECTIONS:
+        if now - refreshed_at.get(section, 0) > MAX_AGE_SECONDS:
+            stale.add(section)
+
+    messages = _message_logs(swarm_dir)
+    owned = {key for key in logs if key not in SECTION_LOGS.values()}
+    if (
+        "agents" in stale
+        or owned != set(messages)
+        or any(log_moved(log, logs.get(key)) for key, log in messages.items())
+        or _cursor_versions(swarm_dir, snapshot["agents"]) != snapshot["cursors"]
+    ):
+        stale.add("unread")
+    return stale
+
+
+def _unread_count(cache, swarm_dir: Path, agent_id: str) -> int:
+    try:
+        cursor = json.loads(_cursor_file(swarm_dir, agent_id).read_text())
+    except (FileNotFoundError, ValueError):
+        cursor = {}
+    return sum(len(tail.records) for tail in cache.inbox(agent_id, cursor).values())
+
+
+def top_up(
+    swarm_dir: Path, snapshot: Dict[str, Any], sections: Set[str], now: Optional[float] = None
+) -> Dict[str, Any]:
+    """Rebuild the given sections from the cache and persist the snapshot."""
+    from swarm_cache import SwarmCache
+
+    swarm_dir = Path(swarm_dir)
+    now = time.time() if now is None else now
+    with SwarmCache(swarm_dir) as cache:
+        # Taken first: the sections can only be newer than what they claim
+        marks = cache.watermarks(*{SECTION_GROUPS[section] for section in sections})
+
+        if "agents" in sections:
+            snapshot["agents"] = cache.agents()
+        if "ready" in sections:
+            snapshot["ready"] = cache.available_tasks(limit=TOP_K)
+            snapshot["ready_total"] = cache.available_task_count()
+        if "locks" in sections:
+            snapshot["locks"] = cache.locks(datetime.utcfromtimestamp(now))
+        if "reservations" in sections:
+            snapshot["reservations"] = cache.reservations(datetime.utcfromtimestamp(now))
+        if "unread" in sections:
+            snapshot["cursors"] = _cursor_versions(swarm_dir, snapshot["agents"])
+            snapshot["unread"] = {
+                agent_id: _unread_count(cache, swarm_dir, agent_id)
+                for agent_id in snapshot["agents"]
+            }
+
+    logs = snapshot["logs"]
+    for section in sections & SECTION_LOGS.keys():
+        logs[SECTION_LOGS[section]] = marks.get(SECTION_LOGS[section])
+    if "unread" in sections:
+        # Message logs come and go (migration, new inbox partitions)
+        for key in [key for key in logs if key not in SECTION_LOGS.values()]:
+            del logs[key]
+        logs.update((key, marks.get(key)) for key in _message_logs(swarm_dir))
+    for section in sections:
+        snapshot["refreshed_at"][section] = now
+
+    try:
+        write_json_atomic(snapshot_path(swarm_dir), snapshot)
+    except OSError:
+        # A read-only cache directory only costs the next reader a top-up
+        pass
+    return snapshot
+
+
+def load(
+    swarm_dir: Path = None, sections: Iterable[str] = SECTIONS, now: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    The current snapshot, topping up whichever of sections went stale.
+
+    Sections not asked for are returned as last written.
+    """
+    swarm_dir = Path(swarm_dir or SWARM_DIR)
+    snapshot = read_snapshot(swarm_dir)
+    stale = stale_sections(swarm_dir, snapshot, now) & set(sections)
+    if stale:
+        snapshot = top_up(swarm_dir, snapshot, stale, now)
+    return snapshot
+
+
+def follow(swarm_dir: Path = None):
+    """Top the snapshot up after every change, and at least every MAX_AGE_SECONDS."""
+    import watch
+
+    swarm_dir = Path(swarm_dir or SWARM_DIR)
+    while True:
+        load(swarm_dir)
+        for _ in watch.stream(swarm_dir, idle_timeout=MAX_AGE_SECONDS):
+            load(swarm_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Swarm snapshot for agent bootstrap")
+    parser.add_argument("command", choices=["show", "follow"])
+    parser.add_argument("--swarm-dir", help="Swarm directory (default: .claude/swarm)")
+
+    args = parser.parse_args()
+    swarm_dir = Path(args.swarm_dir) if args.swarm_dir else SWARM_DIR
+
+    if args.command == "show":
+        print(json.dumps(load(swarm_dir), indent=2))
+        return
+    try:
+        follow(swarm_dir)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Task state folding for tasks.jsonl.
+
+How records fold into task state and when a task can be claimed. Shared by
+the reference replay (replay.py), compaction (compact.py) and SwarmCache,
+which folds only the records appended since its last refresh and keeps the
+claimable tasks as an indexed ready flag (swarm_cache.py).
+"""
+
+from typing import Any, Dict, List
+
+
+def apply_task_record(task_state: Dict[str, Dict], record: Dict[str, Any]):
+    """Fold a single tasks.jsonl record into task_state."""
+    # Folded record written by compaction: the full state of one task
+    if record.get("compacted"):
+        task = dict(record)
+        del task["compacted"]
+        task_state[task["id"]] = task
+    # Task definition
+    elif "id" in record and "task_id" not in record:
+        task_state[record["id"]] = {**record, "status": "pending"}
+    # Task state update
+    elif "task_id" in record:
+        task_id = record["task_id"]
+        if task_id in task_state:
+            task_state[task_id].update(record)
+
+
+def _unmet_dependencies(task_state: Dict[str, Dict], task: Dict) -> List[str]:
+    """Dependencies of task that are not completed yet."""
+    return [
+        dep_id
+        for dep_id in task.get("dependencies", [])
+        if task_state.get(dep_id, {}).get("status") != "completed"
+    ]
+
+
+def is_claimable(task_state: Dict[str, Dict], task: Dict) -> bool:
+    """A task can be claimed when it is pending, unassigned and unblocked."""
+    if task.get("status") != "pending" or task.get("assigned_to"):
+        return False
+    return not _unmet_dependencies(task_state, task)
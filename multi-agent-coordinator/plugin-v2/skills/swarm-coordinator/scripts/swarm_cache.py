@@ -5,388 +5,892 @@ SQLite cache for fast queries on JSONL data.
 Inspired by beads' dual persistence strategy:
 - JSONL files are the source of truth (Git-managed)
 - SQLite cache provides fast queries (gitignored)
-- Auto-rebuilds when JSONL is newer than cache
+- Refreshes incrementally from what was appended to each JSONL file
+
+The cache remembers, per log, how far it has ingested (inode, byte offset
+and a fingerprint, see swarm_log.py). A refresh folds in only the lines
+appended since, in one transaction; a table is rebuilt from scratch only
+when one of its logs was truncated or rotated.
+
+A SwarmCache keeps one connection per thread for its lifetime, so queries
+reuse SQLite's prepared statements instead of reconnecting every time.
+
+Each query refreshes only the tables it reads. The tasks table doubles as
+a ready queue: every row carries a ready flag, and task_deps maps each task
+to the tasks depending on it, so a refresh re-evaluates only the tasks it
+touched and their dependents, and picking the next task is an index seek.
+inbox() reads an agent's own message logs past its read cursor instead of
+ingesting the swarm's message traffic.
+
+The swarm scripts read all state through this cache. Its replay-shaped
+queries (tasks(), agents(), locks(), inbox(), ...) return exactly what
+folding the logs from scratch returns (replay.py), down to dict order.
 """
 
 import sqlite3
 import json
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import message_store
+from liveness import Liveness
+from lock_index import lock_is_active
+from state_engine import apply_task_record, is_claimable
+from swarm_log import TailRead, log_moved, read_appended
+
+# Bump when the schema changes; older caches are dropped and re-ingested
+SCHEMA_VERSION = 6
+
+# Tables, each refreshed from its own logs
+GROUPS = ("tasks", "messages", "locks", "agents")
+
+# Applied to every connection; WAL itself is persistent and set at creation
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",  # 256 MiB
+    "PRAGMA cache_size=-16000",  # 16 MiB
+    "PRAGMA temp_store=MEMORY",
+)
+
+TASK_COLUMNS = (
+    "id, description, status, assigned_to, priority, files, dependencies, "
+    "created_at, claimed_at, completed_at, summary"
+)
+MESSAGE_COLUMNS = "id, from_agent, to_agent, subject, body, priority, timestamp, read"
+
+# Prepared statements are cached per connection, keyed by SQL text, so
+# queries keep their SQL constant and pass everything else as parameters.
+# Rows are ordered by seq, the order the replay's dicts would have.
+AVAILABLE_TASKS_SQL = f"""
+    SELECT {TASK_COLUMNS}, record FROM tasks
+    WHERE ready = 1
+    ORDER BY priority DESC, created_at ASC, seq ASC
+    LIMIT ?
+"""
+AVAILABLE_TASK_COUNT_SQL = "SELECT COUNT(*) FROM tasks WHERE ready = 1"
+DEPENDENTS_SQL = "SELECT task_id FROM task_deps WHERE dep_id IN (SELECT value FROM json_each(?))"
+TASK_BY_ID_SQL = f"SELECT {TASK_COLUMNS} FROM tasks WHERE id = ?"
+TASK_RECORD_SQL = "SELECT record FROM tasks WHERE id = ?"
+TASKS_SQL = "SELECT id, record FROM tasks ORDER BY seq"
+TASK_RECORDS_FOR_SQL = "SELECT id, record FROM tasks WHERE id IN (SELECT value FROM json_each(?))"
+# Newest first, one page at a time. Each recipient (the agent, then "all")
+# is a range scan of idx_messages_to_time starting below the keyset cursor
+# (ts, log, end_offset) and at or above since. The two ranges are merged.
+# Given read offsets ({log key: offset}), only messages past them are kept.
+_MESSAGES_RANGE = f"""
+    SELECT * FROM (
+        SELECT {MESSAGE_COLUMNS}, ts, log, end_offset FROM messages
+        WHERE to_agent = ? AND (ts, log, end_offset) < (?, ?, ?) AND ts >= ?
+          AND (? IS NULL OR (read = 0 AND end_offset > COALESCE(
+            (SELECT value FROM json_each(?) WHERE key = log), 0
+          )))
+        ORDER BY ts DESC, log DESC, end_offset DESC
+        LIMIT ?
+    )
+"""
+MESSAGES_FOR_AGENT_SQL = f"""
+    {_MESSAGES_RANGE}
+    UNION ALL
+    {_MESSAGES_RANGE}
+    ORDER BY ts DESC, log DESC, end_offset DESC
+    LIMIT ?
+"""
+LOCKS_SQL = "SELECT file_path, record FROM locks WHERE reservation = ? ORDER BY seq"
+ACTIVE_LOCKS_SQL = """
+    SELECT file_path, holder, reason, acquired_at, expires_at, reservation, record FROM locks
+    ORDER BY acquired_at DESC
+"""
+AGENTS_SQL = "SELECT id, record FROM agents ORDER BY seq"
+ACTIVE_AGENTS_SQL = """
+    SELECT id, session_id, started_at, last_seen, status FROM agents
+    WHERE status = 'active'
+    ORDER BY last_seen DESC
+"""
+
+
+def _upsert_sql(table: str, keys: Tuple[str, ...], columns: List[str]) -> str:
+    """INSERT OR REPLACE that keeps an existing row's seq, and so its position."""
+    where = " AND ".join(f"{key} = ?" for key in keys)
+    return (
+        f"INSERT OR REPLACE INTO {table} (seq, {', '.join(columns)}) "
+        f"VALUES ((SELECT seq FROM {table} WHERE {where}), {', '.join('?' * len(columns))})"
+    )
+
+
+TASK_UPSERT_SQL = _upsert_sql(
+    "tasks",
+    ("id",),
+    TASK_COLUMNS.split(", ") + ["ready", "record"],
+)
+LOCK_UPSERT_SQL = _upsert_sql(
+    "locks",
+    ("reservation", "file_path"),
+    ["reservation", "file_path", "holder", "reason", "acquired_at", "expires_at", "record"],
+)
+AGENT_UPSERT_SQL = _upsert_sql(
+    "agents", ("id",), ["id", "session_id", "started_at", "last_seen", "status", "record"]
+)
+
+
+def _task_row(task_id: str, record: Dict[str, Any], ready: bool) -> tuple:
+    """tasks table row for a folded task (the upsert key comes first)."""
+    return (
+        task_id,
+        task_id,
+        record.get("description", ""),
+        record.get("status"),
+        record.get("agent_id"),
+        record.get("priority") or 0,
+        json.dumps(record.get("files", [])),
+        json.dumps(record.get("dependencies", [])),
+        record.get("created_at") or "",
+        record.get("claimed_at"),
+        record.get("completed_at"),
+        record.get("summary") or None,
+        1 if ready else 0,
+        json.dumps(record),
+    )
+
+
+def messages_for_agent_params(
+    agent_id: str,
+    read_offsets: Optional[Dict[str, int]] = None,
+    limit: Optional[int] = None,
+    before: Optional[Dict[str, Any]] = None,
+    since: Optional[float] = None,
+) -> tuple:
+    """Parameters of MESSAGES_FOR_AGENT_SQL."""
+    if before:
+        position = (before["ts"], before["log"], before["end_offset"])
+    else:
+        position = (float("inf"), "", 0)
+    since = float("-inf") if since is None else since
+    limit = limit or -1
+    unread = None if read_offsets is None else json.dumps(read_offsets)
+    # Broadcasts are read once, even when agent_id is the broadcast name
+    other = message_store.BROADCAST if agent_id != message_store.BROADCAST else None
+    return (
+        (agent_id, *position, since, unread, unread, limit)
+        + (other, *position, since, unread, unread, limit)
+        + (limit,)
+    )
+
+
+def _dependencies(task: Dict[str, Any]) -> List[str]:
+    deps = task.get("dependencies")
+    return [dep for dep in deps if isinstance(dep, str)] if isinstance(deps, list) else []
+
+
+def _message_row(log: str, end: int, msg: Dict[str, Any]) -> tuple:
+    return (
+        log,
+        end,
+        message_store.timestamp_seconds(msg.get("timestamp")),
+        msg.get("id"),
+        msg.get("from", ""),
+        msg.get("to", ""),
+        msg.get("subject", ""),
+        msg.get("body", ""),
+        msg.get("priority", "normal"),
+        msg.get("timestamp", ""),
+        1 if msg.get("read", False) else 0,
+        json.dumps(msg),
+    )
+
+
+def _lock_row(key: Tuple[int, str], lock: Dict[str, Any]) -> tuple:
+    return (
+        *key,
+        *key,
+        lock.get("holder", ""),
+        lock.get("reason", ""),
+        lock.get("acquired_at", ""),
+        lock.get("expires_at", ""),
+        json.dumps(lock),
+    )
+
+
+def _agent_row(agent_id: str, agent: Dict[str, Any]) -> tuple:
+    return (
+        agent_id,
+        agent_id,
+        agent.get("session_id", ""),
+        agent.get("started_at", ""),
+        agent.get("last_seen", ""),
+        agent.get("status", "active"),
+        json.dumps(agent),
+    )
+
+
+def _lock_change(record: Dict[str, Any]) -> Optional[Tuple[Tuple[int, str], Optional[Dict]]]:
+    """
+    ((reservation, file path), record to keep or None to drop it) for a
+    locks.jsonl record. Reservations are keyed apart from locks on the same
+    path, as in lock_index.py.
+    """
+    file_path = record.get("file_path")
+    if not file_path:
+        return None
+    key = (1 if record.get("reservation") else 0, file_path)
+    if record.get("status") == "released":
+        return key, None
+    if record.get("holder"):
+        # Expiry depends on the time of the query, so expired locks are kept
+        return key, record
+    return None
+
+
+def _agent_change(record: Dict[str, Any]) -> Optional[Tuple[str, Optional[Dict]]]:
+    """(agent ID, record to keep or None to drop the agent) for an agents.jsonl record."""
+    agent_id = record.get("id")
+    if not agent_id:
+        return None
+    return agent_id, None if record.get("terminated_at") else record
+
+
+def _fold_changes(
+    records: List[Dict[str, Any]], change: Callable
+) -> Tuple[Dict[str, Dict], Set[str]]:
+    """
+    Net effect of records on a keyed table.
+
+    Returns the rows to upsert, in the order a dict replay would insert
+    them, and the keys dropped along the way (deleted first, so a key that
+    comes back is appended at the end like in the replay).
+    """
+    live: Dict[str, Dict] = {}
+    dropped: Set[str] = set()
+    for record in records:
+        changed = change(record)
+        if changed is None:
+            continue
+        key, kept = changed
+        if kept is None:
+            live.pop(key, None)
+            dropped.add(key)
+        else:
+            live[key] = kept
+    return live, dropped
 
 
 class SwarmCache:
-    """SQLite cache for swarm state with auto-rebuild."""
+    """SQLite cache for swarm state with incremental refresh."""
 
-    def __init__(self, swarm_dir: Path = Path(".claude/swarm")):
+    def __init__(self, swarm_dir: Path = Path(".claude/swarm"), read_only: bool = False):
+        """
+        Open the cache, creating it if needed; queries refresh what they read.
+
+        With read_only, the database is opened read-only and never
+        refreshed: queries see what the last writer ingested. The cache must
+        already exist.
+        """
         self.swarm_dir = Path(swarm_dir)
         self.cache_dir = self.swarm_dir / ".cache"
         self.db_path = self.cache_dir / "state.db"
+        self.read_only = read_only
 
         self.tasks_file = self.swarm_dir / "tasks.jsonl"
-        self.messages_file = self.swarm_dir / "messages.jsonl"
         self.locks_file = self.swarm_dir / "locks.jsonl"
         self.agents_file = self.swarm_dir / "agents.jsonl"
 
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
         self._ensure_cache()
 
-    def _ensure_cache(self):
-        """Ensure cache exists and is up-to-date."""
-        if not self.db_path.exists():
-            self._create_cache()
-            self._rebuild_cache()
-            return
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+
+        if self.read_only:
+            if not self.db_path.exists():
+                raise FileNotFoundError(f"No swarm cache at {self.db_path}")
+            uri = f"{self.db_path.resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(
+                uri, uri=True, timeout=10, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA query_only=ON")
+        else:
+            conn = sqlite3.connect(
+                self.db_path, timeout=10, isolation_level=None, check_same_thread=False
+            )
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        conn.row_factory = sqlite3.Row
 
-        # Check if any JSONL file is newer than cache
-        db_mtime = self.db_path.stat().st_mtime
-        jsonl_files = [
-            self.tasks_file,
-            self.messages_file,
-            self.locks_file,
-            self.agents_file,
-        ]
-
-        needs_rebuild = any(
-            f.exists() and f.stat().st_mtime > db_mtime for f in jsonl_files
-        )
+        self._local.conn = conn
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def close(self):
+        """Close the connections of every thread."""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
 
-        if needs_rebuild:
-            self._rebuild_cache()
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _ensure_cache(self):
+        """Ensure the cache exists with the current schema."""
+        if self.read_only:
+            self._connect()
+            return
 
-    def _create_cache(self):
-        """Create SQLite cache schema."""
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self._create_cache(conn)
 
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA journal_mode=WAL")  # Better concurrency
+    def refresh(self, *groups: str):
+        """Fold in whatever was appended to the logs of groups (default: every table)."""
+        if not self.read_only:
+            self._refresh(self._connect(), groups or GROUPS)
 
-        # Tasks table
-        conn.execute(
+    def _create_cache(self, conn: sqlite3.Connection):
+        """Create SQLite cache schema, dropping a cache from an older schema."""
+        conn.execute("PRAGMA journal_mode=WAL")  # Better concurrency
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+                # Another process got here first
+                conn.execute("COMMIT")
+                return
+
+            for table in ("tasks", "task_deps", "messages", "locks", "agents", "ingest_watermarks"):
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+            # Tasks table; record holds the folded task as the replay returns it
+            conn.execute(
+                """
+                CREATE TABLE tasks (
+                    seq INTEGER PRIMARY KEY,
+                    id TEXT NOT NULL UNIQUE,
+                    description TEXT,
+                    status TEXT,
+                    assigned_to TEXT,
+                    priority INTEGER,
+                    files TEXT,
+                    dependencies TEXT,
+                    created_at TEXT,
+                    claimed_at TEXT,
+                    completed_at TEXT,
+                    summary TEXT,
+                    ready INTEGER,
+                    record TEXT
+                )
             """
-            CREATE TABLE IF NOT EXISTS tasks (
-                id TEXT PRIMARY KEY,
-                description TEXT,
-                status TEXT,
-                assigned_to TEXT,
-                priority INTEGER,
-                files TEXT,
-                dependencies TEXT,
-                created_at TEXT,
-                claimed_at TEXT,
-                completed_at TEXT,
-                summary TEXT
             )
-        """
-        )
 
-        # Messages table
-        conn.execute(
+            # Reverse dependencies: which tasks wait on dep_id
+            conn.execute(
+                """
+                CREATE TABLE task_deps (
+                    dep_id TEXT,
+                    task_id TEXT,
+                    PRIMARY KEY (dep_id, task_id)
+                ) WITHOUT ROWID
             """
-            CREATE TABLE IF NOT EXISTS messages (
-                id TEXT PRIMARY KEY,
-                from_agent TEXT,
-                to_agent TEXT,
-                subject TEXT,
-                body TEXT,
-                priority TEXT,
-                timestamp TEXT,
-                read INTEGER
             )
-        """
-        )
 
-        # Locks table
-        conn.execute(
+            # Messages table, keyed by position (log key, offset past the line);
+            # ts is the timestamp in epoch seconds, so it orders numerically
+            conn.execute(
+                """
+                CREATE TABLE messages (
+                    log TEXT,
+                    end_offset INTEGER,
+                    id TEXT,
+                    from_agent TEXT,
+                    to_agent TEXT,
+                    subject TEXT,
+                    body TEXT,
+                    priority TEXT,
+                    timestamp TEXT,
+                    ts REAL,
+                    read INTEGER,
+                    record TEXT,
+                    PRIMARY KEY (log, end_offset)
+                )
             """
-            CREATE TABLE IF NOT EXISTS locks (
-                file_path TEXT PRIMARY KEY,
-                holder TEXT,
-                reason TEXT,
-                acquired_at TEXT,
-                expires_at TEXT
             )
-        """
-        )
 
-        # Agents table
-        conn.execute(
+            # Locks table: latest acquire record per path, released paths
+            # removed; reservations (reservation = 1) are rows of their own
+            conn.execute(
+                """
+                CREATE TABLE locks (
+                    seq INTEGER PRIMARY KEY,
+                    reservation INTEGER NOT NULL,
+                    file_path TEXT NOT NULL,
+                    holder TEXT,
+                    reason TEXT,
+                    acquired_at TEXT,
+                    expires_at TEXT,
+                    record TEXT,
+                    UNIQUE (reservation, file_path)
+                )
             """
-            CREATE TABLE IF NOT EXISTS agents (
-                id TEXT PRIMARY KEY,
-                session_id TEXT,
-                started_at TEXT,
-                last_seen TEXT,
-                status TEXT
             )
-        """
-        )
 
-        # Indexes for common queries
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status)")
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_tasks_assigned ON tasks(assigned_to)"
-        )
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_messages_to ON messages(to_agent)"
-        )
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_read ON messages(read)")
-
-        conn.commit()
-        conn.close()
+            # Agents table: latest registration per agent, terminated agents removed
+            conn.execute(
+                """
+                CREATE TABLE agents (
+                    seq INTEGER PRIMARY KEY,
+                    id TEXT NOT NULL UNIQUE,
+                    session_id TEXT,
+                    started_at TEXT,
+                    last_seen TEXT,
+                    status TEXT,
+                    record TEXT
+                )
+            """
+            )
 
-    def _rebuild_cache(self):
-        """Rebuild cache from JSONL files."""
-        conn = sqlite3.connect(self.db_path)
-
-        # Clear existing data
-        conn.execute("DELETE FROM tasks")
-        conn.execute("DELETE FROM messages")
-        conn.execute("DELETE FROM locks")
-        conn.execute("DELETE FROM agents")
-
-        # Load tasks
-        if self.tasks_file.exists():
-            task_state = {}
-            with open(self.tasks_file, "r") as f:
-                for line in f:
-                    if not line.strip():
-                        continue
-                    record = json.loads(line)
-
-                    # Task definition
-                    if "id" in record and "task_id" not in record:
-                        task_state[record["id"]] = {
-                            "id": record["id"],
-                            "description": record.get("description", ""),
-                            "status": "pending",
-                            "assigned_to": None,
-                            "priority": record.get("priority", 0),
-                            "files": json.dumps(record.get("files", [])),
-                            "dependencies": json.dumps(record.get("dependencies", [])),
-                            "created_at": record.get("created_at", ""),
-                            "claimed_at": None,
-                            "completed_at": None,
-                            "summary": None,
-                        }
-                    # Task state update
-                    elif "task_id" in record:
-                        task_id = record["task_id"]
-                        if task_id in task_state:
-                            if record.get("status"):
-                                task_state[task_id]["status"] = record["status"]
-                            if record.get("agent_id"):
-                                task_state[task_id]["assigned_to"] = record["agent_id"]
-                            if record.get("claimed_at"):
-                                task_state[task_id]["claimed_at"] = record["claimed_at"]
-                            if record.get("completed_at"):
-                                task_state[task_id]["completed_at"] = record[
-                                    "completed_at"
-                                ]
-                            if record.get("summary"):
-                                task_state[task_id]["summary"] = record["summary"]
-
-            # Insert tasks
-            for task in task_state.values():
-                conn.execute(
-                    """
-                    INSERT OR REPLACE INTO tasks
-                    (id, description, status, assigned_to, priority, files, dependencies,
-                     created_at, claimed_at, completed_at, summary)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        task["id"],
-                        task["description"],
-                        task["status"],
-                        task["assigned_to"],
-                        task["priority"],
-                        task["files"],
-                        task["dependencies"],
-                        task["created_at"],
-                        task["claimed_at"],
-                        task["completed_at"],
-                        task["summary"],
-                    ),
+            # How far each log (path relative to the swarm dir) has been ingested
+            conn.execute(
+                """
+                CREATE TABLE ingest_watermarks (
+                    log TEXT PRIMARY KEY,
+                    inode INTEGER,
+                    offset INTEGER,
+                    fingerprint TEXT
                 )
+            """
+            )
 
-        # Load messages
-        if self.messages_file.exists():
-            with open(self.messages_file, "r") as f:
-                for line in f:
-                    if not line.strip():
-                        continue
-                    msg = json.loads(line)
-                    conn.execute(
-                        """
-                        INSERT OR REPLACE INTO messages
-                        (id, from_agent, to_agent, subject, body, priority, timestamp, read)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                        (
-                            msg["id"],
-                            msg.get("from", ""),
-                            msg.get("to", ""),
-                            msg.get("subject", ""),
-                            msg.get("body", ""),
-                            msg.get("priority", "normal"),
-                            msg.get("timestamp", ""),
-                            1 if msg.get("read", False) else 0,
-                        ),
-                    )
+            # Indexes for common queries
+            conn.execute("CREATE INDEX idx_tasks_status ON tasks(status)")
+            conn.execute("CREATE INDEX idx_tasks_assigned ON tasks(assigned_to)")
+            conn.execute(
+                "CREATE INDEX idx_tasks_ready ON tasks(ready, priority DESC, created_at)"
+            )
+            conn.execute(
+                "CREATE INDEX idx_messages_to_time ON messages(to_agent, ts, log, end_offset)"
+            )
+            conn.execute("CREATE INDEX idx_messages_read ON messages(read)")
+
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _log_groups(self, groups: Tuple[str, ...] = GROUPS) -> Dict[str, List[Path]]:
+        """Logs feeding each of the given tables."""
+        fixed = {"tasks": self.tasks_file, "locks": self.locks_file, "agents": self.agents_file}
+        return {
+            group: message_store.all_logs(self.swarm_dir) if group == "messages" else [fixed[group]]
+            for group in groups
+        }
+
+    def _group_of(self, key: str) -> str:
+        """Table a log key feeds (every log but the three fixed ones holds messages)."""
+        for group, path in (
+            ("tasks", self.tasks_file),
+            ("locks", self.locks_file),
+            ("agents", self.agents_file),
+        ):
+            if key == path.name:
+                return group
+        return "messages"
+
+    def watermarks(self, *groups: str) -> Dict[str, Dict[str, Any]]:
+        """How far each log (by log key) of groups (default: every table) has been ingested."""
+        groups = groups or GROUPS
+        self.refresh(*groups)
+        return {
+            key: mark
+            for key, mark in self._watermarks(self._connect()).items()
+            if self._group_of(key) in groups
+        }
+
+    def _watermarks(self, conn: sqlite3.Connection) -> Dict[str, Dict[str, Any]]:
+        return {
+            log: {"inode": inode, "offset": offset, "fingerprint": fingerprint}
+            for log, inode, offset, fingerprint in conn.execute(
+                "SELECT log, inode, offset, fingerprint FROM ingest_watermarks"
+            )
+        }
+
+    def _refresh(self, conn: sqlite3.Connection, groups: Tuple[str, ...] = GROUPS):
+        """Fold the new lines of the groups' logs into their tables, in one transaction."""
+        groups = self._log_groups(groups)
+        keys = {message_store.log_key(self.swarm_dir, log) for logs in groups.values() for log in logs}
+
+        watermarks = {k: w for k, w in self._watermarks(conn).items() if self._group_of(k) in groups}
+        if not any(key not in keys for key in watermarks) and not any(
+            log_moved(log, watermarks.get(message_store.log_key(self.swarm_dir, log)))
+            for logs in groups.values()
+            for log in logs
+        ):
+            return
 
-        # Load locks
-        if self.locks_file.exists():
-            with open(self.locks_file, "r") as f:
-                for line in f:
-                    if not line.strip():
-                        continue
-                    lock = json.loads(line)
-                    conn.execute(
-                        """
-                        INSERT OR REPLACE INTO locks
-                        (file_path, holder, reason, acquired_at, expires_at)
-                        VALUES (?, ?, ?, ?, ?)
-                    """,
-                        (
-                            lock.get("file_path", ""),
-                            lock.get("holder", ""),
-                            lock.get("reason", ""),
-                            lock.get("acquired_at", ""),
-                            lock.get("expires_at", ""),
-                        ),
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have ingested part of it meanwhile
+            watermarks = self._watermarks(conn)
+            for group, logs in groups.items():
+                logs = {message_store.log_key(self.swarm_dir, log): log for log in logs}
+                with_ends = group == "messages"
+                tails = {
+                    key: read_appended(log, watermarks.get(key), with_ends)
+                    for key, log in logs.items()
+                }
+
+                # A vanished log (e.g. messages.jsonl after migration) is a rotation too
+                gone = [k for k in watermarks if k not in logs and self._group_of(k) == group]
+                reset = bool(gone) or any(tail.reset for tail in tails.values())
+                if reset:
+                    conn.execute(f"DELETE FROM {group}")
+                    if group == "tasks":
+                        conn.execute("DELETE FROM task_deps")
+                    tails = {key: read_appended(log, None, with_ends) for key, log in logs.items()}
+                    conn.executemany(
+                        "DELETE FROM ingest_watermarks WHERE log = ?", [(k,) for k in gone]
                     )
 
-        # Load agents
-        if self.agents_file.exists():
-            with open(self.agents_file, "r") as f:
-                for line in f:
-                    if not line.strip():
-                        continue
-                    agent = json.loads(line)
-                    conn.execute(
-                        """
-                        INSERT OR REPLACE INTO agents
-                        (id, session_id, started_at, last_seen, status)
-                        VALUES (?, ?, ?, ?, ?)
-                    """,
+                self._apply(conn, group, tails, reset)
+
+                conn.executemany(
+                    "INSERT OR REPLACE INTO ingest_watermarks VALUES (?, ?, ?, ?)",
+                    [
                         (
-                            agent.get("id", ""),
-                            agent.get("session_id", ""),
-                            agent.get("started_at", ""),
-                            agent.get("last_seen", ""),
-                            agent.get("status", "active"),
-                        ),
-                    )
+                            key,
+                            tail.watermark["inode"],
+                            tail.watermark["offset"],
+                            tail.watermark["fingerprint"],
+                        )
+                        for key, tail in tails.items()
+                        if tail.watermark != watermarks.get(key)
+                    ],
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _apply(
+        self,
+        conn: sqlite3.Connection,
+        group: str,
+        tails: Dict[str, TailRead],
+        reset: bool,
+    ):
+        """Upsert the rows touched by newly read records."""
+        if group == "messages":
+            conn.executemany(
+                f"""
+                INSERT OR REPLACE INTO messages
+                (log, end_offset, ts, {MESSAGE_COLUMNS}, record)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                [
+                    _message_row(key, end, msg)
+                    for key, tail in tails.items()
+                    for msg, end in zip(tail.records, tail.ends)
+                ],
+            )
+            return
 
-        conn.commit()
-        conn.close()
+        records = [record for tail in tails.values() for record in tail.records]
+
+        if group == "tasks":
+            if not records:
+                return
+            # Fold the new records onto the stored state of the tasks they name
+            ids = {record.get("task_id", record.get("id")) for record in records}
+            task_state = self._stored_tasks(conn, [i for i in ids if isinstance(i, str)])
+            for record in records:
+                apply_task_record(task_state, record)
+
+            # Only definitions (and compacted tasks) add rows, so they set
+            # the order of new tasks; updates only touch existing ones
+            touched = dict.fromkeys(
+                record.get("id")
+                for record in records
+                if record.get("compacted") or "task_id" not in record
+            )
+            touched.update(dict.fromkeys(ids))
+            touched = [task_id for task_id in touched if task_id in task_state]
+
+            # Readiness can only change for the touched tasks and the tasks
+            # waiting on them; load those and every dependency they name
+            dependents = [
+                task_id
+                for (task_id,) in conn.execute(DEPENDENTS_SQL, (json.dumps(touched),))
+                if task_id not in touched
+            ]
+            task_state.update(self._stored_tasks(conn, dependents))
+            deps = {dep for task_id in touched + dependents for dep in _dependencies(task_state[task_id])}
+            task_state.update(self._stored_tasks(conn, [d for d in deps if d not in task_state]))
+
+            def ready(task_id):
+                return is_claimable(task_state, task_state[task_id])
+
+            conn.executemany(
+                TASK_UPSERT_SQL,
+                [_task_row(task_id, task_state[task_id], ready(task_id)) for task_id in touched],
+            )
+            conn.executemany(
+                "DELETE FROM task_deps WHERE task_id = ?", [(task_id,) for task_id in touched]
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO task_deps VALUES (?, ?)",
+                [(dep, task_id) for task_id in touched for dep in _dependencies(task_state[task_id])],
+            )
+            conn.executemany(
+                "UPDATE tasks SET ready = ? WHERE id = ?",
+                [(1 if ready(task_id) else 0, task_id) for task_id in dependents],
+            )
+            return
 
-    # === Query methods ===
+        table, keys, upsert, change, row = {
+            "locks": (
+                "locks", ("reservation", "file_path"), LOCK_UPSERT_SQL, _lock_change, _lock_row
+            ),
+            "agents": ("agents", ("id",), AGENT_UPSERT_SQL, _agent_change, _agent_row),
+        }[group]
+        live, dropped = _fold_changes(records, change)
+        where = " AND ".join(f"{key} = ?" for key in keys)
+        conn.executemany(
+            f"DELETE FROM {table} WHERE {where}",
+            [k if isinstance(k, tuple) else (k,) for k in dropped],
+        )
+        conn.executemany(upsert, [row(k, record) for k, record in live.items()])
 
-    def get_available_tasks(self) -> List[Dict]:
-        """Get pending tasks with no dependencies, sorted by priority."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+    @staticmethod
+    def _stored_tasks(conn: sqlite3.Connection, task_ids: List[str]) -> Dict[str, Dict]:
+        """Folded state of the given tasks as stored in the tasks table."""
+        return {
+            task_id: json.loads(record)
+            for task_id, record in conn.execute(TASK_RECORDS_FOR_SQL, (json.dumps(task_ids),))
+        }
 
-        cursor = conn.execute(
-            """
-            SELECT * FROM tasks
-            WHERE status = 'pending' AND (assigned_to IS NULL OR assigned_to = '')
-            ORDER BY priority DESC, created_at ASC
+    def _rebuild_cache(self):
+        """Rebuild cache from JSONL files, ignoring what was ingested before."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM ingest_watermarks")
+        for table in ("tasks", "task_deps", "messages", "locks", "agents"):
+            conn.execute(f"DELETE FROM {table}")
+        conn.execute("COMMIT")
+        self._refresh(conn)
+
+    # === Replay-shaped queries (what replay.py returns) ===
+
+    def tasks(self) -> Dict[str, Dict]:
+        """Task state keyed by task ID, in definition order."""
+        self.refresh("tasks")
+        return {
+            task_id: json.loads(record)
+            for task_id, record in self._connect().execute(TASKS_SQL)
+        }
+
+    def task(self, task_id: str) -> Optional[Dict]:
+        """Folded state of one task."""
+        self.refresh("tasks")
+        row = self._connect().execute(TASK_RECORD_SQL, (task_id,)).fetchone()
+        return json.loads(row["record"]) if row else None
+
+    def available_tasks(self, limit: int = None) -> List[Dict]:
+        """Claimable tasks by priority (descending), then created_at, then definition order."""
+        self.refresh("tasks")
+        cursor = self._connect().execute(AVAILABLE_TASKS_SQL, (limit or -1,))
+        return [json.loads(row["record"]) for row in cursor]
+
+    def available_task_count(self) -> int:
+        """Number of claimable tasks."""
+        self.refresh("tasks")
+        return self._connect().execute(AVAILABLE_TASK_COUNT_SQL).fetchone()[0]
+
+    def next_available_task(self) -> Optional[Dict]:
+        """The task an auto-assigning claim would take."""
+        available = self.available_tasks(limit=1)
+        return available[0] if available else None
+
+    def agents(self) -> Dict[str, Dict]:
+        """Latest registration of every agent that has not terminated."""
+        self.refresh("agents")
+        return {
+            agent_id: json.loads(record)
+            for agent_id, record in self._connect().execute(AGENTS_SQL)
+        }
+
+    def locks(self, now: Optional[datetime] = None) -> Dict[str, Dict]:
+        """Unexpired, unreleased locks keyed by file path."""
+        return self._active_locks(0, now)
+
+    def reservations(self, now: Optional[datetime] = None) -> Dict[str, Dict]:
+        """Unexpired, unreleased reservations keyed by pattern."""
+        return self._active_locks(1, now)
+
+    def _active_locks(self, reservation: int, now: Optional[datetime]) -> Dict[str, Dict]:
+        self.refresh("locks")
+        now = now or datetime.utcnow()
+        liveness = Liveness(self.swarm_dir, now)
+        active = {}
+        for file_path, record in self._connect().execute(LOCKS_SQL, (reservation,)):
+            record = json.loads(record)
+            if lock_is_active(record, now, liveness):
+                active[file_path] = record
+        return active
+
+    def inbox(self, agent_id: str, cursor: Optional[Dict[str, Any]] = None) -> Dict[str, TailRead]:
         """
-        )
-
-        tasks = []
-        for row in cursor:
-            task = dict(row)
-            task["files"] = json.loads(task["files"]) if task["files"] else []
-            task["dependencies"] = (
-                json.loads(task["dependencies"]) if task["dependencies"] else []
+        Messages addressed to agent_id after cursor, per inbox log.
+
+        cursor maps log keys to watermarks, as saved by get_messages.py. Only
+        the agent's own logs are read, from the cursor on, so the cost is the
+        unread mail rather than the swarm's traffic. A position the log no
+        longer holds (rotated or truncated) reads that log from the start,
+        and the TailRead is flagged reset. Each TailRead carries the offset
+        just past every message and the watermark the log was read up to.
+        """
+        cursor = cursor or {}
+        inbox = {}
+        for log in message_store.inbox_logs(self.swarm_dir, agent_id):
+            key = message_store.log_key(self.swarm_dir, log)
+            tail = read_appended(log, cursor.get(key), with_ends=True)
+            mine = [
+                (msg, end)
+                for msg, end in zip(tail.records, tail.ends)
+                if msg.get("to") in (agent_id, message_store.BROADCAST)
+            ]
+            inbox[key] = TailRead(
+                [msg for msg, _ in mine], tail.watermark, tail.reset, [end for _, end in mine]
             )
-            tasks.append(task)
-
-        conn.close()
-        return tasks
-
-    def get_task_by_id(self, task_id: str) -> Optional[Dict]:
-        """Get task by ID."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-
-        cursor = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
-        row = cursor.fetchone()
+        return inbox
 
-        conn.close()
-
-        if not row:
-            return None
+    # === Row-shaped queries ===
 
+    @staticmethod
+    def _task_from_row(row: sqlite3.Row) -> Dict:
         task = dict(row)
+        task.pop("record", None)
         task["files"] = json.loads(task["files"]) if task["files"] else []
         task["dependencies"] = (
             json.loads(task["dependencies"]) if task["dependencies"] else []
         )
         return task
 
-    def get_messages_for_agent(
-        self, agent_id: str, unread_only: bool = True, limit: int = None
-    ) -> List[Dict]:
-        """Get messages for an agent."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-
-        query = "SELECT * FROM messages WHERE (to_agent = ? OR to_agent = 'all')"
-        params = [agent_id]
-
-        if unread_only:
-            query += " AND read = 0"
+    def get_available_tasks(self) -> List[Dict]:
+        """Get pending tasks whose dependencies are completed, sorted by priority."""
+        self.refresh("tasks")
+        cursor = self._connect().execute(AVAILABLE_TASKS_SQL, (-1,))
+        return [self._task_from_row(row) for row in cursor]
 
-        query += " ORDER BY timestamp DESC"
+    def get_task_by_id(self, task_id: str) -> Optional[Dict]:
+        """Get task by ID."""
+        self.refresh("tasks")
+        row = self._connect().execute(TASK_BY_ID_SQL, (task_id,)).fetchone()
+        if not row:
+            return None
+        return self._task_from_row(row)
 
-        if limit:
-            query += f" LIMIT {limit}"
+    def get_messages_for_agent(
+        self,
+        agent_id: str,
+        unread_only: bool = True,
+        limit: int = None,
+        since: Optional[datetime] = None,
+    ) -> List[Dict]:
+        """
+        Get messages for an agent, newest first (since: only from then on).
 
-        cursor = conn.execute(query, params)
-        messages = [dict(row) for row in cursor]
+        Unread messages are the ones past the agent's read cursor.
+        """
+        read_cursor = self._read_cursor(agent_id) if unread_only else None
+        return self.message_page(agent_id, read_cursor, limit, since=since)[0]
+
+    def _read_cursor(self, agent_id: str) -> Dict[str, Any]:
+        """The agent's read cursor as saved by get_messages.py ({} if none)."""
+        name = f"{message_store.safe_name(agent_id)}.json"
+        path = self.swarm_dir / message_store.CURSOR_DIR / name
+        try:
+            return json.loads(path.read_text())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def message_page(
+        self,
+        agent_id: str,
+        read_cursor: Optional[Dict[str, Any]] = None,
+        limit: int = 50,
+        before: Optional[Dict[str, Any]] = None,
+        since: Optional[datetime] = None,
+    ) -> Tuple[List[Dict], Optional[Dict[str, Any]]]:
+        """
+        One page of an agent's messages, newest first.
 
-        conn.close()
-        return messages
+        Returns the messages and the cursor to pass as before for the next
+        page (None after the last page). Pages stay consistent while new
+        messages arrive: they can only show up on the first page.
 
-    def get_active_locks(self) -> List[Dict]:
-        """Get all active locks."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-
-        now = datetime.utcnow().isoformat()
+        With read_cursor (log keys to watermarks, as saved by get_messages.py)
+        only unread messages are paged: those past the cursor and not written
+        as read. A position in a log that has since been replaced reads that
+        log from the start, as inbox() does.
+        """
+        self.refresh("messages")
+        conn = self._connect()
+        read_offsets = None
+        if read_cursor is not None:
+            marks = self._watermarks(conn)
+            read_offsets = {
+                key: position.get("offset", 0)
+                for key, position in read_cursor.items()
+                if key in marks and position.get("inode") == marks[key]["inode"]
+            }
+        since_ts = message_store.timestamp_seconds(since.isoformat()) if since else None
         cursor = conn.execute(
-            """
-            SELECT * FROM locks
-            WHERE expires_at > ?
-            ORDER BY acquired_at DESC
-        """,
-            (now,),
+            MESSAGES_FOR_AGENT_SQL,
+            messages_for_agent_params(agent_id, read_offsets, limit, before, since_ts),
         )
+        messages = []
+        position = None
+        for row in cursor:
+            message = dict(row)
+            position = {
+                "ts": message.pop("ts"),
+                "log": message.pop("log"),
+                "end_offset": message.pop("end_offset"),
+            }
+            messages.append(message)
+        if not limit or len(messages) < limit:
+            position = None
+        return messages, position
 
-        locks = [dict(row) for row in cursor]
-        conn.close()
+    def get_active_locks(self) -> List[Dict]:
+        """Get all active locks and reservations."""
+        self.refresh("locks")
+        now = datetime.utcnow()
+        liveness = Liveness(self.swarm_dir, now)
+        locks = []
+        for row in self._connect().execute(ACTIVE_LOCKS_SQL):
+            lock = dict(row)
+            lock["reservation"] = bool(lock["reservation"])
+            if lock_is_active(json.loads(lock.pop("record")), now, liveness):
+                locks.append(lock)
         return locks
 
     def get_active_agents(self) -> List[Dict]:
         """Get all active agents."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-
-        cursor = conn.execute(
-            """
-            SELECT * FROM agents
-            WHERE status = 'active'
-            ORDER BY last_seen DESC
-        """
-        )
-
-        agents = [dict(row) for row in cursor]
-        conn.close()
-        return agents
+        self.refresh("agents")
+        cursor = self._connect().execute(ACTIVE_AGENTS_SQL)
+        return [dict(row) for row in cursor]
 
 
 if __name__ == "__main__":
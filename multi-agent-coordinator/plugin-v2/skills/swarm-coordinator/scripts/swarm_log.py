@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Append-only JSONL log primitives shared by the swarm scripts.
+
+Every file under .claude/swarm/ is an append-only log. Readers that remember
+a watermark (inode, byte offset and a fingerprint of the bytes just before
+the offset) can replay only the records appended since their last visit,
+and can tell when the file was truncated or replaced underneath them.
+
+Each append is a single O_APPEND write, so a writer that dies mid-append
+leaves at most one partial line at the end of the log. The next writer
+terminates it before appending, and readers move lines that do not parse
+aside into <log>.quarantine instead of failing. How often appends are
+fsynced is set with SWARM_FSYNC:
+
+    off     never (the default; the OS writes back on its own)
+    always  before the append lock is released
+    group   at most once per SWARM_FSYNC_GROUP_MS (20) per log, and at exit
+"""
+
+import atexit
+import json
+import os
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import perf_trace
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no advisory locks
+    fcntl = None
+
+# Bytes before the watermark offset that must still match on the next read
+FINGERPRINT_BYTES = 64
+
+FSYNC_MODES = ("off", "always", "group")
+FSYNC_MODE = os.environ.get("SWARM_FSYNC", "off")
+if FSYNC_MODE not in FSYNC_MODES:
+    FSYNC_MODE = "off"
+FSYNC_GROUP_SECONDS = float(os.environ.get("SWARM_FSYNC_GROUP_MS", 20)) / 1000
+
+QUARANTINE_SUFFIX = ".quarantine"
+
+# Logs appended to but not yet fsynced (group mode): path -> first unsynced append
+_unsynced: Dict[str, float] = {}
+
+# Corrupt lines this process has already quarantined: (path, inode, offset)
+_quarantined: Set[Tuple[str, int, int]] = set()
+
+
+class TailRead(NamedTuple):
+    """Result of reading the records appended after a watermark."""
+
+    records: List[Dict[str, Any]]
+    watermark: Dict[str, Any]
+    reset: bool  # True when the log was truncated/rotated and read from byte 0
+    ends: Optional[List[int]] = None  # offset just past each record, if asked for
+
+
+def new_watermark() -> Dict[str, Any]:
+    """Return a watermark positioned at the start of an unseen log."""
+    return {"inode": None, "offset": 0, "fingerprint": ""}
+
+
+def _fingerprint(f, offset: int) -> str:
+    """Checksum of the bytes immediately before offset."""
+    start = max(0, offset - FINGERPRINT_BYTES)
+    f.seek(start)
+    return f"{zlib.crc32(f.read(offset - start)):08x}"
+
+
+def _watermark_valid(f, st: os.stat_result, watermark: Dict[str, Any]) -> bool:
+    """Check that the log still holds the bytes the watermark points past."""
+    offset = watermark.get("offset", 0)
+    if watermark.get("inode") != st.st_ino or offset > st.st_size:
+        return False
+    return _fingerprint(f, offset) == watermark.get("fingerprint")
+
+
+def quarantine_log(path: Path) -> Path:
+    """Where the lines of a log that do not parse are kept."""
+    path = Path(path)
+    return path.with_name(path.name + QUARANTINE_SUFFIX)
+
+
+def _quarantine(path: Path, inode: int, offset: int, line: bytes, error: Exception):
+    """Keep a corrupt line out of the way, once per log position."""
+    key = (str(path), inode, offset)
+    if key in _quarantined:
+        return
+    _quarantined.add(key)
+
+    target = quarantine_log(path)
+    try:
+        with open(target, "rb") as f:
+            for existing in f:
+                try:
+                    entry = json.loads(existing)
+                except ValueError:
+                    continue
+                if entry.get("inode") == inode and entry.get("offset") == offset:
+                    return
+    except FileNotFoundError:
+        pass
+
+    append_records(
+        target,
+        [
+            {
+                "inode": inode,
+                "offset": offset,
+                "line": line.decode("utf-8", "replace"),
+                "error": str(error),
+                "quarantined_at": datetime.utcnow().isoformat(),
+            }
+        ],
+    )
+    perf_trace.current().count(records_quarantined=1)
+
+
+def _parse_lines(
+    path: Path, inode: int, offset: int, data: bytes, with_ends: bool
+) -> Tuple[List[Dict[str, Any]], Optional[List[int]]]:
+    """Records of the complete lines in data, which starts at offset."""
+    if not with_ends:
+        try:
+            records = [json.loads(line) for line in data.splitlines() if line.strip()]
+            if all(type(record) is dict for record in records):
+                return records, None
+        except ValueError:
+            pass
+
+    # Slow path: find and set aside the lines that do not parse
+    records, ends = [], []
+    position = offset
+    for line in data.split(b"\n")[:-1]:
+        start, position = position, position + len(line) + 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if type(record) is not dict:
+                raise ValueError(f"not a JSON object: {type(record).__name__}")
+        except ValueError as exc:
+            _quarantine(path, inode, start, line, exc)
+            continue
+        records.append(record)
+        ends.append(position)
+    return records, ends if with_ends else None
+
+
+def read_appended(
+    path: Path, watermark: Optional[Dict[str, Any]] = None, with_ends: bool = False
+) -> TailRead:
+    """
+    Read the complete records appended to a JSONL log since watermark.
+
+    A trailing line without its newline is left for the next call, so a
+    reader never sees a record that is still being written. Lines that are
+    not JSON objects (a torn append, a stray write) are skipped and copied
+    to quarantine_log(path). If the file was truncated or rotated, the whole
+    log is re-read and reset is set.
+
+    With with_ends, the byte offset just past each record is returned too,
+    so a reader can stop part-way through (see watermark_at).
+    """
+    watermark = watermark or new_watermark()
+    had_position = bool(watermark.get("offset"))
+
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return TailRead([], new_watermark(), had_position, [] if with_ends else None)
+
+    with f:
+        st = os.fstat(f.fileno())
+        if had_position and _watermark_valid(f, st, watermark):
+            offset, reset = watermark["offset"], False
+        else:
+            offset, reset = 0, had_position
+
+        f.seek(offset)
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        new_offset = offset + end
+        fingerprint = _fingerprint(f, new_offset)
+
+    new_mark = {"inode": st.st_ino, "offset": new_offset, "fingerprint": fingerprint}
+    records, ends = _parse_lines(Path(path), st.st_ino, offset, data[:end], with_ends)
+    perf_trace.current().count(bytes_read=end, records_scanned=len(records))
+    return TailRead(records, new_mark, reset, ends)
+
+
+def watermark_at(path: Path, inode: int, offset: int) -> Optional[Dict[str, Any]]:
+    """
+    Watermark for an offset returned by read_appended(with_ends=True).
+
+    Returns None if the log has since been replaced or truncated below offset.
+    """
+    try:
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            if st.st_ino != inode or st.st_size < offset:
+                return None
+            return {"inode": inode, "offset": offset, "fingerprint": _fingerprint(f, offset)}
+    except FileNotFoundError:
+        return None
+
+
+def watermark_valid(path: Path, watermark: Optional[Dict[str, Any]]) -> bool:
+    """
+    Whether read_appended would resume from watermark instead of byte 0.
+
+    A watermark with no position is never valid.
+    """
+    if not watermark or not watermark.get("offset"):
+        return False
+    try:
+        with open(path, "rb") as f:
+            return _watermark_valid(f, os.fstat(f.fileno()), watermark)
+    except FileNotFoundError:
+        return False
+
+
+def log_moved(path: Path, watermark: Optional[Dict[str, Any]]) -> bool:
+    """Cheap stat() check whether a log moved past watermark (grew, shrank or was replaced)."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return bool(watermark and watermark["offset"])
+    if watermark is None:
+        return st.st_size > 0
+    return st.st_ino != watermark["inode"] or st.st_size != watermark["offset"]
+
+
+def _fsync_path(path: str):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def sync_pending(max_age: float = 0.0):
+    """
+    Fsync the logs whose oldest unsynced append is at least max_age old.
+
+    Group mode calls this after each append and at exit; a long-running
+    process can also call it while idle.
+    """
+    now = time.monotonic()
+    for path, since in list(_unsynced.items()):
+        if now - since >= max_age:
+            del _unsynced[path]
+            _fsync_path(path)
+
+
+def has_pending_sync() -> bool:
+    return bool(_unsynced)
+
+
+atexit.register(sync_pending)
+
+
+class LogAppender:
+    """
+    Append handle for a locked log.
+
+    Each write() is one O_APPEND os.write of the whole text, so concurrent
+    records never interleave and a crash can only cut off the end of the
+    last one. If the log does not end in a newline (a writer died part-way),
+    the first write starts with one, so the fragment stays on a line of its
+    own for readers to quarantine.
+    """
+
+    def __init__(self, fd: int, path: Path):
+        self.fd = fd
+        self.path = path
+        self.written = False
+        self._checked_tail = False
+
+    def write(self, text: str) -> int:
+        data = text.encode()
+        if not data:
+            return 0
+        if not self._checked_tail:
+            self._checked_tail = True
+            size = os.fstat(self.fd).st_size
+            if size and os.pread(self.fd, 1, size - 1) != b"\n":
+                data = b"\n" + data
+        while data:
+            # A short write (a full disk, a signal) leaves the rest to retry
+            data = data[os.write(self.fd, data) :]
+        self.written = True
+        return len(text)
+
+    def flush(self):
+        """Writes go straight to the file; nothing is buffered."""
+
+    def fileno(self) -> int:
+        return self.fd
+
+
+@contextmanager
+def locked_append(path: Path):
+    """
+    Open a log for appending while holding an exclusive advisory lock.
+
+    Writers that go through this lock are serialised, so a caller can read
+    the log, decide, and append without another agent slipping in between.
+    If the log is rotated while waiting for the lock, the new file is
+    opened and locked instead. Yields a LogAppender; what it wrote is
+    fsynced according to SWARM_FSYNC.
+    """
+    path = Path(path)
+    while True:
+        fd = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o666)
+        try:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    # Another writer holds it: wait, and let a trace know
+                    started = time.perf_counter()
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                    perf_trace.current().count(
+                        append_lock_waits=1,
+                        append_lock_wait_us=int((time.perf_counter() - started) * 1e6),
+                    )
+            try:
+                current_inode = os.stat(path).st_ino
+            except FileNotFoundError:
+                current_inode = None
+        except BaseException:
+            os.close(fd)
+            raise
+        if current_inode == os.fstat(fd).st_ino:
+            break
+        os.close(fd)
+
+    appender = LogAppender(fd, path)
+    try:
+        yield appender
+        if appender.written and FSYNC_MODE == "always":
+            os.fsync(fd)
+    finally:
+        # Closing drops the lock
+        os.close(fd)
+
+    if appender.written and FSYNC_MODE == "group":
+        _unsynced.setdefault(str(path), time.monotonic())
+        sync_pending(FSYNC_GROUP_SECONDS)
+
+
+def append_records(path: Path, records: Iterable[Dict[str, Any]]):
+    """Append records to a JSONL log in one locked write."""
+    with locked_append(path) as f:
+        f.write("".join(json.dumps(record) + "\n" for record in records))
+
+
+def write_json_atomic(path: Path, data: Any, durable: bool = False):
+    """
+    Write a JSON document via a temp file and rename.
+
+    With durable, the file and the rename are fsynced before returning, so
+    the new content survives a crash.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        # json.dumps uses the C encoder; json.dump streams through Python
+        f.write(json.dumps(data))
+        if durable:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    if durable and hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
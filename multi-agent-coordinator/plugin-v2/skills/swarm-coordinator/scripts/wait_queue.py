@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Bounded FIFO wait queues for locked files (opt-in).
+
+With SWARM_LOCK_WAIT_SECONDS set, a PreToolUse that finds its files locked
+does not block straight away: the hook takes a ticket, queues it on every
+path of the batch, and sleeps until a release wakes it or the wait times
+out. Tickets are ordered by creation time and an agent may only take the
+locks while its ticket is the oldest live one on each of its paths, so
+handoff is first come, first served and agents arriving later cannot jump
+the queue. One ticket serves a whole batch, so two waiters can never each
+be first on a path the other needs.
+
+Layout under .claude/swarm/.cache/waits/:
+    <safe path>/<ticket>.json   queue entry (agent, pid, deadline, paths)
+    fifos/<ticket>              wake-up pipe of the waiting hook process
+
+A queue directory is removed once its last entry goes, so releases only
+look for waiters to wake while some queue is non-empty.
+
+A releasing agent writes one byte to the pipe of the first ticket on each
+released path. Waiters also re-check every RECHECK_SECONDS, so a holder
+whose lease lapses (liveness.py) hands over without a release record.
+
+Every wait appends its outcome to .cache/lock_waits.jsonl:
+    python3 wait_queue.py stats
+"""
+
+import argparse
+import json
+import os
+import select
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import message_store
+from liveness import pid_alive
+from swarm_log import append_records, read_appended, write_json_atomic
+
+SWARM_DIR = Path(".claude/swarm")
+
+WAIT_DIR = Path(".cache") / "waits"
+FIFO_DIR = "fifos"
+METRICS_LOG = Path(".cache") / "lock_waits.jsonl"
+
+# Longest a hook sleeps for a lock; 0 turns waiting off. Capped below the
+# default 60 s hook timeout.
+MAX_WAIT_SECONDS = 50
+WAIT_SECONDS = min(float(os.environ.get("SWARM_LOCK_WAIT_SECONDS", 0)), MAX_WAIT_SECONDS)
+
+# Waiters allowed per path; a full queue blocks at once
+QUEUE_MAX = int(os.environ.get("SWARM_LOCK_QUEUE_MAX", 8))
+
+# Longest sleep between checks when no release wakes the waiter
+RECHECK_SECONDS = 1.0
+
+
+def _queue_dir(swarm_dir: Path, file_path: str) -> Path:
+    return Path(swarm_dir) / WAIT_DIR / message_store.safe_name(file_path)
+
+
+def _remove_if_empty(queue: Path):
+    """Remove a queue directory that holds no entries (rmdir fails otherwise)."""
+    try:
+        os.rmdir(queue)
+    except OSError:
+        pass
+
+
+def _write_entry(path: Path, entry: Dict[str, Any]):
+    """Write a queue entry, recreating its queue if it was just removed as empty."""
+    for _ in range(10):
+        try:
+            write_json_atomic(path, entry)
+            return
+        except FileNotFoundError:
+            continue
+    write_json_atomic(path, entry)
+
+
+def _live_entries(queue: Path) -> List[Dict[str, Any]]:
+    """Queue entries oldest first, removing those of dead or timed-out waiters."""
+    try:
+        names = sorted(name for name in os.listdir(queue) if name.endswith(".json"))
+    except FileNotFoundError:
+        return []
+
+    now = time.time()
+    live = []
+    for name in names:
+        path = queue / name
+        try:
+            entry = json.loads(path.read_text())
+        except (FileNotFoundError, ValueError):
+            continue
+        if entry.get("deadline", 0) < now or not pid_alive(entry.get("pid", 0)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            continue
+        live.append(entry)
+    if not live:
+        _remove_if_empty(queue)
+    return live
+
+
+def queued_ahead(
+    swarm_dir: Path, file_path: str, agent_id: str, ticket_id: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    The first live entry on file_path that comes before ticket_id.
+
+    Without a ticket every other agent's entry counts: an agent that is not
+    queued must not take a path others are waiting for.
+    """
+    for entry in _live_entries(_queue_dir(swarm_dir, file_path)):
+        if entry["ticket"] == ticket_id:
+            return None
+        if ticket_id is not None or entry["agent_id"] != agent_id:
+            return entry
+    return None
+
+
+def has_waiters(swarm_dir: Path) -> bool:
+    """Cheap check whether any wait queue holds an entry."""
+    try:
+        queues = [e.path for e in os.scandir(Path(swarm_dir) / WAIT_DIR) if e.name != FIFO_DIR]
+    except FileNotFoundError:
+        return False
+    for queue in queues:
+        try:
+            with os.scandir(queue) as entries:
+                if any(entry.name.endswith(".json") for entry in entries):
+                    return True
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        # Emptied without being removed, e.g. while an entry was being written
+        _remove_if_empty(Path(queue))
+    return False
+
+
+class Ticket:
+    """One waiting PreToolUse, queued on every path of its batch."""
+
+    def __init__(self, swarm_dir: Path, agent_id: str, file_paths: List[str], deadline: float):
+        self.swarm_dir = Path(swarm_dir)
+        self.agent_id = agent_id
+        self.file_paths = file_paths
+        self.deadline = deadline
+        self.id = f"{time.time_ns():020d}-{os.getpid()}"
+        self.fifo = None
+        self._fd = None
+
+    def enqueue(self) -> bool:
+        """Queue on every path, or on none if any queue is full."""
+        entry = {
+            "ticket": self.id,
+            "agent_id": self.agent_id,
+            "pid": os.getpid(),
+            "deadline": self.deadline,
+            "paths": self.file_paths,
+        }
+        for file_path in self.file_paths:
+            if len(_live_entries(_queue_dir(self.swarm_dir, file_path))) >= QUEUE_MAX:
+                return False
+
+        if hasattr(os, "mkfifo"):
+            self.fifo = self.swarm_dir / WAIT_DIR / FIFO_DIR / self.id
+            self.fifo.parent.mkdir(parents=True, exist_ok=True)
+            os.mkfifo(self.fifo)
+            # Non-blocking and also opened for writing, so reads never see EOF
+            self._fd = os.open(self.fifo, os.O_RDWR | os.O_NONBLOCK)
+
+        for file_path in self.file_paths:
+            _write_entry(_queue_dir(self.swarm_dir, file_path) / f"{self.id}.json", entry)
+        return True
+
+    def wait(self, timeout: float):
+        """Sleep until woken by a release or until timeout seconds pass."""
+        if self._fd is None:
+            time.sleep(timeout)
+            return
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if ready:
+            try:
+                while os.read(self._fd, 64):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def leave(self):
+        """Remove the ticket from every queue and drop its pipe."""
+        for file_path in self.file_paths:
+            queue = _queue_dir(self.swarm_dir, file_path)
+            try:
+                (queue / f"{self.id}.json").unlink()
+            except FileNotFoundError:
+                pass
+            _remove_if_empty(queue)
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if self.fifo is not None:
+            try:
+                self.fifo.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def notify(swarm_dir: Path, file_paths: List[str]):
+    """Wake the first waiter on each released path."""
+    woken = set()
+    for file_path in file_paths:
+        entries = _live_entries(_queue_dir(swarm_dir, file_path))
+        if not entries or entries[0]["ticket"] in woken:
+            continue
+        ticket = entries[0]["ticket"]
+        woken.add(ticket)
+        fifo = Path(swarm_dir) / WAIT_DIR / FIFO_DIR / ticket
+        try:
+            fd = os.open(fifo, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError:
+            # No pipe (polling waiter) or the waiter just left
+            continue
+        try:
+            os.write(fd, b"\0")
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def record_wait(
+    swarm_dir: Path, agent_id: str, file_paths: List[str], waited: float, outcome: str
+):
+    """Append one wait outcome (acquired, timeout or full) to the metrics log."""
+    append_records(
+        Path(swarm_dir) / METRICS_LOG,
+        [
+            {
+                "agent_id": agent_id,
+                "paths": file_paths,
+                "waited_ms": round(waited * 1000, 3),
+                "outcome": outcome,
+                "at": time.time(),
+            }
+        ],
+    )
+
+
+def stats(swarm_dir: Path) -> Dict[str, Any]:
+    """Wait outcomes and wait-time percentiles from the metrics log."""
+    records = read_appended(Path(swarm_dir) / METRICS_LOG).records
+    outcomes: Dict[str, int] = {}
+    for record in records:
+        outcomes[record["outcome"]] = outcomes.get(record["outcome"], 0) + 1
+
+    waits = sorted(r["waited_ms"] for r in records if r["outcome"] == "acquired")
+    summary: Dict[str, Any] = {
+        "waits": len(records),
+        "outcomes": outcomes,
+        # Each wait that ended with the lock is a block (and a retry) that never happened
+        "blocks_avoided": outcomes.get("acquired", 0),
+    }
+    if waits:
+        summary["acquired_wait_ms"] = {
+            "p50": round(statistics.median(waits), 3),
+            "p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 3),
+            "max": round(waits[-1], 3),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lock wait queues")
+    parser.add_argument("command", choices=["stats"])
+    parser.add_argument("--swarm-dir", help="Swarm directory (default: .claude/swarm)")
+    parser.add_argument("--json", action="store_true", help="Emit JSON")
+
+    args = parser.parse_args()
+    swarm_dir = Path(args.swarm_dir) if args.swarm_dir else SWARM_DIR
+
+    summary = stats(swarm_dir)
+    if args.json:
+        print(json.dumps(summary))
+        return
+
+    print(f"Waits: {summary['waits']} {summary['outcomes']}")
+    print(f"Blocked attempts avoided: {summary['blocks_avoided']}")
+    if "acquired_wait_ms" in summary:
+        w = summary["acquired_wait_ms"]
+        print(f"Wait before acquiring: p50 {w['p50']}ms, p95 {w['p95']}ms, max {w['max']}ms")
+
+
+if __name__ == "__main__":
+    main()
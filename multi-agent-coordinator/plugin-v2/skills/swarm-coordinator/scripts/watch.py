@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Wake-ups on swarm log changes instead of re-reading the logs in a loop.
+
+A Watcher follows the append-only logs (.claude/swarm/*.jsonl and the
+inbox/*.jsonl partitions, see message_store.py) and blocks until one of
+them changes. On Linux it uses inotify on the two directories (through
+ctypes, no dependencies), so appends, compaction's renames and new inbox
+partitions all wake it at once. Elsewhere, or when inotify is unavailable,
+it compares each log's inode, size and mtime every POLL_SECONDS.
+
+Changes are named by log key, as in message_store.log_key(): "tasks.jsonl",
+"inbox/agent-1.jsonl".
+
+    with Watcher(swarm_dir, ["tasks.jsonl"]) as watcher:
+        while not ready():
+            watcher.changes(timeout=30)
+
+wait_until() is that loop. A Watcher queues changes between calls, so a
+change that lands between a check and the next changes() is not missed.
+
+Usage:
+    python3 watch.py stream                   # one JSON line per change
+    python3 watch.py tasks --timeout 300      # until a task is available
+    python3 watch.py lock src/app.py          # until the file is unlocked
+"""
+
+import argparse
+import json
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+import message_store
+
+SWARM_DIR = Path(".claude/swarm")
+
+# Interval of the polling fallback
+POLL_SECONDS = float(os.environ.get("SWARM_WATCH_POLL_SECONDS", 0.2))
+
+# One append is several events (create, write, close); changes arriving
+# within this window of each other are reported as one batch
+SETTLE_SECONDS = float(os.environ.get("SWARM_WATCH_SETTLE_MS", 10)) / 1000
+
+# inotify(7)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _libc():
+    """libc with the inotify calls, or None where there are none."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        # AttributeError on a libc without inotify
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class Watcher:
+    """
+    Blocks until one of the watched swarm logs changes.
+
+    logs limits the watch to those log keys (every .jsonl log by default).
+    The backend ("inotify" or "poll") is chosen on construction.
+    """
+
+    def __init__(
+        self,
+        swarm_dir: Path = SWARM_DIR,
+        logs: Optional[Iterable[str]] = None,
+        poll_interval: float = POLL_SECONDS,
+        use_inotify: bool = True,
+        settle: float = SETTLE_SECONDS,
+    ):
+        self.swarm_dir = Path(swarm_dir)
+        self.logs = set(logs) if logs is not None else None
+        self.poll_interval = poll_interval
+        self.settle = settle
+        self._fd = None
+        self._dirs: Dict[int, str] = {}
+        self._snapshot: Dict[str, Tuple[int, int, int]] = {}
+
+        libc = _libc() if use_inotify else None
+        if libc is not None:
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd >= 0:
+                self._libc, self._fd = libc, fd
+                self.swarm_dir.mkdir(parents=True, exist_ok=True)
+                self._add_watch("")
+                self._add_watch(message_store.INBOX_DIR + "/")
+
+        self.backend = "inotify" if self._fd is not None else "poll"
+        if self._fd is None:
+            self._snapshot = self._stat_logs()
+
+    def _add_watch(self, prefix: str):
+        """Watch swarm_dir/prefix for log changes, if the directory exists."""
+        if prefix in self._dirs.values():
+            return
+        path = self.swarm_dir / prefix if prefix else self.swarm_dir
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd >= 0:
+            self._dirs[wd] = prefix
+
+    def _wanted(self, key: str) -> bool:
+        return key.endswith(".jsonl") and (self.logs is None or key in self.logs)
+
+    def changes(self, timeout: Optional[float] = None) -> Set[str]:
+        """
+        Keys of the logs changed since the last call, waiting up to timeout
+        seconds (forever if None) for the first. Empty on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            changed = self._next(remaining)
+            if changed:
+                return self._settle(changed)
+            if deadline is not None and time.monotonic() >= deadline:
+                return changed
+
+    def _next(self, timeout: Optional[float]) -> Set[str]:
+        return self._inotify(timeout) if self._fd is not None else self._poll(timeout)
+
+    def _settle(self, changed: Set[str]) -> Set[str]:
+        """Add the changes that follow within the settle window (at most ten windows)."""
+        limit = time.monotonic() + 10 * self.settle
+        while self.settle and time.monotonic() < limit:
+            more = self._next(self.settle)
+            if not more:
+                break
+            changed |= more
+        return changed
+
+    def _inotify(self, timeout: Optional[float]) -> Set[str]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset : offset + length].rstrip(b"\0").decode(errors="replace")
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    # Events were dropped: report every log as changed
+                    changed.update(k for k in self._stat_logs() if self._wanted(k))
+                    continue
+                prefix = self._dirs.get(wd)
+                if prefix is None:
+                    continue
+                if mask & IN_ISDIR:
+                    if prefix == "" and name == message_store.INBOX_DIR:
+                        # The swarm was just partitioned
+                        self._add_watch(name + "/")
+                        changed.update(k for k in self._stat_logs() if self._wanted(k))
+                    continue
+                key = prefix + name
+                if self._wanted(key):
+                    changed.add(key)
+        return changed
+
+    def _stat_logs(self) -> Dict[str, Tuple[int, int, int]]:
+        """(inode, size, mtime) of every log, by key."""
+        stats = {}
+        for prefix in ("", message_store.INBOX_DIR + "/"):
+            try:
+                entries = os.scandir(self.swarm_dir / prefix if prefix else self.swarm_dir)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            with entries:
+                for entry in entries:
+                    if not entry.name.endswith(".jsonl"):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    stats[prefix + entry.name] = (st.st_ino, st.st_size, st.st_mtime_ns)
+        return stats
+
+    def _poll(self, timeout: Optional[float]) -> Set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._stat_logs()
+            changed = {
+                key
+                for key in set(snapshot) | set(self._snapshot)
+                if snapshot.get(key) != self._snapshot.get(key) and self._wanted(key)
+            }
+            self._snapshot = snapshot
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            pause = self.poll_interval
+            if deadline is not None:
+                pause = min(pause, max(0.0, deadline - time.monotonic()))
+            time.sleep(pause)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def wait_for_change(
+    swarm_dir: Path = SWARM_DIR,
+    logs: Optional[Iterable[str]] = None,
+    timeout: Optional[float] = None,
+) -> Set[str]:
+    """Block until one of the logs changes; returns the changed keys (empty on timeout)."""
+    with Watcher(swarm_dir, logs) as watcher:
+        return watcher.changes(timeout)
+
+
+def wait_until(
+    check: Callable[[], Any],
+    swarm_dir: Path = SWARM_DIR,
+    logs: Optional[Iterable[str]] = None,
+    timeout: Optional[float] = None,
+    recheck: Optional[float] = None,
+) -> Any:
+    """
+    Long-poll: the first truthy result of check(), or None on timeout.
+
+    check() runs once up front and again after every change to the logs.
+    recheck also re-runs it at least that often, for conditions that change
+    without a log write (such as a lock lease lapsing).
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with Watcher(swarm_dir, logs) as watcher:
+        while True:
+            result = check()
+            if result:
+                return result
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            if recheck is not None:
+                remaining = recheck if remaining is None else min(remaining, recheck)
+            watcher.changes(remaining)
+
+
+def stream(
+    swarm_dir: Path = SWARM_DIR,
+    logs: Optional[Iterable[str]] = None,
+    idle_timeout: Optional[float] = None,
+) -> Iterator[Set[str]]:
+    """Yield each batch of changed log keys as it happens, until idle_timeout passes quietly."""
+    with Watcher(swarm_dir, logs) as watcher:
+        while True:
+            changed = watcher.changes(idle_timeout)
+            if not changed:
+                return
+            yield changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wait for swarm state changes")
+    parser.add_argument("command", choices=["stream", "tasks", "lock"])
+    parser.add_argument("file_path", nargs="?", help="File to wait for (lock)")
+    parser.add_argument("--timeout", type=float, help="Give up after this many seconds")
+    parser.add_argument("--swarm-dir", help="Swarm directory (default: .claude/swarm)")
+
+    args = parser.parse_args()
+    swarm_dir = Path(args.swarm_dir) if args.swarm_dir else SWARM_DIR
+
+    if args.command == "stream":
+        try:
+            for changed in stream(swarm_dir, idle_timeout=args.timeout):
+                print(json.dumps({"at": time.time(), "changed": sorted(changed)}), flush=True)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if args.command == "tasks":
+        from swarm_cache import SwarmCache
+
+        def available():
+            with SwarmCache(swarm_dir) as cache:
+                return cache.available_tasks()
+
+        tasks = wait_until(available, swarm_dir, ["tasks.jsonl"], args.timeout)
+        if not tasks:
+            print("No task became available.")
+            sys.exit(1)
+        for task in tasks:
+            print(f"- `{task['id']}`: {task['description']}")
+        return
+
+    if not args.file_path:
+        parser.error("lock needs a file path")
+
+    from liveness import LEASE_SECONDS
+    from lock_index import LockIndex
+
+    index = LockIndex(swarm_dir)
+    try:
+        # A lease lapsing is not a log write, so also re-check now and then
+        free = wait_until(
+            lambda: index.get(args.file_path) is None,
+            swarm_dir,
+            ["locks.jsonl"],
+            args.timeout,
+            recheck=min(LEASE_SECONDS, 5),
+        )
+    finally:
+        index.close()
+    if not free:
+        print(f"{args.file_path} is still locked.")
+        sys.exit(1)
+    print(f"{args.file_path} is free.")
+
+
+if __name__ == "__main__":
+    main()
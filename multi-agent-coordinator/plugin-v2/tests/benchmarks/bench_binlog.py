@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Binary log scans versus JSONL parsing.
+
+Writes a synthetic messages.jsonl and locks.jsonl per size
+(swarm_history.py), imports each into a .swlog, and times finding one
+recipient's messages and one file's lock records: parsing every JSONL line
+versus binlog.read_records() with a key, which skips the bodies of all
+other records. Also reports the full decode of each format and file sizes.
+
+Usage:
+    python3 bench_binlog.py
+    python3 bench_binlog.py --sizes 10000,100000 --repeat 5 --json
+"""
+
+import argparse
+import json
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "skills/swarm-coordinator/scripts"))
+
+import binlog
+import swarm_history
+
+
+def jsonl_scan(path: Path, field: str, key: str) -> int:
+    found = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if json.loads(line).get(field) == key:
+                found += 1
+    return found
+
+
+def jsonl_decode(path: Path) -> int:
+    with open(path, "rb") as f:
+        return sum(1 for line in f if json.loads(line) is not None)
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def measure(size: int, repeat: int):
+    workdir = Path(tempfile.mkdtemp(prefix="binlog-bench-"))
+    try:
+        swarm_dir = workdir / ".claude/swarm"
+        swarm_history.generate(swarm_dir, agents=100, tasks=10, messages=size, lock_records=size)
+        results = {}
+        for name, field, key in (
+            ("messages", "to", swarm_history.agent_name(7)),
+            ("locks", "file_path", "src/mod7.py"),
+        ):
+            source = swarm_dir / f"{name}.jsonl"
+            target = workdir / f"{name}.swlog"
+            binlog.import_jsonl(source, target)
+            expected = jsonl_scan(source, field, key)
+            found = sum(1 for _ in binlog.read_records(target, key=key))
+            assert found == expected, (name, found, expected)
+            results[name] = {
+                "records": size,
+                "matches": found,
+                "jsonl_bytes": source.stat().st_size,
+                "swlog_bytes": target.stat().st_size,
+                "jsonl_key_ms": round(timed(lambda: jsonl_scan(source, field, key), repeat), 3),
+                "swlog_key_ms": round(
+                    timed(lambda: sum(1 for _ in binlog.read_records(target, key=key)), repeat), 3
+                ),
+                "jsonl_full_ms": round(timed(lambda: jsonl_decode(source), repeat), 3),
+                "swlog_full_ms": round(
+                    timed(lambda: sum(1 for _ in binlog.read_records(target)), repeat), 3
+                ),
+            }
+        return results
+    finally:
+        shutil.rmtree(workdir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark binary log scans vs JSONL")
+    parser.add_argument("--sizes", default="10000,100000", help="Records per log, comma-separated")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per measurement")
+    parser.add_argument("--json", action="store_true", help="Emit JSON only")
+
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+    results = {str(size): measure(size, args.repeat) for size in sizes}
+
+    if args.json:
+        print(json.dumps({"msgpack": binlog.msgpack is not None, "results": results}))
+        return
+
+    body = "msgpack" if binlog.msgpack is not None else "JSON"
+    print(f"Binary log bodies: {body} (median of {args.repeat} runs)\n")
+    print(
+        f"{'log':>9} {'records':>8} {'jsonl key':>10} {'swlog key':>10} "
+        f"{'jsonl all':>10} {'swlog all':>10} {'size ratio':>10}"
+    )
+    for size, logs in results.items():
+        for name, r in logs.items():
+            print(
+                f"{name:>9} {size:>8} {r['jsonl_key_ms']:>8.1f}ms {r['swlog_key_ms']:>8.1f}ms "
+                f"{r['jsonl_full_ms']:>8.1f}ms {r['swlog_full_ms']:>8.1f}ms "
+                f"{r['swlog_bytes'] / r['jsonl_bytes']:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
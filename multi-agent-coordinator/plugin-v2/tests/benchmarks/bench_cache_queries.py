@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+SwarmCache queries per second: connect-per-query versus a reused connection.
+
+Populates a swarm with synthetic tasks, messages, locks and agents, then
+runs every SwarmCache query method repeatedly:
+
+- per_query: the pre-pooling pattern, a fresh sqlite3.connect() with
+  row_factory for every query, closed afterwards
+- reused: the SwarmCache methods on one long-lived instance (including
+  their cheap refresh check)
+- read_only: the same methods on a read-only SwarmCache
+
+Usage:
+    python3 bench_cache_queries.py
+    python3 bench_cache_queries.py --tasks 5000 --messages 50000 --seconds 1 --json
+"""
+
+import argparse
+import json
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent.parent.parent / "skills" / "swarm-coordinator" / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import swarm_cache
+from swarm_cache import SwarmCache
+
+
+def populate(swarm_dir: Path, tasks: int, messages: int, locks: int, agents: int):
+    """Write synthetic logs."""
+    now = datetime.utcnow()
+    with open(swarm_dir / "tasks.jsonl", "w") as f:
+        for i in range(tasks):
+            deps = [f"task-{i - 1:05d}"] if i % 4 == 0 and i else []
+            f.write(json.dumps({"id": f"task-{i:05d}", "priority": i % 10, "dependencies": deps, "created_at": now.isoformat()}) + "\n")
+        for i in range(0, tasks, 3):
+            f.write(json.dumps({"task_id": f"task-{i:05d}", "status": "completed"}) + "\n")
+    with open(swarm_dir / "messages.jsonl", "w") as f:
+        for i in range(messages):
+            to = "all" if i % 10 == 0 else f"agent-{i % agents}"
+            f.write(json.dumps({"id": f"msg-{i:06d}", "from": "x", "to": to, "subject": str(i), "body": "b" * 80, "timestamp": (now + timedelta(seconds=i)).isoformat()}) + "\n")
+    with open(swarm_dir / "locks.jsonl", "w") as f:
+        for i in range(locks):
+            f.write(json.dumps({"file_path": f"src/f{i}.py", "holder": f"agent-{i % agents}", "acquired_at": now.isoformat(), "expires_at": (now + timedelta(minutes=5)).isoformat()}) + "\n")
+    with open(swarm_dir / "agents.jsonl", "w") as f:
+        for i in range(agents):
+            f.write(json.dumps({"id": f"agent-{i}", "session_id": str(i), "started_at": now.isoformat()}) + "\n")
+
+
+def per_query(db_path: Path, sql: str, params=(), convert=dict):
+    """One query the way SwarmCache used to run it."""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    rows = [convert(row) for row in conn.execute(sql, params)]
+    conn.close()
+    return rows
+
+
+def queries(cache: SwarmCache):
+    """name -> (reused call, per-query call) pairs."""
+    db = cache.db_path
+    task = SwarmCache._task_from_row
+    now = datetime.utcnow().isoformat()
+    return {
+        "available_tasks": (
+            cache.get_available_tasks,
+            lambda: per_query(db, swarm_cache.AVAILABLE_TASKS_SQL, (-1,), task),
+        ),
+        "task_by_id": (
+            lambda: cache.get_task_by_id("task-00042"),
+            lambda: per_query(db, swarm_cache.TASK_BY_ID_SQL, ("task-00042",), task),
+        ),
+        "messages_for_agent": (
+            lambda: cache.get_messages_for_agent("agent-7", limit=20),
+            lambda: per_query(
+                db,
+                swarm_cache.MESSAGES_FOR_AGENT_SQL,
+                swarm_cache.messages_for_agent_params("agent-7", True, 20),
+            ),
+        ),
+        "active_locks": (
+            cache.get_active_locks,
+            lambda: per_query(db, swarm_cache.ACTIVE_LOCKS_SQL, (now,)),
+        ),
+        "active_agents": (
+            cache.get_active_agents,
+            lambda: per_query(db, swarm_cache.ACTIVE_AGENTS_SQL),
+        ),
+    }
+
+
+def qps(fn, seconds: float) -> float:
+    """Calls per second of fn over roughly `seconds`."""
+    fn()
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= seconds:
+            return round(calls / elapsed, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SwarmCache query throughput")
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--locks", type=int, default=500)
+    parser.add_argument("--agents", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=0.5, help="Time per measurement")
+    parser.add_argument("--json", action="store_true", help="Emit JSON only")
+
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="swarm-cache-bench-"))
+    try:
+        swarm_dir = workdir / ".claude" / "swarm"
+        swarm_dir.mkdir(parents=True)
+        populate(swarm_dir, args.tasks, args.messages, args.locks, args.agents)
+
+        cache = SwarmCache(swarm_dir)
+        cache.refresh()
+        reader = SwarmCache(swarm_dir, read_only=True)
+        results = {}
+        for name, (reused, legacy) in queries(cache).items():
+            read_only = queries(reader)[name][0]
+            results[name] = {
+                "per_query_qps": qps(legacy, args.seconds),
+                "reused_qps": qps(reused, args.seconds),
+                "read_only_qps": qps(read_only, args.seconds),
+            }
+        cache.close()
+        reader.close()
+    finally:
+        shutil.rmtree(workdir)
+
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    print(f"{'query':>20} {'per-query':>12} {'reused':>12} {'read-only':>12}")
+    for name, r in results.items():
+        print(
+            f"{name:>20} {r['per_query_qps']:>10.0f}/s {r['reused_qps']:>10.0f}/s "
+            f"{r['read_only_qps']:>10.0f}/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Stress benchmark for concurrent task claiming.
+
+Spawns N agent processes that keep auto-claiming from one shared task queue
+until it is empty, then audits tasks.jsonl for tasks that were claimed more
+than once (duplicated) or never claimed (lost).
+
+Usage:
+    python3 bench_claim_stress.py --agents 8 --tasks 500
+    python3 bench_claim_stress.py --agents 8 --tasks 500 --mode naive --json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "skills/swarm-coordinator/scripts"))
+
+import claim_task
+
+
+def naive_claim(swarm_dir: Path, agent_id: str):
+    """The pre-lock claim path: read state, pick a task, append without a lock."""
+    task_state = claim_task.load_task_state()
+    available = claim_task.get_available_tasks(task_state)
+    if not available:
+        return None
+
+    task_id = available[0]["id"]
+    claim = {
+        "task_id": task_id,
+        "agent_id": agent_id,
+        "claimed_at": datetime.utcnow().isoformat(),
+        "status": "in_progress",
+    }
+    with open(swarm_dir / "tasks.jsonl", "a") as f:
+        f.write(json.dumps(claim) + "\n")
+    return task_id
+
+
+def agent_worker(swarm_dir: str, agent_id: str, mode: str, start, results):
+    """Claim tasks until the queue is drained."""
+    swarm_dir = Path(swarm_dir)
+    claim_task.SWARM_DIR = swarm_dir
+    os.environ["CLAUDE_AGENT_NAME"] = agent_id
+
+    claimed = 0
+    start.wait()
+    with contextlib.redirect_stdout(io.StringIO()):
+        while True:
+            if mode == "naive":
+                task_id = naive_claim(swarm_dir, agent_id)
+            else:
+                task_id = claim_task.claim_task()
+            if task_id is None:
+                break
+            claimed += 1
+
+    results.put(claimed)
+
+
+def seed_tasks(swarm_dir: Path, count: int):
+    """Write count independent pending tasks."""
+    with open(swarm_dir / "tasks.jsonl", "w") as f:
+        for i in range(count):
+            task = {
+                "id": f"task-{i:06d}",
+                "description": f"Synthetic task {i}",
+                "status": "pending",
+                "dependencies": [],
+                "priority": i % 10,
+                "files": [],
+                "created_at": datetime.utcnow().isoformat(),
+            }
+            f.write(json.dumps(task) + "\n")
+
+
+def audit(swarm_dir: Path, task_count: int):
+    """Count duplicated and lost claims in the final log."""
+    claims = Counter()
+    with open(swarm_dir / "tasks.jsonl", "r") as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get("status") == "in_progress" and "task_id" in record:
+                claims[record["task_id"]] += 1
+
+    duplicated = sum(n - 1 for n in claims.values() if n > 1)
+    lost = task_count - len(claims)
+    return duplicated, lost, sum(claims.values())
+
+
+def run(agents: int, tasks: int, mode: str):
+    """Run one stress round and return its metrics."""
+    workdir = Path(tempfile.mkdtemp(prefix="swarm-claim-bench-"))
+    swarm_dir = workdir / ".claude/swarm"
+    swarm_dir.mkdir(parents=True)
+
+    try:
+        seed_tasks(swarm_dir, tasks)
+
+        ctx = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+        start = ctx.Event()
+        results = ctx.Queue()
+        procs = [
+            ctx.Process(
+                target=agent_worker,
+                args=(str(swarm_dir), f"bench-agent-{i}", mode, start, results),
+            )
+            for i in range(agents)
+        ]
+        for proc in procs:
+            proc.start()
+
+        started = time.perf_counter()
+        start.set()
+        reported = sum(results.get() for _ in procs)
+        elapsed = time.perf_counter() - started
+        for proc in procs:
+            proc.join()
+
+        duplicated, lost, recorded = audit(swarm_dir, tasks)
+    finally:
+        shutil.rmtree(workdir)
+
+    return {
+        "mode": mode,
+        "agents": agents,
+        "tasks": tasks,
+        "claims_reported": reported,
+        "claims_recorded": recorded,
+        "duplicated": duplicated,
+        "lost": lost,
+        "elapsed_seconds": round(elapsed, 4),
+        "claims_per_second": round(reported / elapsed, 1) if elapsed else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent claim stress benchmark")
+    parser.add_argument("--agents", type=int, default=8, help="Number of agent processes")
+    parser.add_argument("--tasks", type=int, default=500, help="Number of tasks to seed")
+    parser.add_argument(
+        "--mode",
+        choices=["atomic", "naive"],
+        default="atomic",
+        help="atomic = claim_task.claim_task(), naive = unlocked read-then-append",
+    )
+    parser.add_argument("--json", action="store_true", help="Emit JSON only")
+
+    args = parser.parse_args()
+
+    result = run(args.agents, args.tasks, args.mode)
+
+    if args.json:
+        print(json.dumps(result))
+        return
+
+    print(f"Mode:              {result['mode']}")
+    print(f"Agents / tasks:    {result['agents']} / {result['tasks']}")
+    print(f"Claims:            {result['claims_reported']} in {result['elapsed_seconds']}s")
+    print(f"Claims per second: {result['claims_per_second']}")
+    print(f"Duplicated claims: {result['duplicated']}")
+    print(f"Lost tasks:        {result['lost']}")
+
+
+if __name__ == "__main__":
+    main()
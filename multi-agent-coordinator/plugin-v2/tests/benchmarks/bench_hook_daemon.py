@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+End-to-end hook latency with and without the coordinator daemon.
+
+Runs hooks/coordination.py as Claude Code does (a fresh python3 process per
+event, payload on stdin) for alternating PreToolUse/PostToolUse events, first
+handled in-process and then forwarded to a running coordinator_daemon.py.
+A synthetic lock history is written first so both modes start from the same
+log.
+
+Usage:
+    python3 bench_hook_daemon.py
+    python3 bench_hook_daemon.py --events 400 --history 100000 --json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PLUGIN_ROOT = Path(__file__).parent.parent.parent.resolve()
+HOOK = PLUGIN_ROOT / "hooks" / "coordination.py"
+DAEMON = PLUGIN_ROOT / "hooks" / "coordinator_daemon.py"
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bench_lock_lookup import percentile, write_history
+
+
+def run_events(workdir: Path, events: int):
+    """Latency samples (ms) of one hook process per event."""
+    env = dict(os.environ, CLAUDE_AGENT_NAME="bench-agent")
+    samples = []
+    for i in range(events):
+        event = {
+            "hook_event_name": "PreToolUse" if i % 2 == 0 else "PostToolUse",
+            "tool_name": "Edit",
+            "tool_input": {"file_path": f"bench/file_{i // 2}.py"},
+            "tool_response": {"success": True},
+        }
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, str(HOOK)],
+            input=json.dumps(event),
+            capture_output=True,
+            text=True,
+            cwd=workdir,
+            env=env,
+        )
+        samples.append((time.perf_counter() - started) * 1000)
+        result = json.loads(proc.stdout)
+        assert "error" not in result and not result.get("block"), result
+    return samples
+
+
+def summarize(samples):
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hook latency: in-process vs daemon")
+    parser.add_argument("--events", type=int, default=200, help="Hook invocations per mode")
+    parser.add_argument(
+        "--history", type=int, default=10000, help="Lock records written before timing"
+    )
+    parser.add_argument("--json", action="store_true", help="Emit JSON only")
+
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="swarm-daemon-bench-"))
+    try:
+        swarm_dir = workdir / ".claude" / "swarm"
+        swarm_dir.mkdir(parents=True)
+        write_history(swarm_dir / "locks.jsonl", args.history)
+
+        # Warm up the lock index and bytecode caches for both modes
+        run_events(workdir, 2)
+        in_process = run_events(workdir, args.events)
+
+        subprocess.run(
+            [sys.executable, str(DAEMON), "start"], cwd=workdir, check=True, capture_output=True
+        )
+        try:
+            run_events(workdir, 2)
+            daemon = run_events(workdir, args.events)
+        finally:
+            subprocess.run([sys.executable, str(DAEMON), "stop"], cwd=workdir, capture_output=True)
+    finally:
+        shutil.rmtree(workdir)
+
+    results = {
+        "events": args.events,
+        "history": args.history,
+        "in_process": summarize(in_process),
+        "daemon": summarize(daemon),
+    }
+
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    print(f"{args.events} hook events, {args.history} lock records of history")
+    print(f"{'mode':>12} {'p50':>10} {'p99':>10} {'max':>10}")
+    for mode in ("in_process", "daemon"):
+        r = results[mode]
+        print(f"{mode:>12} {r['p50_ms']:>8.2f}ms {r['p99_ms']:>8.2f}ms {r['max_ms']:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Hook process start-up cost, hyperfine style.
+
+Every hook event is a fresh python3 process, so for the common events the
+interpreter start-up and imports are most of the latency. This times whole
+processes (warmup runs first, then mean ± σ and min/max) for:
+
+- python3 -c pass, the floor
+- coordination.py and hook_entry.py on a Read event, which is ignored
+- coordination.py and hook_entry.py on alternating Edit PreToolUse/PostToolUse
+
+A SessionStart event is sent through hook_entry.py first, as in a real
+session, so the scripts' bytecode has been compiled before timing.
+
+With --importtime N it also prints the N most expensive imports (cumulative,
+from python3 -X importtime) of hook_entry.py handling an Edit event.
+
+Usage:
+    python3 bench_hook_startup.py
+    python3 bench_hook_startup.py --runs 50 --warmup 5 --json
+    python3 bench_hook_startup.py --importtime 15
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PLUGIN_ROOT = Path(__file__).parent.parent.parent.resolve()
+LEGACY_HOOK = PLUGIN_ROOT / "hooks" / "coordination.py"
+ENTRY_HOOK = PLUGIN_ROOT / "hooks" / "hook_entry.py"
+
+READ_EVENT = {
+    "hook_event_name": "PreToolUse",
+    "tool_name": "Read",
+    "tool_input": {"file_path": "bench/file.py"},
+}
+
+
+def edit_event(i: int):
+    """Alternating lock/release events, so the lock log stays small."""
+    return {
+        "hook_event_name": "PreToolUse" if i % 2 == 0 else "PostToolUse",
+        "tool_name": "Edit",
+        "tool_input": {"file_path": "bench/file.py"},
+        "tool_response": {"success": True},
+    }
+
+
+def run_once(command, payload: str, workdir: Path, env) -> float:
+    """Wall time (ms) of one process."""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        command, input=payload, capture_output=True, text=True, cwd=workdir, env=env
+    )
+    elapsed = (time.perf_counter() - started) * 1000
+    assert proc.returncode == 0, proc.stderr
+    return elapsed
+
+
+def measure(command, events, workdir: Path, env, runs: int, warmup: int):
+    """Timing summary of runs processes, after warmup untimed ones."""
+    for i in range(warmup):
+        run_once(command, events(i), workdir, env)
+    samples = [run_once(command, events(warmup + i), workdir, env) for i in range(runs)]
+    return {
+        "mean_ms": round(statistics.mean(samples), 3),
+        "stdev_ms": round(statistics.stdev(samples), 3) if len(samples) > 1 else 0.0,
+        "min_ms": round(min(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+def import_profile(workdir: Path, env, top: int):
+    """The top imports by cumulative microseconds, from -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", str(ENTRY_HOOK)],
+        input=json.dumps(edit_event(0)),
+        capture_output=True,
+        text=True,
+        cwd=workdir,
+        env=env,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        rows.append(
+            {"module": name.strip(), "self_us": int(own), "cumulative_us": int(cumulative)}
+        )
+    rows.sort(key=lambda row: row["cumulative_us"], reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hook process start-up cost")
+    parser.add_argument("--runs", type=int, default=30, help="Timed processes per case")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed processes per case")
+    parser.add_argument(
+        "--importtime", type=int, default=0, metavar="N", help="Also report the N costliest imports"
+    )
+    parser.add_argument("--json", action="store_true", help="Emit JSON only")
+
+    args = parser.parse_args()
+
+    env = dict(os.environ, CLAUDE_AGENT_NAME="bench-agent")
+    workdir = Path(tempfile.mkdtemp(prefix="swarm-startup-bench-"))
+    try:
+        (workdir / ".claude" / "swarm").mkdir(parents=True)
+        run_once(
+            [sys.executable, str(ENTRY_HOOK)],
+            json.dumps({"hook_event_name": "SessionStart", "session_id": "bench"}),
+            workdir,
+            env,
+        )
+        read = lambda i: json.dumps(READ_EVENT)
+        edit = lambda i: json.dumps(edit_event(i))
+        cases = {
+            "python_floor": ([sys.executable, "-c", "pass"], read),
+            "legacy_read": ([sys.executable, str(LEGACY_HOOK)], read),
+            "entry_read": ([sys.executable, str(ENTRY_HOOK)], read),
+            "legacy_edit": ([sys.executable, str(LEGACY_HOOK)], edit),
+            "entry_edit": ([sys.executable, str(ENTRY_HOOK)], edit),
+        }
+        results = {"runs": args.runs, "warmup": args.warmup, "cases": {}}
+        for name, (command, events) in cases.items():
+            results["cases"][name] = measure(command, events, workdir, env, args.runs, args.warmup)
+        if args.importtime:
+            results["imports"] = import_profile(workdir, env, args.importtime)
+    finally:
+        shutil.rmtree(workdir)
+
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    print(f"{args.runs} runs per case after {args.warmup} warmup runs")
+    print(f"{'case':>14} {'mean ± σ':>18} {'min':>10} {'max':>10}")
+    for name, r in results["cases"].items():
+        spread = f"{r['mean_ms']:.2f} ± {r['stdev_ms']:.2f}ms"
+        print(f"{name:>14} {spread:>18} {r['min_ms']:>8.2f}ms {r['max_ms']:>8.2f}ms")
+
+    if args.importtime:
+        print(f"\nTop {args.importtime} imports of hook_entry.py on an Edit event (cumulative)")
+        for row in results["imports"]:
+            print(f"{row['cumulative_us'] / 1000:>8.2f}ms  {row['module']}")
+
+
+if __name__ == "__main__":
+    main()
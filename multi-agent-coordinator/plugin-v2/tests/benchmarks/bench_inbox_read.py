@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Inbox read cost versus total swarm message volume.
+
+For each volume, writes the same synthetic traffic (direct messages between
+--agents agents plus ~10% broadcasts) once as a single messages.jsonl and
+once as partitioned inbox logs, then times for one agent:
+
+- full: reading its whole inbox (get_messages without --unread-only)
+- unread: fetching unread mail with a cursor after another --new messages
+  were sent swarm-wide
+
+Usage:
+    python3 bench_inbox_read.py
+    python3 bench_inbox_read.py --volumes 10000,100000 --agents 50 --json
+"""
+
+import argparse
+import json
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent.parent.parent / "skills" / "swarm-coordinator" / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import get_messages
+import message_store
+
+
+def make_messages(count: int, agents: int, start: int, rng: random.Random):
+    """Synthetic messages with increasing timestamps."""
+    base = datetime(2025, 1, 1)
+    for i in range(start, start + count):
+        to = "all" if rng.random() < 0.1 else f"agent-{rng.randrange(agents)}"
+        yield {
+            "id": f"msg-{i:08x}",
+            "from": f"agent-{rng.randrange(agents)}",
+            "to": to,
+            "subject": f"Subject {i}",
+            "body": "x" * 200,
+            "priority": "normal",
+            "timestamp": (base + timedelta(milliseconds=i)).isoformat(),
+            "read": False,
+        }
+
+
+def write_messages(swarm_dir: Path, messages, partitioned: bool):
+    """Append messages in the chosen layout, one file handle per log."""
+    handles = {}
+    try:
+        for msg in messages:
+            if partitioned:
+                log = message_store.partition_log(swarm_dir, msg["to"])
+            else:
+                log = swarm_dir / message_store.MESSAGES_LOG
+            if log not in handles:
+                handles[log] = open(log, "a")
+            handles[log].write(json.dumps(msg) + "\n")
+    finally:
+        for f in handles.values():
+            f.close()
+
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def run_layout(volume: int, agents: int, new: int, partitioned: bool, repeat: int):
+    """Median full-inbox and cursor read times (ms) for agent-0."""
+    workdir = Path(tempfile.mkdtemp(prefix="swarm-inbox-bench-"))
+    try:
+        swarm_dir = workdir / ".claude" / "swarm"
+        swarm_dir.mkdir(parents=True)
+        if partitioned:
+            (swarm_dir / message_store.INBOX_DIR).mkdir()
+        get_messages.SWARM_DIR = swarm_dir
+
+        rng = random.Random(volume)
+        write_messages(swarm_dir, make_messages(volume, agents, 0, rng), partitioned)
+
+        full_ms = timed(lambda: message_store.read_inbox(swarm_dir, "agent-0"), repeat)
+
+        samples = []
+        for r in range(repeat):
+            get_messages.fetch_unread("agent-0", limit=10**9)
+            write_messages(
+                swarm_dir, make_messages(new, agents, volume + r * new, rng), partitioned
+            )
+            started = time.perf_counter()
+            get_messages.fetch_unread("agent-0", limit=10**9)
+            samples.append((time.perf_counter() - started) * 1000)
+        unread_ms = round(statistics.median(samples), 3)
+    finally:
+        shutil.rmtree(workdir)
+
+    return {"full_ms": full_ms, "unread_ms": unread_ms}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inbox read cost vs message volume")
+    parser.add_argument("--volumes", default="10000,100000", help="Comma-separated message counts")
+    parser.add_argument("--agents", type=int, default=50, help="Agents exchanging messages")
+    parser.add_argument("--new", type=int, default=1000, help="Messages sent between cursor reads")
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per measurement")
+    parser.add_argument("--json", action="store_true", help="Emit JSON only")
+
+    args = parser.parse_args()
+
+    results = []
+    for volume in (int(v) for v in args.volumes.split(",")):
+        results.append(
+            {
+                "volume": volume,
+                "single_file": run_layout(volume, args.agents, args.new, False, args.repeat),
+                "partitioned": run_layout(volume, args.agents, args.new, True, args.repeat),
+            }
+        )
+
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    print(f"{args.agents} agents, {args.new} new messages between cursor reads")
+    print(f"{'messages':>10} {'single full':>12} {'part. full':>12} {'single new':>12} {'part. new':>12}")
+    for r in results:
+        print(
+            f"{r['volume']:>10} {r['single_file']['full_ms']:>10.2f}ms "
+            f"{r['partitioned']['full_ms']:>10.2f}ms {r['single_file']['unread_ms']:>10.2f}ms "
+            f"{r['partitioned']['unread_ms']:>10.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+PreToolUse hook latency versus lock history size.
+
+For each history size, writes a synthetic locks.jsonl (acquire/release
+pairs over a pool of paths) and times process_hook_event() for a PreToolUse
+on a fresh path, once with the indexed lock table and once with the legacy
+reverse full-file scan. The first indexed call (which builds the table) is
+reported separately as the cold cost.
+
+Usage:
+    python3 bench_lock_lookup.py
+    python3 bench_lock_lookup.py --sizes 10000,100000 --repeat 50 --json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+PLUGIN_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PLUGIN_ROOT))
+
+from hooks import coordination
+
+
+def legacy_check_lock(self, file_path):
+    """The pre-index lock check: read the whole file and scan backwards."""
+    locks_file = self.swarm_dir / "locks.jsonl"
+    if not locks_file.exists():
+        return None
+
+    lines = locks_file.read_text().strip().split("\n")
+    for line in reversed(lines):
+        if not line:
+            continue
+
+        record = json.loads(line)
+        if record["file_path"] != file_path:
+            continue
+
+        if record.get("status") == "released":
+            return None
+
+        expires_at = datetime.fromisoformat(record["expires_at"])
+        if expires_at > datetime.utcnow():
+            return record
+        return None
+
+    return None
+
+
+def legacy_check_locks(self, file_paths):
+    """_check_locks on top of the pre-index single-path scan."""
+    held = {}
+    for file_path in file_paths:
+        record = legacy_check_lock(self, file_path)
+        if record:
+            held[file_path] = record
+    return held
+
+
+def write_history(locks_file: Path, records: int, paths: int = 5000):
+    """Write records lock entries as acquire/release pairs."""
+    now = datetime.utcnow()
+    expires = (now + timedelta(minutes=5)).isoformat()
+    with open(locks_file, "w") as f:
+        for i in range(records):
+            path = f"src/module_{(i // 2) % paths}.py"
+            if i % 2 == 0:
+                record = {
+                    "file_path": path,
+                    "holder": f"agent-{i % 97}",
+                    "reason": "editing via Edit",
+                    "acquired_at": now.isoformat(),
+                    "expires_at": expires,
+                }
+            else:
+                record = {
+                    "file_path": path,
+                    "holder": f"agent-{(i - 1) % 97}",
+                    "released_at": now.isoformat(),
+                    "status": "released",
+                }
+            f.write(json.dumps(record) + "\n")
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of samples."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def time_pre_tool_use(repeat: int):
+    """Latency samples (ms) of PreToolUse on paths that are not locked."""
+    samples = []
+    for i in range(repeat):
+        event = {
+            "hook_event_name": "PreToolUse",
+            "tool_name": "Edit",
+            "tool_input": {"file_path": f"bench/fresh_{time.time_ns()}_{i}.py"},
+        }
+        started = time.perf_counter()
+        result = coordination.process_hook_event(event)
+        samples.append((time.perf_counter() - started) * 1000)
+        assert not result.get("block"), result
+    return samples
+
+
+def summarize(samples):
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+def run_size(records: int, repeat: int, legacy_repeat: int):
+    """Benchmark one history size in a fresh swarm directory."""
+    workdir = Path(tempfile.mkdtemp(prefix="swarm-lock-bench-"))
+    prev_cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        swarm_dir = Path(".claude/swarm")
+        swarm_dir.mkdir(parents=True)
+        coordination.SWARM_DIR = swarm_dir
+        write_history(swarm_dir / "locks.jsonl", records)
+
+        started = time.perf_counter()
+        time_pre_tool_use(1)
+        cold_ms = (time.perf_counter() - started) * 1000
+
+        indexed = time_pre_tool_use(repeat)
+
+        with mock.patch.object(coordination.SwarmCoordinator, "_check_locks", legacy_check_locks):
+            legacy = time_pre_tool_use(legacy_repeat)
+    finally:
+        os.chdir(prev_cwd)
+        shutil.rmtree(workdir)
+
+    return {
+        "records": records,
+        "indexed_cold_ms": round(cold_ms, 3),
+        "indexed": summarize(indexed),
+        "legacy_scan": summarize(legacy),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PreToolUse lock lookup benchmark")
+    parser.add_argument(
+        "--sizes",
+        default="10000,100000,1000000",
+        help="Comma-separated lock record counts",
+    )
+    parser.add_argument("--repeat", type=int, default=200, help="Indexed samples per size")
+    parser.add_argument(
+        "--legacy-repeat", type=int, default=10, help="Legacy full-scan samples per size"
+    )
+    parser.add_argument("--json", action="store_true", help="Emit JSON only")
+
+    args = parser.parse_args()
+    os.environ.setdefault("CLAUDE_AGENT_NAME", "bench-agent")
+
+    results = [
+        run_size(int(size), args.repeat, args.legacy_repeat)
+        for size in args.sizes.split(",")
+    ]
+
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    print(f"{'records':>10} {'cold':>10} {'idx p50':>10} {'idx p99':>10} {'scan p50':>10} {'scan p99':>10}")
+    for r in results:
+        print(
+            f"{r['records']:>10} {r['indexed_cold_ms']:>9.2f}ms "
+            f"{r['indexed']['p50_ms']:>8.2f}ms {r['indexed']['p99_ms']:>8.2f}ms "
+            f"{r['legacy_scan']['p50_ms']:>8.2f}ms {r['legacy_scan']['p99_ms']:>8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Reservation coverage checks versus the number of active reservations.
+
+For each size, writes that many task reservations (directory globs, per-
+directory file globs, plain directories and a few root-level "**" globs)
+into locks.jsonl, then times LockIndex.covering() on random paths through
+the prefix index, and a linear scan that matches every active reservation
+(already loaded in memory) against the path.
+
+Usage:
+    python3 bench_reservations.py
+    python3 bench_reservations.py --sizes 1000,10000 --repeat 2000 --json
+"""
+
+import argparse
+import json
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "skills/swarm-coordinator/scripts"))
+
+from bench_lock_lookup import percentile
+from lock_index import LockIndex, pattern_matches
+
+
+def pattern_for(i: int) -> str:
+    """A reservation pattern spread over a two-level package tree."""
+    package, module = f"pkg{i % 200}", f"mod{i // 200}"
+    kind = i % 10
+    if kind == 9 and i % 1000 == 9:
+        return f"**/*.gen{i // 1000}"
+    if kind < 6:
+        return f"{package}/{module}/**"
+    if kind < 8:
+        return f"{package}/{module}/*.py"
+    return f"{package}/{module}"
+
+
+def write_reservations(locks_file: Path, count: int):
+    now = datetime.utcnow()
+    expires = (now + timedelta(hours=1)).isoformat()
+    with open(locks_file, "w") as f:
+        for i in range(count):
+            record = {
+                "file_path": pattern_for(i),
+                "holder": f"agent-{i % 97}",
+                "reason": f"reserved for task task-{i}",
+                "reservation": True,
+                "task_id": f"task-{i}",
+                "acquired_at": now.isoformat(),
+                "expires_at": expires,
+            }
+            f.write(json.dumps(record) + "\n")
+
+
+def sample_paths(count: int, size: int, rng: random.Random):
+    """Paths inside reserved directories and outside any reservation."""
+    paths = []
+    for _ in range(count):
+        i = rng.randrange(size)
+        if rng.random() < 0.5:
+            paths.append(f"pkg{i % 200}/mod{i // 200}/sub/file_{i}.py")
+        else:
+            paths.append(f"pkg{i % 200}/unreserved/file_{i}.py")
+    return paths
+
+
+def timed(fn, paths):
+    """Per-call latency samples in microseconds."""
+    samples = []
+    for path in paths:
+        started = time.perf_counter()
+        fn(path)
+        samples.append((time.perf_counter() - started) * 1e6)
+    return samples
+
+
+def summarize(samples):
+    return {
+        "p50_us": round(statistics.median(samples), 1),
+        "p99_us": round(percentile(samples, 99), 1),
+        "max_us": round(max(samples), 1),
+    }
+
+
+def run_size(size: int, repeat: int, scan_repeat: int, seed: int):
+    workdir = Path(tempfile.mkdtemp(prefix="swarm-reservation-bench-"))
+    index = LockIndex(workdir)
+    try:
+        write_reservations(workdir / "locks.jsonl", size)
+        started = time.perf_counter()
+        index.refresh()
+        cold_ms = (time.perf_counter() - started) * 1000
+
+        rng = random.Random(seed)
+        indexed = timed(index.covering, sample_paths(repeat, size, rng))
+
+        active = list(index.reservations().items())
+
+        def scan(path):
+            return [r for p, r in active if pattern_matches(p, path)]
+
+        linear = timed(scan, sample_paths(scan_repeat, size, rng))
+    finally:
+        index.close()
+        shutil.rmtree(workdir)
+
+    return {
+        "reservations": size,
+        "index_build_ms": round(cold_ms, 3),
+        "indexed": summarize(indexed),
+        "linear_scan": summarize(linear),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reservation coverage check benchmark")
+    parser.add_argument(
+        "--sizes", default="1000,5000,20000", help="Comma-separated active reservation counts"
+    )
+    parser.add_argument("--repeat", type=int, default=2000, help="Indexed checks per size")
+    parser.add_argument("--scan-repeat", type=int, default=20, help="Linear-scan checks per size")
+    parser.add_argument("--seed", type=int, default=0, help="Path sampling seed")
+    parser.add_argument("--json", action="store_true", help="Emit JSON only")
+
+    args = parser.parse_args()
+
+    results = [
+        run_size(int(size), args.repeat, args.scan_repeat, args.seed)
+        for size in args.sizes.split(",")
+    ]
+
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    print(f"{'reserved':>10} {'build':>10} {'idx p50':>10} {'idx p99':>10} {'scan p50':>11} {'scan p99':>11}")
+    for r in results:
+        print(
+            f"{r['reservations']:>10} {r['index_build_ms']:>8.1f}ms "
+            f"{r['indexed']['p50_us']:>8.1f}us {r['indexed']['p99_us']:>8.1f}us "
+            f"{r['linear_scan']['p50_us']:>9.0f}us {r['linear_scan']['p99_us']:>9.0f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
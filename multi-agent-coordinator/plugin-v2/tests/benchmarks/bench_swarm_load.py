@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Multi-process swarm simulation on top of a synthetic history.
+
+Generates a history (swarm_history.py) in a temp .claude/swarm directory,
+then starts one process per agent. Each runs a seeded random mix of the
+operations agents perform: claiming and completing tasks, sending and
+reading messages, PreToolUse/PostToolUse on a shared set of hot files, and
+swarm state queries through SwarmCache. Each hook event gets a fresh
+SwarmCoordinator, as a hook process would (interpreter start-up is measured
+by bench_hook_startup.py). Reports throughput and p50/p95/p99 latency per
+operation.
+
+--json output carries the parameters and the git commit, so runs can be
+kept and compared across commits with compare_results.py.
+
+Usage:
+    python3 bench_swarm_load.py --agents 8 --ops 200
+    python3 bench_swarm_load.py --agents 100 --ops 50 --messages 500000 \\
+        --lock-records 480000 --tasks 20000 --json > after.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "skills/swarm-coordinator/scripts"))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import swarm_history
+from bench_lock_lookup import percentile
+
+# Relative weights of the simulated operations
+MIX = {
+    "claim_task": 10,
+    "complete_task": 5,
+    "send_message": 20,
+    "get_messages": 15,
+    "edit": 35,  # PreToolUse, then PostToolUse if not blocked
+    "get_state": 15,
+}
+
+
+def agent_worker(workdir: str, index: int, ops: int, hot_files: int, seed: int, start, results):
+    """Run ops random operations as agent index and report their latencies."""
+    import claim_task
+    import complete_task
+    import get_messages
+    import send_message
+    from hooks import coordination
+    from swarm_cache import SwarmCache
+
+    os.chdir(workdir)
+    swarm_dir = Path(".claude/swarm")
+    for module in (claim_task, complete_task, get_messages, send_message, coordination):
+        module.SWARM_DIR = swarm_dir
+    agent_id = swarm_history.agent_name(index)
+    os.environ["CLAUDE_AGENT_NAME"] = agent_id
+
+    rng = random.Random(seed * 1000 + index)
+    names, weights = zip(*MIX.items())
+    latencies: Dict[str, List[float]] = {}
+    claimed: List[str] = []
+    blocked = 0
+
+    def timed(op, fn, *args):
+        started = time.perf_counter()
+        result = fn(*args)
+        latencies.setdefault(op, []).append((time.perf_counter() - started) * 1000)
+        return result
+
+    def hook(event_name, file_path):
+        event = {
+            "hook_event_name": event_name,
+            "tool_name": "Edit",
+            "tool_input": {"file_path": file_path},
+            "tool_response": {"success": True},
+        }
+        return coordination.process_hook_event(event, coordination.SwarmCoordinator())
+
+    def get_state():
+        with SwarmCache(swarm_dir) as cache:
+            return cache.available_tasks(), cache.locks()
+
+    start.wait()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(ops):
+            op = rng.choices(names, weights)[0]
+            if op == "claim_task":
+                task_id = timed(op, claim_task.claim_task)
+                if task_id:
+                    claimed.append(task_id)
+            elif op == "complete_task":
+                if claimed:
+                    timed(op, complete_task.complete_task, claimed.pop(), "done")
+            elif op == "send_message":
+                recipient = swarm_history.agent_name(rng.randrange(index + 2))
+                timed(op, send_message.send_message, recipient, "Load", "Simulated message")
+            elif op == "get_messages":
+                timed(op, get_messages.fetch_unread, agent_id, 20)
+            elif op == "edit":
+                file_path = f"src/hot{rng.randrange(hot_files)}.py"
+                result = timed("pre_tool_use", hook, "PreToolUse", file_path)
+                if result.get("block"):
+                    blocked += 1
+                else:
+                    timed("post_tool_use", hook, "PostToolUse", file_path)
+            else:
+                timed(op, get_state)
+
+    results.put({"latencies": latencies, "blocked": blocked})
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(samples: List[float], elapsed: float) -> Dict[str, float]:
+    return {
+        "count": len(samples),
+        "ops_per_second": round(len(samples) / elapsed, 1),
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+def simulate(args) -> Tuple[Dict[str, List[float]], int, float, int, float]:
+    """
+    One run on a fresh history: latencies by operation, blocked edits,
+    elapsed seconds, history lines and seconds spent generating them.
+    """
+    workdir = Path(tempfile.mkdtemp(prefix="swarm-load-bench-"))
+    try:
+        started = time.perf_counter()
+        lines = swarm_history.generate(
+            workdir / ".claude/swarm",
+            agents=max(args.history_agents, args.agents),
+            tasks=args.tasks,
+            messages=args.messages,
+            lock_records=args.lock_records,
+            partitioned=args.partitioned,
+            seed=args.seed,
+        )
+        generate_seconds = time.perf_counter() - started
+
+        ctx = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+        start = ctx.Event()
+        results = ctx.Queue()
+        procs = [
+            ctx.Process(
+                target=agent_worker,
+                args=(str(workdir), i, args.ops, args.hot_files, args.seed, start, results),
+            )
+            for i in range(args.agents)
+        ]
+        for proc in procs:
+            proc.start()
+
+        started = time.perf_counter()
+        start.set()
+        reports = [results.get() for _ in procs]
+        elapsed = time.perf_counter() - started
+        for proc in procs:
+            proc.join()
+    finally:
+        shutil.rmtree(workdir)
+
+    latencies: Dict[str, List[float]] = {}
+    for report in reports:
+        for op, samples in report["latencies"].items():
+            latencies.setdefault(op, []).extend(samples)
+    blocked = sum(report["blocked"] for report in reports)
+    return latencies, blocked, elapsed, sum(lines.values()), generate_seconds
+
+
+def run(args) -> Dict:
+    """Pool the samples of args.repeat runs, each on a fresh copy of the same history."""
+    latencies: Dict[str, List[float]] = {}
+    blocked, elapsed, generate_seconds = 0, 0.0, 0.0
+    for _ in range(args.repeat):
+        samples, run_blocked, run_elapsed, history_lines, run_generate = simulate(args)
+        for op, values in samples.items():
+            latencies.setdefault(op, []).extend(values)
+        blocked += run_blocked
+        elapsed += run_elapsed
+        generate_seconds += run_generate
+    total = sum(len(samples) for samples in latencies.values())
+
+    return {
+        "benchmark": "swarm_load",
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "params": {
+            "agents": args.agents,
+            "ops": args.ops,
+            "hot_files": args.hot_files,
+            "tasks": args.tasks,
+            "messages": args.messages,
+            "lock_records": args.lock_records,
+            "partitioned": args.partitioned,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "history_lines": history_lines,
+        "generate_seconds": round(generate_seconds, 3),
+        "elapsed_seconds": round(elapsed, 3),
+        "ops_per_second": round(total / elapsed, 1),
+        "blocked_edits": blocked,
+        "operations": {op: summarize(s, elapsed) for op, s in sorted(latencies.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-process swarm load benchmark")
+    parser.add_argument("--agents", type=int, default=8, help="Agent processes")
+    parser.add_argument("--ops", type=int, default=200, help="Operations per agent")
+    parser.add_argument("--hot-files", type=int, default=50, help="Files the agents edit")
+    parser.add_argument("--history-agents", type=int, default=100, help="Agents in the history")
+    parser.add_argument("--tasks", type=int, default=2000, help="Tasks in the history")
+    parser.add_argument("--messages", type=int, default=20000, help="Messages in the history")
+    parser.add_argument(
+        "--lock-records", type=int, default=20000, help="Lock records in the history"
+    )
+    parser.add_argument("--partitioned", action="store_true", help="Per-recipient inbox logs")
+    parser.add_argument("--seed", type=int, default=0, help="History and operation mix seed")
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Runs to pool (steadier tail percentiles)"
+    )
+    parser.add_argument("--json", action="store_true", help="Emit JSON only")
+
+    args = parser.parse_args()
+    result = run(args)
+
+    if args.json:
+        print(json.dumps(result))
+        return
+
+    print(
+        f"{args.agents} agents x {args.ops} ops x {args.repeat} run(s) "
+        f"on {result['history_lines']} history lines "
+        f"(commit {result['commit']})"
+    )
+    print(
+        f"{result['ops_per_second']} ops/s over {result['elapsed_seconds']}s, "
+        f"{result['blocked_edits']} blocked edits\n"
+    )
+    print(f"{'operation':>14} {'count':>7} {'ops/s':>8} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for op, r in result["operations"].items():
+        print(
+            f"{op:>14} {r['count']:>7} {r['ops_per_second']:>8.1f} "
+            f"{r['p50_ms']:>7.2f}ms {r['p95_ms']:>7.2f}ms {r['p99_ms']:>7.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
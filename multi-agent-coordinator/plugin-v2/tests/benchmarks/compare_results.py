@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Compare two bench_swarm_load.py --json results for regressions.
+
+Prints the change of each operation's throughput and p50/p95/p99 latency
+from the baseline to the candidate and exits with status 1 if any latency
+grew, or any throughput fell, by more than --threshold (a fraction).
+Operations with fewer than --min-count samples in either run are shown but
+not judged: their tail percentiles are noise.
+
+Usage:
+    python3 bench_swarm_load.py --json > before.json
+    git checkout my-branch
+    python3 bench_swarm_load.py --json > after.json
+    python3 compare_results.py before.json after.json --threshold 0.25
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+LATENCIES = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def load(path: str) -> Dict:
+    result = json.loads(Path(path).read_text())
+    if result.get("benchmark") != "swarm_load":
+        raise SystemExit(f"{path} is not a bench_swarm_load.py result")
+    return result
+
+
+def compare(
+    baseline: Dict, candidate: Dict, threshold: float, min_count: int = 20
+) -> Tuple[List[Dict], List[str]]:
+    """Per-operation rows of relative changes, and the regressions among them."""
+    rows, regressions = [], []
+    for op in sorted(set(baseline["operations"]) & set(candidate["operations"])):
+        before, after = baseline["operations"][op], candidate["operations"][op]
+        judged = min(before["count"], after["count"]) >= min_count
+        row = {"operation": op, "judged": judged}
+
+        changes = {"ops_per_second": -1.0}
+        changes.update({metric: 1.0 for metric in LATENCIES})
+        for metric, direction in changes.items():
+            change = after[metric] / before[metric] - 1 if before[metric] else 0.0
+            row[metric] = round(change, 4)
+            # Lower throughput and higher latency are worse
+            if judged and change * direction > threshold:
+                regressions.append(f"{op} {metric}: {before[metric]} -> {after[metric]}")
+        rows.append(row)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare swarm load benchmark results")
+    parser.add_argument("baseline", help="Result JSON of the reference commit")
+    parser.add_argument("candidate", help="Result JSON to check")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Allowed relative change (default 0.2)"
+    )
+    parser.add_argument(
+        "--min-count", type=int, default=20, help="Samples an operation needs to be judged"
+    )
+    parser.add_argument("--json", action="store_true", help="Emit JSON only")
+
+    args = parser.parse_args()
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    rows, regressions = compare(baseline, candidate, args.threshold, args.min_count)
+
+    if args.json:
+        print(json.dumps({"rows": rows, "regressions": regressions}))
+    else:
+        if baseline["params"] != candidate["params"]:
+            print("⚠️  The runs used different parameters; changes may not mean much.\n")
+        print(f"{baseline['commit']} -> {candidate['commit']}\n")
+        print(f"{'operation':>14} {'ops/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for row in rows:
+            cells = " ".join(f"{row[m]:>+8.1%}" for m in ("ops_per_second",) + LATENCIES)
+            print(f"{row['operation']:>14} {cells}{'' if row['judged'] else '  (too few samples)'}")
+        print()
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  - {regression}")
+        else:
+            print(f"✓ No regression beyond {args.threshold:.0%}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
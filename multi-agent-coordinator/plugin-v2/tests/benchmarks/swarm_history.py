@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Synthetic swarm histories for the load benchmarks.
+
+Writes the logs of a swarm that has been running for a while into a
+.claude/swarm directory: agent registrations and terminations, tasks with
+dependency chains and their claim/completion records, lock acquire/release
+pairs (a few still held), and direct and broadcast messages in either
+message layout. The same seed always produces the same records (timestamps
+aside, which are relative to now so that held locks have not expired).
+
+Usage:
+    python3 swarm_history.py /tmp/swarm --agents 100 --tasks 20000 \\
+        --messages 500000 --lock-records 480000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "skills/swarm-coordinator/scripts"))
+
+import message_store
+
+# Files the synthetic agents edit
+PATH_SPACE = 5000
+
+
+def agent_name(i: int) -> str:
+    return f"agent-{i:04d}"
+
+
+def _write(path: Path, records):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        f.writelines(json.dumps(record) + "\n" for record in records)
+
+
+def _agents(count: int, rng: random.Random, start: datetime):
+    for i in range(count):
+        yield {
+            "id": agent_name(i),
+            "session_id": f"session-{i}",
+            "started_at": (start + timedelta(seconds=i)).isoformat(),
+            "pid": 10000 + i,
+        }
+    # Agents that came and went
+    for i in range(count, count + count // 4):
+        yield {"id": agent_name(i), "started_at": start.isoformat(), "pid": 10000 + i}
+        yield {"id": agent_name(i), "terminated_at": start.isoformat(), "session_duration": 60}
+
+
+def _tasks(count: int, agents: int, rng: random.Random, start: datetime):
+    definitions, progress = [], []
+    for i in range(count):
+        task_id = f"task-{i:07d}"
+        # One task in five waits for an earlier one
+        dependencies = [f"task-{rng.randrange(i):07d}"] if i and rng.random() < 0.2 else []
+        definitions.append(
+            {
+                "id": task_id,
+                "description": f"Synthetic task {i}",
+                "status": "pending",
+                "dependencies": dependencies,
+                "priority": rng.randrange(10),
+                "files": [],
+                "created_at": (start + timedelta(milliseconds=i)).isoformat(),
+            }
+        )
+        # Roughly half in progress or done, the rest still pending
+        roll = rng.random()
+        if roll < 0.5 and not dependencies:
+            agent_id = agent_name(rng.randrange(agents))
+            progress.append(
+                {
+                    "task_id": task_id,
+                    "agent_id": agent_id,
+                    "claimed_at": start.isoformat(),
+                    "status": "in_progress",
+                }
+            )
+            if roll < 0.35:
+                progress.append(
+                    {
+                        "task_id": task_id,
+                        "agent_id": agent_id,
+                        "completed_at": start.isoformat(),
+                        "status": "completed",
+                        "summary": "",
+                    }
+                )
+    return definitions + progress
+
+
+def _locks(count: int, agents: int, held: int, rng: random.Random, now: datetime):
+    acquired_at = (now - timedelta(minutes=1)).isoformat()
+    for _ in range(count // 2):
+        path = f"src/mod{rng.randrange(PATH_SPACE)}.py"
+        holder = agent_name(rng.randrange(agents))
+        yield {
+            "file_path": path,
+            "holder": holder,
+            "reason": "editing via Edit",
+            "acquired_at": acquired_at,
+            "expires_at": acquired_at,
+        }
+        yield {"file_path": path, "holder": holder, "released_at": acquired_at, "status": "released"}
+    # Locks that are still held
+    expires_at = (now + timedelta(hours=1)).isoformat()
+    for i in range(held):
+        yield {
+            "file_path": f"src/held{i}.py",
+            "holder": agent_name(i % agents),
+            "reason": "editing via Edit",
+            "acquired_at": now.isoformat(),
+            "expires_at": expires_at,
+        }
+
+
+def _messages(count: int, agents: int, rng: random.Random, start: datetime):
+    for i in range(count):
+        broadcast = rng.random() < 0.05
+        yield {
+            "id": f"msg-hist{i:08d}",
+            "from": agent_name(rng.randrange(agents)),
+            "to": message_store.BROADCAST if broadcast else agent_name(rng.randrange(agents)),
+            "subject": f"Update {i}",
+            "body": "Synthetic message body",
+            "priority": "normal",
+            "timestamp": (start + timedelta(milliseconds=i)).isoformat(),
+            "read": rng.random() < 0.7,
+        }
+
+
+def generate(
+    swarm_dir: Path,
+    agents: int = 100,
+    tasks: int = 2000,
+    messages: int = 20000,
+    lock_records: int = 20000,
+    held_locks: int = 20,
+    partitioned: bool = False,
+    seed: int = 0,
+) -> Dict[str, int]:
+    """Write a synthetic history into swarm_dir; returns the lines per log."""
+    swarm_dir = Path(swarm_dir)
+    swarm_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    start = now - timedelta(days=1)
+
+    lines: Dict[str, int] = {}
+
+    def write(path: Path, records):
+        records = list(records)
+        _write(path, records)
+        lines[message_store.log_key(swarm_dir, path)] = len(records)
+
+    write(swarm_dir / "agents.jsonl", _agents(agents, rng, start))
+    write(swarm_dir / "tasks.jsonl", _tasks(tasks, agents, rng, start))
+    write(swarm_dir / "locks.jsonl", _locks(lock_records, agents, held_locks, rng, now))
+
+    history = _messages(messages, agents, rng, start)
+    if not partitioned:
+        write(swarm_dir / message_store.MESSAGES_LOG, history)
+    else:
+        by_recipient: Dict[str, list] = {}
+        for message in history:
+            by_recipient.setdefault(message["to"], []).append(message)
+        (swarm_dir / message_store.INBOX_DIR).mkdir(exist_ok=True)
+        for recipient, records in sorted(by_recipient.items()):
+            write(message_store.partition_log(swarm_dir, recipient), records)
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic swarm history")
+    parser.add_argument("swarm_dir", help="Directory to write the logs into")
+    parser.add_argument("--agents", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--lock-records", type=int, default=20000)
+    parser.add_argument("--held-locks", type=int, default=20)
+    parser.add_argument("--partitioned", action="store_true", help="Per-recipient inbox logs")
+    parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    lines = generate(
+        Path(args.swarm_dir),
+        args.agents,
+        args.tasks,
+        args.messages,
+        args.lock_records,
+        args.held_locks,
+        args.partitioned,
+        args.seed,
+    )
+    print(f"Wrote {sum(lines.values())} lines in {time.perf_counter() - started:.1f}s")
+    for key, count in lines.items():
+        if not key.startswith(message_store.INBOX_DIR + "/"):
+            print(f"  {key}: {count}")
+    partitions = [n for k, n in lines.items() if k.startswith(message_store.INBOX_DIR + "/")]
+    if partitions:
+        print(f"  {message_store.INBOX_DIR}/: {sum(partitions)} in {len(partitions)} partitions")
+
+
+if __name__ == "__main__":
+    main()
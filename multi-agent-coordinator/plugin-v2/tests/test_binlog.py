@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Tests for the binary swarm log format (binlog.py)."""
+
+import json
+import multiprocessing
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "skills/swarm-coordinator/scripts"))
+sys.path.insert(0, str(Path(__file__).parent / "benchmarks"))
+
+import binlog
+import swarm_history
+
+
+def append_batches(path: str, writer: int, count: int):
+    """Worker process: append count single-record batches."""
+    for i in range(count):
+        binlog.append_records(Path(path), [{"id": f"agent-{writer}", "started_at": "", "i": i}])
+
+
+class TestBinaryLog(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.log = self.test_dir / "locks.swlog"
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_swarm_logs_round_trip_losslessly(self):
+        swarm_dir = self.test_dir / "swarm"
+        swarm_history.generate(swarm_dir, agents=10, tasks=50, messages=200, lock_records=100)
+        with open(swarm_dir / "messages.jsonl", "a") as f:
+            record = {"from": "a", "to": "b", "body": "héllo ✓", "n": 2**70, "x": None, "f": 0.1}
+            f.write(json.dumps(record) + "\n")
+
+        for name in ("agents", "tasks", "locks", "messages"):
+            source = swarm_dir / f"{name}.jsonl"
+            count = binlog.import_jsonl(source, self.test_dir / f"{name}.swlog")
+            binlog.export_jsonl(self.test_dir / f"{name}.swlog", self.test_dir / f"{name}.jsonl")
+            self.assertEqual(count, len(source.read_text().splitlines()))
+            self.assertEqual((self.test_dir / f"{name}.jsonl").read_text(), source.read_text())
+
+    def test_records_are_typed_and_timestamped(self):
+        binlog.append_records(
+            self.log,
+            [
+                {"file_path": "a.py", "holder": "x", "acquired_at": "2025-01-01T00:00:00"},
+                {"file_path": "a.py", "holder": "x", "status": "released"},
+                {"task_id": "task-1", "status": "completed"},
+            ],
+        )
+        headers = list(binlog.iter_headers(self.log))
+        self.assertEqual([h.kind for h in headers], ["lock", "lock_release", "task_update"])
+        self.assertEqual(headers[0].time, 1735689600.0)
+        self.assertEqual(headers[0].key_hash, binlog.key_hash("a.py"))
+        self.assertEqual(headers[2].key_hash, binlog.key_hash("task-1"))
+
+    def test_key_scan_decodes_only_matching_records(self):
+        records = [{"file_path": f"src/{i % 10}.py", "holder": "x", "i": i} for i in range(100)]
+        binlog.append_records(self.log, records)
+
+        with mock.patch.object(binlog, "_decode_body", wraps=binlog._decode_body) as decode:
+            found = list(binlog.read_records(self.log, key="src/3.py"))
+        self.assertEqual([r["i"] for r in found], list(range(3, 100, 10)))
+        self.assertEqual(decode.call_count, 10)
+
+        releases = list(binlog.read_records(self.log, kinds=["lock_release"]))
+        self.assertEqual(releases, [])
+
+    def test_key_scan_rejects_hash_collisions(self):
+        binlog.append_records(self.log, [{"file_path": "a.py"}, {"file_path": "b.py"}])
+        with mock.patch.object(binlog, "key_hash", return_value=1):
+            binlog.append_records(self.log, [{"file_path": "c.py"}])
+            self.assertEqual(list(binlog.read_records(self.log, key="a.py")), [])
+
+    def test_torn_tail_is_ignored(self):
+        binlog.append_records(self.log, [{"to": "b", "from": "a", "i": i} for i in range(3)])
+        with open(self.log, "ab") as f:
+            f.write(binlog.encode({"to": "b", "from": "a", "i": 3})[:-4])
+        self.assertEqual([r["i"] for r in binlog.read_records(self.log)], [0, 1, 2])
+
+    def test_corrupt_body_fails_its_crc(self):
+        binlog.append_records(self.log, [{"file_path": "a.py", "holder": "xxxx"}])
+        data = bytearray(self.log.read_bytes())
+        data[-3] ^= 0xFF
+        self.log.write_bytes(bytes(data))
+
+        with self.assertRaises(binlog.CorruptRecord):
+            list(binlog.read_records(self.log))
+        # A scan for another key never reads the damaged body
+        self.assertEqual(list(binlog.read_records(self.log, key="b.py")), [])
+
+    def test_not_a_binary_log(self):
+        self.log.write_text('{"file_path": "a.py"}\n')
+        with self.assertRaises(ValueError):
+            list(binlog.read_records(self.log))
+
+    @unittest.skipIf(binlog.msgpack is None, "msgpack is not installed")
+    def test_msgpack_bodies_fall_back_to_json_per_record(self):
+        binlog.append_records(self.log, [{"id": "t", "n": 1}, {"id": "t", "n": 2**70}])
+        headers = list(binlog.iter_headers(self.log))
+        self.assertEqual(
+            [h.encoding for h in headers], [binlog.ENCODING_MSGPACK, binlog.ENCODING_JSON]
+        )
+        self.assertEqual([r["n"] for r in binlog.read_records(self.log)], [1, 2**70])
+
+    def test_concurrent_appends_stay_whole(self):
+        ctx = multiprocessing.get_context("fork")
+        workers = [
+            ctx.Process(target=append_batches, args=(str(self.log), i, 100)) for i in range(4)
+        ]
+        for proc in workers:
+            proc.start()
+        for proc in workers:
+            proc.join(60)
+            self.assertEqual(proc.exitcode, 0)
+
+        for writer in range(4):
+            records = list(binlog.read_records(self.log, key=f"agent-{writer}"))
+            self.assertEqual([r["i"] for r in records], list(range(100)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Tests for compact.py"""
+
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "skills/swarm-coordinator/scripts"))
+
+import compact
+import get_state
+import swarm_log
+from swarm_cache import SwarmCache
+
+
+def _lock(file_path, holder, minutes=5):
+    now = datetime.utcnow()
+    return {
+        "file_path": file_path,
+        "holder": holder,
+        "reason": "editing",
+        "acquired_at": now.isoformat(),
+        "expires_at": (now + timedelta(minutes=minutes)).isoformat(),
+    }
+
+
+def _append_locks(locks_file, writer, count):
+    """Append count unique active locks through the shared append lock."""
+    for i in range(count):
+        swarm_log.append_records(locks_file, [_lock(f"w{writer}/{i}.py", f"agent-{writer}")])
+
+
+class TestCompact(unittest.TestCase):
+    def setUp(self):
+        """Create a temporary directory for testing."""
+        self.test_dir = tempfile.mkdtemp()
+        self.swarm_dir = Path(self.test_dir) / ".claude/swarm"
+        self.swarm_dir.mkdir(parents=True, exist_ok=True)
+        compact.SWARM_DIR = self.swarm_dir
+        get_state.SWARM_DIR = self.swarm_dir
+
+    def tearDown(self):
+        """Clean up temporary directory."""
+        import shutil
+        shutil.rmtree(self.test_dir)
+
+    def write(self, name, records):
+        with open(self.swarm_dir / name, "w") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+    def read(self, name):
+        with open(self.swarm_dir / name, "r") as f:
+            return [json.loads(line) for line in f]
+
+    def test_compact_locks_keeps_active_only(self):
+        """Released and expired locks are dropped, active ones kept."""
+        self.write(
+            "locks.jsonl",
+            [
+                _lock("a.py", "agent-1"),
+                {"file_path": "a.py", "holder": "agent-1", "status": "released"},
+                _lock("b.py", "agent-1", minutes=-1),
+                _lock("c.py", "agent-1"),
+                _lock("c.py", "agent-2"),
+            ],
+        )
+        before = get_state.get_locks()
+
+        result = compact.compact(["locks"])
+
+        self.assertEqual(result["locks"], {"before": 5, "after": 1})
+        self.assertEqual(get_state.get_locks(), before)
+        self.assertEqual(self.read("locks.jsonl")[0]["holder"], "agent-2")
+
+    def test_compact_tasks_preserves_state(self):
+        """Folding tasks keeps the exact replayed state and ready queue."""
+        self.write(
+            "tasks.jsonl",
+            [
+                {"id": "task-1", "status": "pending", "priority": 3, "dependencies": []},
+                {"id": "task-2", "status": "pending", "priority": 9, "dependencies": ["task-1"]},
+                {"id": "task-3", "status": "pending", "priority": 1, "dependencies": []},
+                {"task_id": "task-1", "agent_id": "a", "status": "in_progress"},
+                {"task_id": "task-1", "agent_id": "a", "status": "completed", "summary": "ok"},
+                {"task_id": "task-3", "agent_id": "b", "status": "in_progress"},
+                {"task_id": "task-404", "status": "completed"},
+            ],
+        )
+        cache = SwarmCache(self.swarm_dir)
+        before = cache.tasks()
+        ready_before = [t["id"] for t in cache.available_tasks()]
+
+        result = compact.compact(["tasks"])
+
+        self.assertEqual(result["tasks"], {"before": 7, "after": 3})
+        cache = SwarmCache(self.swarm_dir)
+        self.assertEqual(cache.tasks(), before)
+        self.assertEqual([t["id"] for t in cache.available_tasks()], ready_before)
+        self.assertEqual(ready_before, ["task-2"])
+
+    def test_compact_agents_drops_terminated(self):
+        """Terminated agents disappear; running agents keep their registration."""
+        self.write(
+            "agents.jsonl",
+            [
+                {"id": "agent-1", "started_at": "2025-01-01T00:00:00"},
+                {"id": "agent-2", "started_at": "2025-01-01T00:00:00"},
+                {"id": "agent-1", "terminated_at": "2025-01-01T01:00:00"},
+                {"id": "agent-3", "started_at": "2025-01-01T00:00:00"},
+            ],
+        )
+
+        compact.compact(["agents"])
+
+        self.assertEqual([r["id"] for r in self.read("agents.jsonl")], ["agent-2", "agent-3"])
+        self.assertEqual(sorted(get_state.get_agents()), ["agent-2", "agent-3"])
+
+    def test_compaction_replaces_file_atomically(self):
+        """The compacted log is a new file renamed over the old one."""
+        self.write("agents.jsonl", [{"id": "agent-1", "started_at": "x"}])
+        inode = (self.swarm_dir / "agents.jsonl").stat().st_ino
+
+        compact.compact(["agents"])
+
+        self.assertNotEqual((self.swarm_dir / "agents.jsonl").stat().st_ino, inode)
+        self.assertEqual(
+            [p.name for p in self.swarm_dir.iterdir() if p.name.endswith(".compact")], []
+        )
+
+    def test_min_bytes_skips_small_logs(self):
+        """--auto only touches logs above the size threshold."""
+        self.write("agents.jsonl", [{"id": "agent-1", "started_at": "x"}])
+        self.assertEqual(compact.compact(min_bytes=1024 * 1024), {})
+
+    def test_background_trigger_compacts_large_log(self):
+        """A log over the threshold gets compacted by a background process."""
+        import time
+        from unittest import mock
+
+        self.write(
+            "agents.jsonl",
+            [{"id": f"agent-{i}", "terminated_at": "x"} for i in range(50)],
+        )
+
+        with mock.patch.object(compact, "AUTO_COMPACT_BYTES", 1):
+            with mock.patch.dict(os.environ, {"SWARM_COMPACT_BYTES": "1"}):
+                compact.maybe_trigger_compaction(self.swarm_dir, self.swarm_dir / "agents.jsonl")
+                # A second trigger while the first is pending is a no-op
+                compact.maybe_trigger_compaction(self.swarm_dir, self.swarm_dir / "agents.jsonl")
+
+        marker = self.swarm_dir / ".cache" / "compact.pending"
+        deadline = time.time() + 10
+        while marker.exists() and time.time() < deadline:
+            time.sleep(0.05)
+
+        self.assertFalse(marker.exists())
+        self.assertEqual(self.read("agents.jsonl"), [])
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires fork")
+    def test_concurrent_appends_are_not_lost(self):
+        """Appends racing with compaction all survive it."""
+        locks_file = self.swarm_dir / "locks.jsonl"
+        self.write("locks.jsonl", [])
+
+        ctx = multiprocessing.get_context("fork")
+        writers = [
+            ctx.Process(target=_append_locks, args=(locks_file, w, 150)) for w in range(4)
+        ]
+        for proc in writers:
+            proc.start()
+        while any(proc.is_alive() for proc in writers):
+            compact.compact(["locks"])
+        for proc in writers:
+            proc.join()
+        compact.compact(["locks"])
+
+        self.assertEqual(len(self.read("locks.jsonl")), 600)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Tests for the optional coordinator daemon and the hook's client side."""
+
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from hooks import coordination, coordinator_daemon
+
+import perf_trace  # on sys.path once the hooks are imported
+
+
+class TestCoordinatorDaemon(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.prev_cwd = os.getcwd()
+        os.chdir(self.test_dir)
+
+        self.swarm_dir = Path(".claude/swarm")
+        self.swarm_dir.mkdir(parents=True, exist_ok=True)
+        coordination.SWARM_DIR = self.swarm_dir
+
+    def tearDown(self):
+        os.chdir(self.prev_cwd)
+        shutil.rmtree(self.test_dir)
+
+    def start_daemon(self):
+        """Serve requests from a background thread until the test ends."""
+        server = coordinator_daemon.CoordinatorDaemon(
+            coordinator_daemon.socket_path(self.swarm_dir)
+        )
+
+        def serve():
+            # The lock index connection belongs to the serving thread
+            server.serve_forever(poll_interval=0.05)
+            server.server_close()
+
+        thread = threading.Thread(target=serve)
+        thread.start()
+
+        def stop():
+            server.shutdown()
+            thread.join()
+
+        self.addCleanup(stop)
+        return server
+
+    def pre_tool_use(self, file_path):
+        return {
+            "hook_event_name": "PreToolUse",
+            "tool_name": "Edit",
+            "tool_input": {"file_path": file_path},
+        }
+
+    def test_no_daemon_falls_back(self):
+        """Without a socket the client reports that nobody answered."""
+        self.assertIsNone(coordination.forward_to_daemon(self.pre_tool_use("a.py"), "a"))
+
+    def test_stale_socket_falls_back(self):
+        """A socket file nobody listens on is treated as no daemon."""
+        path = coordinator_daemon.socket_path(self.swarm_dir)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(str(path))
+
+        self.assertIsNone(coordination.forward_to_daemon(self.pre_tool_use("a.py"), "a"))
+
+    def test_daemon_serves_locks_per_agent(self):
+        """Agents going through the daemon still exclude each other."""
+        self.start_daemon()
+
+        first = coordination.forward_to_daemon(self.pre_tool_use("src/app.py"), "agent-a")
+        second = coordination.forward_to_daemon(self.pre_tool_use("src/app.py"), "agent-b")
+
+        self.assertFalse(first["block"])
+        self.assertTrue(second["block"])
+        self.assertIn("agent-a", second["message"])
+
+        records = [
+            json.loads(line)
+            for line in (self.swarm_dir / "locks.jsonl").read_text().splitlines()
+        ]
+        self.assertEqual([r["holder"] for r in records], ["agent-a"])
+
+    def test_daemon_sees_in_process_writers(self):
+        """Locks taken by hooks that bypass the daemon are honoured."""
+        self.start_daemon()
+        coordination.forward_to_daemon(self.pre_tool_use("warm.py"), "agent-a")
+
+        direct = coordination.SwarmCoordinator(agent_id="agent-b")
+        coordination.process_hook_event(self.pre_tool_use("src/app.py"), direct)
+
+        result = coordination.forward_to_daemon(self.pre_tool_use("src/app.py"), "agent-a")
+        self.assertTrue(result["block"])
+
+    def test_session_start_records_client_pid(self):
+        """The registration carries the hook process pid, not the daemon's."""
+        self.start_daemon()
+        event = {"hook_event_name": "SessionStart", "hook_context": {"session_id": "s-1"}}
+
+        result = coordination.forward_to_daemon(event, "agent-a", pid=4242)
+
+        self.assertTrue(result["success"])
+        record = json.loads((self.swarm_dir / "agents.jsonl").read_text().splitlines()[-1])
+        self.assertEqual(record["id"], "agent-a")
+        self.assertEqual(record["pid"], 4242)
+
+    def test_session_end_releases_and_forgets_agent(self):
+        """SessionEnd releases the agent's locks and drops its coordinator."""
+        server = self.start_daemon()
+        coordination.forward_to_daemon(self.pre_tool_use("src/app.py"), "agent-a")
+        self.assertIn("agent-a", server.coordinators)
+
+        result = coordination.forward_to_daemon({"hook_event_name": "SessionEnd"}, "agent-a")
+
+        self.assertTrue(result["success"])
+        self.assertNotIn("agent-a", server.coordinators)
+        blocked = coordination.forward_to_daemon(self.pre_tool_use("src/app.py"), "agent-b")
+        self.assertFalse(blocked["block"])
+
+    def test_invalid_request_returns_error(self):
+        """Malformed requests get an error response instead of a hang."""
+        self.start_daemon()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(5)
+            sock.connect(str(coordinator_daemon.socket_path(self.swarm_dir)))
+            sock.sendall(b'{"event": {}}\n')
+            response = json.loads(sock.makefile("rb").readline())
+
+        self.assertIn("error", response)
+
+    def test_daemon_requests_are_traced_apart(self):
+        """With tracing on, the daemon records its share of each event."""
+        perf_trace.ENABLED = True
+        self.addCleanup(setattr, perf_trace, "ENABLED", False)
+        self.start_daemon()
+
+        coordination.forward_to_daemon(self.pre_tool_use("src/app.py"), "agent-a")
+
+        # Stored after the response is sent
+        deadline = time.monotonic() + 5
+        while not perf_trace.read(self.swarm_dir) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        (record,) = perf_trace.read(self.swarm_dir)
+        self.assertEqual(record["event"], "pre-tool-use")
+        self.assertTrue(record["tags"]["daemon"])
+        self.assertIn("check_locks", record["phases"])
+        self.assertIn("pre-tool-use (daemon)", perf_trace.summarize([record]))
+
+
+class TestDaemonCli(unittest.TestCase):
+    """The daemon script run as its own process, as users start it."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        (Path(self.test_dir) / ".claude/swarm").mkdir(parents=True)
+        self.addCleanup(shutil.rmtree, self.test_dir)
+
+    def cli(self, command):
+        return subprocess.run(
+            [sys.executable, coordinator_daemon.__file__, command],
+            cwd=self.test_dir,
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+
+    def test_start_status_stop(self):
+        result = self.cli("status")
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("not running", result.stdout)
+
+        result = self.cli("start")
+        self.addCleanup(self.cli, "stop")
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        self.assertIn("listening", self.cli("status").stdout)
+
+        self.assertIn("stopped", self.cli("stop").stdout)
+        self.assertIn("not running", self.cli("status").stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -185,6 +185,84 @@ class TestGetMessages(unittest.TestCase):
 
         self.assertIn("No messages", output)
 
+    def append_messages(self, count, start=100, to="TestAgent"):
+        """Append count unread messages to the log."""
+        with open(self.messages_file, "a") as f:
+            for i in range(start, start + count):
+                msg = {
+                    "id": f"msg-{i}",
+                    "from": "Sender",
+                    "to": to,
+                    "subject": f"Message {i}",
+                    "body": f"Body {i}",
+                    "priority": "normal",
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "read": False,
+                }
+                f.write(json.dumps(msg) + "\n")
+
+    def fetch(self, **kwargs):
+        """get_messages() with stdout captured; returns the shown ids."""
+        old_stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            messages = get_messages.get_messages(**kwargs)
+        finally:
+            sys.stdout = old_stdout
+        return [msg["id"] for msg in messages]
+
+    def test_unread_messages_are_marked_read(self):
+        """Messages shown once are not shown as unread again."""
+        self.assertEqual(self.fetch(unread_only=True), ["msg-4", "msg-1"])
+        self.assertEqual(self.fetch(unread_only=True), [])
+
+        # The log itself is untouched
+        self.assertIn('"read": false', self.messages_file.read_text())
+
+    def test_peek_leaves_messages_unread(self):
+        """--peek shows unread messages without moving the cursor."""
+        self.assertEqual(self.fetch(unread_only=True, peek=True), ["msg-4", "msg-1"])
+        self.assertEqual(self.fetch(unread_only=True), ["msg-4", "msg-1"])
+
+    def test_only_new_messages_after_cursor(self):
+        """Mail appended after a read is the only unread mail."""
+        self.fetch(unread_only=True)
+        self.append_messages(2)
+        self.append_messages(1, start=200, to="OtherAgent")
+
+        self.assertEqual(self.fetch(unread_only=True), ["msg-101", "msg-100"])
+
+        cursor = get_messages.load_cursor("TestAgent")
+        self.assertEqual(cursor["messages.jsonl"]["offset"], self.messages_file.stat().st_size)
+
+    def test_limit_reads_oldest_first_and_keeps_the_rest(self):
+        """Over the limit, the oldest unread are shown and the rest stay unread."""
+        self.append_messages(7)
+
+        seen = []
+        for _ in range(3):
+            batch = self.fetch(unread_only=True, limit=4)
+            self.assertLessEqual(len(batch), 4)
+            seen.extend(reversed(batch))
+
+        expected = ["msg-1", "msg-4"] + [f"msg-{i}" for i in range(100, 107)]
+        self.assertEqual(seen, expected)
+        self.assertEqual(self.fetch(unread_only=True), [])
+
+    def test_cursor_reset_when_log_is_replaced(self):
+        """A rewritten log is read from the start again."""
+        self.fetch(unread_only=True)
+        self.messages_file.unlink()
+        self.append_messages(1)
+
+        self.assertEqual(self.fetch(unread_only=True), ["msg-100"])
+
+    def test_cursor_file_name_is_sanitized(self):
+        """Agent IDs cannot escape the cursor directory."""
+        path = get_messages.cursor_file("../../evil/agent")
+        self.assertEqual(path.parent, self.swarm_dir / ".cache" / "cursors")
+        self.assertNotIn("/", path.name)
+
 
 if __name__ == "__main__":
     unittest.main()
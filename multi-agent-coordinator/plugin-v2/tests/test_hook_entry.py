@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Tests for the fast hook entry point (hooks/hook_entry.py)."""
+
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+PLUGIN_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PLUGIN_ROOT))
+
+from hooks import hook_entry
+
+ENTRY_HOOK = PLUGIN_ROOT / "hooks" / "hook_entry.py"
+LEGACY_HOOK = PLUGIN_ROOT / "hooks" / "coordination.py"
+
+
+class TestFastResponse(unittest.TestCase):
+    """Which payloads are answered without loading coordination.py."""
+
+    def test_ignored_tools_are_answered(self):
+        pre = {"hook_event_name": "PreToolUse", "tool_name": "Read", "tool_input": {}}
+        post = {"hook_event_name": "PostToolUse", "tool_name": "Bash", "tool_input": {}}
+
+        self.assertEqual(json.loads(hook_entry.fast_response(json.dumps(pre))), {"block": False})
+        self.assertEqual(
+            json.loads(hook_entry.fast_response(json.dumps(post))), {"success": True}
+        )
+
+    def test_event_name_spellings(self):
+        for name in ("pre-tool-use", "pre_tool_use", "PRETOOLUSE"):
+            raw = json.dumps({"hook_event_name": name, "tool_name": "Glob"})
+            self.assertEqual(hook_entry.fast_response(raw), '{"block": false}', name)
+
+    def test_edit_tools_are_processed(self):
+        for tool in ("Edit", "Write", "MultiEdit"):
+            raw = json.dumps({"hook_event_name": "PreToolUse", "tool_name": tool})
+            self.assertIsNone(hook_entry.fast_response(raw), tool)
+
+    def test_ambiguous_payloads_are_processed(self):
+        payloads = [
+            "{}",
+            "not json",
+            '{"hook_event_name": "SessionStart"}',
+            '{"event": "PreToolUse", "tool_name": "Read"}',
+            '{"hook_event_name": "PreToolUse", "hook_event_name": "SessionStart"}',
+            '{"hook_event_name": "Pre\\u0054oolUse", "tool_name": "Read"}',
+            '{"hook_event_name": null, "tool_name": "Read"}',
+            # Any mention of an edit tool, even outside tool_name
+            '{"hook_event_name": "PreToolUse", "tool_name": "Bash", "tool_input": "Write"}',
+        ]
+        for raw in payloads:
+            self.assertIsNone(hook_entry.fast_response(raw), raw)
+
+
+class TestEntryProcess(unittest.TestCase):
+    """hook_entry.py run the way Claude Code runs hooks."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.env = dict(os.environ, CLAUDE_AGENT_NAME="EntryTester")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def run_hook(self, script: Path, event) -> str:
+        proc = subprocess.run(
+            [sys.executable, str(script)],
+            input=json.dumps(event),
+            capture_output=True,
+            text=True,
+            cwd=self.test_dir,
+            env=self.env,
+            check=True,
+        )
+        return proc.stdout
+
+    def test_ignored_tool_touches_nothing(self):
+        event = {"hook_event_name": "PreToolUse", "tool_name": "Read", "tool_input": {}}
+
+        self.assertEqual(json.loads(self.run_hook(ENTRY_HOOK, event)), {"block": False})
+        self.assertEqual(os.listdir(self.test_dir), [])
+
+    def test_edit_events_match_coordination(self):
+        events = [
+            {"hook_event_name": "SessionStart", "session_id": "s-1"},
+            {"hook_event_name": "PreToolUse", "tool_name": "Edit", "tool_input": {"file_path": "a.py"}},
+            {"hook_event_name": "PostToolUse", "tool_name": "Edit", "tool_input": {"file_path": "a.py"}},
+            {"hook_event_name": "PreToolUse", "tool_name": "Read", "tool_input": {}},
+        ]
+        for event in events:
+            entry = json.loads(self.run_hook(ENTRY_HOOK, event))
+            legacy = json.loads(self.run_hook(LEGACY_HOOK, event))
+            self.assertEqual(entry, legacy, event["hook_event_name"])
+
+    def test_session_start_precompiles(self):
+        cached = Path(importlib.util.cache_from_source(str(LEGACY_HOOK)))
+        cached.unlink(missing_ok=True)
+
+        self.run_hook(ENTRY_HOOK, {"hook_event_name": "SessionStart", "session_id": "s-1"})
+
+        self.assertTrue(cached.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
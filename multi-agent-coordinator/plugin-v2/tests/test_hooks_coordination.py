@@ -2,11 +2,14 @@
 """Tests for hook event dispatch."""
 
 import json
+import multiprocessing
 import os
+import random
 import shutil
 import sys
 import tempfile
 import unittest
+from datetime import datetime, timedelta
 from pathlib import Path
 
 # Add plugin root to path to import hooks module
@@ -59,6 +62,237 @@ class TestHookDispatch(unittest.TestCase):
         self.assertEqual(record["session_id"], "session-123")
         self.assertEqual(record["id"], "HookTester")
 
+    def pre_tool_use(self, file_path, tool_name="Edit"):
+        """Dispatch a PreToolUse event for file_path."""
+        return coordination.process_hook_event(
+            {
+                "hook_event_name": "PreToolUse",
+                "tool_name": tool_name,
+                "tool_input": {"file_path": file_path},
+            }
+        )
+
+    def test_pre_tool_use_blocks_file_locked_by_other_agent(self):
+        """PreToolUse should block edits on files another agent holds."""
+        os.environ["CLAUDE_AGENT_NAME"] = "OtherAgent"
+        self.assertFalse(self.pre_tool_use("src/app.py")["block"])
+
+        os.environ["CLAUDE_AGENT_NAME"] = "HookTester"
+        result = self.pre_tool_use("src/app.py")
+
+        self.assertTrue(result["block"])
+        self.assertIn("OtherAgent", result["message"])
+        self.assertFalse(self.pre_tool_use("src/other.py")["block"])
+
+    def test_post_tool_use_releases_lock(self):
+        """PostToolUse should release the lock so other agents can edit."""
+        os.environ["CLAUDE_AGENT_NAME"] = "OtherAgent"
+        self.pre_tool_use("src/app.py")
+        coordination.process_hook_event(
+            {
+                "hook_event_name": "PostToolUse",
+                "tool_name": "Edit",
+                "tool_input": {"file_path": "src/app.py"},
+                "tool_response": {"success": True},
+            }
+        )
+
+        os.environ["CLAUDE_AGENT_NAME"] = "HookTester"
+        self.assertFalse(self.pre_tool_use("src/app.py")["block"])
+
+    def test_session_end_releases_lingering_locks(self):
+        """SessionEnd should release every lock the agent still holds."""
+        os.environ["CLAUDE_AGENT_NAME"] = "OtherAgent"
+        self.pre_tool_use("src/a.py")
+        self.pre_tool_use("src/b.py", tool_name="Write")
+        coordination.process_hook_event({"hook_event_name": "SessionEnd"})
+
+        os.environ["CLAUDE_AGENT_NAME"] = "HookTester"
+        self.assertFalse(self.pre_tool_use("src/a.py")["block"])
+        self.assertFalse(self.pre_tool_use("src/b.py")["block"])
+
+    def test_multi_path_input_locks_every_path(self):
+        """Every listed path is locked, not just the first one."""
+        os.environ["CLAUDE_AGENT_NAME"] = "OtherAgent"
+        result = coordination.process_hook_event(
+            {
+                "hook_event_name": "PreToolUse",
+                "tool_name": "MultiEdit",
+                "tool_input": {"file_path": "src/c.py", "paths": ["src/b.py", "src/a.py"]},
+            }
+        )
+        self.assertFalse(result["block"])
+
+        # One append, in sorted path order
+        records = [json.loads(line) for line in (self.swarm_dir / "locks.jsonl").open()]
+        self.assertEqual([r["file_path"] for r in records], ["src/a.py", "src/b.py", "src/c.py"])
+        self.assertEqual(len({r["acquired_at"] for r in records}), 1)
+
+        os.environ["CLAUDE_AGENT_NAME"] = "HookTester"
+        for path in ("src/a.py", "src/b.py", "src/c.py"):
+            self.assertTrue(self.pre_tool_use(path)["block"], path)
+
+    def test_multi_path_acquisition_is_all_or_nothing(self):
+        """A batch with one path held elsewhere locks none of its paths."""
+        os.environ["CLAUDE_AGENT_NAME"] = "OtherAgent"
+        self.pre_tool_use("src/b.py")
+
+        os.environ["CLAUDE_AGENT_NAME"] = "HookTester"
+        result = coordination.process_hook_event(
+            {
+                "hook_event_name": "PreToolUse",
+                "tool_name": "MultiEdit",
+                "tool_input": {"paths": ["src/a.py", "src/b.py", "src/c.py"]},
+            }
+        )
+        self.assertTrue(result["block"])
+        self.assertIn("src/b.py", result["message"])
+
+        os.environ["CLAUDE_AGENT_NAME"] = "ThirdAgent"
+        self.assertFalse(self.pre_tool_use("src/a.py")["block"])
+        self.assertFalse(self.pre_tool_use("src/c.py")["block"])
+
+    def test_post_tool_use_releases_every_path(self):
+        """PostToolUse releases the whole batch in one append."""
+        event = {
+            "tool_name": "MultiEdit",
+            "tool_input": {"paths": ["src/a.py", "src/b.py"]},
+            "tool_response": {"success": True},
+        }
+        os.environ["CLAUDE_AGENT_NAME"] = "OtherAgent"
+        coordination.process_hook_event(dict(event, hook_event_name="PreToolUse"))
+        coordination.process_hook_event(dict(event, hook_event_name="PostToolUse"))
+
+        records = [json.loads(line) for line in (self.swarm_dir / "locks.jsonl").open()]
+        self.assertEqual(
+            [(r["file_path"], r.get("status")) for r in records[2:]],
+            [("src/a.py", "released"), ("src/b.py", "released")],
+        )
+
+        os.environ["CLAUDE_AGENT_NAME"] = "HookTester"
+        self.assertFalse(self.pre_tool_use("src/a.py")["block"])
+        self.assertFalse(self.pre_tool_use("src/b.py")["block"])
+
+    def reserve(self, pattern, holder):
+        """Append a task reservation record for pattern."""
+        now = datetime.utcnow()
+        record = {
+            "file_path": pattern,
+            "holder": holder,
+            "reason": "reserved for task task-001",
+            "reservation": True,
+            "task_id": "task-001",
+            "acquired_at": now.isoformat(),
+            "expires_at": (now + timedelta(hours=1)).isoformat(),
+        }
+        with open(self.swarm_dir / "locks.jsonl", "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def test_reserved_pattern_blocks_other_agents(self):
+        """Edits under another agent's reserved pattern are blocked."""
+        self.reserve("src/auth/**", "OtherAgent")
+
+        result = self.pre_tool_use("src/auth/login.py")
+        self.assertTrue(result["block"])
+        self.assertIn("OtherAgent", result["message"])
+        self.assertIn("task-001", result["message"])
+
+        # Absolute paths are matched relative to the project root
+        absolute = os.path.join(os.getcwd(), "src", "auth", "oauth", "google.py")
+        self.assertTrue(self.pre_tool_use(absolute)["block"])
+
+        self.assertFalse(self.pre_tool_use("src/api/users.py")["block"])
+
+    def test_own_reservation_does_not_block(self):
+        """The reserving agent edits inside its reservation normally."""
+        self.reserve("src/auth/**", "HookTester")
+        self.assertFalse(self.pre_tool_use("src/auth/login.py")["block"])
+
+
+CONTENDED_FILES = [f"src/shared_{i}.py" for i in range(6)]
+
+
+def contend(workdir: str, agent_id: str, seed: int, rounds: int, results: str):
+    """Worker process: lock and release random overlapping file sets."""
+    os.chdir(workdir)
+    os.environ["CLAUDE_AGENT_NAME"] = agent_id
+    coordination.SWARM_DIR = Path(".claude/swarm")
+    rng = random.Random(seed)
+    coordinator = coordination.SwarmCoordinator()
+
+    acquired = []
+    for _ in range(rounds):
+        paths = rng.sample(CONTENDED_FILES, rng.randint(1, 4))
+        event = {"tool_name": "MultiEdit", "tool_input": {"paths": paths}}
+        result = coordination.process_hook_event(
+            dict(event, hook_event_name="PreToolUse"), coordinator
+        )
+        if result.get("block") is False:
+            acquired.append(sorted(paths))
+            coordination.process_hook_event(
+                dict(event, hook_event_name="PostToolUse", tool_response={"success": True}),
+                coordinator,
+            )
+    Path(results).write_text(json.dumps(acquired))
+
+
+class TestMultiFileContention(unittest.TestCase):
+    """Many agent processes locking overlapping file sets at once."""
+
+    AGENTS = 6
+    ROUNDS = 40
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.swarm_dir = Path(self.test_dir) / ".claude/swarm"
+        self.swarm_dir.mkdir(parents=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_overlapping_batches_never_share_a_file(self):
+        ctx = multiprocessing.get_context("fork")
+        workers = []
+        for i in range(self.AGENTS):
+            results = os.path.join(self.test_dir, f"agent-{i}.json")
+            proc = ctx.Process(
+                target=contend, args=(self.test_dir, f"agent-{i}", i, self.ROUNDS, results)
+            )
+            proc.start()
+            workers.append((f"agent-{i}", results, proc))
+        for _, _, proc in workers:
+            proc.join(120)
+            self.assertEqual(proc.exitcode, 0)
+
+        # Replay the log: no path is ever acquired while another agent holds it
+        holders = {}
+        batches = {agent_id: [] for agent_id, _, _ in workers}
+        previous = None
+        for line in (self.swarm_dir / "locks.jsonl").open():
+            record = json.loads(line)
+            path, holder = record["file_path"], record["holder"]
+            if record.get("status") == "released":
+                self.assertEqual(holders.pop(path), holder)
+                previous = None
+                continue
+
+            self.assertNotIn(path, holders, f"{holder} took {path} from {holders.get(path)}")
+            holders[path] = holder
+            batch = (holder, record["acquired_at"])
+            if batch != previous:
+                batches[holder].append([])
+            batches[holder][-1].append(path)
+            previous = batch
+        self.assertEqual(holders, {})
+
+        # Each successful PreToolUse is exactly one whole batch in the log
+        granted = 0
+        for agent_id, results, _ in workers:
+            acquired = json.loads(Path(results).read_text())
+            self.assertEqual(batches[agent_id], acquired, agent_id)
+            granted += len(acquired)
+        self.assertGreater(granted, 0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -119,6 +119,76 @@ class TestIDGenerator(unittest.TestCase):
 
         self.assertEqual(id_generator.count_records_in_file(test_file), 3)
 
+    def test_generate_ids_batch(self):
+        """Test batch generation avoids collisions with existing IDs."""
+        # 4-char hashes from only 16 possible first chars would collide quickly
+        # without the in-memory check.
+        existing = {f"task-{i:04x}" for i in range(0, 65536, 2)}
+        ids = id_generator.generate_ids("task", 1000, 0, existing)
+
+        self.assertEqual(len(set(ids)), 1000)
+        self.assertFalse(existing & set(ids))
+        self.assertTrue(all(len(i.split("-")[1]) == 4 for i in ids))
+
+    def test_generate_ids_uses_record_count(self):
+        """Test batch hash length follows the given record count."""
+        ids = id_generator.generate_ids("msg", 3, record_count=1500)
+        self.assertTrue(all(len(i.split("-")[1]) == 6 for i in ids))
+
+    def test_record_index_counts_incrementally(self):
+        """Test that the record index only folds in appended lines."""
+        log = self.test_path / "messages.jsonl"
+        with open(log, "w") as f:
+            for i in range(10):
+                f.write(json.dumps({"id": f"msg-{i}"}) + "\n")
+
+        index = id_generator.RecordIndex(log)
+        self.assertEqual(index.count(), 10)
+
+        with open(log, "a") as f:
+            f.write(json.dumps({"id": "msg-10"}) + "\n\n")
+        self.assertEqual(index.count(), 11)
+        self.assertTrue(index.db_path.exists())
+
+    def test_record_index_resets_on_truncation(self):
+        """Test that a rewritten log is recounted from scratch."""
+        log = self.test_path / "tasks.jsonl"
+        log.write_text('{"id": "a"}\n{"id": "b"}\n{"id": "c"}\n')
+        index = id_generator.RecordIndex(log)
+        self.assertEqual(index.count(), 3)
+
+        log.write_text('{"id": "d"}\n')
+        self.assertEqual(index.count(), 1)
+
+    def test_record_index_rejects_existing_ids(self):
+        """Test that new IDs never collide with IDs already in the log."""
+        log = self.test_path / "tasks.jsonl"
+        log.write_text('{"id": "task-0000"}\n')
+        index = id_generator.RecordIndex(log)
+        self.assertEqual(index.count(), 1)
+
+        # Occupy all but 16 of the 4-char hashes
+        free = {f"task-{i:04x}" for i in range(4096, 65536, 4096)} | {"task-0000"}
+        conn = index._connect()
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT OR IGNORE INTO log_ids (log, id) VALUES (?, ?)",
+            [
+                (index.log_name, f"task-{i:04x}")
+                for i in range(65536)
+                if f"task-{i:04x}" not in free or i == 0
+            ],
+        )
+        conn.execute("COMMIT")
+        conn.close()
+
+        new_id = index.new_id("task")
+        self.assertIn(new_id, free)
+        self.assertNotEqual(new_id, "task-0000")
+
+        # The ID is reserved, so it is not handed out again
+        self.assertNotEqual(index.new_id("task"), new_id)
+
     def test_nonexistent_file(self):
         """Test handling of non-existent files."""
         nonexistent = self.test_path / "nonexistent.jsonl"
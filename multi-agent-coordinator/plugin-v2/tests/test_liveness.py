@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""Tests for heartbeat liveness and lease-based locks (liveness.py)."""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "skills/swarm-coordinator/scripts"))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import claim_task
+import compact
+import liveness
+from hooks import coordination
+from lock_index import LockIndex
+from swarm_log import locked_append
+
+
+def dead_pid() -> int:
+    """The pid of a process that has exited and been reaped."""
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+class TestLiveness(unittest.TestCase):
+    def setUp(self):
+        """Create a temporary swarm directory."""
+        self.test_dir = tempfile.mkdtemp()
+        self.swarm_dir = Path(self.test_dir) / ".claude/swarm"
+        self.swarm_dir.mkdir(parents=True, exist_ok=True)
+        self.index = LockIndex(self.swarm_dir)
+
+    def tearDown(self):
+        """Clean up temporary directory."""
+        self.index.close()
+        shutil.rmtree(self.test_dir)
+
+    def age(self, agent_id, seconds):
+        """Make the agent's last heartbeat seconds old."""
+        then = time.time() - seconds
+        os.utime(liveness.heartbeat_file(self.swarm_dir, agent_id), (then, then))
+
+    def lease(self, file_path, holder, minutes=5, held_seconds=0):
+        """Append a lease lock record expiring in minutes, taken held_seconds ago."""
+        now = datetime.utcnow()
+        record = {
+            "file_path": file_path,
+            "holder": holder,
+            "reason": "editing via Edit",
+            "lease": True,
+            "acquired_at": (now - timedelta(seconds=held_seconds)).isoformat(),
+            "expires_at": (now + timedelta(minutes=minutes)).isoformat(),
+        }
+        with open(self.swarm_dir / "locks.jsonl", "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def test_verdicts(self):
+        """Fresh heartbeats are alive, stale ones and dead sessions are not."""
+        check = lambda agent_id: liveness.Liveness(self.swarm_dir)(agent_id)
+        self.assertIsNone(check("agent-1"))
+
+        liveness.touch(self.swarm_dir, "agent-1")
+        self.assertTrue(check("agent-1"))
+
+        self.age("agent-1", liveness.LEASE_SECONDS + 1)
+        self.assertFalse(check("agent-1"))
+
+        liveness.start_session(self.swarm_dir, "agent-2", os.getpid())
+        self.assertTrue(check("agent-2"))
+        liveness.start_session(self.swarm_dir, "agent-2", dead_pid())
+        self.assertFalse(check("agent-2"))
+
+        liveness.end_session(self.swarm_dir, "agent-2")
+        self.assertIsNone(check("agent-2"))
+
+    def test_renewal_does_not_grow_logs(self):
+        """A heartbeat is a utime on one small file."""
+        liveness.touch(self.swarm_dir, "agent-1")
+        before = sorted(p.name for p in self.swarm_dir.iterdir())
+        size = liveness.heartbeat_file(self.swarm_dir, "agent-1").stat().st_size
+        for _ in range(100):
+            liveness.touch(self.swarm_dir, "agent-1")
+        self.assertEqual(sorted(p.name for p in self.swarm_dir.iterdir()), before)
+        self.assertEqual(liveness.heartbeat_file(self.swarm_dir, "agent-1").stat().st_size, size)
+
+    def test_lease_outlives_expiry_while_holder_is_alive(self):
+        """A live holder keeps its lease past expires_at."""
+        liveness.touch(self.swarm_dir, "agent-1")
+        self.lease("src/big_refactor.py", "agent-1", minutes=-30)
+        self.assertEqual(self.index.get("src/big_refactor.py")["holder"], "agent-1")
+
+    def test_live_holder_keeps_lease_for_at_most_max_hold(self):
+        """A lease that was never released ends after the maximum hold time."""
+        liveness.touch(self.swarm_dir, "agent-1")
+        max_hold = liveness.LEASE_MAX_HOLD_SECONDS
+        self.lease("src/stale.py", "agent-1", minutes=-30, held_seconds=max_hold + 1)
+        self.lease("src/fresh.py", "agent-1", minutes=-30, held_seconds=max_hold - 60)
+        self.assertIsNone(self.index.get("src/stale.py"))
+        self.assertEqual(list(self.index.active_locks()), ["src/fresh.py"])
+
+    def test_lease_of_dead_holder_is_reclaimed_before_expiry(self):
+        """A lease ends when its holder's heartbeat stops, not at expires_at."""
+        liveness.touch(self.swarm_dir, "agent-1")
+        self.lease("src/a.py", "agent-1", minutes=60)
+        self.assertIsNotNone(self.index.get("src/a.py"))
+
+        self.age("agent-1", liveness.LEASE_SECONDS + 1)
+        self.assertIsNone(self.index.get("src/a.py"))
+        self.assertEqual(self.index.active_locks(), {})
+
+    def test_reservation_of_dead_holder_is_reclaimed(self):
+        """A reservation ends with its holder's heartbeat, not after a day."""
+        liveness.touch(self.swarm_dir, "agent-1")
+        task = {"id": "task-001", "files": ["src/auth/**"]}
+        with locked_append(self.swarm_dir / "locks.jsonl") as f:
+            claim_task.reserve_files(task, "agent-1", f)
+        holders = [r["holder"] for r in self.index.covering("src/auth/login.py")]
+        self.assertEqual(holders, ["agent-1"])
+
+        # A live holder keeps its reservation past the lock max hold time
+        max_hold = liveness.LEASE_MAX_HOLD_SECONDS
+        with open(self.swarm_dir / "locks.jsonl") as f:
+            record = json.loads(f.readline())
+        record["acquired_at"] = (
+            datetime.utcnow() - timedelta(seconds=max_hold + 1)
+        ).isoformat()
+        with open(self.swarm_dir / "locks.jsonl", "a") as f:
+            f.write(json.dumps(record) + "\n")
+        self.assertEqual(len(self.index.covering("src/auth/login.py")), 1)
+
+        self.age("agent-1", liveness.LEASE_SECONDS + 1)
+        self.assertEqual(self.index.covering("src/auth/login.py"), [])
+        self.assertEqual(self.index.reservations(), {})
+
+    def test_lock_without_heartbeat_uses_expiry(self):
+        """Holders that never sent a heartbeat keep fixed expiry."""
+        self.lease("src/a.py", "agent-1", minutes=5)
+        self.lease("src/b.py", "agent-1", minutes=-1)
+        self.assertEqual(list(self.index.active_locks()), ["src/a.py"])
+
+    def test_compaction_keeps_live_and_drops_dead_leases(self):
+        """Compaction applies the same liveness as queries."""
+        liveness.touch(self.swarm_dir, "alive")
+        liveness.touch(self.swarm_dir, "gone")
+        self.lease("src/a.py", "alive", minutes=-30)
+        self.lease("src/b.py", "gone", minutes=60)
+        self.age("gone", liveness.LEASE_SECONDS + 1)
+
+        compact.compact_log(self.swarm_dir / "locks.jsonl", compact.FOLDERS["locks"])
+
+        records = [json.loads(line) for line in (self.swarm_dir / "locks.jsonl").open()]
+        self.assertEqual([r["file_path"] for r in records], ["src/a.py"])
+
+    def test_writer_expires_lease_when_session_dies(self):
+        """The heartbeat writer renews while the session lives and expires it after."""
+        session = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(0.5)"])
+        reaper = threading.Thread(target=session.wait)
+        reaper.start()
+
+        writer = threading.Thread(
+            target=liveness.run_writer, args=(self.swarm_dir, "agent-1", session.pid, 0.05)
+        )
+        writer.start()
+        time.sleep(0.2)
+        self.assertTrue(liveness.Liveness(self.swarm_dir)("agent-1"))
+
+        writer.join(10)
+        reaper.join()
+        self.assertFalse(writer.is_alive())
+        self.assertFalse(liveness.Liveness(self.swarm_dir)("agent-1"))
+
+
+class TestHookLeases(unittest.TestCase):
+    """Hook-acquired locks follow their holder's heartbeat."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.prev_cwd = os.getcwd()
+        os.chdir(self.test_dir)
+        self.swarm_dir = Path(".claude/swarm")
+        self.swarm_dir.mkdir(parents=True, exist_ok=True)
+        coordination.SWARM_DIR = self.swarm_dir
+
+    def tearDown(self):
+        os.chdir(self.prev_cwd)
+        shutil.rmtree(self.test_dir)
+        os.environ.pop("CLAUDE_AGENT_NAME", None)
+
+    def pre_tool_use(self, agent_id, file_path):
+        os.environ["CLAUDE_AGENT_NAME"] = agent_id
+        return coordination.process_hook_event(
+            {
+                "hook_event_name": "PreToolUse",
+                "tool_name": "Edit",
+                "tool_input": {"file_path": file_path},
+            }
+        )
+
+    def test_session_start_records_session_pid(self):
+        """SessionStart stores the session pid in agents.jsonl and the heartbeat."""
+        coordinator = coordination.SwarmCoordinator(agent_id="agent-1", session_pid=os.getpid())
+        coordinator.handle_session_start({"session_id": "s-1"})
+
+        record = json.loads((self.swarm_dir / "agents.jsonl").read_text().splitlines()[-1])
+        self.assertEqual(record["session_pid"], os.getpid())
+        heartbeat = json.loads(liveness.heartbeat_file(self.swarm_dir, "agent-1").read_text())
+        self.assertEqual(heartbeat["pid"], os.getpid())
+
+    def test_crashed_holder_releases_at_once(self):
+        """Another agent can edit as soon as the holder's heartbeat goes stale."""
+        self.assertFalse(self.pre_tool_use("crashed", "src/app.py")["block"])
+        blocked = self.pre_tool_use("waiting", "src/app.py")
+        self.assertTrue(blocked["block"])
+        self.assertIn("heartbeat lease", blocked["message"])
+
+        liveness.expire(self.swarm_dir, "crashed")
+        self.assertFalse(self.pre_tool_use("waiting", "src/app.py")["block"])
+
+    def test_session_end_stops_heartbeat(self):
+        """SessionEnd removes the agent's heartbeat."""
+        self.pre_tool_use("agent-1", "src/app.py")
+        self.assertTrue(liveness.heartbeat_file(self.swarm_dir, "agent-1").exists())
+
+        coordination.process_hook_event({"hook_event_name": "SessionEnd"})
+        self.assertFalse(liveness.heartbeat_file(self.swarm_dir, "agent-1").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""Tests for lock_index module."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "skills/swarm-coordinator/scripts"))
+
+import lock_index
+
+
+class TestLockIndex(unittest.TestCase):
+    def setUp(self):
+        """Create a temporary swarm directory."""
+        self.test_dir = tempfile.mkdtemp()
+        self.swarm_dir = Path(self.test_dir) / ".claude/swarm"
+        self.swarm_dir.mkdir(parents=True, exist_ok=True)
+        self.locks_file = self.swarm_dir / "locks.jsonl"
+        self.index = lock_index.LockIndex(self.swarm_dir)
+
+    def tearDown(self):
+        """Clean up temporary directory."""
+        import shutil
+        self.index.close()
+        shutil.rmtree(self.test_dir)
+
+    def acquire(self, file_path, holder, minutes=5):
+        """Append an acquire record."""
+        now = datetime.utcnow()
+        self.append(
+            {
+                "file_path": file_path,
+                "holder": holder,
+                "reason": "editing",
+                "acquired_at": now.isoformat(),
+                "expires_at": (now + timedelta(minutes=minutes)).isoformat(),
+            }
+        )
+
+    def release(self, file_path, holder, reservation=False):
+        """Append a release record (of a reservation if reservation is set)."""
+        record = {"file_path": file_path, "holder": holder, "status": "released"}
+        if reservation:
+            record["reservation"] = True
+        self.append(record)
+
+    def append(self, record, mode="a"):
+        with open(self.locks_file, mode) as f:
+            f.write(json.dumps(record) + "\n")
+
+    def test_missing_log_has_no_locks(self):
+        """No locks.jsonl means nothing is locked."""
+        self.assertIsNone(self.index.get("src/a.py"))
+        self.assertEqual(self.index.active_locks(), {})
+
+    def test_latest_record_wins(self):
+        """Acquire, release and re-acquire resolve to the latest record."""
+        self.acquire("src/a.py", "agent-1")
+        self.assertEqual(self.index.get("src/a.py")["holder"], "agent-1")
+
+        self.release("src/a.py", "agent-1")
+        self.assertIsNone(self.index.get("src/a.py"))
+
+        self.acquire("src/a.py", "agent-2")
+        self.release("src/b.py", "agent-1")
+        self.assertEqual(self.index.get("src/a.py")["holder"], "agent-2")
+
+    def test_expired_lock_is_inactive(self):
+        """Expired locks are not reported."""
+        self.acquire("src/a.py", "agent-1", minutes=-1)
+        self.assertIsNone(self.index.get("src/a.py"))
+        self.assertEqual(self.index.active_locks(), {})
+
+    def test_index_survives_new_instances(self):
+        """A second process sees the same table without rescanning."""
+        for i in range(50):
+            self.acquire(f"src/{i}.py", "agent-1")
+        self.index.refresh()
+
+        other = lock_index.LockIndex(self.swarm_dir)
+        try:
+            self.assertEqual(len(other.active_locks()), 50)
+        finally:
+            other.close()
+
+    def test_held_by(self):
+        """held_by lists paths whose latest record belongs to the holder."""
+        self.acquire("src/a.py", "agent-1")
+        self.acquire("src/b.py", "agent-1")
+        self.acquire("src/b.py", "agent-2")
+        self.acquire("src/c.py", "agent-1")
+        self.release("src/c.py", "agent-1")
+
+        self.assertEqual(self.index.held_by("agent-1"), ["src/a.py"])
+
+    def test_get_many(self):
+        """get_many returns the active locks among the requested paths."""
+        self.acquire("src/a.py", "agent-1")
+        self.acquire("src/b.py", "agent-2", minutes=-1)
+        self.acquire("src/c.py", "agent-1")
+        self.release("src/c.py", "agent-1")
+        self.acquire("src/d.py", "agent-2")
+
+        held = self.index.get_many(["src/a.py", "src/b.py", "src/c.py", "src/e.py"])
+        self.assertEqual(list(held), ["src/a.py"])
+        self.assertEqual(held["src/a.py"]["holder"], "agent-1")
+        self.assertEqual(self.index.get_many([]), {})
+
+    def reserve(self, pattern, holder, minutes=5):
+        """Append a reservation record."""
+        now = datetime.utcnow()
+        self.append(
+            {
+                "file_path": pattern,
+                "holder": holder,
+                "reason": "reserved for task",
+                "reservation": True,
+                "acquired_at": now.isoformat(),
+                "expires_at": (now + timedelta(minutes=minutes)).isoformat(),
+            }
+        )
+
+    def test_pattern_matching(self):
+        """Globs stay within directories except **; plain paths cover subtrees."""
+        cases = [
+            ("src/auth/**", "src/auth/login.py", True),
+            ("src/auth/**", "src/auth/oauth/google.py", True),
+            ("src/auth/**", "src/authz/login.py", False),
+            ("src/*.py", "src/app.py", True),
+            ("src/*.py", "src/api/app.py", False),
+            ("**/*.md", "README.md", True),
+            ("**/*.md", "docs/guide/intro.md", True),
+            ("src/[ab].py", "src/b.py", True),
+            ("./docs/", "docs/index.md", True),
+            ("docs", "docs", True),
+            ("docs", "docs2/index.md", False),
+        ]
+        for pattern, file_path, expected in cases:
+            self.assertEqual(
+                lock_index.pattern_matches(pattern, file_path), expected, (pattern, file_path)
+            )
+        self.assertEqual(lock_index.pattern_prefix("src/auth/**"), "src/auth/")
+        self.assertEqual(lock_index.pattern_prefix("**/*.md"), "")
+
+    def test_overlapping_patterns(self):
+        """Patterns overlap when one covers the other or ** spans a shared prefix."""
+        overlap = lock_index.patterns_overlap
+        self.assertTrue(overlap("src/auth/**", "src/auth/**"))
+        self.assertTrue(overlap("src", "src/auth/*.py"))
+        self.assertTrue(overlap("src/*.py", "src/app.py"))
+        self.assertTrue(overlap("**/*.md", "docs/**"))
+        self.assertFalse(overlap("src/*.py", "src/*.md"))
+        self.assertFalse(overlap("src/api/**", "src/ui/**"))
+
+    def test_covering_reservations(self):
+        """covering() finds active reservations whose pattern covers the path."""
+        self.reserve("src/auth/**", "agent-1")
+        self.reserve("src/*.py", "agent-2")
+        self.reserve("docs", "agent-3", minutes=-1)
+        self.acquire("src/auth/login.py", "agent-4")
+
+        holders = lambda path: sorted(r["holder"] for r in self.index.covering(path))
+        self.assertEqual(holders("src/auth/login.py"), ["agent-1"])
+        self.assertEqual(holders("src/main.py"), ["agent-2"])
+        self.assertEqual(holders("docs/index.md"), [])
+        self.assertEqual(holders("lib/util.py"), [])
+        self.assertEqual(list(self.index.reservations()), ["src/*.py", "src/auth/**"])
+
+        self.release("src/auth/**", "agent-1", reservation=True)
+        self.assertEqual(holders("src/auth/login.py"), [])
+        self.assertEqual(
+            self.index.covering_many(["src/auth/login.py", "src/main.py"]),
+            {"src/main.py": self.index.covering("src/main.py")},
+        )
+
+    def test_locks_leave_reservations_on_the_same_path(self):
+        """Locks and releases on a reserved plain path do not end the reservation."""
+        self.reserve("src/auth.py", "agent-1")
+        self.acquire("src/auth.py", "agent-1")
+        self.assertEqual(self.index.get("src/auth.py")["holder"], "agent-1")
+        self.release("src/auth.py", "agent-1")
+
+        self.assertIsNone(self.index.get("src/auth.py"))
+        self.assertEqual([r["holder"] for r in self.index.covering("src/auth.py")], ["agent-1"])
+        self.assertEqual(list(self.index.reservations("agent-1")), ["src/auth.py"])
+
+        self.release("src/auth.py", "agent-1", reservation=True)
+        self.assertEqual(self.index.covering("src/auth.py"), [])
+
+    def test_compaction_keeps_reservations_next_to_locks(self):
+        """Compaction keeps a reservation and a lock on the same path apart."""
+        import compact
+
+        self.reserve("docs", "agent-1")
+        self.acquire("docs", "agent-1")
+        self.reserve("src/auth.py", "agent-1")
+        self.acquire("src/auth.py", "agent-1")
+        self.release("src/auth.py", "agent-1")
+        compact.compact_log(self.locks_file, compact.FOLDERS["locks"])
+
+        records = [json.loads(line) for line in self.locks_file.open()]
+        self.assertEqual(
+            sorted((r["file_path"], bool(r.get("reservation"))) for r in records),
+            [("docs", False), ("docs", True), ("src/auth.py", True)],
+        )
+
+    def test_rotated_log_rebuilds_table(self):
+        """A replaced locks.jsonl is re-indexed from scratch."""
+        self.acquire("src/a.py", "agent-1")
+        self.acquire("src/b.py", "agent-1")
+        self.index.refresh()
+
+        rotated = self.swarm_dir / "locks.jsonl.new"
+        rotated.write_text("")
+        os.replace(rotated, self.locks_file)
+        self.acquire("src/c.py", "agent-3")
+
+        self.assertEqual(list(self.index.active_locks()), ["src/c.py"])
+
+
+if __name__ == "__main__":
+    unittest.main()
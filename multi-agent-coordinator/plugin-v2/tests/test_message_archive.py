@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""Tests for message retention and the message archive (message_archive.py)."""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "skills/swarm-coordinator/scripts"))
+
+import get_messages
+import message_archive
+import message_store
+from id_generator import RecordIndex
+from swarm_cache import SwarmCache
+
+NOW = datetime(2025, 6, 1)
+
+
+class TestRetention(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.swarm_dir = Path(self.test_dir) / ".claude/swarm"
+        self.swarm_dir.mkdir(parents=True, exist_ok=True)
+        get_messages.SWARM_DIR = self.swarm_dir
+        self.count = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def send(self, to, days_ago, now=NOW, msg_id=None):
+        self.count += 1
+        message = {
+            "id": msg_id or f"msg-{self.count:03d}",
+            "from": "x",
+            "to": to,
+            "subject": f"m{self.count}",
+            "body": "",
+            "timestamp": (now - timedelta(days=days_ago)).isoformat(),
+            "read": False,
+        }
+        message_store.append_message(self.swarm_dir, message)
+        return message["id"]
+
+    def prune(self, **limits):
+        return message_archive.apply_retention(self.swarm_dir, now=NOW.timestamp(), **limits)
+
+    def unread(self, agent_id):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return [m["id"] for m in get_messages.fetch_unread(agent_id, 100)["messages"]]
+
+    def test_age_and_count_caps(self):
+        ids = [self.send("agent-a", days) for days in (30, 20, 10, 5, 1, 0)]
+
+        self.assertEqual(self.prune(max_age_days=7), {"messages.jsonl": 3})
+        self.assertEqual(self.prune(max_age_days=7), {})
+        self.assertEqual(self.prune(max_count=2), {"messages.jsonl": 1})
+
+        live = [m["id"] for m in message_store.read_all(self.swarm_dir)]
+        self.assertEqual(live, ids[4:])
+        self.assertEqual([m["id"] for m in message_archive.query(self.swarm_dir)], ids[:4])
+        self.assertEqual(len(message_archive.segments(self.swarm_dir)), 2)
+
+    def test_no_limits_is_a_no_op(self):
+        self.send("agent-a", 100)
+        self.assertEqual(self.prune(max_age_days=0, max_count=0), {})
+        self.assertFalse(message_archive.archive_dir(self.swarm_dir).exists())
+
+    def test_read_cursors_survive_the_rewrite(self):
+        for days in (10, 9, 8):
+            self.send("agent-a", days)
+        self.unread("agent-a")
+        kept = [self.send("agent-a", days) for days in (2, 1)]
+        self.assertEqual(self.unread("agent-b"), [])
+
+        with SwarmCache(self.swarm_dir) as cache:
+            self.assertEqual(len(cache.get_messages_for_agent("agent-a", False)), 5)
+            self.assertEqual(self.prune(max_age_days=7), {"messages.jsonl": 3})
+            # The open cache drops the archived rows on its next query
+            self.assertEqual(len(cache.get_messages_for_agent("agent-a", False)), 2)
+
+        # Read mail stays read, unread mail stays unread
+        self.assertEqual(self.unread("agent-a"), kept)
+
+    def test_cursor_inside_the_archived_part(self):
+        self.send("agent-a", 10)
+        self.unread("agent-a")
+        old, new = self.send("agent-a", 9), self.send("agent-a", 1)
+        self.prune(max_age_days=7)
+        # The unread message that was archived is only in the archive now
+        self.assertEqual(self.unread("agent-a"), [new])
+        self.assertIn(old, [m["id"] for m in message_archive.query(self.swarm_dir, "agent-a")])
+
+    def test_archive_query_by_recipient_and_time(self):
+        message_store.migrate(self.swarm_dir)
+        sent = {(to, days): self.send(to, days) for to in ("agent-a", "agent-b", "all") for days in (30, 20, 10)}
+        self.send("agent-a", 0)
+        self.assertEqual(
+            self.prune(max_age_days=7),
+            {"inbox/agent-a.jsonl": 3, "inbox/agent-b.jsonl": 3, "inbox/all.jsonl": 3},
+        )
+
+        mail = [m["id"] for m in message_archive.query(self.swarm_dir, "agent-a")]
+        self.assertEqual(
+            sorted(mail), sorted(sent[(to, d)] for to in ("agent-a", "all") for d in (30, 20, 10))
+        )
+        window = message_archive.query(
+            self.swarm_dir, "agent-b", since=NOW - timedelta(days=25), until=NOW - timedelta(days=15)
+        )
+        self.assertEqual(
+            sorted(m["id"] for m in window), sorted([sent[("agent-b", 20)], sent[("all", 20)]])
+        )
+
+    def test_archive_is_compressed_and_lossless(self):
+        for i in range(200):
+            self.send("agent-a", 30)
+        before = (self.swarm_dir / "messages.jsonl").read_bytes()
+        self.prune(max_age_days=7)
+
+        (entry,) = message_archive.segments(self.swarm_dir)
+        segment = message_archive.archive_dir(self.swarm_dir) / entry["segment"]
+        self.assertLess(segment.stat().st_size, len(before) / 5)
+        archived = "".join(json.dumps(m) + "\n" for m in message_archive.query(self.swarm_dir))
+        self.assertEqual(archived.encode(), before)
+        self.assertEqual((self.swarm_dir / "messages.jsonl").read_bytes(), b"")
+
+    def test_archived_ids_stay_reserved(self):
+        message_store.migrate(self.swarm_dir)
+        archived = [self.send(to, 30) for to in ("agent-a", "all")]
+        live = self.send("agent-b", 0, msg_id=message_store.new_message_id(self.swarm_dir))
+        # agent-a's partition is pruned before the broadcast log is rewritten
+        self.assertEqual(list(self.prune(max_age_days=7)), ["inbox/agent-a.jsonl", "inbox/all.jsonl"])
+
+        ids = RecordIndex(message_store.id_log(self.swarm_dir)).ids()
+        self.assertTrue(set(archived + [live]) <= ids)
+
+    def test_compaction_applies_configured_retention(self):
+        import compact
+
+        now = datetime.utcnow()
+        self.send("agent-a", 30, now)
+        self.send("agent-a", 0, now)
+        previous = message_archive.RETENTION_DAYS
+        message_archive.RETENTION_DAYS = 7
+        argv = sys.argv
+        sys.argv = ["compact.py", "--auto", "--swarm-dir", str(self.swarm_dir)]
+        try:
+            with contextlib.redirect_stdout(io.StringIO()) as out:
+                compact.main()
+        finally:
+            sys.argv = argv
+            message_archive.RETENTION_DAYS = previous
+        self.assertIn("Archived 1 old message(s) from messages.jsonl", out.getvalue())
+        self.assertEqual(len(message_store.read_all(self.swarm_dir)), 1)
+
+    def test_retention_due_checks_oldest_message_and_count(self):
+        log = self.swarm_dir / "messages.jsonl"
+        self.send("agent-a", 3)
+        self.send("agent-a", 1)
+        due = lambda: message_archive.retention_due(log, now=NOW.timestamp())
+
+        with mock.patch.multiple(message_archive, RETENTION_DAYS=7, RETENTION_COUNT=0):
+            self.assertFalse(due())
+        with mock.patch.multiple(message_archive, RETENTION_DAYS=2, RETENTION_COUNT=0):
+            self.assertTrue(due())
+        with mock.patch.multiple(message_archive, RETENTION_DAYS=0, RETENTION_COUNT=2):
+            self.assertFalse(due())
+            self.send("agent-a", 0)
+            self.assertTrue(due())
+
+    def test_small_log_due_for_retention_triggers_compactor(self):
+        import compact
+
+        now = datetime.utcnow()
+        self.send("agent-a", 30, now)
+        self.send("agent-a", 0, now)
+        log = self.swarm_dir / "messages.jsonl"
+        self.assertLess(log.stat().st_size, compact.AUTO_COMPACT_BYTES)
+
+        with mock.patch.object(message_archive, "RETENTION_DAYS", 7):
+            with mock.patch.dict(os.environ, {"SWARM_MESSAGE_RETENTION_DAYS": "7"}):
+                compact.maybe_trigger_retention(self.swarm_dir, log)
+
+        marker = self.swarm_dir / ".cache" / "compact.pending"
+        deadline = time.time() + 10
+        while marker.exists() and time.time() < deadline:
+            time.sleep(0.05)
+
+        self.assertFalse(marker.exists())
+        self.assertEqual(len(message_store.read_all(self.swarm_dir)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
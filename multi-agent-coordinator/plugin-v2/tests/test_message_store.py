@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""Tests for the message storage layouts (message_store.py)"""
+
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import unittest
+from io import StringIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "skills/swarm-coordinator/scripts"))
+
+import complete_task
+import get_messages
+import message_store
+import send_message
+from swarm_cache import SwarmCache
+
+
+def _send_many(swarm_dir, writer, count):
+    """Send count messages from one process."""
+    send_message.SWARM_DIR = swarm_dir
+    os.environ["CLAUDE_AGENT_NAME"] = f"writer-{writer}"
+    sys.stdout = StringIO()
+    for i in range(count):
+        send_message.send_message(f"agent-{i % 3}", f"{writer}-{i}", "body")
+
+
+class TestMessageStore(unittest.TestCase):
+    def setUp(self):
+        """Create a temporary swarm directory."""
+        self.test_dir = tempfile.mkdtemp()
+        self.swarm_dir = Path(self.test_dir) / ".claude/swarm"
+        self.swarm_dir.mkdir(parents=True, exist_ok=True)
+
+        for module in (send_message, complete_task, get_messages):
+            module.SWARM_DIR = self.swarm_dir
+        os.environ["CLAUDE_AGENT_NAME"] = "Sender"
+
+        self.old_stdout = sys.stdout
+        sys.stdout = StringIO()
+
+    def tearDown(self):
+        """Clean up temporary directory."""
+        import shutil
+        sys.stdout = self.old_stdout
+        shutil.rmtree(self.test_dir)
+        os.environ.pop("CLAUDE_AGENT_NAME", None)
+
+    def read(self, relative):
+        path = self.swarm_dir / relative
+        return [json.loads(line) for line in path.read_text().splitlines()]
+
+    def inbox(self, agent_id, **kwargs):
+        """Subjects of the messages get_messages() shows agent_id."""
+        os.environ["CLAUDE_AGENT_NAME"] = agent_id
+        try:
+            return [m["subject"] for m in get_messages.get_messages(**kwargs)]
+        finally:
+            os.environ["CLAUDE_AGENT_NAME"] = "Sender"
+
+    def test_single_file_is_default(self):
+        """Without an inbox directory everything goes to messages.jsonl."""
+        send_message.send_message("agent-a", "hello", "body")
+        complete_task.complete_task("task-1")
+
+        self.assertFalse(message_store.is_partitioned(self.swarm_dir))
+        self.assertEqual([m["to"] for m in self.read("messages.jsonl")], ["agent-a", "all"])
+
+    def test_partitioned_routes_by_recipient(self):
+        """Direct messages and broadcasts go to separate inbox logs."""
+        message_store.migrate(self.swarm_dir)
+
+        send_message.send_message("agent-a", "direct", "body")
+        send_message.send_message("all", "broadcast", "body")
+        complete_task.complete_task("task-1")
+
+        self.assertFalse((self.swarm_dir / "messages.jsonl").exists())
+        self.assertEqual([m["subject"] for m in self.read("inbox/agent-a.jsonl")], ["direct"])
+        self.assertEqual(len(self.read("inbox/all.jsonl")), 2)
+
+    def test_partitioned_inbox_reads_only_own_logs(self):
+        """An agent's mail is its partition plus broadcasts, oldest first."""
+        message_store.migrate(self.swarm_dir)
+        send_message.send_message("agent-a", "first", "body")
+        send_message.send_message("agent-b", "not mine", "body")
+        send_message.send_message("all", "second", "body")
+        send_message.send_message("agent-a", "third", "body")
+
+        logs = message_store.inbox_logs(self.swarm_dir, "agent-a")
+        self.assertNotIn(self.swarm_dir / "inbox/agent-b.jsonl", logs)
+
+        self.assertEqual(self.inbox("agent-a", unread_only=True), ["third", "second", "first"])
+        self.assertEqual(self.inbox("agent-a", unread_only=True), [])
+
+    def test_partitioned_limit_advances_each_log(self):
+        """Paging through mail spread over two logs shows each message once."""
+        message_store.migrate(self.swarm_dir)
+        for i in range(5):
+            send_message.send_message("agent-a", f"direct-{i}", "body")
+            send_message.send_message("all", f"broadcast-{i}", "body")
+
+        seen = []
+        for _ in range(4):
+            seen.extend(reversed(self.inbox("agent-a", unread_only=True, limit=3)))
+
+        self.assertEqual(len(seen), 10)
+        self.assertEqual(sorted(seen), sorted(set(seen)))
+
+    def test_migration_moves_messages(self):
+        """Migration splits messages.jsonl by recipient and archives it."""
+        send_message.send_message("agent-a", "one", "body")
+        send_message.send_message("agent-b", "two", "body")
+        send_message.send_message("all", "three", "body")
+        before = self.read("messages.jsonl")
+
+        result = message_store.migrate(self.swarm_dir)
+
+        self.assertEqual(result, {"messages": 3, "partitions": 3})
+        self.assertTrue(message_store.is_partitioned(self.swarm_dir))
+        self.assertFalse((self.swarm_dir / "messages.jsonl").exists())
+        self.assertTrue((self.swarm_dir / "messages.jsonl.migrated").exists())
+        self.assertEqual(
+            sorted(m["id"] for m in message_store.read_all(self.swarm_dir)),
+            sorted(m["id"] for m in before),
+        )
+
+        # A second run is a no-op
+        self.assertEqual(message_store.migrate(self.swarm_dir)["messages"], 0)
+
+    def test_migration_keeps_read_positions(self):
+        """Mail read before the migration stays read after it."""
+        send_message.send_message("agent-a", "old direct", "body")
+        send_message.send_message("all", "old broadcast", "body")
+        self.inbox("agent-a", unread_only=True)
+        send_message.send_message("agent-a", "unread direct", "body")
+
+        message_store.migrate(self.swarm_dir)
+        send_message.send_message("all", "new broadcast", "body")
+
+        self.assertEqual(
+            self.inbox("agent-a", unread_only=True), ["new broadcast", "unread direct"]
+        )
+
+    def test_migrated_ids_are_not_reused(self):
+        """IDs of migrated messages are reserved for the new layout."""
+        send_message.send_message("agent-a", "one", "body")
+        migrated_id = self.read("messages.jsonl")[0]["id"]
+        message_store.migrate(self.swarm_dir)
+
+        from id_generator import RecordIndex
+
+        index = RecordIndex(message_store.partition_log(self.swarm_dir, "all"))
+        conn = index._connect()
+        try:
+            reserved = {row[0] for row in conn.execute("SELECT id FROM log_ids")}
+        finally:
+            conn.close()
+        self.assertIn(migrated_id, reserved)
+
+    def test_recipient_names_are_sanitized(self):
+        """A recipient cannot write outside the inbox directory."""
+        message_store.migrate(self.swarm_dir)
+        send_message.send_message("../../escape", "sneaky", "body")
+
+        self.assertEqual(len(list((self.swarm_dir / "inbox").glob("*.jsonl"))), 1)
+        self.assertFalse((Path(self.test_dir) / "escape.jsonl").exists())
+
+    def test_swarm_cache_reads_partitions(self):
+        """SwarmCache loads messages from the inbox logs."""
+        message_store.migrate(self.swarm_dir)
+        send_message.send_message("agent-a", "direct", "body")
+        send_message.send_message("all", "broadcast", "body")
+
+        cache = SwarmCache(self.swarm_dir)
+        subjects = [m["subject"] for m in cache.get_messages_for_agent("agent-a")]
+        self.assertEqual(sorted(subjects), ["broadcast", "direct"])
+
+    def test_migration_carries_reserved_ids(self):
+        """IDs handed out but not yet sent stay taken in the inbox layout."""
+        send_message.send_message("agent-a", "before", "body")
+        pending = message_store.new_message_id(self.swarm_dir)
+        logged = message_store.read_all(self.swarm_dir)[0]["id"]
+
+        message_store.migrate(self.swarm_dir)
+
+        from id_generator import RecordIndex
+
+        ids = RecordIndex(message_store.id_log(self.swarm_dir)).ids()
+        self.assertTrue({pending, logged} <= ids)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires fork")
+    def test_messages_sent_during_migration_are_not_lost(self):
+        """Senders racing with the migration end up in the inbox logs."""
+        ctx = multiprocessing.get_context("fork")
+        writers = [
+            ctx.Process(target=_send_many, args=(self.swarm_dir, w, 40)) for w in range(4)
+        ]
+        for proc in writers:
+            proc.start()
+        message_store.migrate(self.swarm_dir)
+        for proc in writers:
+            proc.join()
+
+        messages = message_store.read_all(self.swarm_dir)
+        self.assertEqual(len(messages), 160)
+        self.assertEqual(len({m["id"] for m in messages}), 160)
+
+
+if __name__ == "__main__":
+    unittest.main()
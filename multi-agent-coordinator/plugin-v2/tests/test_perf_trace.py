@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Tests for hook performance traces (perf_trace.py) and the perf view."""
+
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "skills/swarm-coordinator/scripts"))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import get_state
+import perf_trace
+from hooks import coordination
+
+
+def write_traces(swarm_dir: str, pid: int, count: int):
+    """Worker process: store count traces."""
+    for i in range(count):
+        perf_trace.write(Path(swarm_dir), {"event": "x", "writer": pid, "i": i, "tags": {}})
+
+
+class TestTraceRing(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.swarm_dir = Path(self.test_dir) / ".claude/swarm"
+        self.swarm_dir.mkdir(parents=True, exist_ok=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_ring_keeps_the_newest_traces_in_fixed_space(self):
+        previous, perf_trace.SLOTS = perf_trace.SLOTS, 4
+        try:
+            for i in range(10):
+                perf_trace.write(self.swarm_dir, {"event": "x", "i": i})
+        finally:
+            perf_trace.SLOTS = previous
+
+        self.assertEqual([r["i"] for r in perf_trace.read(self.swarm_dir)], [6, 7, 8, 9])
+        size = (self.swarm_dir / perf_trace.TRACE_FILE).stat().st_size
+        self.assertEqual(size, perf_trace.HEADER_BYTES + 4 * perf_trace.SLOT_BYTES)
+
+    def test_concurrent_writers_get_distinct_slots(self):
+        ctx = multiprocessing.get_context("fork")
+        workers = [
+            ctx.Process(target=write_traces, args=(str(self.swarm_dir), i, 50)) for i in range(4)
+        ]
+        for proc in workers:
+            proc.start()
+        for proc in workers:
+            proc.join(60)
+            self.assertEqual(proc.exitcode, 0)
+
+        records = perf_trace.read(self.swarm_dir)
+        self.assertEqual([r["seq"] for r in records], list(range(200)))
+        self.assertEqual(len({(r["writer"], r["i"]) for r in records}), 200)
+
+    def test_oversized_record_is_stored_without_tags(self):
+        perf_trace.write(self.swarm_dir, {"event": "x", "tags": {"big": "y" * 2000}})
+        self.assertEqual(perf_trace.read(self.swarm_dir)[0]["tags"], {})
+
+    def test_record_too_large_without_tags_is_kept_minimal(self):
+        phases = {f"phase-{i}": 1.5 for i in range(200)}
+        record = {"total_ms": 3.0, "phases": phases, "counters": {}, "tags": {}}
+        perf_trace.write(self.swarm_dir, dict(record, event="x"))
+        perf_trace.write(self.swarm_dir, dict(record, event="y", phases={}))
+
+        records = perf_trace.read(self.swarm_dir)
+        self.assertEqual([r["event"] for r in records], ["x", "y"])
+        self.assertEqual(records[0]["truncated"], True)
+        self.assertEqual((records[0]["total_ms"], records[0]["seq"]), (3.0, 0))
+        self.assertEqual(perf_trace.summarize(records)["x"]["total"]["count"], 1)
+
+    def test_summary_percentiles(self):
+        records = [
+            {
+                "event": "pre-tool-use",
+                "total_ms": float(ms),
+                "phases": {"check_locks": ms / 2},
+                "counters": {"bytes_read": 100},
+                "tags": {"lock": "acquired" if ms < 90 else "blocked"},
+            }
+            for ms in range(1, 101)
+        ]
+        summary = perf_trace.summarize(records)["pre-tool-use"]
+        self.assertEqual(summary["total"], {"count": 100, "p50": 50.0, "p95": 95.0, "p99": 99.0})
+        self.assertEqual(summary["phases"]["check_locks"]["p99"], 49.5)
+        self.assertEqual(summary["mean_counters"], {"bytes_read": 100.0})
+        self.assertEqual(summary["locks"], {"acquired": 89, "blocked": 11})
+
+
+class TestHookTraces(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.prev_cwd = os.getcwd()
+        os.chdir(self.test_dir)
+        self.swarm_dir = Path(".claude/swarm")
+        self.swarm_dir.mkdir(parents=True, exist_ok=True)
+        coordination.SWARM_DIR = self.swarm_dir
+        get_state.SWARM_DIR = self.swarm_dir
+
+    def tearDown(self):
+        perf_trace.ENABLED = False
+        os.chdir(self.prev_cwd)
+        shutil.rmtree(self.test_dir)
+        os.environ.pop("CLAUDE_AGENT_NAME", None)
+
+    def run_hook(self, agent_id, hook_event_name):
+        os.environ["CLAUDE_AGENT_NAME"] = agent_id
+        payload = {
+            "hook_event_name": hook_event_name,
+            "tool_name": "Edit",
+            "tool_input": {"file_path": "src/app.py"},
+            "tool_response": {"success": True},
+        }
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            coordination.main(json.dumps(payload))
+        return json.loads(out.getvalue())
+
+    def test_tracing_is_off_by_default(self):
+        self.assertFalse(perf_trace.ENABLED)
+        self.run_hook("agent-1", "PreToolUse")
+        self.assertFalse((self.swarm_dir / perf_trace.TRACE_FILE).exists())
+        self.assertIs(perf_trace.current(), perf_trace.NULL)
+
+    def test_hook_invocations_are_traced(self):
+        perf_trace.ENABLED = True
+        self.run_hook("agent-1", "PreToolUse")
+        # A lock taken outside this process, so the next hook has a tail to read
+        with open(self.swarm_dir / "locks.jsonl", "a") as f:
+            f.write(json.dumps({"file_path": "src/other.py", "holder": "agent-3"}) + "\n")
+        self.assertTrue(self.run_hook("agent-2", "PreToolUse")["block"])
+        self.run_hook("agent-1", "PostToolUse")
+        self.assertIs(perf_trace.current(), perf_trace.NULL)
+
+        records = perf_trace.read(self.swarm_dir)
+        self.assertEqual(
+            [r["event"] for r in records], ["pre-tool-use", "pre-tool-use", "post-tool-use"]
+        )
+        acquired, blocked, released = records
+        for phase in ("parse", "session", "daemon", "lease", "check_locks", "append", "serialize"):
+            self.assertIn(phase, acquired["phases"])
+        self.assertNotIn("append", blocked["phases"])
+        self.assertIn("release", released["phases"])
+        self.assertEqual(acquired["tags"]["lock"], "acquired")
+        self.assertEqual(blocked["tags"]["lock"], "blocked")
+        self.assertGreater(blocked["counters"]["bytes_read"], 0)
+        self.assertGreater(blocked["counters"]["records_scanned"], 0)
+
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            get_state.get_state("perf")
+        view = out.getvalue()
+        self.assertIn("### pre-tool-use (2 calls)", view)
+        self.assertIn("- check_locks: p50", view)
+        self.assertIn("- Locks: acquired 1, blocked 1", view)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""Tests for the bootstrap snapshot (snapshot.py) and its use at SessionStart."""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "skills/swarm-coordinator/scripts"))
+
+import get_messages
+import message_store
+import snapshot
+import swarm_cache
+from hooks import coordination
+from swarm_log import append_records
+
+
+def _task(task_id, priority=0, dependencies=()):
+    return {
+        "id": task_id,
+        "description": f"do {task_id}",
+        "priority": priority,
+        "dependencies": list(dependencies),
+        "created_at": "2025-01-01T00:00:00",
+    }
+
+
+def _lock(file_path, holder, minutes=5):
+    now = datetime.utcnow()
+    return {
+        "file_path": file_path,
+        "holder": holder,
+        "reason": "editing",
+        "acquired_at": now.isoformat(),
+        "expires_at": (now + timedelta(minutes=minutes)).isoformat(),
+    }
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.swarm_dir = Path(self.test_dir) / ".claude/swarm"
+        self.swarm_dir.mkdir(parents=True, exist_ok=True)
+        get_messages.SWARM_DIR = self.swarm_dir
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def append(self, name, *records):
+        append_records(self.swarm_dir / name, records)
+
+    def register(self, *agent_ids):
+        self.append(
+            "agents.jsonl", *({"id": a, "started_at": "2025-01-01T00:00:00"} for a in agent_ids)
+        )
+
+    def send(self, to):
+        message = {
+            "id": message_store.new_message_id(self.swarm_dir),
+            "from": "x",
+            "to": to,
+            "subject": "s",
+            "body": "",
+            "timestamp": datetime.utcnow().isoformat(),
+            "read": False,
+        }
+        message_store.append_message(self.swarm_dir, message)
+
+    def test_sections(self):
+        self.register("agent-1", "agent-2")
+        self.append(
+            "tasks.jsonl",
+            _task("task-1", 1),
+            _task("task-2", 5),
+            _task("task-3", 9, dependencies=["task-1"]),
+            _task("task-4", 3),
+            # Updates carry no status of the task definition
+            {"task_id": "task-4", "status": "claimed", "assigned_to": "agent-2"},
+        )
+        self.append(
+            "locks.jsonl",
+            dict(_lock("a.py", "agent-1"), reservation=True),
+            _lock("a.py", "agent-1"),
+            _lock("b.py", "agent-2", minutes=-1),
+        )
+        self.send("agent-1")
+        self.send("all")
+
+        snap = snapshot.load(self.swarm_dir)
+        self.assertEqual(sorted(snap["agents"]), ["agent-1", "agent-2"])
+        self.assertEqual([t["id"] for t in snap["ready"]], ["task-2", "task-1"])
+        self.assertEqual(snap["ready_total"], 2)
+        self.assertEqual(list(snap["locks"]), ["a.py"])
+        self.assertEqual(list(snap["reservations"]), ["a.py"])
+        self.assertEqual(snap["unread"], {"agent-1": 2, "agent-2": 1})
+        self.assertEqual(
+            snap["logs"]["tasks.jsonl"]["offset"], (self.swarm_dir / "tasks.jsonl").stat().st_size
+        )
+
+    def test_top_k(self):
+        self.append("tasks.jsonl", *(_task(f"task-{i:02d}", i) for i in range(30)))
+        with mock.patch.object(snapshot, "TOP_K", 3):
+            snap = snapshot.load(self.swarm_dir)
+        self.assertEqual([t["id"] for t in snap["ready"]], ["task-29", "task-28", "task-27"])
+        self.assertEqual(snap["ready_total"], 30)
+
+    def test_unchanged_logs_need_no_cache(self):
+        self.register("agent-1")
+        self.append("tasks.jsonl", _task("task-1"))
+        first = snapshot.load(self.swarm_dir)
+
+        with mock.patch.object(swarm_cache, "SwarmCache", side_effect=AssertionError):
+            self.assertEqual(snapshot.load(self.swarm_dir), first)
+
+    def test_only_moved_sections_are_topped_up(self):
+        self.register("agent-1")
+        self.append("tasks.jsonl", _task("task-1"))
+        now = time.time()
+        snapshot.load(self.swarm_dir, now=now)
+
+        self.append("tasks.jsonl", {"task_id": "task-1", "status": "claimed", "assigned_to": "a"})
+        written = snapshot.read_snapshot(self.swarm_dir)
+        self.assertEqual(snapshot.stale_sections(self.swarm_dir, written, now), {"ready"})
+        # Only the tasks log is read, for the section and its watermark alike
+        refreshed = set()
+        refresh = swarm_cache.SwarmCache.refresh
+
+        def spy(cache, *groups):
+            refreshed.update(groups or swarm_cache.GROUPS)
+            return refresh(cache, *groups)
+
+        with mock.patch.object(swarm_cache.SwarmCache, "agents", side_effect=AssertionError):
+            with mock.patch.object(swarm_cache.SwarmCache, "refresh", spy):
+                snap = snapshot.load(self.swarm_dir, now=now)
+        self.assertEqual(snap["ready"], [])
+        self.assertEqual(refreshed, {"tasks"})
+
+        # Locks expire without the log changing
+        later = now + snapshot.MAX_AGE_SECONDS + 1
+        self.assertEqual(
+            snapshot.stale_sections(self.swarm_dir, snap, later), {"locks", "reservations"}
+        )
+
+    def test_sections_not_asked_for_stay_as_written(self):
+        self.register("agent-1")
+        snapshot.load(self.swarm_dir)
+        self.register("agent-2")
+
+        snap = snapshot.load(self.swarm_dir, sections=("ready",))
+        self.assertEqual(list(snap["agents"]), ["agent-1"])
+        self.assertEqual(sorted(snapshot.load(self.swarm_dir)["agents"]), ["agent-1", "agent-2"])
+
+    def test_unread_follows_messages_and_cursors(self):
+        self.register("agent-1")
+        self.send("agent-1")
+        self.assertEqual(snapshot.load(self.swarm_dir)["unread"], {"agent-1": 1})
+
+        self.send("all")
+        self.assertEqual(snapshot.load(self.swarm_dir)["unread"], {"agent-1": 2})
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            get_messages.fetch_unread("agent-1")
+        self.assertEqual(snapshot.load(self.swarm_dir)["unread"], {"agent-1": 0})
+
+        # A new inbox layout is a new set of logs
+        message_store.migrate(self.swarm_dir)
+        self.send("agent-1")
+        snap = snapshot.load(self.swarm_dir)
+        self.assertEqual(snap["unread"], {"agent-1": 1})
+        self.assertIn("inbox/agent-1.jsonl", snap["logs"])
+        self.assertNotIn("messages.jsonl", snap["logs"])
+
+    def test_rotated_log_rebuilds_its_section(self):
+        self.append("tasks.jsonl", _task("task-1"), _task("task-2"))
+        snapshot.load(self.swarm_dir)
+        # Same size, different inode
+        tasks_file = self.swarm_dir / "tasks.jsonl"
+        replacement = tasks_file.with_name("tasks.new")
+        replacement.write_text(tasks_file.read_text().replace("task-1", "task-9"))
+        os.replace(replacement, tasks_file)
+        ready = snapshot.load(self.swarm_dir)["ready"]
+        self.assertEqual(sorted(t["id"] for t in ready), ["task-2", "task-9"])
+
+    def test_unusable_snapshot_is_rebuilt(self):
+        self.append("tasks.jsonl", _task("task-1"))
+        path = snapshot.snapshot_path(self.swarm_dir)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("{not json")
+        self.assertEqual(snapshot.load(self.swarm_dir)["ready_total"], 1)
+        self.assertEqual(json.loads(path.read_text())["version"], snapshot.SNAPSHOT_VERSION)
+
+
+class TestSessionStart(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.prev_cwd = os.getcwd()
+        os.chdir(self.test_dir)
+        self.swarm_dir = Path(".claude/swarm")
+        self.swarm_dir.mkdir(parents=True, exist_ok=True)
+        coordination.SWARM_DIR = self.swarm_dir
+
+    def tearDown(self):
+        os.chdir(self.prev_cwd)
+        shutil.rmtree(self.test_dir)
+
+    def start(self, agent_id):
+        coordinator = coordination.SwarmCoordinator(agent_id=agent_id, pid=os.getpid())
+        with mock.patch("liveness.start_session"):
+            return coordinator.handle_session_start({"session_id": "s"})["context_message"]
+
+    def test_lists_claimable_tasks_only(self):
+        append_records(
+            self.swarm_dir / "tasks.jsonl",
+            [
+                _task("task-1", 1),
+                _task("task-2", 5),
+                _task("task-3", 9, dependencies=["task-1"]),
+                {"task_id": "task-2", "status": "claimed", "assigned_to": "agent-1"},
+            ],
+        )
+        message = self.start("agent-2")
+        self.assertIn("(1 total)", message)
+        self.assertIn("`task-1`", message)
+        self.assertNotIn("`task-2`", message)
+        self.assertNotIn("`task-3`", message)
+
+    def test_later_sessions_read_the_snapshot(self):
+        append_records(self.swarm_dir / "tasks.jsonl", [_task("task-1")])
+        self.start("agent-1")
+        with mock.patch.object(swarm_cache, "SwarmCache", side_effect=AssertionError):
+            self.assertIn("`task-1`", self.start("agent-2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
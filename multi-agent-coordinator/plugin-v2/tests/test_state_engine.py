@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""Tests for task state folding (state_engine.py), the cache's ready queue and swarm_log.py"""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "skills/swarm-coordinator/scripts"))
+
+import state_engine
+import swarm_cache
+import swarm_log
+from swarm_cache import SwarmCache
+
+
+class TestTaskFold(unittest.TestCase):
+    def test_replays_definitions_and_updates(self):
+        """Definitions start pending and updates are merged in order."""
+        state = {}
+        for record in (
+            {"id": "task-001", "description": "A", "status": "ignored", "priority": 3},
+            {"task_id": "task-001", "agent_id": "agent-1", "status": "in_progress"},
+            {"task_id": "task-999", "status": "completed"},
+        ):
+            state_engine.apply_task_record(state, record)
+
+        self.assertEqual(list(state), ["task-001"])
+        self.assertEqual(state["task-001"]["status"], "in_progress")
+        self.assertEqual(state["task-001"]["agent_id"], "agent-1")
+
+    def test_compacted_record_is_the_full_state(self):
+        """A record written by compaction replaces the task as it stands."""
+        state = {}
+        state_engine.apply_task_record(state, {"id": "task-001", "priority": 1})
+        state_engine.apply_task_record(
+            state, {"id": "task-001", "status": "completed", "compacted": True}
+        )
+        self.assertEqual(state["task-001"], {"id": "task-001", "status": "completed"})
+
+    def test_claimable(self):
+        """Pending, unassigned tasks with completed dependencies are claimable."""
+        state = {
+            "a": {"id": "a", "status": "completed"},
+            "b": {"id": "b", "status": "pending", "dependencies": ["a"]},
+            "c": {"id": "c", "status": "pending", "dependencies": ["a", "b"]},
+            "d": {"id": "d", "status": "pending", "assigned_to": "x"},
+        }
+        claimable = [t for t in state if state_engine.is_claimable(state, state[t])]
+        self.assertEqual(claimable, ["b"])
+
+
+class TestReadyQueue(unittest.TestCase):
+    """The ready flag SwarmCache keeps on the tasks table."""
+
+    def setUp(self):
+        """Create a temporary swarm directory."""
+        self.test_dir = tempfile.mkdtemp()
+        self.swarm_dir = Path(self.test_dir) / ".claude/swarm"
+        self.swarm_dir.mkdir(parents=True, exist_ok=True)
+        self.tasks_file = self.swarm_dir / "tasks.jsonl"
+
+    def tearDown(self):
+        """Clean up temporary directory."""
+        import shutil
+        shutil.rmtree(self.test_dir)
+
+    def append(self, *records):
+        """Append records to tasks.jsonl."""
+        with open(self.tasks_file, "a") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+    def cache(self):
+        """Fresh cache, as a new process would open it."""
+        return SwarmCache(self.swarm_dir)
+
+    def test_orders_by_priority_then_created_at(self):
+        """Higher priority first, older first among equals."""
+        self.append(
+            {"id": "low", "priority": 1, "created_at": "2025-01-01T00:00:00"},
+            {"id": "new", "priority": 9, "created_at": "2025-01-03T00:00:00"},
+            {"id": "old", "priority": 9, "created_at": "2025-01-02T00:00:00"},
+        )
+
+        ids = [t["id"] for t in self.cache().available_tasks()]
+        self.assertEqual(ids, ["old", "new", "low"])
+
+    def test_claimed_tasks_leave_the_queue(self):
+        """A claimed task is skipped and the next one surfaces."""
+        self.append({"id": "a", "priority": 9}, {"id": "b", "priority": 1})
+        self.assertEqual(self.cache().next_available_task()["id"], "a")
+
+        self.append({"task_id": "a", "agent_id": "x", "status": "in_progress"})
+        self.assertEqual(self.cache().next_available_task()["id"], "b")
+
+        self.append({"task_id": "b", "agent_id": "y", "status": "in_progress"})
+        self.assertIsNone(self.cache().next_available_task())
+
+    def test_completion_unlocks_dependents(self):
+        """Dependents join the queue once every dependency is completed."""
+        self.append(
+            {"id": "a", "priority": 1},
+            {"id": "b", "priority": 1},
+            {"id": "c", "priority": 9, "dependencies": ["a", "b"]},
+        )
+        self.assertEqual(self.cache().next_available_task()["id"], "a")
+
+        self.append({"task_id": "a", "status": "completed"})
+        self.assertEqual([t["id"] for t in self.cache().available_tasks()], ["b"])
+
+        self.append({"task_id": "b", "status": "completed"})
+        self.assertEqual(self.cache().next_available_task()["id"], "c")
+
+    def test_dependency_defined_later(self):
+        """A dependency on a not-yet-defined task blocks until it completes."""
+        self.append({"id": "c", "dependencies": ["a"]})
+        self.assertIsNone(self.cache().next_available_task())
+
+        self.append({"id": "a"}, {"task_id": "a", "status": "completed"})
+        self.assertEqual(self.cache().next_available_task()["id"], "c")
+
+    def test_redefinition_moves_the_task(self):
+        """Redefining a queued task reorders it and re-checks its dependents."""
+        self.append(
+            {"id": "a", "priority": 1},
+            {"id": "b", "priority": 5},
+            {"id": "c", "dependencies": ["a"]},
+            {"task_id": "a", "status": "completed"},
+        )
+        self.assertEqual([t["id"] for t in self.cache().available_tasks()], ["b", "c"])
+
+        # Redefined: a is pending again (blocking c) and now outranks b
+        self.append({"id": "a", "priority": 9})
+        self.assertEqual([t["id"] for t in self.cache().available_tasks()], ["a", "b"])
+
+    def test_next_task_is_an_index_seek(self):
+        """Picking the next task reads the ready index, not every task."""
+        cache = self.cache()
+        plan = " ".join(
+            row[3]
+            for row in cache._connect().execute(
+                "EXPLAIN QUERY PLAN " + swarm_cache.AVAILABLE_TASKS_SQL, (1,)
+            )
+        )
+        self.assertIn("USING INDEX idx_tasks_ready (ready=?)", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_matches_full_scan(self):
+        """The queue agrees with a dependency check over every task."""
+        import random
+
+        rng = random.Random(5)
+        ids = []
+        for i in range(200):
+            task_id = f"task-{i:03d}"
+            deps = rng.sample(ids, min(len(ids), rng.randint(0, 2)))
+            self.append(
+                {
+                    "id": task_id,
+                    "priority": rng.randint(0, 10),
+                    "dependencies": deps,
+                    "created_at": f"2025-01-01T00:{i // 60:02d}:{i % 60:02d}",
+                }
+            )
+            ids.append(task_id)
+            if i % 3 == 0:
+                self.append({"task_id": rng.choice(ids), "status": "completed"})
+            if i % 5 == 0:
+                self.cache().next_available_task()
+
+        cache = self.cache()
+        state = cache.tasks()
+        expected = sorted(
+            (t for t in state.values() if state_engine.is_claimable(state, t)),
+            key=lambda t: (-t["priority"], t["created_at"]),
+        )
+        self.assertEqual(
+            [t["id"] for t in cache.available_tasks()], [t["id"] for t in expected]
+        )
+
+
+class TestReadAppended(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.log = Path(self.test_dir) / "log.jsonl"
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.test_dir)
+
+    def test_missing_file(self):
+        """Reading a missing log yields nothing and a fresh watermark."""
+        tail = swarm_log.read_appended(self.log)
+        self.assertEqual(tail.records, [])
+        self.assertFalse(tail.reset)
+        self.assertEqual(tail.watermark, swarm_log.new_watermark())
+
+    def test_deleted_file_reports_reset(self):
+        """A log that disappears after being read is reported as reset."""
+        self.log.write_text('{"a": 1}\n')
+        tail = swarm_log.read_appended(self.log)
+        self.log.unlink()
+
+        self.assertTrue(swarm_log.read_appended(self.log, tail.watermark).reset)
+
+    def test_skips_blank_lines(self):
+        """Blank lines are not records."""
+        self.log.write_text('{"a": 1}\n\n{"a": 2}\n')
+        tail = swarm_log.read_appended(self.log)
+        self.assertEqual(tail.records, [{"a": 1}, {"a": 2}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""Differential tests: SwarmCache against the JSONL replay (replay.py)"""
+
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "skills/swarm-coordinator/scripts"))
+
+import compact
+import message_store
+import replay
+from swarm_cache import SwarmCache
+from swarm_log import append_records, watermark_at
+
+TASK_IDS = [f"task-{i}" for i in range(10)]
+AGENTS = ["agent-a", "agent-b", "agent-c", "../odd agent"]
+FILES = [f"src/file_{i}.py" for i in range(6)]
+STATUSES = ["pending", "in_progress", "completed"]
+
+
+class RandomSwarm:
+    """Writes a random but well-formed event history into a swarm directory."""
+
+    def __init__(self, swarm_dir: Path, seed: int):
+        self.swarm_dir = swarm_dir
+        self.rng = random.Random(seed)
+        self.clock = datetime(2025, 1, 1)
+        self.now = datetime.utcnow()
+        self.message_count = 0
+
+    def tick(self) -> str:
+        """Non-decreasing timestamps, with ties."""
+        self.clock += timedelta(seconds=self.rng.choice([0, 0, 1, 2]))
+        return self.clock.isoformat()
+
+    def append(self, log: str, record):
+        append_records(self.swarm_dir / log, [record])
+
+    def define_task(self):
+        rng = self.rng
+        task = {
+            "id": rng.choice(TASK_IDS),
+            "description": f"work {rng.randrange(1000)}",
+            "files": rng.sample(FILES, rng.randrange(3)),
+            "dependencies": rng.sample(TASK_IDS + ["task-404"], rng.choice([0, 0, 1, 2])),
+            "created_at": rng.choice(["", "2025-01-01T00:00:00", "2025-01-02T00:00:00"]),
+        }
+        priority = rng.choice([None, 0, 1, 5, 10, "absent"])
+        if priority != "absent":
+            task["priority"] = priority
+        if rng.random() < 0.1:
+            task["assigned_to"] = rng.choice(AGENTS)
+        self.append("tasks.jsonl", task)
+
+    def update_task(self):
+        rng = self.rng
+        update = {"task_id": rng.choice(TASK_IDS + ["task-404"])}
+        if rng.random() < 0.8:
+            update["status"] = rng.choice(STATUSES)
+        if rng.random() < 0.6:
+            update["agent_id"] = rng.choice(AGENTS)
+        self.append("tasks.jsonl", update)
+
+    def agent_event(self):
+        rng = self.rng
+        agent_id = rng.choice(AGENTS)
+        roll = rng.random()
+        if roll < 0.55:
+            record = {"id": agent_id, "session_id": str(rng.randrange(100)), "started_at": self.tick()}
+        elif roll < 0.9:
+            record = {"id": agent_id, "terminated_at": self.tick(), "session_duration": 1}
+        else:
+            record = {"session_id": "no id"}
+        self.append("agents.jsonl", record)
+
+    def lock_event(self):
+        rng = self.rng
+        file_path = rng.choice(FILES)
+        holder = rng.choice(AGENTS)
+        roll = rng.random()
+        if roll < 0.55:
+            expires = self.now + timedelta(hours=rng.choice([-2, -1, 1, 2]))
+            record = {
+                "file_path": file_path,
+                "holder": holder,
+                "reason": "edit",
+                "acquired_at": self.tick(),
+                "expires_at": expires.isoformat(),
+            }
+        elif roll < 0.85:
+            record = {
+                "file_path": file_path,
+                "holder": holder,
+                "released_at": self.tick(),
+                "status": "released",
+            }
+        elif roll < 0.95:
+            record = {"file_path": file_path, "note": "no holder"}
+        else:
+            record = {"holder": holder}
+        if rng.random() < 0.3:
+            # A reservation on the same key space as the locks above
+            record["reservation"] = True
+        self.append("locks.jsonl", record)
+
+    def send_message(self):
+        rng = self.rng
+        self.message_count += 1
+        message_store.append_message(
+            self.swarm_dir,
+            {
+                "id": f"msg-{self.message_count}",
+                "from": rng.choice(AGENTS),
+                "to": rng.choice(AGENTS + ["all", "all"]),
+                "subject": f"subject {self.message_count}",
+                "body": "body",
+                "priority": rng.choice(["normal", "high"]),
+                "timestamp": self.tick(),
+                "read": rng.random() < 0.2,
+            },
+        )
+
+    def maintenance(self):
+        """Rotate a log the way the real tools do."""
+        rng = self.rng
+        roll = rng.random()
+        if roll < 0.3:
+            message_store.migrate(self.swarm_dir)
+        else:
+            name = rng.choice(list(compact.FOLDERS))
+            compact.compact_log(self.swarm_dir / f"{name}.jsonl", compact.FOLDERS[name])
+
+    def step(self):
+        rng = self.rng
+        roll = rng.random()
+        if roll < 0.2:
+            self.define_task()
+        elif roll < 0.4:
+            self.update_task()
+        elif roll < 0.5:
+            self.agent_event()
+        elif roll < 0.7:
+            self.lock_event()
+        elif roll < 0.98:
+            self.send_message()
+        else:
+            self.maintenance()
+
+
+class TestCacheMatchesReplay(unittest.TestCase):
+    SEEDS = range(20)
+    STEPS = 150
+    CHECKPOINT_EVERY = 25
+
+    def setUp(self):
+        """Create a temporary swarm directory."""
+        self.test_dir = tempfile.mkdtemp()
+        self.swarm_dir = Path(self.test_dir) / ".claude/swarm"
+        self.swarm_dir.mkdir(parents=True, exist_ok=True)
+
+    def tearDown(self):
+        """Clean up temporary directory."""
+        shutil.rmtree(self.test_dir)
+
+    def assert_same_state(self, cache: SwarmCache, now: datetime, context: str):
+        swarm_dir = self.swarm_dir
+
+        # Dict order is part of the replay's answer
+        self.assertEqual(
+            list(cache.tasks().items()), list(replay.replay_tasks(swarm_dir).items()), context
+        )
+        self.assertEqual(cache.available_tasks(), replay.replay_available_tasks(swarm_dir), context)
+        self.assertEqual(
+            list(cache.agents().items()), list(replay.replay_agents(swarm_dir).items()), context
+        )
+        self.assertEqual(cache.locks(now), replay.replay_locks(swarm_dir, now), context)
+        self.assertEqual(
+            cache.reservations(now), replay.replay_reservations(swarm_dir, now), context
+        )
+
+        for task_id in TASK_IDS:
+            self.assertEqual(cache.task(task_id), replay.replay_tasks(swarm_dir).get(task_id))
+
+        available = replay.replay_available_tasks(swarm_dir)
+        self.assertEqual(cache.next_available_task(), available[0] if available else None)
+
+    def assert_same_inbox(self, cache: SwarmCache, cursors, rng: random.Random, context: str):
+        """Compare every agent's inbox after its cursor, then move the cursor on."""
+        for agent_id in AGENTS:
+            cursor = cursors.setdefault(agent_id, {})
+            expected = replay.replay_inbox(self.swarm_dir, agent_id, cursor)
+            self.assertEqual(cache.inbox(agent_id, cursor), expected, f"{context} {agent_id}")
+
+            for key, tail in expected.items():
+                roll = rng.random()
+                if roll < 0.4:
+                    cursor[key] = tail.watermark
+                elif roll < 0.7 and tail.ends:
+                    end = rng.choice(tail.ends)
+                    cursor[key] = watermark_at(
+                        self.swarm_dir / key, tail.watermark["inode"], end
+                    )
+                elif roll < 0.75:
+                    # A position in a log that no longer exists
+                    cursor[key] = {"inode": 0, "offset": 7, "fingerprint": "00000000"}
+
+    def run_history(self, seed: int):
+        swarm = RandomSwarm(self.swarm_dir, seed)
+        rng = random.Random(seed + 1000)
+        incremental = SwarmCache(self.swarm_dir)
+        lagging = SwarmCache(self.swarm_dir)
+        cursors = {}
+        try:
+            for step in range(self.STEPS):
+                swarm.step()
+                if step % self.CHECKPOINT_EVERY == 0:
+                    context = f"seed {seed} step {step}"
+                    self.assert_same_state(incremental, swarm.now, context)
+                    self.assert_same_inbox(incremental, cursors, rng, context)
+
+            # One big incremental catch-up, and a cache built from scratch
+            context = f"seed {seed} end"
+            self.assert_same_state(lagging, swarm.now, context)
+            with SwarmCache(self.swarm_dir) as fresh:
+                fresh._rebuild_cache()
+                self.assert_same_state(fresh, swarm.now, context)
+                self.assert_same_inbox(fresh, cursors, rng, context)
+        finally:
+            incremental.close()
+            lagging.close()
+
+    def test_random_histories(self):
+        """Cached state equals the replay after every random history."""
+        for seed in self.SEEDS:
+            with self.subTest(seed=seed):
+                shutil.rmtree(self.swarm_dir)
+                self.swarm_dir.mkdir(parents=True)
+                self.run_history(seed)
+
+
+if __name__ == "__main__":
+    unittest.main()
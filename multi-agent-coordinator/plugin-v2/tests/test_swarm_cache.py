@@ -4,6 +4,9 @@
 import unittest
 import tempfile
 import json
+import os
+import sqlite3
+import threading
 import time
 from pathlib import Path
 from datetime import datetime, timedelta
@@ -14,6 +17,7 @@ sys.path.insert(
     0, str(Path(__file__).parent.parent / "skills/swarm-coordinator/scripts")
 )
 
+import message_store
 import swarm_cache
 
 
@@ -119,22 +123,21 @@ class TestSwarmCache(unittest.TestCase):
         self.assertTrue(cache.cache_dir.exists())
 
     def test_cache_rebuild_on_jsonl_change(self):
-        """Test that cache rebuilds when JSONL is newer."""
+        """Test that the cache picks up JSONL changes."""
         # Create initial cache
         cache = swarm_cache.SwarmCache(self.swarm_dir)
-        initial_mtime = cache.db_path.stat().st_mtime
-
-        # Wait a bit to ensure different mtime
-        time.sleep(0.1)
+        self.assertIsNone(cache.get_task_by_id("task-001"))
 
         # Update JSONL file
         self.create_sample_tasks()
 
-        # Create new cache instance - should rebuild
+        # Both the open cache and a new instance see the new tasks
         cache2 = swarm_cache.SwarmCache(self.swarm_dir)
-        new_mtime = cache2.db_path.stat().st_mtime
+        self.assertIsNotNone(cache2.get_task_by_id("task-001"))
+        self.assertIsNotNone(cache.get_task_by_id("task-002"))
 
-        self.assertGreater(new_mtime, initial_mtime, "Cache should be rebuilt")
+        watermark = cache2._watermarks(cache2._connect())["tasks.jsonl"]
+        self.assertEqual(watermark["offset"], (self.swarm_dir / "tasks.jsonl").stat().st_size)
 
     def test_get_available_tasks_empty(self):
         """Test getting available tasks from empty cache."""
@@ -149,13 +152,35 @@ class TestSwarmCache(unittest.TestCase):
 
         tasks = cache.get_available_tasks()
 
-        # Only task-002 should be available (task-001 is in_progress)
+        # task-001 is in_progress and task-002 waits for it
+        self.assertEqual(len(tasks), 0)
+
+        # Completing task-001 unblocks task-002
+        with open(self.swarm_dir / "tasks.jsonl", "a") as f:
+            f.write(json.dumps({"task_id": "task-001", "status": "completed"}) + "\n")
+
+        time.sleep(0.01)
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+        tasks = cache.get_available_tasks()
+
         self.assertEqual(len(tasks), 1)
         self.assertEqual(tasks[0]["id"], "task-002")
         self.assertEqual(tasks[0]["description"], "Test task 2")
         self.assertIsInstance(tasks[0]["files"], list)
         self.assertIsInstance(tasks[0]["dependencies"], list)
 
+    def test_get_available_tasks_unknown_dependency(self):
+        """Test that a dependency on an unknown task keeps the task blocked."""
+        tasks_file = self.swarm_dir / "tasks.jsonl"
+        with open(tasks_file, "w") as f:
+            f.write(json.dumps({"id": "task-001", "dependencies": ["task-404"]}) + "\n")
+            f.write(json.dumps({"id": "task-002", "dependencies": []}) + "\n")
+
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+        tasks = cache.get_available_tasks()
+
+        self.assertEqual([t["id"] for t in tasks], ["task-002"])
+
     def test_get_task_by_id(self):
         """Test getting specific task by ID."""
         self.create_sample_tasks()
@@ -393,6 +418,400 @@ class TestSwarmCache(unittest.TestCase):
         self.assertEqual(tasks[1]["id"], "task-003")  # Priority 5
         self.assertEqual(tasks[2]["id"], "task-001")  # Priority 2
 
+    def test_terminated_agent_is_dropped(self):
+        """A termination record removes the agent instead of overwriting it."""
+        agents_file = self.swarm_dir / "agents.jsonl"
+        with open(agents_file, "w") as f:
+            f.write(json.dumps({"id": "agent-1", "started_at": "2025-01-01T00:00:00"}) + "\n")
+            f.write(json.dumps({"id": "agent-2", "started_at": "2025-01-01T00:00:00"}) + "\n")
+            f.write(json.dumps({"id": "agent-1", "terminated_at": "2025-01-01T01:00:00"}) + "\n")
+
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+
+        self.assertEqual(list(cache.agents()), ["agent-2"])
+        self.assertEqual([a["id"] for a in cache.get_active_agents()], ["agent-2"])
+
+    def test_released_lock_is_dropped(self):
+        """A release record removes the lock; a later acquire brings it back."""
+        future = (datetime.utcnow() + timedelta(minutes=5)).isoformat()
+        acquire = {"file_path": "src/a.py", "holder": "agent-1", "expires_at": future}
+        locks_file = self.swarm_dir / "locks.jsonl"
+        with open(locks_file, "w") as f:
+            f.write(json.dumps(acquire) + "\n")
+            f.write(
+                json.dumps({"file_path": "src/a.py", "holder": "agent-1", "status": "released"})
+                + "\n"
+            )
+
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+        self.assertEqual(cache.locks(), {})
+        self.assertEqual(cache.get_active_locks(), [])
+
+        with open(locks_file, "a") as f:
+            f.write(json.dumps({**acquire, "holder": "agent-2"}) + "\n")
+        self.assertEqual(cache.locks()["src/a.py"]["holder"], "agent-2")
+
+    def test_connection_is_reused(self):
+        """Queries on one cache share a connection per thread."""
+        self.create_sample_tasks()
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+        conn = cache._connect()
+
+        cache.get_available_tasks()
+        cache.get_task_by_id("task-001")
+        self.assertIs(cache._connect(), conn)
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(cache._connect()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], conn)
+
+        cache.close()
+        self.assertIsNot(cache._connect(), conn)
+
+    def test_pragmas_applied(self):
+        """Connections are tuned for a small, hot, local cache."""
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+        conn = cache._connect()
+
+        self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+        self.assertEqual(conn.execute("PRAGMA temp_store").fetchone()[0], 2)  # MEMORY
+        self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -16000)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_read_only_mode(self):
+        """A read-only cache answers queries but never writes."""
+        self.create_sample_tasks()
+        with swarm_cache.SwarmCache(self.swarm_dir) as writer:
+            writer.refresh()
+
+        reader = swarm_cache.SwarmCache(self.swarm_dir, read_only=True)
+        self.assertEqual(reader.get_task_by_id("task-001")["status"], "in_progress")
+
+        with self.assertRaises(sqlite3.OperationalError):
+            reader._connect().execute("DELETE FROM tasks")
+
+        # New log lines are only seen once a writer has ingested them
+        with open(self.swarm_dir / "tasks.jsonl", "a") as f:
+            f.write(json.dumps({"id": "task-003"}) + "\n")
+        self.assertIsNone(reader.get_task_by_id("task-003"))
+        swarm_cache.SwarmCache(self.swarm_dir).refresh()
+        self.assertIsNotNone(reader.get_task_by_id("task-003"))
+
+    def test_read_only_requires_existing_cache(self):
+        """There is nothing to read before a writer created the cache."""
+        with self.assertRaises(FileNotFoundError):
+            swarm_cache.SwarmCache(self.swarm_dir, read_only=True)
+
+
+class TestSwarmCacheRefresh(unittest.TestCase):
+    """Incremental ingestion of appended log lines."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.swarm_dir = Path(self.test_dir) / ".claude/swarm"
+        self.swarm_dir.mkdir(parents=True, exist_ok=True)
+
+    def tearDown(self):
+        import shutil
+
+        shutil.rmtree(self.test_dir)
+
+    def append(self, name, *records, mode="a"):
+        with open(self.swarm_dir / name, mode) as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+    def message(self, msg_id, to="agent-a"):
+        return {"id": msg_id, "from": "x", "to": to, "subject": msg_id, "timestamp": msg_id}
+
+    def rows(self, cache, table):
+        conn = sqlite3.connect(cache.db_path)
+        try:
+            return sorted(conn.execute(f"SELECT * FROM {table}").fetchall())
+        finally:
+            conn.close()
+
+    def tamper(self, cache, sql):
+        conn = sqlite3.connect(cache.db_path)
+        conn.execute(sql)
+        conn.commit()
+        conn.close()
+
+    def test_refresh_reads_only_appended_lines(self):
+        """Rows ingested earlier are not re-inserted on the next refresh."""
+        self.append("tasks.jsonl", {"id": "task-001", "description": "original"})
+        self.append("messages.jsonl", self.message("msg-1"))
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+        cache.refresh()
+
+        # If the refresh reloaded everything, the marker would be overwritten
+        self.tamper(cache, "UPDATE tasks SET description = 'marker'")
+        self.append("messages.jsonl", self.message("msg-2"))
+        self.append("tasks.jsonl", {"id": "task-002"})
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+
+        self.assertEqual(cache.get_task_by_id("task-001")["description"], "marker")
+        self.assertIsNotNone(cache.get_task_by_id("task-002"))
+        self.assertEqual(len(cache.get_messages_for_agent("agent-a")), 2)
+
+    def test_queries_refresh_only_their_tables(self):
+        """Task and inbox queries leave the message traffic unread."""
+        self.append("tasks.jsonl", {"id": "task-001"})
+        self.append("messages.jsonl", self.message("msg-1"))
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+
+        self.assertEqual(cache.next_available_task()["id"], "task-001")
+        self.assertIsNotNone(cache.task("task-001"))
+        self.assertEqual(len(cache.inbox("agent-a")["messages.jsonl"].records), 1)
+        self.assertEqual(self.rows(cache, "messages"), [])
+
+        self.assertEqual(len(cache.get_messages_for_agent("agent-a")), 1)
+        self.assertEqual(len(self.rows(cache, "messages")), 1)
+
+    def test_updates_rewrite_touched_tasks(self):
+        """A status update refreshes the row of the task it names."""
+        self.append("tasks.jsonl", {"id": "task-001"}, {"id": "task-002"})
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+
+        self.append("tasks.jsonl", {"task_id": "task-002", "agent_id": "a", "status": "in_progress"})
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+
+        self.assertEqual(cache.get_task_by_id("task-002")["status"], "in_progress")
+        self.assertEqual(cache.get_task_by_id("task-002")["assigned_to"], "a")
+        self.assertEqual([t["id"] for t in cache.get_available_tasks()], ["task-001"])
+
+    def test_truncation_rebuilds_table(self):
+        """A rewritten, shorter log replaces the rows it fed."""
+        self.append("messages.jsonl", self.message("msg-1"), self.message("msg-2"))
+        self.append("tasks.jsonl", {"id": "task-001"})
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+
+        self.append("messages.jsonl", self.message("msg-3"), mode="w")
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+
+        self.assertEqual([m["id"] for m in cache.get_messages_for_agent("agent-a")], ["msg-3"])
+        self.assertIsNotNone(cache.get_task_by_id("task-001"))
+
+    def test_rotation_rebuilds_table(self):
+        """A log replaced by rename (e.g. compaction) is re-ingested."""
+        self.append(
+            "locks.jsonl",
+            {"file_path": "a.py", "holder": "x", "expires_at": "2999-01-01T00:00:00"},
+            {"file_path": "b.py", "holder": "x", "expires_at": "2999-01-01T00:00:00"},
+        )
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+
+        rotated = self.swarm_dir / "locks.jsonl.new"
+        rotated.write_text(
+            json.dumps({"file_path": "b.py", "holder": "x", "expires_at": "2999-01-01T00:00:00"})
+            + "\n"
+        )
+        os.replace(rotated, self.swarm_dir / "locks.jsonl")
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+
+        self.assertEqual([l["file_path"] for l in cache.get_active_locks()], ["b.py"])
+
+    def test_reservation_survives_lock_on_same_path(self):
+        """The holder's own lock and release on a reserved path keep the reservation."""
+        lock = {"file_path": "src/auth.py", "holder": "a", "expires_at": "2999-01-01T00:00:00"}
+        self.append(
+            "locks.jsonl",
+            dict(lock, reservation=True, task_id="task-1"),
+            lock,
+            {"file_path": "src/auth.py", "holder": "a", "status": "released"},
+        )
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+
+        self.assertEqual(cache.locks(), {})
+        self.assertEqual(list(cache.reservations()), ["src/auth.py"])
+        self.assertEqual(
+            [(l["file_path"], l["reservation"]) for l in cache.get_active_locks()],
+            [("src/auth.py", True)],
+        )
+
+    def test_message_migration_rebuilds_messages(self):
+        """Switching to inbox logs re-ingests messages without duplicates."""
+        import message_store
+
+        self.append("messages.jsonl", self.message("msg-1"), self.message("msg-2", to="all"))
+        swarm_cache.SwarmCache(self.swarm_dir)
+
+        message_store.migrate(self.swarm_dir)
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+
+        self.assertEqual(
+            sorted(m["id"] for m in cache.get_messages_for_agent("agent-a")), ["msg-1", "msg-2"]
+        )
+
+    def test_old_schema_is_replaced(self):
+        """A cache written by an older version is dropped and re-ingested."""
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+        self.tamper(cache, "PRAGMA user_version = 1")
+        self.tamper(cache, "INSERT INTO tasks (id, status) VALUES ('ghost', 'pending')")
+
+        self.append("tasks.jsonl", {"id": "task-001"})
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+
+        self.assertIsNone(cache.get_task_by_id("ghost"))
+        self.assertIsNotNone(cache.get_task_by_id("task-001"))
+
+    def test_incremental_matches_full_rebuild(self):
+        """Refreshing after every append ends where a rebuild ends."""
+        import random
+
+        rng = random.Random(11)
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+        for i in range(60):
+            choice = rng.randrange(4)
+            if choice == 0:
+                self.append("tasks.jsonl", {"id": f"task-{i}", "priority": rng.randrange(5)})
+            elif choice == 1:
+                self.append("tasks.jsonl", {"task_id": f"task-{rng.randrange(i + 1)}", "status": "completed"})
+            elif choice == 2:
+                self.append("messages.jsonl", self.message(f"msg-{i}", rng.choice(["agent-a", "all"])))
+            else:
+                self.append(
+                    "locks.jsonl",
+                    {"file_path": f"f{rng.randrange(5)}.py", "holder": "x", "expires_at": "2999-01-01T00:00:00"},
+                )
+            if rng.random() < 0.5:
+                cache = swarm_cache.SwarmCache(self.swarm_dir)
+                cache.refresh()
+
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+        cache.refresh()
+        incremental = {t: self.rows(cache, t) for t in ("tasks", "messages", "locks", "agents")}
+        cache._rebuild_cache()
+        rebuilt = {t: self.rows(cache, t) for t in ("tasks", "messages", "locks", "agents")}
+
+        self.assertEqual(incremental, rebuilt)
+
+
+class TestMessagePages(unittest.TestCase):
+    """Time-ordered message pages with keyset cursors."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.swarm_dir = Path(self.test_dir) / ".claude/swarm"
+        self.swarm_dir.mkdir(parents=True, exist_ok=True)
+        self.start = datetime(2025, 1, 1)
+        self.count = 0
+
+    def tearDown(self):
+        import shutil
+
+        shutil.rmtree(self.test_dir)
+
+    def send(self, to, read=False, seconds=None):
+        self.count += 1
+        seconds = self.count if seconds is None else seconds
+        with open(self.swarm_dir / "messages.jsonl", "a") as f:
+            f.write(
+                json.dumps(
+                    {
+                        "id": f"msg-{self.count}",
+                        "from": "x",
+                        "to": to,
+                        "subject": "",
+                        "timestamp": (self.start + timedelta(seconds=seconds)).isoformat(),
+                        "read": read,
+                    }
+                )
+                + "\n"
+            )
+        return f"msg-{self.count}"
+
+    def pages(self, cache, agent_id, size, **kwargs):
+        pages, before = [], None
+        while True:
+            page, before = cache.message_page(agent_id, None, size, before, **kwargs)
+            pages.append([m["id"] for m in page])
+            if before is None:
+                return pages
+
+    def test_pages_walk_newest_first(self):
+        mine = [self.send("agent-a" if i % 4 else "all") for i in range(25)]
+        for _ in range(10):
+            self.send("agent-b")
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+
+        pages = self.pages(cache, "agent-a", 10)
+        self.assertEqual([len(p) for p in pages], [10, 10, 5])
+        self.assertEqual(sum(pages, []), mine[::-1])
+
+    def test_pages_are_stable_while_messages_arrive(self):
+        for _ in range(6):
+            self.send("agent-a")
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+        first, before = cache.message_page("agent-a", None, 3)
+        self.send("agent-a")
+        second, before = cache.message_page("agent-a", None, 3, before)
+        self.assertEqual([m["id"] for m in first + second], [f"msg-{i}" for i in range(6, 0, -1)])
+
+    def test_order_is_by_time_not_text(self):
+        # ISO timestamps with and without microseconds do not sort as text
+        late = self.send("agent-a", seconds=1.5)
+        early = self.send("agent-a", seconds=1)
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+        self.assertEqual([m["id"] for m in cache.get_messages_for_agent("agent-a")], [late, early])
+
+    def test_since_and_unread_filters(self):
+        for i in range(10):
+            self.send("agent-a", read=i % 2 == 0)
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+        since = self.start + timedelta(seconds=5)
+        self.assertEqual(
+            [m["id"] for m in cache.get_messages_for_agent("agent-a", since=since)],
+            ["msg-10", "msg-8", "msg-6"],
+        )
+        self.assertEqual(
+            self.pages(cache, "agent-a", 2, since=since),
+            [["msg-10", "msg-9"], ["msg-8", "msg-7"], ["msg-6", "msg-5"], []],
+        )
+
+    def test_unread_is_past_the_read_cursor(self):
+        for _ in range(3):
+            self.send("agent-a")
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+        cursor = {key: tail.watermark for key, tail in cache.inbox("agent-a").items()}
+        cursor_dir = self.swarm_dir / message_store.CURSOR_DIR
+        cursor_dir.mkdir(parents=True)
+        (cursor_dir / "agent-a.json").write_text(json.dumps(cursor))
+        self.send("agent-a")
+        self.send("all")
+
+        self.assertEqual(
+            [m["id"] for m in cache.get_messages_for_agent("agent-a")], ["msg-5", "msg-4"]
+        )
+        self.assertEqual(len(cache.get_messages_for_agent("agent-a", unread_only=False)), 5)
+        page, _ = cache.message_page("agent-a", cursor, 1)
+        self.assertEqual([m["id"] for m in page], ["msg-5"])
+
+        # A cursor into a log that was since replaced leaves all of it unread
+        stale = {key: dict(mark, inode=mark["inode"] + 1) for key, mark in cursor.items()}
+        self.assertEqual(len(cache.message_page("agent-a", stale)[0]), 5)
+
+    def test_broadcast_reader_sees_each_message_once(self):
+        for _ in range(3):
+            self.send("all")
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+        self.assertEqual(len(cache.get_messages_for_agent(message_store.BROADCAST)), 3)
+
+    def test_query_uses_the_recipient_time_index(self):
+        self.send("agent-a")
+        cache = swarm_cache.SwarmCache(self.swarm_dir)
+        plan = " ".join(
+            row[3]
+            for row in cache._connect().execute(
+                "EXPLAIN QUERY PLAN " + swarm_cache.MESSAGES_FOR_AGENT_SQL,
+                swarm_cache.messages_for_agent_params("agent-a", {"messages.jsonl": 0}, 20),
+            )
+        )
+        self.assertEqual(plan.count("USING INDEX idx_messages_to_time"), 2)
+        self.assertNotIn("SCAN messages", plan)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""Tests for crash-safe appends and torn-line recovery in swarm_log.py."""
+
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "skills/swarm-coordinator/scripts"))
+
+import swarm_log
+from lock_index import LockIndex
+from swarm_cache import SwarmCache
+
+
+def _lock(file_path, holder, payload=""):
+    now = datetime.utcnow()
+    return {
+        "file_path": file_path,
+        "holder": holder,
+        "reason": "editing",
+        "acquired_at": now.isoformat(),
+        "expires_at": (now + timedelta(minutes=5)).isoformat(),
+        "payload": payload,
+        "size": len(payload),
+    }
+
+
+def _die_mid_append(locks_file: str):
+    """Append one record, then crash half-way through writing the next."""
+    swarm_log.append_records(Path(locks_file), [_lock("src/a.py", "agent-1")])
+    real_write = os.write
+
+    def torn_write(fd, data):
+        real_write(fd, data[: len(data) // 2])
+        os.kill(os.getpid(), signal.SIGKILL)
+
+    with mock.patch.object(swarm_log.os, "write", torn_write):
+        swarm_log.append_records(Path(locks_file), [_lock("src/b.py", "agent-1")])
+
+
+def _append_forever(locks_file: str, writer: int):
+    """Append large records until killed."""
+    for i in range(10**6):
+        payload = "x" * random.randrange(1, 256 * 1024)
+        swarm_log.append_records(Path(locks_file), [_lock(f"w{writer}/{i}.py", "a", payload)])
+
+
+class TestTornLines(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.swarm_dir = Path(self.test_dir) / ".claude/swarm"
+        self.swarm_dir.mkdir(parents=True, exist_ok=True)
+        self.locks_file = self.swarm_dir / "locks.jsonl"
+        swarm_log._quarantined.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def quarantined(self, path):
+        target = swarm_log.quarantine_log(path)
+        if not target.exists():
+            return []
+        return [json.loads(line) for line in target.read_text().splitlines()]
+
+    def test_writer_killed_mid_append(self):
+        ctx = multiprocessing.get_context("fork")
+        proc = ctx.Process(target=_die_mid_append, args=(str(self.locks_file),))
+        proc.start()
+        proc.join(30)
+        self.assertEqual(proc.exitcode, -signal.SIGKILL)
+        self.assertFalse(self.locks_file.read_bytes().endswith(b"\n"))
+
+        # The next append terminates the torn line instead of joining it
+        swarm_log.append_records(self.locks_file, [_lock("src/c.py", "agent-2")])
+
+        records = swarm_log.read_appended(self.locks_file).records
+        self.assertEqual([r["file_path"] for r in records], ["src/a.py", "src/c.py"])
+        (entry,) = self.quarantined(self.locks_file)
+        self.assertTrue(entry["line"].startswith('{"file_path": "src/b.py"'))
+        self.assertEqual(entry["inode"], self.locks_file.stat().st_ino)
+
+        # Every reader of the swarm keeps working
+        with SwarmCache(self.swarm_dir) as cache:
+            self.assertEqual(sorted(cache.locks()), ["src/a.py", "src/c.py"])
+        index = LockIndex(self.swarm_dir)
+        try:
+            self.assertEqual(index.get("src/c.py")["holder"], "agent-2")
+            self.assertIsNone(index.get("src/b.py"))
+        finally:
+            index.close()
+
+    def test_trailing_partial_record_waits_for_its_end(self):
+        line = json.dumps(_lock("src/b.py", "agent-1"))
+        swarm_log.append_records(self.locks_file, [_lock("src/a.py", "agent-1")])
+        with open(self.locks_file, "a") as f:
+            f.write(line[:20])
+
+        tail = swarm_log.read_appended(self.locks_file)
+        self.assertEqual(len(tail.records), 1)
+        self.assertEqual(self.quarantined(self.locks_file), [])
+
+        with open(self.locks_file, "a") as f:
+            f.write(line[20:] + "\n")
+        self.assertEqual(
+            swarm_log.read_appended(self.locks_file, tail.watermark).records[0]["file_path"],
+            "src/b.py",
+        )
+
+    def test_corrupt_line_is_quarantined_once(self):
+        tasks_file = self.swarm_dir / "tasks.jsonl"
+        first = json.dumps({"id": "task-1", "description": "a", "status": "pending"}) + "\n"
+        torn = '{"id": "task-2", "descr\n'
+        with open(tasks_file, "w") as f:
+            f.write(first)
+            f.write(torn)
+            f.write("[1, 2]\n")
+            f.write(json.dumps({"id": "task-3", "description": "c", "status": "pending"}) + "\n")
+
+        self.assertEqual(sorted(SwarmCache(self.swarm_dir).tasks()), ["task-1", "task-3"])
+        tail = swarm_log.read_appended(tasks_file, with_ends=True)
+        self.assertEqual([r["id"] for r in tail.records], ["task-1", "task-3"])
+        self.assertEqual(tail.ends[-1], tasks_file.stat().st_size)
+
+        # Another process reading the same log adds nothing
+        swarm_log._quarantined.clear()
+        with SwarmCache(self.swarm_dir) as cache:
+            self.assertEqual(sorted(cache.tasks()), ["task-1", "task-3"])
+        self.assertEqual(
+            [e["offset"] for e in self.quarantined(tasks_file)],
+            [len(first), len(first) + len(torn)],
+        )
+
+    def test_random_kills_never_break_readers(self):
+        ctx = multiprocessing.get_context("fork")
+        rng = random.Random(0)
+        for _ in range(20):
+            writers = [
+                ctx.Process(target=_append_forever, args=(str(self.locks_file), i))
+                for i in range(3)
+            ]
+            for proc in writers:
+                proc.start()
+            time.sleep(rng.uniform(0.005, 0.05))
+            for proc in writers:
+                os.kill(proc.pid, signal.SIGKILL)
+            for proc in writers:
+                proc.join(30)
+
+        records = swarm_log.read_appended(self.locks_file).records
+        self.assertGreater(len(records), 0)
+        for record in records:
+            self.assertEqual(len(record["payload"]), record["size"])
+        with SwarmCache(self.swarm_dir) as cache:
+            self.assertEqual(len(cache.locks()), len({r["file_path"] for r in records}))
+
+
+class TestAppends(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.log = Path(self.test_dir) / "locks.jsonl"
+        swarm_log._unsynced.clear()
+
+    def tearDown(self):
+        swarm_log._unsynced.clear()
+        shutil.rmtree(self.test_dir)
+
+    def test_batch_is_one_write(self):
+        with mock.patch.object(swarm_log.os, "write", wraps=os.write) as write:
+            swarm_log.append_records(self.log, [_lock(f"{i}.py", "a") for i in range(50)])
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(len(swarm_log.read_appended(self.log).records), 50)
+
+    def test_short_write_is_completed(self):
+        real_write = os.write
+        with mock.patch.object(
+            swarm_log.os, "write", side_effect=lambda fd, data: real_write(fd, data[:100])
+        ):
+            swarm_log.append_records(self.log, [_lock(f"{i}.py", "a") for i in range(5)])
+        self.assertEqual(len(swarm_log.read_appended(self.log).records), 5)
+
+    def test_fsync_off_by_default(self):
+        self.assertEqual(swarm_log.FSYNC_MODE, "off")
+        with mock.patch.object(swarm_log.os, "fsync") as fsync:
+            swarm_log.append_records(self.log, [_lock("a.py", "a")])
+        fsync.assert_not_called()
+        self.assertFalse(swarm_log.has_pending_sync())
+
+    def test_fsync_always(self):
+        with mock.patch.object(swarm_log, "FSYNC_MODE", "always"), mock.patch.object(
+            swarm_log.os, "fsync"
+        ) as fsync:
+            for i in range(3):
+                swarm_log.append_records(self.log, [_lock(f"{i}.py", "a")])
+            with swarm_log.locked_append(self.log):
+                pass
+        self.assertEqual(fsync.call_count, 3)
+
+    def test_group_commit_shares_one_fsync(self):
+        with mock.patch.object(swarm_log, "FSYNC_MODE", "group"), mock.patch.object(
+            swarm_log, "FSYNC_GROUP_SECONDS", 60
+        ), mock.patch.object(swarm_log.os, "fsync") as fsync:
+            for i in range(10):
+                swarm_log.append_records(self.log, [_lock(f"{i}.py", "a")])
+            fsync.assert_not_called()
+            self.assertTrue(swarm_log.has_pending_sync())
+
+            # What atexit does
+            swarm_log.sync_pending()
+        self.assertEqual(fsync.call_count, 1)
+        self.assertFalse(swarm_log.has_pending_sync())
+
+
+if __name__ == "__main__":
+    unittest.main()
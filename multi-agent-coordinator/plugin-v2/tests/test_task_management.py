@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 """Tests for task management (claim_task.py and complete_task.py)"""
 
+import hashlib
 import json
+import multiprocessing
 import os
 import sys
 import tempfile
@@ -9,11 +11,23 @@ import unittest
 from datetime import datetime
 from pathlib import Path
 from io import StringIO
+from unittest import mock
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "skills/swarm-coordinator/scripts"))
 
 import claim_task
 import complete_task
+import create_task
+import id_generator
+import lock_index
+
+
+def _claim_until_empty(agent_name):
+    """Auto-claim tasks as agent_name until none are left."""
+    os.environ["CLAUDE_AGENT_NAME"] = agent_name
+    sys.stdout = StringIO()
+    while claim_task.claim_task() is not None:
+        pass
 
 
 class TestTaskManagement(unittest.TestCase):
@@ -164,6 +178,51 @@ class TestTaskManagement(unittest.TestCase):
 
         self.assertIn("not found", output)
 
+    def test_claim_already_claimed_task_rejected(self):
+        """Test that a task claimed by another agent cannot be claimed again."""
+        old_stdout = sys.stdout
+        sys.stdout = captured_output = StringIO()
+
+        first = claim_task.claim_task("task-002")
+        os.environ["CLAUDE_AGENT_NAME"] = "OtherAgent"
+        second = claim_task.claim_task("task-002")
+
+        sys.stdout = old_stdout
+        output = captured_output.getvalue()
+
+        self.assertEqual(first, "task-002")
+        self.assertIsNone(second)
+        self.assertIn("already claimed by TestAgent", output)
+
+        with open(self.tasks_file, "r") as f:
+            claims = [json.loads(line) for line in f if "task_id" in line]
+        self.assertEqual(len(claims), 1)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires fork")
+    def test_concurrent_auto_claims_never_duplicate(self):
+        """Test that concurrent agents never auto-claim the same task."""
+        for i in range(4, 40):
+            with open(self.tasks_file, "a") as f:
+                f.write(json.dumps({"id": f"task-{i:03d}", "priority": i % 7}) + "\n")
+
+        ctx = multiprocessing.get_context("fork")
+        procs = [
+            ctx.Process(target=_claim_until_empty, args=(f"Agent{i}",)) for i in range(4)
+        ]
+        for proc in procs:
+            proc.start()
+        for proc in procs:
+            proc.join()
+
+        with open(self.tasks_file, "r") as f:
+            claimed = [
+                json.loads(line)["task_id"] for line in f if '"in_progress"' in line
+            ]
+
+        # 38 claimable tasks (task-003 waits on task-001), each claimed once
+        self.assertEqual(len(claimed), len(set(claimed)))
+        self.assertEqual(len(claimed), 38)
+
     def test_complete_task(self):
         """Test completing a task."""
         # First claim the task
@@ -188,6 +247,68 @@ class TestTaskManagement(unittest.TestCase):
         self.assertEqual(completion_record["status"], "completed")
         self.assertEqual(completion_record["summary"], "Task completed successfully")
 
+    def test_claim_reserves_task_files(self):
+        """Claiming a task reserves its `files` patterns for the claimer."""
+        old_stdout = sys.stdout
+        sys.stdout = StringIO()
+        claim_task.claim_task("task-001")
+        sys.stdout = old_stdout
+
+        index = lock_index.LockIndex(self.swarm_dir)
+        try:
+            reservations = index.reservations()
+            self.assertEqual(list(reservations), ["src/api/**"])
+            self.assertEqual(reservations["src/api/**"]["holder"], "TestAgent")
+            self.assertEqual(reservations["src/api/**"]["task_id"], "task-001")
+            self.assertEqual(len(index.covering("src/api/v1/users.py")), 1)
+            self.assertEqual(index.covering("src/ui/app.py"), [])
+        finally:
+            index.close()
+
+    def test_complete_releases_only_own_task_reservations(self):
+        """Completion releases the task's reservations and no others."""
+        old_stdout = sys.stdout
+        sys.stdout = StringIO()
+        claim_task.claim_task("task-001")
+        claim_task.claim_task("task-002")
+        claim_task.reserve_files({"id": "task-001", "files": ["docs"]}, "OtherAgent")
+        complete_task.complete_task("task-001")
+        sys.stdout = old_stdout
+
+        index = lock_index.LockIndex(self.swarm_dir)
+        try:
+            self.assertEqual(list(index.reservations()), ["docs", "src/ui/**"])
+        finally:
+            index.close()
+
+    def test_overlapping_reservations_cannot_be_claimed(self):
+        """A task whose files another agent reserved waits until they are released."""
+        with open(self.tasks_file, "a") as f:
+            for task_id, files in (("task-004", ["src/api/**"]), ("task-005", ["src/api/v1/*.py"])):
+                f.write(json.dumps({"id": task_id, "description": task_id, "files": files}) + "\n")
+        old_stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            claim_task.claim_task("task-001")
+            os.environ["CLAUDE_AGENT_NAME"] = "OtherAgent"
+            self.assertIsNone(claim_task.claim_task("task-004"))
+            self.assertIsNone(claim_task.claim_task("task-005"))
+            # Auto-claim passes over the blocked tasks
+            self.assertEqual(claim_task.claim_task(), "task-002")
+
+            index = lock_index.LockIndex(self.swarm_dir)
+            try:
+                self.assertEqual(index.reservations()["src/api/**"]["holder"], "TestAgent")
+            finally:
+                index.close()
+
+            os.environ["CLAUDE_AGENT_NAME"] = "TestAgent"
+            complete_task.complete_task("task-001")
+            os.environ["CLAUDE_AGENT_NAME"] = "OtherAgent"
+            self.assertEqual(claim_task.claim_task("task-004"), "task-004")
+        finally:
+            sys.stdout = old_stdout
+
     def test_complete_task_broadcasts_message(self):
         """Test that completing a task broadcasts a message."""
         complete_task.complete_task("task-001", "Done!")
@@ -216,5 +337,115 @@ class TestTaskManagement(unittest.TestCase):
         self.assertIn("task-003", task_ids)
 
 
+class TestCreateTasks(unittest.TestCase):
+    def setUp(self):
+        """Create a temporary directory for testing."""
+        self.test_dir = tempfile.mkdtemp()
+        self.swarm_dir = Path(self.test_dir) / ".claude/swarm"
+        create_task.SWARM_DIR = self.swarm_dir
+        claim_task.SWARM_DIR = self.swarm_dir
+        self.tasks_file = self.swarm_dir / "tasks.jsonl"
+
+    def tearDown(self):
+        """Clean up temporary directory."""
+        import shutil
+        shutil.rmtree(self.test_dir)
+
+    def test_create_tasks_batch(self):
+        """Test that a batch is written in order with distinct IDs."""
+        batch = [
+            {"description": f"Task {i}", "priority": i % 10, "files": [f"src/{i}/**"]}
+            for i in range(200)
+        ]
+
+        task_ids = create_task.create_tasks(batch)
+
+        self.assertEqual(len(task_ids), 200)
+        self.assertEqual(len(set(task_ids)), 200)
+
+        with open(self.tasks_file, "r") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r["id"] for r in records], task_ids)
+        self.assertEqual(records[7]["description"], "Task 7")
+        self.assertEqual(records[7]["files"], ["src/7/**"])
+        self.assertEqual(records[7]["status"], "pending")
+
+    def test_create_tasks_avoids_existing_ids(self):
+        """Test that batch IDs never reuse an existing task ID."""
+        first = create_task.create_tasks([{"description": "Existing"}])
+        second = create_task.create_tasks([{"description": f"New {i}"} for i in range(50)])
+
+        self.assertNotIn(first[0], second)
+        self.assertEqual(len(claim_task.load_task_state()), 51)
+
+    def test_create_tasks_reserves_ids_in_the_index(self):
+        """Test that batch IDs skip reserved IDs and are reserved themselves."""
+        def task_id(byte):
+            data = f"0-{(byte * 16).hex()}"
+            return f"task-{hashlib.sha256(data.encode()).hexdigest()[:4]}"
+
+        index = id_generator.RecordIndex(self.tasks_file)
+        index.reserve([task_id(b"a")])
+        clock = mock.Mock(time=lambda: 0)
+        with mock.patch.object(id_generator, "time", clock), mock.patch.object(
+            id_generator.os, "urandom", side_effect=[b"a" * 16, b"b" * 16]
+        ):
+            task_ids = create_task.create_tasks([{"description": "x"}])
+
+        self.assertEqual(task_ids, [task_id(b"b")])
+        self.assertIn(task_id(b"b"), index.ids())
+
+    def test_create_tasks_hash_length_covers_batch(self):
+        """Test that the hash length accounts for the whole batch."""
+        task_ids = create_task.create_tasks([{"description": "x"}] * 600)
+        self.assertEqual(len(task_ids[0].split("-")[1]), 5)
+
+    def test_create_tasks_requires_description(self):
+        """Test that an invalid spec rejects the whole batch."""
+        with self.assertRaises(ValueError):
+            create_task.create_tasks([{"description": "ok"}, {"priority": 3}])
+        self.assertFalse(self.tasks_file.exists())
+
+    def test_read_batch_from_jsonl(self):
+        """Test reading task specs from a JSONL file."""
+        source = Path(self.test_dir) / "plan.jsonl"
+        source.write_text('{"description": "A"}\n\n{"description": "B", "priority": 9}\n')
+
+        batch = create_task.read_batch(str(source))
+
+        self.assertEqual([spec["description"] for spec in batch], ["A", "B"])
+
+    def test_create_tasks_rejects_malformed_specs(self):
+        """Non-object specs and bad priority/dependencies fail before any append."""
+        bad_specs = [
+            ["not an object"],
+            {"description": "A", "priority": "high"},
+            {"description": "A", "priority": True},
+            {"description": "A", "dependencies": "task-1"},
+            {"description": "A", "dependencies": [1]},
+        ]
+        for spec in bad_specs:
+            with self.assertRaisesRegex(ValueError, "entry 2"):
+                create_task.create_tasks([{"description": "ok"}, spec])
+        self.assertFalse(self.tasks_file.exists())
+
+    def test_from_jsonl_reports_bad_line(self):
+        """The CLI names the offending line and writes nothing."""
+        source = Path(self.test_dir) / "plan.jsonl"
+        source.write_text('{"description": "A"}\n\n[1, 2]\n')
+        argv, stdout = sys.argv, sys.stdout
+        sys.argv = ["create_task.py", "--from-jsonl", str(source)]
+        sys.stdout = StringIO()
+        try:
+            with self.assertRaises(SystemExit):
+                create_task.main()
+            output = sys.stdout.getvalue()
+        finally:
+            sys.argv, sys.stdout = argv, stdout
+
+        self.assertIn("line 3", output)
+        self.assertFalse(self.tasks_file.exists())
+
+
 if __name__ == "__main__":
     unittest.main()
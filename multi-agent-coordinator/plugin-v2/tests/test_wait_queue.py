@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""Tests for queued lock waits with fair handoff (wait_queue.py)."""
+
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "skills/swarm-coordinator/scripts"))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import wait_queue
+from hooks import coordination
+from test_liveness import dead_pid
+
+
+def edit_event(hook_event_name, file_path):
+    return {
+        "hook_event_name": hook_event_name,
+        "tool_name": "Edit",
+        "tool_input": {"file_path": file_path},
+        "tool_response": {"success": True},
+    }
+
+
+def wait_and_edit(workdir: str, agent_id: str, file_path: str):
+    """Worker process: queue for file_path, hold it briefly, release it."""
+    os.chdir(workdir)
+    coordination.SWARM_DIR = Path(".claude/swarm")
+    coordinator = coordination.SwarmCoordinator(agent_id=agent_id, lock_wait_seconds=20)
+    result = coordination.process_hook_event(edit_event("PreToolUse", file_path), coordinator)
+    if result.get("block") is not False:
+        sys.exit(1)
+    time.sleep(0.05)
+    coordination.process_hook_event(edit_event("PostToolUse", file_path), coordinator)
+
+
+class TestWaitQueue(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.prev_cwd = os.getcwd()
+        os.chdir(self.test_dir)
+        self.swarm_dir = Path(".claude/swarm")
+        self.swarm_dir.mkdir(parents=True, exist_ok=True)
+        coordination.SWARM_DIR = self.swarm_dir
+
+    def tearDown(self):
+        os.chdir(self.prev_cwd)
+        shutil.rmtree(self.test_dir)
+
+    def coordinator(self, agent_id, wait=0):
+        return coordination.SwarmCoordinator(agent_id=agent_id, lock_wait_seconds=wait)
+
+    def edit(self, coordinator, hook_event_name, file_path="src/app.py"):
+        return coordination.process_hook_event(edit_event(hook_event_name, file_path), coordinator)
+
+    def queue_length(self, file_path):
+        return len(wait_queue._live_entries(wait_queue._queue_dir(self.swarm_dir, file_path)))
+
+    def test_waiting_is_off_by_default(self):
+        """Without SWARM_LOCK_WAIT_SECONDS a locked file blocks at once."""
+        self.assertEqual(wait_queue.WAIT_SECONDS, 0)
+        holder = self.coordinator("holder")
+        self.assertFalse(self.edit(holder, "PreToolUse")["block"])
+
+        started = time.monotonic()
+        waiter = coordination.SwarmCoordinator(agent_id="waiter")
+        self.assertTrue(self.edit(waiter, "PreToolUse")["block"])
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(wait_queue.stats(self.swarm_dir)["waits"], 0)
+
+    def test_waiters_acquire_in_arrival_order(self):
+        """A release hands the file to the oldest waiter, then the next."""
+        holder = self.coordinator("holder")
+        self.assertFalse(self.edit(holder, "PreToolUse")["block"])
+
+        ctx = multiprocessing.get_context("fork")
+        workers = []
+        for i in range(3):
+            proc = ctx.Process(target=wait_and_edit, args=(self.test_dir, f"waiter-{i}", "src/app.py"))
+            proc.start()
+            workers.append(proc)
+            # Start the next waiter only once this one is queued
+            deadline = time.time() + 10
+            while self.queue_length("src/app.py") <= i and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(self.queue_length("src/app.py"), i + 1)
+
+        self.edit(holder, "PostToolUse")
+        for proc in workers:
+            proc.join(30)
+            self.assertEqual(proc.exitcode, 0)
+
+        acquired = [
+            record["holder"]
+            for record in map(json.loads, (self.swarm_dir / "locks.jsonl").open())
+            if record.get("status") != "released"
+        ]
+        self.assertEqual(acquired, ["holder", "waiter-0", "waiter-1", "waiter-2"])
+        self.assertEqual(self.queue_length("src/app.py"), 0)
+
+        summary = wait_queue.stats(self.swarm_dir)
+        self.assertEqual(summary["outcomes"], {"acquired": 3})
+        self.assertEqual(summary["blocks_avoided"], 3)
+        # Woken by the release, not by the once-a-second recheck
+        first = min(
+            r["waited_ms"]
+            for r in map(json.loads, (self.swarm_dir / wait_queue.METRICS_LOG).open())
+        )
+        self.assertLess(first, wait_queue.RECHECK_SECONDS * 1000)
+
+    def test_newcomer_cannot_jump_the_queue(self):
+        """A free file still blocks agents that arrive after a waiter."""
+        ticket = wait_queue.Ticket(self.swarm_dir, "waiter", ["src/app.py"], time.time() + 30)
+        self.assertTrue(ticket.enqueue())
+        try:
+            result = self.edit(self.coordinator("newcomer"), "PreToolUse")
+            self.assertTrue(result["block"])
+            self.assertIn("**Queued**", result["message"])
+            self.assertIn("waiter", result["message"])
+
+            # The waiter itself takes the file
+            waiter = self.coordinator("waiter")
+            self.assertEqual(waiter._acquire_locks(["src/app.py"], "editing", ticket.id), [])
+        finally:
+            ticket.leave()
+
+    def test_wait_times_out(self):
+        """A wait that outlasts the holder blocks and leaves the queue."""
+        self.assertFalse(self.edit(self.coordinator("holder"), "PreToolUse")["block"])
+
+        started = time.monotonic()
+        result = self.edit(self.coordinator("waiter", wait=0.3), "PreToolUse")
+        self.assertTrue(result["block"])
+        self.assertGreaterEqual(time.monotonic() - started, 0.3)
+        self.assertEqual(self.queue_length("src/app.py"), 0)
+        self.assertEqual(wait_queue.stats(self.swarm_dir)["outcomes"], {"timeout": 1})
+
+    def test_full_queue_blocks_at_once(self):
+        """Past QUEUE_MAX waiters an agent is blocked without waiting."""
+        self.assertFalse(self.edit(self.coordinator("holder"), "PreToolUse")["block"])
+        ticket = wait_queue.Ticket(self.swarm_dir, "first", ["src/app.py"], time.time() + 30)
+        self.assertTrue(ticket.enqueue())
+
+        previous, wait_queue.QUEUE_MAX = wait_queue.QUEUE_MAX, 1
+        try:
+            started = time.monotonic()
+            self.assertTrue(self.edit(self.coordinator("second", wait=10), "PreToolUse")["block"])
+            self.assertLess(time.monotonic() - started, 1)
+        finally:
+            wait_queue.QUEUE_MAX = previous
+            ticket.leave()
+        self.assertEqual(wait_queue.stats(self.swarm_dir)["outcomes"], {"full": 1})
+
+    def test_dead_and_expired_waiters_are_dropped(self):
+        """Tickets of exited or timed-out waiters do not hold up the queue."""
+        ticket = wait_queue.Ticket(self.swarm_dir, "gone", ["src/app.py"], time.time() + 30)
+        self.assertTrue(ticket.enqueue())
+        entry = wait_queue._queue_dir(self.swarm_dir, "src/app.py") / f"{ticket.id}.json"
+        record = json.loads(entry.read_text())
+        entry.write_text(json.dumps(dict(record, pid=dead_pid())))
+
+        expired = wait_queue.Ticket(self.swarm_dir, "late", ["src/app.py"], time.time() - 1)
+        self.assertTrue(expired.enqueue())
+        try:
+            self.assertFalse(self.edit(self.coordinator("newcomer"), "PreToolUse")["block"])
+            self.assertEqual(self.queue_length("src/app.py"), 0)
+        finally:
+            ticket.leave()
+            expired.leave()
+
+    def test_empty_queues_are_removed(self):
+        """has_waiters() turns false again once the last waiter has left."""
+        self.assertFalse(wait_queue.has_waiters(self.swarm_dir))
+        ticket = wait_queue.Ticket(self.swarm_dir, "a", ["src/a.py", "src/b.py"], time.time() + 30)
+        self.assertTrue(ticket.enqueue())
+        self.assertTrue(wait_queue.has_waiters(self.swarm_dir))
+
+        ticket.leave()
+        self.assertFalse(wait_queue.has_waiters(self.swarm_dir))
+        self.assertFalse(wait_queue._queue_dir(self.swarm_dir, "src/a.py").exists())
+
+        # A dead waiter's queue goes once its entry is dropped
+        gone = wait_queue.Ticket(self.swarm_dir, "gone", ["src/a.py"], time.time() - 1)
+        self.assertTrue(gone.enqueue())
+        self.assertTrue(wait_queue.has_waiters(self.swarm_dir))
+        self.assertEqual(self.queue_length("src/a.py"), 0)
+        self.assertFalse(wait_queue.has_waiters(self.swarm_dir))
+        self.assertFalse(wait_queue._queue_dir(self.swarm_dir, "src/a.py").exists())
+        gone.leave()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""Tests for log change wake-ups (watch.py), on both backends."""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "skills/swarm-coordinator/scripts"))
+
+import get_messages
+import message_store
+import watch
+
+
+class InotifyWatcherTest(unittest.TestCase):
+    USE_INOTIFY = True
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.swarm_dir = Path(self.test_dir) / ".claude/swarm"
+        self.swarm_dir.mkdir(parents=True, exist_ok=True)
+        self.watcher = self.watch()
+
+    def tearDown(self):
+        self.watcher.close()
+        shutil.rmtree(self.test_dir)
+
+    def watch(self, logs=None):
+        watcher = watch.Watcher(self.swarm_dir, logs, poll_interval=0.02, use_inotify=self.USE_INOTIFY)
+        if self.USE_INOTIFY and watcher.backend != "inotify":
+            watcher.close()
+            self.skipTest("inotify is not available")
+        return watcher
+
+    def append(self, key, record=None, delay=0):
+        """Append a record to swarm_dir/key, after delay seconds in the background."""
+
+        def write():
+            time.sleep(delay)
+            path = self.swarm_dir / key
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "a") as f:
+                f.write(json.dumps(record or {"id": "x"}) + "\n")
+
+        if not delay:
+            write()
+            return None
+        thread = threading.Thread(target=write)
+        thread.start()
+        self.addCleanup(thread.join)
+        return thread
+
+    def test_append_wakes_waiter(self):
+        """A blocked changes() returns as soon as a log is appended to."""
+        self.append("tasks.jsonl", delay=0.1)
+        started = time.monotonic()
+        self.assertEqual(self.watcher.changes(timeout=5), {"tasks.jsonl"})
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_timeout_without_changes(self):
+        started = time.monotonic()
+        self.assertEqual(self.watcher.changes(timeout=0.2), set())
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+
+    def test_changes_between_calls_are_kept(self):
+        """A change made while nobody waits is reported by the next call."""
+        self.append("locks.jsonl")
+        self.assertEqual(self.watcher.changes(timeout=1), {"locks.jsonl"})
+        self.assertEqual(self.watcher.changes(timeout=0.1), set())
+
+    def test_only_watched_logs_wake(self):
+        """Other logs and non-log files do not wake a filtered watcher."""
+        watcher = self.watch(["tasks.jsonl"])
+        self.addCleanup(watcher.close)
+        self.append("messages.jsonl")
+        (self.swarm_dir / "notes.txt").write_text("x")
+        self.assertEqual(watcher.changes(timeout=0.2), set())
+
+        self.append("tasks.jsonl")
+        self.assertEqual(watcher.changes(timeout=1), {"tasks.jsonl"})
+
+    def test_compaction_rename_is_a_change(self):
+        """Replacing a log (as compaction does) wakes the watcher."""
+        self.append("tasks.jsonl")
+        self.watcher.changes(timeout=1)
+
+        tmp = self.swarm_dir / "tasks.jsonl.compact"
+        tmp.write_text(json.dumps({"id": "folded"}) + "\n")
+        os.replace(tmp, self.swarm_dir / "tasks.jsonl")
+        self.assertEqual(self.watcher.changes(timeout=1), {"tasks.jsonl"})
+
+    def test_one_append_is_one_change(self):
+        """The events of a single append arrive as one batch."""
+        watcher = watch.Watcher(
+            self.swarm_dir, poll_interval=0.02, use_inotify=self.USE_INOTIFY, settle=0.2
+        )
+        self.addCleanup(watcher.close)
+
+        def write():
+            with open(self.swarm_dir / "agents.jsonl", "a") as f:
+                time.sleep(0.01)
+                f.write(json.dumps({"id": "x"}))
+                f.flush()
+                time.sleep(0.01)
+                f.write("\n")
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.assertEqual(watcher.changes(timeout=5), {"agents.jsonl"})
+        self.assertEqual(watcher.changes(timeout=0.1), set())
+
+    def test_new_inbox_partition_is_watched(self):
+        """Inbox logs are watched even when inbox/ appears after the watcher."""
+        self.append("inbox/agent-1.jsonl")
+        self.assertIn("inbox/agent-1.jsonl", self.watcher.changes(timeout=1))
+
+        self.append("inbox/agent-1.jsonl", delay=0.1)
+        self.assertEqual(self.watcher.changes(timeout=5), {"inbox/agent-1.jsonl"})
+
+    def test_wait_until_and_stream(self):
+        """wait_until returns the first truthy check; stream ends when idle."""
+        tasks = self.swarm_dir / "tasks.jsonl"
+        self.append("tasks.jsonl", delay=0.1)
+        result = watch.wait_until(
+            lambda: tasks.exists() and tasks.read_text(), self.swarm_dir, ["tasks.jsonl"], 5
+        )
+        self.assertIn('"id"', result)
+        self.assertIsNone(watch.wait_until(lambda: False, self.swarm_dir, timeout=0.1))
+
+        self.append("agents.jsonl", delay=0.1)
+        batches = list(watch.stream(self.swarm_dir, ["agents.jsonl"], idle_timeout=0.5))
+        # A writer descheduled mid-append can still split its events
+        self.assertTrue(batches)
+        self.assertTrue(all(batch == {"agents.jsonl"} for batch in batches))
+
+
+class PollingWatcherTest(InotifyWatcherTest):
+    USE_INOTIFY = False
+
+
+class TestWaitForMessages(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.swarm_dir = Path(self.test_dir) / ".claude/swarm"
+        self.swarm_dir.mkdir(parents=True, exist_ok=True)
+        get_messages.SWARM_DIR = self.swarm_dir
+        os.environ["CLAUDE_AGENT_NAME"] = "TestAgent"
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+        os.environ.pop("CLAUDE_AGENT_NAME", None)
+
+    def send_later(self, to, delay):
+        message = {
+            "id": f"msg-{to}",
+            "from": "Sender",
+            "to": to,
+            "subject": "Hello",
+            "body": "Body",
+            "timestamp": datetime.utcnow().isoformat(),
+            "read": False,
+        }
+        thread = threading.Timer(delay, message_store.append_message, (self.swarm_dir, message))
+        thread.start()
+        self.addCleanup(thread.join)
+
+    def test_wait_returns_new_mail(self):
+        """--wait blocks until a message for the agent arrives."""
+        self.send_later("OtherAgent", 0.05)
+        self.send_later("TestAgent", 0.3)
+        started = time.monotonic()
+        with contextlib.redirect_stdout(io.StringIO()):
+            messages = get_messages.get_messages(unread_only=True, wait=10)
+        self.assertEqual([m["id"] for m in messages], ["msg-TestAgent"])
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_wait_times_out_empty(self):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            self.assertEqual(get_messages.get_messages(unread_only=True, wait=0.2), [])
+        self.assertIn("No messages.", out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()